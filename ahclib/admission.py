@@ -0,0 +1,252 @@
+import json
+import math
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from logging import getLogger
+from typing import Any, Callable, ContextManager, Optional
+
+logger = getLogger(__name__)
+
+PSI_CPU_PATH = "/proc/pressure/cpu"
+PSI_MEMORY_PATH = "/proc/pressure/memory"
+MEMINFO_PATH = "/proc/meminfo"
+KB_PER_MB = 1024
+
+# 圧力の値を読み直す間隔で、event engine の lock 再試行ごとに /proc を読まないようにする
+ADMISSION_SAMPLE_SEC = 0.5
+# 起動を止めたスレッドが再確認する間隔
+ADMISSION_POLL_SEC = 0.1
+# 止めた後は閾値のこの割合まで下がってから再開し、閾値付近で停止と再開を繰り返さない
+ADMISSION_RESUME_RATIO = 0.8
+# 自分のケースが 1 つも動いていない状態でこれ以上止めた場合は、1 ケースずつ起動して run を進める
+ADMISSION_MAX_PAUSE_SEC = 120.0
+ADMISSION_FILE = "admission.json"
+
+
+@dataclass(frozen=True)
+class AdmissionThresholds:
+    """新しいケースの起動を止める閾値で、``None`` の項目は見ない"""
+
+    # PSI の some avg10 (%)
+    cpu_pressure: Optional[float] = 20.0
+    memory_pressure: Optional[float] = 10.0
+    # 自分のソルバーを除いた 1 分間の load average を CPU 数で割った値
+    load_ratio: Optional[float] = 1.0
+    # MemAvailable (MB)
+    min_available_mb: Optional[float] = 512
+
+
+@dataclass(frozen=True)
+class SystemPressure:
+    """取得できなかった値は ``None``"""
+
+    cpu_pressure: Optional[float] = None
+    memory_pressure: Optional[float] = None
+    load_average: Optional[float] = None
+    available_mb: Optional[float] = None
+
+
+@dataclass
+class AdmissionEvent:
+    reason: str
+    # 停止した時刻 (epoch 秒) と、再開までの秒数
+    paused_at: float
+    seconds: Optional[float] = None
+
+
+def read_psi_avg10(path: str) -> Optional[float]:
+    """PSI ファイルの ``some avg10`` を返し、PSI のないカーネルでは ``None``"""
+    try:
+        with open(path, "r", encoding="ascii") as psi_file:
+            for line in psi_file:
+                fields = line.split()
+                if fields and fields[0] == "some":
+                    return float(dict(field.split("=", 1) for field in fields[1:])["avg10"])
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def read_available_mb(path: str = MEMINFO_PATH) -> Optional[float]:
+    try:
+        with open(path, "r", encoding="ascii") as meminfo_file:
+            for line in meminfo_file:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / KB_PER_MB
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def sample_pressure() -> SystemPressure:
+    get_load = getattr(os, "getloadavg", None)
+    try:
+        load_average = get_load()[0] if get_load is not None else None
+    except OSError:
+        load_average = None
+    return SystemPressure(
+        cpu_pressure=read_psi_avg10(PSI_CPU_PATH),
+        memory_pressure=read_psi_avg10(PSI_MEMORY_PATH),
+        load_average=load_average,
+        available_mb=read_available_mb(),
+    )
+
+
+class AdmissionController:
+    """CPU とメモリの圧力が閾値を超えている間、新しいケースの起動を止める
+
+    実行中のケースは止めず、``gate`` で包んだ CPU lock の取得だけを待たせる
+    """
+
+    def __init__(
+        self,
+        thresholds: AdmissionThresholds,
+        cpu_count: Optional[int] = None,
+        threads_per_case: int = 1,
+        sampler: Callable[[], SystemPressure] = sample_pressure,
+        max_pause_sec: float = ADMISSION_MAX_PAUSE_SEC,
+    ) -> None:
+        self.thresholds = thresholds
+        self.cpu_count = cpu_count or os.cpu_count() or 1
+        self.threads_per_case = threads_per_case
+        self.sampler = sampler
+        self.max_pause_sec = max_pause_sec
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._sampled_at = -math.inf
+        self._pressure = SystemPressure()
+        self._paused_since: Optional[float] = None
+        self.running = 0
+        self.events: list[AdmissionEvent] = []
+
+    def reset(self) -> None:
+        """run ごとの記録を消し、``cancel`` で止めた待機を再び有効にする"""
+        with self._lock:
+            self._cancelled.clear()
+            self._paused_since = None
+            self.events = []
+
+    def cancel(self) -> None:
+        """中止時に、起動を待っているスレッドを圧力に関わらず進ませる"""
+        self._cancelled.set()
+
+    def _exceeded(self, pressure: SystemPressure, ratio: float) -> list[str]:
+        """閾値に ``ratio`` を掛けた値を超えている項目の説明を返す"""
+        thresholds = self.thresholds
+        reasons = []
+        if thresholds.cpu_pressure is not None and pressure.cpu_pressure is not None:
+            if pressure.cpu_pressure > thresholds.cpu_pressure * ratio:
+                reasons.append(f"cpu pressure {pressure.cpu_pressure:.1f}% > {thresholds.cpu_pressure * ratio:.1f}%")
+        if thresholds.memory_pressure is not None and pressure.memory_pressure is not None:
+            if pressure.memory_pressure > thresholds.memory_pressure * ratio:
+                reasons.append(
+                    f"memory pressure {pressure.memory_pressure:.1f}% > {thresholds.memory_pressure * ratio:.1f}%"
+                )
+        if thresholds.load_ratio is not None and pressure.load_average is not None:
+            # 自分のソルバーによる load は除く
+            other_load = max(0.0, pressure.load_average - self.running * self.threads_per_case)
+            if other_load / self.cpu_count > thresholds.load_ratio * ratio:
+                reasons.append(f"load {other_load:.2f} > {thresholds.load_ratio * ratio * self.cpu_count:.2f}")
+        if thresholds.min_available_mb is not None and pressure.available_mb is not None:
+            if pressure.available_mb < thresholds.min_available_mb / ratio:
+                reasons.append(
+                    f"available memory {pressure.available_mb:.0f} MB < {thresholds.min_available_mb / ratio:.0f} MB"
+                )
+        return reasons
+
+    def admit(self) -> bool:
+        """新しいケースを起動してよいかを返し、停止と再開をログと ``events`` に残す"""
+        now = time.monotonic()
+        with self._lock:
+            if self._cancelled.is_set():
+                return True
+            if now - self._sampled_at >= ADMISSION_SAMPLE_SEC:
+                self._pressure = self.sampler()
+                self._sampled_at = now
+            if self._paused_since is None:
+                reasons = self._exceeded(self._pressure, 1.0)
+                if not reasons:
+                    return True
+                self._paused_since = now
+                self.events.append(AdmissionEvent(", ".join(reasons), time.time()))
+                logger.warning(f"Admission paused: {', '.join(reasons)} ({self.running} cases running).")
+                return False
+            paused_seconds = now - self._paused_since
+            if self._exceeded(self._pressure, ADMISSION_RESUME_RATIO):
+                if self.running > 0 or paused_seconds < self.max_pause_sec:
+                    return False
+                logger.warning(f"Admission still under pressure after {paused_seconds:.1f} sec; starting one case.")
+                return True
+            self._paused_since = None
+            self.events[-1].seconds = paused_seconds
+            logger.info(f"Admission resumed after {paused_seconds:.1f} sec.")
+            return True
+
+    def wait(self) -> None:
+        while not self.admit():
+            self._cancelled.wait(ADMISSION_POLL_SEC)
+
+    def _started(self) -> None:
+        with self._lock:
+            self.running += 1
+
+    def _finished(self) -> None:
+        with self._lock:
+            self.running -= 1
+
+    def gate(self, cpu_lock: Optional[ContextManager[Any]]) -> "AdmissionGate":
+        return AdmissionGate(self, cpu_lock)
+
+    def summary(self) -> dict[str, Any]:
+        """停止回数、停止していた合計秒数、各停止の理由"""
+        with self._lock:
+            events = list(self.events)
+            paused_since = self._paused_since
+        total = sum(event.seconds for event in events if event.seconds is not None)
+        if paused_since is not None:
+            total += time.monotonic() - paused_since
+        return {
+            "throttle_count": len(events),
+            "throttled_seconds": total,
+            "thresholds": asdict(self.thresholds),
+            "events": [asdict(event) for event in events],
+        }
+
+    def write_summary(self, output_dir: str) -> None:
+        with open(os.path.join(output_dir, ADMISSION_FILE), "w", encoding="utf-8") as summary_file:
+            json.dump(self.summary(), summary_file, indent=2)
+
+
+@dataclass
+class AdmissionGate:
+    """CPU lock と同じ ``acquire`` / ``release`` を持ち、圧力が下がるまで取得を待たせる
+
+    thread engine は ``with`` で、event engine は ``acquire(False)`` を繰り返して取得する
+    """
+
+    controller: AdmissionController
+    cpu_lock: Optional[ContextManager[Any]] = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        if blocking:
+            self.controller.wait()
+        elif not self.controller.admit():
+            return False
+        if self.cpu_lock is not None and not self.cpu_lock.acquire(blocking):  # type: ignore[attr-defined]
+            return False
+        self.controller._started()
+        return True
+
+    def release(self) -> None:
+        self.controller._finished()
+        if self.cpu_lock is not None:
+            self.cpu_lock.release()  # type: ignore[attr-defined]
+
+    def __enter__(self) -> "AdmissionGate":
+        self.acquire()
+        return self
+
+    def __exit__(self, *_exc_info: Any) -> None:
+        self.release()
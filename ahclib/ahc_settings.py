@@ -17,15 +17,56 @@ class AHCSettings:
     direction: str = "maximize"  # minimize / maximize
     njobs: int = 100
     cpu_affinity: bool = True  # Linux / WSL でケースごとに logical CPU を固定する
+    # cpu_affinity で使う CPU の選び方 (physical_core / same_node / fastest を順に適用し、空なら ID 順に使う)
+    cpu_placement: list[str] = []
+    # cpu_affinity で固定する CPU を、同時に動く他の ahclib の test / opt と取り合わないように借りる (test が優先)
+    cpu_lease: bool = True
+    # 1 ケースが使う CPU 数で、CPU グループへ固定して OMP_NUM_THREADS などに設定する (並列数は njobs / cpus_per_case 以下)
+    cpus_per_case: int = 1
+    solver_engine: str = "thread"  # thread / event (event は 1 スレッドで全ソルバーを監視する)
+    case_schedule: str = "input"  # input / longest_first (過去の実行時間が長いケースから起動する)
+    stream_record: bool = True  # 記録時にソルバーの出力を out/ err/ へ直接書き込ませる
+    # test の実行中は実行ファイルと out/ err/ をこの tmpfs に置き、結果ディレクトリへはバックグラウンドで移す
+    stage_dir: Optional[str] = None  # 例: "/dev/shm"
+    # 実行中は各ケースの終了後に err/ だけを gzip / zstd (zstandard が必要) で圧縮する。None なら圧縮しない
+    # out/ は ./out から読めるよう実行中は圧縮せず、`ahclib compact` で終わった実行の out/ と err/ を圧縮する
+    record_compression: Optional[str] = None
+    # CPU / メモリの圧力 (PSI)、load average、空きメモリが閾値を超えている間は新しいケースを起動しない
+    admission_control: bool = False
+    admission_cpu_pressure: Optional[float] = 20.0  # /proc/pressure/cpu の some avg10 (%)
+    admission_memory_pressure: Optional[float] = 10.0  # /proc/pressure/memory の some avg10 (%)
+    admission_load_ratio: Optional[float] = 1.0  # 自分のソルバーを除いた load average / CPU 数
+    admission_min_available_mb: Optional[float] = 512  # MemAvailable (MB)
+    result_cache: bool = False  # 実行ファイル・引数・入力・制限時間が同じケースの結果を再利用する
+    result_cache_max_mb: int = 1024  # 超えた場合は最終利用の古い結果から削除する
     timeout: Optional[int] = None
+    timeout_mode: str = "wall"  # wall / cpu (cpu は消費した CPU 時間で判定し、経過時間は 4 倍まで待つ)
+    memory_limit: Optional[int] = None  # MB 単位で、最大 RSS が超えたケースは MLE になる
+    # 同時に実行するケースの予想最大 RSS (過去の test の実測値) の合計の上限 (MB)
+    memory_budget_mb: Optional[float] = None
     is_int: bool = True  # 整数スコアなら True、小数スコアなら False
 
     filename: str = "./main.cpp"
     compile_command: Optional[str] = (
         f"g++ {filename} -O2 -DLOCAL -std=c++20 -o a.out " "-fopenmp -I. -I./../../Library_cpp -march=native"
     )
+    compile_cache: bool = True  # ソース、依存ヘッダ、コマンド、コンパイラが同じならコンパイルを省く
     execute_command: str = "./a.out"
+    # ソルバーを lane ごとに起動したままにし、入力と引数を stdin で渡す (README の「ソルバーの常駐」の手順に従う)
+    solver_server: bool = False
+    # Python のソルバー (python3 main.py) の import を済ませた zygote から fork してケースを実行する
+    solver_zygote: bool = False
+    # インタラクティブ問題のジャッジ ({input} と {output} は入力と出力ファイルのパスに置き換える)
+    interactive_command: Optional[str] = None
+    # 出力だけを採点するプログラム ({input} と {output} は入力と出力ファイルのパスに置き換える)
+    score_command: Optional[str] = None
+    score_workers: int = 2  # 採点プログラムを同時に動かす数で、ソルバーの CPU とは別に使う
     input_file_names: list[str] = [f"./in/{str(i).zfill(4)}.txt" for i in range(100)]
+    # 入力の生成器 ({seed} はシード値、{seeds} は seeds.txt に置き換える) で、指定すると
+    # gen_dir に生成される入力を input_file_names として使う
+    gen_command: Optional[str] = None  # 例: "./tools/target/release/gen {seeds}"
+    gen_seeds: list[int] = list(range(100))
+    gen_dir: str = "./in"
 
     use_relative_score: bool = False
     pre_dir_name: str = ""
@@ -0,0 +1,285 @@
+import collections
+import csv
+import heapq
+import json
+import math
+import os
+import statistics
+import tempfile
+import threading
+from logging import getLogger
+from typing import Any, Callable, Mapping, Optional
+
+logger = getLogger(__name__)
+
+# input はこれまでどおり入力順、longest_first は過去の実行時間が長いケースから起動する
+CASE_SCHEDULES = ("input", "longest_first")
+CASE_TIMES_FILE = "case_times.json"
+CASE_MEMORY_FILE = "case_memory.json"
+# 新しい実行時間を履歴へ反映する割合
+CASE_TIME_SMOOTHING = 0.5
+# 履歴が 1 件もない場合に使う予想実行時間
+DEFAULT_CASE_SECONDS = 1.0
+
+
+def latest_result_csv(all_tests_dir: str, csv_name: str = "result.csv") -> Optional[str]:
+    """実行日時が最も新しい ``result.csv`` のパスを返し、なければ ``None``"""
+    try:
+        run_names = sorted(os.listdir(all_tests_dir), reverse=True)
+    except FileNotFoundError:
+        return None
+    for run_name in run_names:
+        csv_path = os.path.join(all_tests_dir, run_name, csv_name)
+        if os.path.isfile(csv_path):
+            return csv_path
+    return None
+
+
+def read_result_csv_column(csv_path: str, column: str) -> dict[str, float]:
+    """``result.csv`` からケースごとの ``column`` 列の値を読み、空欄や負の値のケースは除く"""
+    values: dict[str, float] = {}
+    with open(csv_path, "r", encoding="utf-8", newline="") as csv_file:
+        for row in csv.DictReader(csv_file):
+            try:
+                value = float(row[column])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if math.isfinite(value) and value >= 0:
+                values[row["filename"]] = value
+    return values
+
+
+def read_result_csv_times(csv_path: str) -> dict[str, float]:
+    """``result.csv`` からケースごとの実行時間を読み、失敗したケースは除く"""
+    return read_result_csv_column(csv_path, "time")
+
+
+class CaseHistory:
+    """ケースごとの値の履歴で、最初は直近の ``result.csv`` の ``column`` 列から作る"""
+
+    column = "time"
+    # 新しい値を履歴へ反映する割合
+    smoothing = CASE_TIME_SMOOTHING
+    # 履歴が 1 件もない場合に使う予想値
+    default_value = DEFAULT_CASE_SECONDS
+    description = "case time history"
+
+    def __init__(self, path: str, fallback_csv: Optional[str] = None) -> None:
+        self.path = path
+        self.fallback_csv = fallback_csv
+        self._lock = threading.Lock()
+        self._times: Optional[dict[str, float]] = None
+
+    def _load(self) -> dict[str, float]:
+        if self._times is not None:
+            return self._times
+        times: dict[str, float] = {}
+        try:
+            if self.fallback_csv is not None:
+                times.update(read_result_csv_column(self.fallback_csv, self.column))
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as history_file:
+                    times.update({name: float(seconds) for name, seconds in json.load(history_file).items()})
+        except (OSError, ValueError, AttributeError) as error:
+            logger.warning(f"Failed to read {self.description}: {error}")
+        self._times = times
+        return times
+
+    def _fallback(self, input_file: str, times: dict[str, float], known: list[float]) -> float:
+        return statistics.median(known) if known else self.default_value
+
+    def predict(self, input_files: list[str]) -> tuple[list[float], int]:
+        """予想値と、履歴があったケース数を返す
+
+        履歴のないケースは既知のケースの中央値とする
+        """
+        with self._lock:
+            times = dict(self._load())
+        known = [times[input_file] for input_file in input_files if input_file in times]
+        predicted = [
+            times[input_file] if input_file in times else self._fallback(input_file, times, known)
+            for input_file in input_files
+        ]
+        return predicted, len(known)
+
+    def record(self, case_seconds: dict[str, float]) -> None:
+        """値を指数移動平均で履歴へ反映して保存する"""
+        with self._lock:
+            times = dict(self._load())
+            for input_file, seconds in case_seconds.items():
+                if seconds < 0:
+                    continue
+                previous = times.get(input_file)
+                if previous is None:
+                    times[input_file] = seconds
+                else:
+                    times[input_file] = previous + self.smoothing * (seconds - previous)
+            self._times = times
+            directory = os.path.dirname(self.path) or "."
+            try:
+                os.makedirs(directory, exist_ok=True)
+                fd, temporary_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+                with os.fdopen(fd, "w", encoding="utf-8") as history_file:
+                    json.dump(times, history_file)
+                # 複数の Optuna session が同時に書いても壊れたファイルを残さない
+                os.replace(temporary_path, self.path)
+            except OSError as error:
+                logger.warning(f"Failed to save {self.description}: {error}")
+
+
+class CaseTimeHistory(CaseHistory):
+    """ケースごとの実行時間の履歴で、最初は直近の ``result.csv`` から作る"""
+
+
+def _parameter_distance(first: Mapping[str, Any], second: Mapping[str, Any]) -> float:
+    """共通する数値パラメータの相対差の合計"""
+    distance = 0.0
+    for key, value in first.items():
+        other = second.get(key)
+        if isinstance(value, (int, float)) and isinstance(other, (int, float)):
+            distance += abs(value - other) / max(abs(value), abs(other), 1)
+    return distance
+
+
+class CaseMemoryHistory(CaseHistory):
+    """ケースごとの最大 RSS (KiB) の履歴で、最初は直近の ``result.csv`` から作る
+
+    ソルバーの変更でメモリ使用量は大きく変わるため、平均せず最新の値を使う
+    履歴のないケースは ``parse_input_params`` の数値が最も近い既知のケースの値とし、
+    比べられなければ既知のケースの中央値とする
+    """
+
+    column = "max_rss_kb"
+    smoothing = 1.0
+    default_value = 0.0
+    description = "case memory history"
+
+    def __init__(
+        self,
+        path: str,
+        fallback_csv: Optional[str] = None,
+        input_parser: Optional[Callable[[str], Mapping[str, Any]]] = None,
+    ) -> None:
+        super().__init__(path, fallback_csv)
+        self.input_parser = input_parser
+        self._params: dict[str, Optional[Mapping[str, Any]]] = {}
+
+    def _input_params(self, input_file: str) -> Optional[Mapping[str, Any]]:
+        if input_file not in self._params:
+            try:
+                params = self.input_parser(input_file) if self.input_parser is not None else None
+            except Exception as error:
+                logger.warning(f"Failed to parse input params of {input_file}: {error}")
+                params = None
+            if not isinstance(params, Mapping) or not any(isinstance(value, (int, float)) for value in params.values()):
+                params = None
+            self._params[input_file] = params
+        return self._params[input_file]
+
+    def _fallback(self, input_file: str, times: dict[str, float], known: list[float]) -> float:
+        params = self._input_params(input_file)
+        if params is not None:
+            candidates = [
+                (_parameter_distance(params, known_params), known_file)
+                for known_file in times
+                if os.path.exists(known_file) and (known_params := self._input_params(known_file)) is not None
+            ]
+            if candidates:
+                return times[min(candidates)[1]]
+        # 今回のケースに既知のものがなければ、履歴全体の中央値とする
+        return super()._fallback(input_file, times, known or list(times.values()))
+
+
+def plan_longest_first(predicted: list[float], lane_count: int) -> list[collections.deque[int]]:
+    """予想実行時間の長い順に、予想負荷が最も小さい lane へケースを割り当てる"""
+    lanes: list[collections.deque[int]] = [collections.deque() for _ in range(max(1, lane_count))]
+    loads = [(0.0, lane_index) for lane_index in range(len(lanes))]
+    for case_index in sorted(range(len(predicted)), key=lambda index: (-predicted[index], index)):
+        load, lane_index = heapq.heappop(loads)
+        lanes[lane_index].append(case_index)
+        heapq.heappush(loads, (load + predicted[case_index], lane_index))
+    return lanes
+
+
+def predicted_makespan(predicted: list[float], lanes: list[collections.deque[int]]) -> float:
+    return max((sum(predicted[case_index] for case_index in lane) for lane in lanes), default=0.0)
+
+
+class MemoryBudget:
+    """予想最大 RSS の合計が ``budget_kb`` を超えないようにケースの起動を調整する
+
+    実行中のケースがなければ、予想が budget を超えるケースも 1 つだけ起動する
+    """
+
+    def __init__(self, budget_kb: float, predicted_kb: list[float], order: Optional[list[int]] = None) -> None:
+        self.budget_kb = budget_kb
+        self._predicted_kb = predicted_kb
+        self._pending = list(range(len(predicted_kb)) if order is None else order)
+        self._condition = threading.Condition()
+        self._reserved_kb = 0.0
+        self._running = 0
+        self._cancelled = False
+        # 先頭のケースが入らず、後ろのケースを先に起動した回数
+        self.deferred_count = 0
+        self.peak_reserved_kb = 0.0
+
+    def _fits(self, case_index: int) -> bool:
+        return self._running == 0 or self._reserved_kb + self._predicted_kb[case_index] <= self.budget_kb
+
+    def _reserve(self, case_index: int) -> None:
+        self._reserved_kb += self._predicted_kb[case_index]
+        self._running += 1
+        self.peak_reserved_kb = max(self.peak_reserved_kb, self._reserved_kb)
+
+    def next_case(self) -> Optional[int]:
+        """budget に収まる最初の未実行ケースを返し、全て起動済みか中止していれば ``None``
+
+        収まるケースがなければ、実行中のケースが終わるまで待つ
+        """
+        with self._condition:
+            while self._pending and not self._cancelled:
+                for position, case_index in enumerate(self._pending):
+                    if self._fits(case_index):
+                        if position > 0:
+                            self.deferred_count += 1
+                        del self._pending[position]
+                        self._reserve(case_index)
+                        return case_index
+                self._condition.wait()
+            return None
+
+    def release(self, case_index: int) -> None:
+        with self._condition:
+            self._reserved_kb -= self._predicted_kb[case_index]
+            self._running -= 1
+            self._condition.notify_all()
+
+    def cancel(self) -> None:
+        with self._condition:
+            self._cancelled = True
+            self._condition.notify_all()
+
+
+class WorkStealingQueue:
+    """lane ごとのケース列で、空いた lane は予想残り時間の最も長い lane の末尾から奪う"""
+
+    def __init__(self, lanes: list[collections.deque[int]], predicted: list[float]) -> None:
+        self._lanes = lanes
+        self._predicted = predicted
+        self._lock = threading.Lock()
+        self.stolen_count = 0
+
+    def _remaining_seconds(self, lane: collections.deque[int]) -> float:
+        return sum(self._predicted[case_index] for case_index in lane)
+
+    def next_case(self, lane_index: int) -> Optional[int]:
+        """``lane_index`` の lane が次に実行するケースを返し、全て終われば ``None``"""
+        with self._lock:
+            own_lane = self._lanes[lane_index]
+            if own_lane:
+                return own_lane.popleft()
+            victim = max(self._lanes, key=self._remaining_seconds)
+            if not victim:
+                return None
+            self.stolen_count += 1
+            return victim.pop()
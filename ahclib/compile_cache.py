@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import tempfile
+from logging import getLogger
+from typing import Optional
+
+logger = getLogger(__name__)
+
+# キーの作り方や保存形式を変えたら上げて、古いエントリを使わないようにする
+CACHE_FORMAT_VERSION = 1
+HASH_CHUNK_SIZE = 1 << 20
+# 保存するバイナリの最大数で、超えた場合は最終利用の古いものから削除する
+COMPILE_CACHE_MAX_ENTRIES = 16
+
+BINARY_SUFFIX = ".bin"
+META_SUFFIX = ".json"
+
+# 依存ヘッダを -M で取得できるコンパイラ (g++-13 のような版付きの名前も含む)
+DEPENDENCY_COMPILER_PATTERN = re.compile(r"^(?:g\+\+|gcc|c\+\+|cc|clang\+\+|clang)(?:-[\d.]+)?$")
+
+
+def _file_digest(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as source:
+        while chunk := source.read(HASH_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def compile_output_path(command: list[str]) -> Optional[str]:
+    """コンパイルコマンドの ``-o`` で指定された出力先を返し、なければ ``None``"""
+    for index, argument in enumerate(command):
+        if argument == "-o" and index + 1 < len(command):
+            return command[index + 1]
+        if argument.startswith("-o") and len(argument) > 2:
+            return argument[2:]
+    return None
+
+
+def _command_without_output(command: list[str]) -> list[str]:
+    arguments: list[str] = []
+    skip_next = False
+    for argument in command:
+        if skip_next:
+            skip_next = False
+        elif argument == "-o":
+            skip_next = True
+        elif not (argument.startswith("-o") and len(argument) > 2):
+            arguments.append(argument)
+    return arguments
+
+
+def parse_dependency_output(text: str) -> list[str]:
+    """``-M`` の make 形式の出力から依存ファイルの一覧を返す"""
+    placeholder = "\0"
+    text = text.replace("\\\n", " ").replace("\\ ", placeholder)
+    paths: list[str] = []
+    for line in text.splitlines():
+        _, separator, dependencies = line.partition(": ")
+        if not separator:
+            continue
+        paths.extend(path.replace(placeholder, " ") for path in dependencies.split())
+    return list(dict.fromkeys(paths))
+
+
+class CompileCache:
+    """ソース、依存ヘッダ、コンパイルコマンド、コンパイラの版が同じならバイナリを再利用する"""
+
+    def __init__(self, directory: str, max_entries: int = COMPILE_CACHE_MAX_ENTRIES) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+        # キャッシュできないコマンドの通知は 1 回だけにする
+        self._disabled_logged = False
+
+    def _log_disabled(self, reason: str) -> None:
+        if not self._disabled_logged:
+            logger.info(f"Compile cache is disabled for this command: {reason}.")
+            self._disabled_logged = True
+
+    def _compiler_version(self, compiler: str) -> Optional[str]:
+        try:
+            completed = subprocess.run([compiler, "--version"], capture_output=True, text=True, check=True)
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return completed.stdout
+
+    def _dependencies(self, command: list[str]) -> Optional[list[str]]:
+        """コンパイラの依存出力からソースと全ヘッダのパスを返し、取得できなければ ``None``"""
+        try:
+            completed = subprocess.run(
+                [*_command_without_output(command), "-M"],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        except (OSError, subprocess.CalledProcessError) as error:
+            logger.warning(f"Failed to list compile dependencies, compile cache is disabled: {error}")
+            return None
+        return parse_dependency_output(completed.stdout)
+
+    def key(self, command: list[str]) -> Optional[str]:
+        """コンパイル結果を識別するキーを返し、依存関係が分からない場合は ``None``"""
+        if not command or not DEPENDENCY_COMPILER_PATTERN.match(os.path.basename(command[0])):
+            self._log_disabled(f"{command[0] if command else 'empty command'} is not a gcc/clang compiler")
+            return None
+        if compile_output_path(command) is None:
+            self._log_disabled("the output is not given by -o")
+            return None
+        version = self._compiler_version(command[0])
+        dependencies = self._dependencies(command)
+        if version is None or dependencies is None:
+            return None
+        try:
+            dependency_digests = {path: _file_digest(path) for path in dependencies}
+        except OSError:
+            return None
+        material = {
+            "version": CACHE_FORMAT_VERSION,
+            "command": command,
+            "compiler": version,
+            # -march=native などで生成物が CPU に依存するため、別マシンのバイナリは使わない
+            "host": [platform.node(), platform.machine()],
+            "dependencies": dependency_digests,
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key + suffix)
+
+    def restore(self, key: str, output_path: str) -> Optional[float]:
+        """保存済みのバイナリを出力先へ置き、省略できたコンパイル時間を返す
+
+        見つからない場合は ``None`` を返す
+        """
+        binary_path = self._path(key, BINARY_SUFFIX)
+        try:
+            with open(self._path(key, META_SUFFIX), "r", encoding="utf-8") as meta_file:
+                entry = json.load(meta_file)
+            binary_digest = entry["binary_sha256"]
+            if not (os.path.exists(output_path) and _file_digest(output_path) == binary_digest):
+                # 同時に動く test と opt が同じ出力先へ戻しても、互いの書きかけを置かないよう一時ファイルを分ける
+                fd, temporary_path = tempfile.mkstemp(dir=os.path.dirname(output_path) or ".", prefix=".ahclib-tmp-")
+                os.close(fd)
+                try:
+                    shutil.copy2(binary_path, temporary_path)
+                    os.replace(temporary_path, output_path)
+                except OSError:
+                    os.remove(temporary_path)
+                    raise
+            # 更新時刻を最終利用時刻として削除順に使う
+            os.utime(binary_path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return float(entry["compile_seconds"])
+
+    def store(self, key: str, output_path: str, compile_seconds: float) -> None:
+        """コンパイルしたバイナリを保存する"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temporary_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+            os.close(fd)
+            shutil.copy2(output_path, temporary_path)
+            os.replace(temporary_path, self._path(key, BINARY_SUFFIX))
+            entry = {"binary_sha256": _file_digest(output_path), "compile_seconds": compile_seconds}
+            # 同時に起動した opt が書きかけのメタを読まないよう、メタも一時ファイルから置き換える
+            fd, temporary_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+            with os.fdopen(fd, "w", encoding="utf-8") as meta_file:
+                json.dump(entry, meta_file)
+            os.replace(temporary_path, self._path(key, META_SUFFIX))
+        except OSError as error:
+            logger.warning(f"Failed to store compile cache entry {key}: {error}")
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        binaries = [
+            entry for entry in os.scandir(self.directory) if entry.name.endswith(BINARY_SUFFIX) and entry.is_file()
+        ]
+        binaries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in binaries[self.max_entries :]:
+            key = entry.name[: -len(BINARY_SUFFIX)]
+            for path in (entry.path, self._path(key, META_SUFFIX)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,319 @@
+import itertools
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Any, ContextManager, Iterable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+logger = getLogger(__name__)
+
+# 別のディレクトリで動かした test と opt も調整するため、ユーザーごとの一時ディレクトリに置く
+CPU_LEASE_DIR = os.path.join(tempfile.gettempdir(), f"ahclib-cpu-leases-{os.getuid() if hasattr(os, 'getuid') else 0}")
+# 数が小さい役割ほど優先し、空いた CPU は待っている test が opt より先に取る
+LEASE_PRIORITIES = {"test": 0, "opt": 1}
+# blocking な取得で lease を取り直す間隔
+LEASE_POLL_SEC = 0.05
+# 待機の記録がこれ以上更新されなければ、待っていたプロセスは諦めたとみなす
+LEASE_WAIT_STALE_SEC = 5.0
+# 他のプロセスを待っているログを出す最小間隔
+LEASE_REPORT_SEC = 10.0
+
+LOCK_FILE_PATTERN = re.compile(r"^cpu(\d+)\.lock$")
+WAIT_FILE_PATTERN = re.compile(r"^cpu(\d+)\.wait\.(\d+)-(\d+)\.json$")
+
+_lease_tokens = itertools.count()
+_report_lock = threading.Lock()
+_last_report = -float("inf")
+
+
+def cpu_lease_supported() -> bool:
+    return fcntl is not None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _read_json(path: str) -> Optional[dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as json_file:
+            value = json.load(json_file)
+    except (OSError, ValueError):
+        return None
+    return value if isinstance(value, dict) else None
+
+
+@dataclass(frozen=True)
+class LeaseHolder:
+    cpu_id: int
+    role: str
+    pid: int
+    since: float
+
+
+@dataclass(frozen=True)
+class LeaseWaiter:
+    cpu_id: int
+    role: str
+    pid: int
+    token: int
+    priority: int
+    since: float
+
+
+class CpuLeaseRegistry:
+    """プロセスをまたいで CPU を貸し出す登録簿
+
+    CPU ごとの lock ファイルを ``flock`` で取り、保持者をファイルに書く
+    プロセスが異常終了しても ``flock`` は OS が解放する
+    """
+
+    def __init__(self, role: str, lease_dir: str = CPU_LEASE_DIR) -> None:
+        if role not in LEASE_PRIORITIES:
+            raise ValueError(f"Invalid lease role: {role}")
+        self.role = role
+        self.priority = LEASE_PRIORITIES[role]
+        self.lease_dir = lease_dir
+
+    def lock_path(self, cpu_id: int) -> str:
+        return os.path.join(self.lease_dir, f"cpu{cpu_id}.lock")
+
+    def wait_path(self, cpu_id: int, token: int) -> str:
+        return os.path.join(self.lease_dir, f"cpu{cpu_id}.wait.{os.getpid()}-{token}.json")
+
+    def lease(self, cpu_ids: Iterable[int], cpu_lock: Optional[ContextManager[Any]] = None) -> "CpuLease":
+        """``cpu_ids`` をまとめて借りる lock を返し、``cpu_lock`` があれば先に取る"""
+        return CpuLease(self, tuple(sorted(cpu_ids)), cpu_lock)
+
+    def waiters(self, cpu_id: Optional[int] = None) -> list[LeaseWaiter]:
+        """生きているプロセスの、古くなっていない待機を返す"""
+        try:
+            names = os.listdir(self.lease_dir)
+        except OSError:
+            return []
+        now = time.time()
+        waiters = []
+        for name in names:
+            match = WAIT_FILE_PATTERN.match(name)
+            if match is None or (cpu_id is not None and int(match.group(1)) != cpu_id):
+                continue
+            path = os.path.join(self.lease_dir, name)
+            try:
+                fresh = now - os.path.getmtime(path) < LEASE_WAIT_STALE_SEC
+            except OSError:
+                continue
+            record = _read_json(path)
+            pid = int(match.group(2))
+            if not fresh or record is None or not _pid_alive(pid):
+                continue
+            waiters.append(
+                LeaseWaiter(
+                    int(match.group(1)),
+                    str(record.get("role")),
+                    pid,
+                    int(match.group(3)),
+                    int(record.get("priority", 0)),
+                    float(record.get("since", 0.0)),
+                )
+            )
+        return waiters
+
+    def holders(self) -> list[LeaseHolder]:
+        """lock ファイルに書かれた保持者のうち、プロセスが生きているものを返す"""
+        try:
+            names = os.listdir(self.lease_dir)
+        except OSError:
+            return []
+        holders = []
+        for name in names:
+            if LOCK_FILE_PATTERN.match(name) is None:
+                continue
+            # 書き込み途中や解放済みの空のファイルは読み飛ばす
+            record = _read_json(os.path.join(self.lease_dir, name))
+            try:
+                holder = LeaseHolder(
+                    int(record["cpu"]), str(record["role"]), int(record["pid"]), float(record["since"])
+                )
+            except (TypeError, KeyError, ValueError):
+                continue
+            if _pid_alive(holder.pid):
+                holders.append(holder)
+        return sorted(holders, key=lambda holder: holder.cpu_id)
+
+
+class CpuLease:
+    """CPU lock と同じ ``acquire`` / ``release`` を持ち、CPU グループの全 CPU をまとめて借りる
+
+    優先度の高い役割か、同じ役割で先に待ち始めたプロセスが待っている間は空いていても取らない
+    """
+
+    def __init__(
+        self,
+        registry: CpuLeaseRegistry,
+        cpu_ids: tuple[int, ...],
+        cpu_lock: Optional[ContextManager[Any]] = None,
+    ) -> None:
+        self.registry = registry
+        self.cpu_ids = cpu_ids
+        self.cpu_lock = cpu_lock
+        self._token = next(_lease_tokens)
+        self._file_descriptors: list[int] = []
+        self._waiting_since: Optional[float] = None
+        self._reported_wait = False
+        self._lock = threading.Lock()
+
+    def _yield_to_waiters(self) -> bool:
+        """先に取るべき他の待機があれば ``True``"""
+        since = self._waiting_since if self._waiting_since is not None else time.time()
+        for cpu_id in self.cpu_ids:
+            for waiter in self.registry.waiters(cpu_id):
+                if waiter.pid == os.getpid() and waiter.token == self._token:
+                    continue
+                if (waiter.priority, waiter.since) < (self.registry.priority, since):
+                    return True
+        return False
+
+    def _try_lock_files(self) -> bool:
+        """全 CPU の lock ファイルを取り、1 つでも取れなければ取った分を戻す"""
+        os.makedirs(self.registry.lease_dir, exist_ok=True)
+        for cpu_id in self.cpu_ids:
+            file_descriptor = os.open(self.registry.lock_path(cpu_id), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(file_descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(file_descriptor)
+                self._unlock_files()
+                return False
+            self._file_descriptors.append(file_descriptor)
+        since = time.time()
+        for cpu_id, file_descriptor in zip(self.cpu_ids, self._file_descriptors):
+            record = {"cpu": cpu_id, "role": self.registry.role, "pid": os.getpid(), "since": since}
+            os.ftruncate(file_descriptor, 0)
+            os.pwrite(file_descriptor, json.dumps(record).encode("utf-8"), 0)
+        return True
+
+    def _unlock_files(self) -> None:
+        for file_descriptor in self._file_descriptors:
+            try:
+                os.ftruncate(file_descriptor, 0)
+            finally:
+                fcntl.flock(file_descriptor, fcntl.LOCK_UN)
+                os.close(file_descriptor)
+        self._file_descriptors = []
+
+    def _mark_waiting(self) -> None:
+        """待機を記録し、すでに記録していれば更新時刻だけを進める"""
+        if self._waiting_since is None:
+            self._waiting_since = time.time()
+            record = {"role": self.registry.role, "priority": self.registry.priority, "since": self._waiting_since}
+            for cpu_id in self.cpu_ids:
+                with open(self.registry.wait_path(cpu_id, self._token), "w", encoding="utf-8") as wait_file:
+                    json.dump(record, wait_file)
+            return
+        for cpu_id in self.cpu_ids:
+            try:
+                os.utime(self.registry.wait_path(cpu_id, self._token))
+            except OSError:
+                pass
+
+    def _clear_waiting(self) -> None:
+        if self._waiting_since is None:
+            return
+        for cpu_id in self.cpu_ids:
+            try:
+                os.remove(self.registry.wait_path(cpu_id, self._token))
+            except OSError:
+                pass
+        self._waiting_since = None
+        self._reported_wait = False
+
+    def _report_wait(self) -> None:
+        global _last_report
+        if self._reported_wait:
+            return
+        self._reported_wait = True
+        with _report_lock:
+            now = time.monotonic()
+            if now - _last_report < LEASE_REPORT_SEC:
+                return
+            _last_report = now
+        held = [holder for holder in self.registry.holders() if holder.cpu_id in self.cpu_ids]
+        owners = ", ".join(f"cpu {holder.cpu_id} by {holder.role} (pid {holder.pid})" for holder in held)
+        logger.info(f"Waiting for CPU lease: {owners or 'higher priority waiters'}.")
+
+    def _try_acquire(self) -> bool:
+        if self._yield_to_waiters() or not self._try_lock_files():
+            self._mark_waiting()
+            self._report_wait()
+            return False
+        self._clear_waiting()
+        return True
+
+    def acquire(self, blocking: bool = True) -> bool:
+        if self.cpu_lock is not None and not self.cpu_lock.acquire(blocking):  # type: ignore[attr-defined]
+            return False
+        with self._lock:
+            acquired = self._try_acquire()
+            while blocking and not acquired:
+                time.sleep(LEASE_POLL_SEC)
+                acquired = self._try_acquire()
+        if not acquired and self.cpu_lock is not None:
+            self.cpu_lock.release()  # type: ignore[attr-defined]
+        return acquired
+
+    def release(self) -> None:
+        with self._lock:
+            self._unlock_files()
+        if self.cpu_lock is not None:
+            self.cpu_lock.release()  # type: ignore[attr-defined]
+
+    def __enter__(self) -> "CpuLease":
+        self.acquire()
+        return self
+
+    def __exit__(self, *_exc_info: Any) -> None:
+        self.release()
+
+
+def format_lease_status(registry: CpuLeaseRegistry) -> list[str]:
+    """CPU ごとの保持者と待機しているプロセスを表にする"""
+    now = time.time()
+    holders = {holder.cpu_id: holder for holder in registry.holders()}
+    waiters: dict[int, list[LeaseWaiter]] = {}
+    for waiter in registry.waiters():
+        waiters.setdefault(waiter.cpu_id, []).append(waiter)
+    cpu_ids = sorted(set(holders) | set(waiters))
+    if not cpu_ids:
+        return ["No CPU is leased."]
+    lines = [f"{'cpu':>4}  {'role':<5} {'pid':>8} {'held':>9}  waiting"]
+    for cpu_id in cpu_ids:
+        holder = holders.get(cpu_id)
+        waiting = ", ".join(
+            f"{waiter.role}:{waiter.pid}"
+            for waiter in sorted(waiters.get(cpu_id, []), key=lambda w: (w.priority, w.since))
+        )
+        if holder is None:
+            lines.append(f"{cpu_id:>4}  {'-':<5} {'-':>8} {'-':>9}  {waiting}")
+        else:
+            held = f"{now - holder.since:.1f}s"
+            lines.append(f"{cpu_id:>4}  {holder.role:<5} {holder.pid:>8} {held:>9}  {waiting}")
+    return lines
+
+
+def run_lease_status(lease_dir: str = CPU_LEASE_DIR) -> None:
+    print("\n".join(format_lease_status(CpuLeaseRegistry("test", lease_dir))))
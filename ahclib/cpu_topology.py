@@ -0,0 +1,191 @@
+import collections
+import os
+import re
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Iterable, Optional, Sequence, Union
+
+logger = getLogger(__name__)
+
+SYS_CPU_DIR = "/sys/devices/system/cpu"
+
+# physical_core は物理コアごとに 1 つの logical CPU だけを使い、SMT の兄弟にソルバーを並べない
+# same_node は候補が最も多い NUMA node の CPU だけを使う
+# fastest は cpu_capacity (なければ最大周波数) が最大の CPU だけを使い、E コアを外す
+CPU_PLACEMENTS = ("physical_core", "same_node", "fastest")
+
+NODE_DIR_PATTERN = re.compile(r"^node(\d+)$")
+
+
+@dataclass(frozen=True)
+class CpuInfo:
+    cpu_id: int
+    package_id: int = 0
+    core_id: Optional[int] = None
+    node_id: Optional[int] = None
+    thread_siblings: tuple[int, ...] = ()
+    capacity: Optional[int] = None
+    max_freq_khz: Optional[int] = None
+
+    @property
+    def core_key(self) -> tuple[int, int]:
+        """同じ物理コアの logical CPU で共通になるキー"""
+        if self.thread_siblings:
+            return (-1, min(self.thread_siblings))
+        if self.core_id is None:
+            return (-1, self.cpu_id)
+        return (self.package_id, self.core_id)
+
+    @property
+    def speed(self) -> Optional[int]:
+        return self.capacity if self.capacity is not None else self.max_freq_khz
+
+
+@dataclass(frozen=True)
+class CpuPlacement:
+    cpu_ids: tuple[int, ...]
+    reasons: tuple[str, ...]
+
+
+def parse_cpu_list(text: str) -> tuple[int, ...]:
+    """``0-3,8`` 形式の CPU 一覧を展開する"""
+    cpu_ids: list[int] = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cpu_ids.extend(range(int(first), int(last or first) + 1))
+    return tuple(cpu_ids)
+
+
+def _read_int(path: str) -> Optional[int]:
+    try:
+        with open(path, "r", encoding="utf-8") as value_file:
+            return int(value_file.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def _read_cpu_list(path: str) -> tuple[int, ...]:
+    try:
+        with open(path, "r", encoding="utf-8") as value_file:
+            return parse_cpu_list(value_file.read())
+    except (OSError, ValueError):
+        return ()
+
+
+def _node_id(cpu_dir: str) -> Optional[int]:
+    try:
+        names = os.listdir(cpu_dir)
+    except OSError:
+        return None
+    for name in names:
+        match = NODE_DIR_PATTERN.match(name)
+        if match is not None:
+            return int(match.group(1))
+    return None
+
+
+def read_cpu_topology(cpu_ids: Iterable[int], sys_dir: str = SYS_CPU_DIR) -> dict[int, CpuInfo]:
+    """``/sys/devices/system/cpu`` から各 CPU のコア、NUMA node、性能を読み、読めない値は ``None`` にする"""
+    topology: dict[int, CpuInfo] = {}
+    for cpu_id in cpu_ids:
+        cpu_dir = os.path.join(sys_dir, f"cpu{cpu_id}")
+        topology_dir = os.path.join(cpu_dir, "topology")
+        topology[cpu_id] = CpuInfo(
+            cpu_id=cpu_id,
+            package_id=_read_int(os.path.join(topology_dir, "physical_package_id")) or 0,
+            core_id=_read_int(os.path.join(topology_dir, "core_id")),
+            node_id=_node_id(cpu_dir),
+            thread_siblings=_read_cpu_list(os.path.join(topology_dir, "thread_siblings_list")),
+            capacity=_read_int(os.path.join(cpu_dir, "cpu_capacity")),
+            max_freq_khz=_read_int(os.path.join(cpu_dir, "cpufreq", "cpuinfo_max_freq")),
+        )
+    return topology
+
+
+def normalize_placement(placement: Union[str, Sequence[str], None]) -> tuple[str, ...]:
+    """settings の ``cpu_placement`` を方針の tuple にし、未知の方針は ``ValueError`` にする"""
+    if placement is None:
+        return ()
+    policies = (placement,) if isinstance(placement, str) else tuple(placement)
+    for policy in policies:
+        if policy not in CPU_PLACEMENTS:
+            raise ValueError(f"cpu_placement は {', '.join(CPU_PLACEMENTS)} から選んでください: {policy}")
+    return policies
+
+
+def _one_per_core(cpu_ids: list[int], topology: dict[int, CpuInfo]) -> list[int]:
+    chosen: dict[tuple[int, int], int] = {}
+    for cpu_id in cpu_ids:
+        chosen.setdefault(topology[cpu_id].core_key, cpu_id)
+    return sorted(chosen.values())
+
+
+def select_cpus(
+    available_cpu_ids: Sequence[int],
+    njobs: int,
+    placement: Sequence[str],
+    topology: dict[int, CpuInfo],
+) -> CpuPlacement:
+    """最小 ID の CPU を ahclib 用に残し、``placement`` の方針を順に適用して solver 用の CPU を選ぶ"""
+    reasons: list[str] = []
+    candidates = sorted(available_cpu_ids)
+    if len(candidates) > 1:
+        reserved = candidates[0]
+        if "physical_core" in placement:
+            # 予約した CPU の SMT の兄弟も ahclib 側の処理と物理コアを共有するため外す
+            reserved_core = topology[reserved].core_key
+            remaining = [cpu_id for cpu_id in candidates if topology[cpu_id].core_key != reserved_core]
+            if remaining:
+                candidates = remaining
+                reasons.append(f"reserved physical core of cpu {reserved} for ahclib")
+            else:
+                candidates = candidates[1:]
+                reasons.append(f"reserved cpu {reserved} for ahclib")
+        else:
+            candidates = candidates[1:]
+            reasons.append(f"reserved cpu {reserved} for ahclib")
+
+    for policy in placement:
+        if policy == "physical_core":
+            selected = _one_per_core(candidates, topology)
+            if len(selected) < len(candidates):
+                reasons.append(f"one thread per physical core ({len(candidates) - len(selected)} SMT siblings skipped)")
+        elif policy == "same_node":
+            nodes = collections.Counter(topology[cpu_id].node_id for cpu_id in candidates)
+            if None in nodes or len(nodes) <= 1:
+                selected = candidates
+            else:
+                node_id = min(nodes, key=lambda node: (-nodes[node], node))
+                selected = [cpu_id for cpu_id in candidates if topology[cpu_id].node_id == node_id]
+                reasons.append(f"NUMA node {node_id} only ({len(selected)} of {len(candidates)} cpus)")
+        else:
+            speeds = [topology[cpu_id].speed for cpu_id in candidates]
+            if None in speeds or len(set(speeds)) <= 1:
+                selected = candidates
+            else:
+                fastest = max(speed for speed in speeds if speed is not None)
+                selected = [cpu_id for cpu_id in candidates if topology[cpu_id].speed == fastest]
+                reasons.append(f"fastest cores only (capacity {fastest}, {len(selected)} of {len(candidates)} cpus)")
+        if selected:
+            candidates = selected
+    return CpuPlacement(tuple(candidates[: max(1, njobs)]), tuple(reasons))
+
+
+def describe_cpu(info: CpuInfo) -> str:
+    """ログ用に CPU の node、コア、性能を並べる"""
+    details = []
+    if info.node_id is not None:
+        details.append(f"node {info.node_id}")
+    if info.core_id is not None:
+        details.append(f"core {info.package_id}:{info.core_id}")
+    if info.speed is not None:
+        details.append(f"capacity {info.speed}")
+    return f"{info.cpu_id} ({', '.join(details)})" if details else str(info.cpu_id)
+
+
+def log_cpu_placement(selection: CpuPlacement, topology: dict[int, CpuInfo]) -> None:
+    for reason in selection.reasons:
+        logger.info(f"CPU placement: {reason}")
+    logger.info(f"CPU placement: {', '.join(describe_cpu(topology[cpu_id]) for cpu_id in selection.cpu_ids)}")
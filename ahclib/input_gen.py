@@ -0,0 +1,241 @@
+import concurrent.futures
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import shlex
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass, field
+from logging import getLogger
+from typing import Any, Optional, Sequence
+
+from .logging_util import configure_elapsed_logging
+from .solver_engine import spawn_solver
+
+logger = getLogger(__name__)
+
+# 生成コマンドや生成方法を変えたら上げて、古い入力を作り直す
+GEN_FORMAT_VERSION = 1
+GEN_MANIFEST_FILE = ".ahclib_gen.json"
+HASH_CHUNK_SIZE = 1 << 20
+
+# {seed} はシード値に置き換え、生成器の標準出力を入力ファイルにする
+SEED_FIELD = "{seed}"
+# {seeds} はシードを 1 行だけ書いた seeds.txt に置き換え、公式 gen と同じく ./in/ へ書かせる
+SEEDS_FIELD = "{seeds}"
+SEEDS_FILE = "seeds.txt"
+OFFICIAL_OUTPUT_PATH = os.path.join("in", "0000.txt")
+
+
+def generated_input_file_names(gen_dir: str, seed_count: int) -> list[str]:
+    """``gen_dir`` に生成される入力ファイルのパスを、シードの順に返す"""
+    return [os.path.join(gen_dir, f"{str(index).zfill(4)}.txt") for index in range(seed_count)]
+
+
+def resolve_input_file_names(settings: Any) -> list[str]:
+    """``gen_command`` があれば生成される入力の一覧、なければ ``input_file_names`` を返す"""
+    if getattr(settings, "gen_command", None) is None:
+        return list(settings.input_file_names)
+    return generated_input_file_names(getattr(settings, "gen_dir", "./in"), len(settings.gen_seeds))
+
+
+def _file_digest(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as source:
+        while chunk := source.read(HASH_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _absolute_arguments(command: list[str]) -> list[str]:
+    """作業ディレクトリを変えて起動するため、既存ファイルを指す相対パスを絶対パスにする"""
+    return [os.path.abspath(argument) if os.path.exists(argument) else argument for argument in command]
+
+
+@dataclass
+class GenerationSummary:
+    generated: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+
+
+class InputGenerator:
+    """シードごとに生成器を並列に実行し、同じ生成器で作った入力は作り直さない"""
+
+    def __init__(
+        self,
+        command: str,
+        seeds: Sequence[int],
+        gen_dir: str = "./in",
+        njobs: int = 1,
+        cpu_ids: tuple[int, ...] = (),
+    ) -> None:
+        self.command = _absolute_arguments(shlex.split(command))
+        self.seeds = list(seeds)
+        self.gen_dir = gen_dir
+        self.njobs = len(cpu_ids) if cpu_ids else max(1, njobs)
+        self.cpu_ids = cpu_ids
+        self.manifest_path = os.path.join(gen_dir, GEN_MANIFEST_FILE)
+
+    def input_file_names(self) -> list[str]:
+        return generated_input_file_names(self.gen_dir, len(self.seeds))
+
+    def generator_hash(self) -> str:
+        """コマンドと、コマンド中の実行ファイルやスクリプトの内容から作る hash"""
+        digests: list[Optional[str]] = []
+        for index, argument in enumerate(self.command):
+            path = shutil.which(argument) if index == 0 else None
+            if path is None and os.path.isfile(argument):
+                path = argument
+            digests.append(None if path is None else _file_digest(path))
+        material = {"version": GEN_FORMAT_VERSION, "command": self.command, "digests": digests}
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _load_manifest(self) -> dict[str, Any]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as manifest_file:
+                manifest = json.load(manifest_file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as error:
+            logger.warning(f"Failed to read generator manifest: {error}")
+            return {}
+        return manifest if isinstance(manifest, dict) else {}
+
+    def _save_manifest(self, manifest: dict[str, Any]) -> None:
+        fd, temporary_path = tempfile.mkstemp(dir=self.gen_dir, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+        os.replace(temporary_path, self.manifest_path)
+
+    def _command_for(self, seed: int, work_dir: str) -> tuple[list[str], bool]:
+        """シードを埋めたコマンドと、標準出力を入力にするかを返す"""
+        if any(SEED_FIELD in argument for argument in self.command):
+            return [argument.replace(SEED_FIELD, str(seed)) for argument in self.command], True
+        seeds_path = os.path.join(work_dir, SEEDS_FILE)
+        with open(seeds_path, "w", encoding="utf-8") as seeds_file:
+            seeds_file.write(f"{seed}\n")
+        if any(SEEDS_FIELD in argument for argument in self.command):
+            return [argument.replace(SEEDS_FIELD, seeds_path) for argument in self.command], False
+        return [*self.command, seeds_path], False
+
+    def _generate(self, seed: int, input_file: str, cpu_id: Optional[int]) -> bool:
+        with tempfile.TemporaryDirectory(prefix="ahclib-gen-") as work_dir:
+            command, from_stdout = self._command_for(seed, work_dir)
+            output_path = os.path.join(work_dir, "stdout.txt" if from_stdout else OFFICIAL_OUTPUT_PATH)
+            try:
+                with open(os.path.join(work_dir, "stdout.txt"), "wb") as stdout_file:
+                    process = spawn_solver(
+                        command,
+                        cpu_id,
+                        stdin=subprocess.DEVNULL,
+                        stdout=stdout_file,
+                        stderr=subprocess.PIPE,
+                        cwd=work_dir,
+                    )
+                    _, stderr = process.communicate()
+            except OSError as error:
+                logger.error(f"Failed to start generator for seed {seed}: {error}")
+                return False
+            if process.returncode != 0 or not os.path.isfile(output_path):
+                message = stderr.decode("utf-8", errors="replace").strip()
+                logger.error(f"Generator failed for seed {seed} (exit code {process.returncode}): {message}")
+                return False
+            # 生成途中の入力をソルバーへ読ませないよう置き換えで配置する
+            fd, temporary_path = tempfile.mkstemp(dir=self.gen_dir, prefix=".tmp-")
+            os.close(fd)
+            shutil.move(output_path, temporary_path)
+            os.replace(temporary_path, input_file)
+        return True
+
+    def run(self, force: bool = False) -> GenerationSummary:
+        """未生成か、別の生成器やシードで作られた入力だけを生成する"""
+        os.makedirs(self.gen_dir, exist_ok=True)
+        generator_hash = self.generator_hash()
+        manifest = self._load_manifest()
+        summary = GenerationSummary()
+        pending: list[tuple[int, str]] = []
+        for seed, input_file in zip(self.seeds, self.input_file_names()):
+            entry = manifest.get(os.path.basename(input_file))
+            expected = {"seed": seed, "generator": generator_hash}
+            if not force and entry == expected and os.path.isfile(input_file):
+                summary.skipped.append(input_file)
+            else:
+                pending.append((seed, input_file))
+
+        # 同じ CPU で 2 つの生成器が動かないよう、空いている CPU を受け渡す
+        free_cpu_ids: queue.Queue[Optional[int]] = queue.Queue()
+        for cpu_id in self.cpu_ids or [None] * self.njobs:
+            free_cpu_ids.put(cpu_id)
+
+        def generate(seed: int, input_file: str) -> bool:
+            cpu_id = free_cpu_ids.get()
+            try:
+                return self._generate(seed, input_file, cpu_id)
+            finally:
+                free_cpu_ids.put(cpu_id)
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.njobs) as executor:
+                futures = {
+                    executor.submit(generate, seed, input_file): (seed, input_file) for seed, input_file in pending
+                }
+                for future in concurrent.futures.as_completed(futures):
+                    seed, input_file = futures[future]
+                    if future.result():
+                        manifest[os.path.basename(input_file)] = {"seed": seed, "generator": generator_hash}
+                        summary.generated.append(input_file)
+                    else:
+                        manifest.pop(os.path.basename(input_file), None)
+                        summary.failed.append(input_file)
+        finally:
+            # 中断しても生成済みの入力は次回に再利用する
+            self._save_manifest(manifest)
+        summary.generated.sort()
+        summary.failed.sort()
+        return summary
+
+
+def build_input_generator(
+    settings: Any,
+    njobs: int,
+    cpu_ids: tuple[int, ...] = (),
+) -> Optional[InputGenerator]:
+    """settings に ``gen_command`` があれば ``InputGenerator`` を返し、なければ ``None``"""
+    command = getattr(settings, "gen_command", None)
+    if command is None:
+        return None
+    return InputGenerator(
+        command,
+        settings.gen_seeds,
+        gen_dir=getattr(settings, "gen_dir", "./in"),
+        njobs=njobs,
+        cpu_ids=cpu_ids,
+    )
+
+
+def run_generate(
+    settings: Any,
+    njobs: int,
+    cpu_affinity: bool = False,
+    force: bool = False,
+) -> GenerationSummary:
+    """settings の生成器で入力を生成し、結果を表示する"""
+    from .parallel_tester import get_cpu_affinity_ids
+
+    configure_elapsed_logging()
+    if not cpu_affinity:
+        njobs = max(1, min(njobs, multiprocessing.cpu_count() - 1))
+    cpu_ids = get_cpu_affinity_ids(njobs, getattr(settings, "cpu_placement", ())) if cpu_affinity else ()
+    generator = build_input_generator(settings, njobs, cpu_ids)
+    if generator is None:
+        raise ValueError("AHCSettings.gen_command が指定されていません")
+    logger.info(f"Generating {len(generator.seeds)} inputs in {generator.gen_dir} with {generator.njobs} jobs.")
+    summary = generator.run(force)
+    logger.info(
+        f"Inputs: {len(summary.generated)} generated / {len(summary.skipped)} skipped / {len(summary.failed)} failed."
+    )
+    return summary
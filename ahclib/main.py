@@ -48,6 +48,23 @@ def resolve_cpu_affinity(cli_value: Optional[bool], settings: Any) -> bool:
     return bool(getattr(settings, "cpu_affinity", False))
 
 
+def _add_cache_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--cache",
+        default=True,
+        action=argparse.BooleanOptionalAction,
+        help="settings の result_cache が有効なとき、保存済みのケース結果を使う (--no-cache で無効化)",
+    )
+
+
+def _add_gen_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--gen",
+        action="store_true",
+        help="実行前に settings の gen_command で未生成の入力を生成する",
+    )
+
+
 def get_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     subparsers = parser.add_subparsers(dest="command", required=True)
@@ -66,6 +83,7 @@ def get_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
         help="vis が使うローカル port (既定: 8050)",
     )
     subparsers.add_parser("clear")
+    subparsers.add_parser("status", help="他の test / opt に貸し出している CPU と待機中のプロセスを表示する")
 
     test_parser = subparsers.add_parser("test")
     _add_settings_argument(test_parser)
@@ -97,6 +115,59 @@ def get_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
         default=None,
         help="ケースごとの CPU 固定を切り替える (未指定時は settings に従う)",
     )
+    test_parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        default=None,
+        help="中断した実行 (ahclib_results/all_tests/ の名前かパス) の残りのケースを、その時の設定と実行ファイルで実行する",
+    )
+    _add_cache_argument(test_parser)
+    _add_gen_argument(test_parser)
+
+    gen_parser = subparsers.add_parser("gen")
+    _add_settings_argument(gen_parser)
+    gen_parser.add_argument(
+        "-n",
+        "--count",
+        type=int,
+        default=None,
+        help="settings の gen_seeds の代わりにシード 0 から count - 1 までを使う",
+    )
+    gen_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="生成済みの入力も作り直す",
+    )
+    gen_parser.add_argument(
+        "--cpu-affinity",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="生成器ごとの CPU 固定を切り替える (未指定時は settings に従う)",
+    )
+
+    compact_parser = subparsers.add_parser("compact", help="記録済みの実行の out/ err/ を圧縮する")
+    compact_parser.add_argument(
+        "--compression",
+        choices=("gzip", "zstd"),
+        default=None,
+        help="圧縮方式 (既定: zstandard があれば zstd、なければ gzip)",
+    )
+    compact_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="同時に圧縮するファイル数 (既定: CPU 数)",
+    )
+
+    bench_parser = subparsers.add_parser("bench_launch")
+    bench_parser.add_argument(
+        "-n",
+        "--repeat",
+        type=int,
+        default=200,
+        help="何もしないソルバーを起動する回数 (既定: 200)",
+    )
 
     beam_parser = subparsers.add_parser("vis_beam")
     beam_parser.add_argument(
@@ -144,6 +215,8 @@ def get_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
         default=None,
         help="ケースごとの CPU 固定を切り替える (未指定時は settings に従う)",
     )
+    _add_cache_argument(opt_parser)
+    _add_gen_argument(opt_parser)
     return parser.parse_args(argv)
 
 
@@ -177,6 +250,24 @@ def main() -> None:
         run_optimizer_dashboard(tailscale=args.tailscale)
         sys.exit(0)
 
+    if args.command == "status":
+        from .cpu_lease import run_lease_status
+
+        run_lease_status()
+        sys.exit(0)
+
+    if args.command == "compact":
+        from .parallel_tester import run_compact
+
+        run_compact(args.compression, args.jobs)
+        sys.exit(0)
+
+    if args.command == "bench_launch":
+        from .parallel_tester import run_launch_benchmark
+
+        run_launch_benchmark(args.repeat)
+        sys.exit(0)
+
     if args.command == "setup":
         print("setup", file=sys.stderr)
         module_dir = os.path.dirname(os.path.abspath(__file__))
@@ -208,10 +299,34 @@ def main() -> None:
         sys.exit(0)
 
     file_path = args.settings
+    resume = getattr(args, "resume", None)
+    if resume is not None:
+        from .parallel_tester import SETTINGS_FILE, resolve_run_dir
+
+        # 中断した実行の結果ディレクトリに複製した settings を使う
+        snapshot_settings = os.path.join(resolve_run_dir(resume), SETTINGS_FILE)
+        if os.path.exists(snapshot_settings):
+            file_path = snapshot_settings
     class_name = "AHCSettings"
     settings = load_class_from_path(file_path, class_name)
     cpu_affinity = resolve_cpu_affinity(args.cpu_affinity, settings)
 
+    if args.command == "gen" or (args.gen and resume is None):
+        from .input_gen import run_generate
+
+        if args.command == "gen" and args.count is not None:
+            settings.gen_seeds = list(range(args.count))
+        summary = run_generate(settings, settings.njobs, cpu_affinity, force=args.command == "gen" and args.force)
+        if summary.failed:
+            sys.exit(1)
+        if args.command == "gen":
+            sys.exit(0)
+
+    from .input_gen import resolve_input_file_names
+
+    # gen_command を使う場合は生成される入力の一覧を input_file_names として扱う
+    settings.input_file_names = resolve_input_file_names(settings)
+
     if args.command == "test":
         from .parallel_tester import run_test
 
@@ -223,6 +338,8 @@ def main() -> None:
             args.record,
             args.memo,
             cpu_affinity=cpu_affinity,
+            use_cache=args.cache,
+            resume=resume,
         )
     elif args.command == "opt":
         from .optimizer import run_optimizer
@@ -241,6 +358,7 @@ def main() -> None:
             pruner,
             tailscale=args.tailscale,
             cpu_affinity=cpu_affinity,
+            use_cache=args.cache,
         )
     else:
         raise ValueError
@@ -25,9 +25,12 @@ from .logging_util import configure_elapsed_logging
 from .parallel_tester import (
     RESULTS_DIR,
     ParallelTester,
+    build_solver_servers,
+    build_solver_zygote,
     build_tester,
     get_cpu_affinity_ids,
 )
+from .solver_engine import CpuTarget, format_cpu_target
 from .tailscale_serve import TailscaleServe
 
 logger = getLogger(__name__)
@@ -123,6 +126,27 @@ def _set_trial_worker_attr(trial: optuna.trial.Trial) -> None:
     )
 
 
+def _set_cache_hits_attr(trial: optuna.trial.Trial, tester: ParallelTester) -> None:
+    """結果キャッシュから再利用したケース数を記録する"""
+    if tester.result_cache is not None:
+        trial.set_user_attr("ahclib_cache_hits", tester.result_cache.hits)
+
+
+def _set_makespan_attr(trial: optuna.trial.Trial, tester: ParallelTester) -> None:
+    """``case_schedule`` が ``longest_first`` なら予想と実際の makespan を記録する"""
+    if tester.last_makespan is not None:
+        predicted, actual = tester.last_makespan
+        trial.set_user_attr("ahclib_makespan_predicted", predicted)
+        trial.set_user_attr("ahclib_makespan_actual", actual)
+
+
+def _set_admission_attr(trial: optuna.trial.Trial, tester: ParallelTester) -> None:
+    """``admission_control`` が有効なら、ケースの起動を止めた回数と秒数を記録する"""
+    if tester.last_admission is not None:
+        trial.set_user_attr("ahclib_admission_pauses", tester.last_admission["throttle_count"])
+        trial.set_user_attr("ahclib_admission_paused_seconds", tester.last_admission["throttled_seconds"])
+
+
 def _would_update_best(study: optuna.Study, value: float) -> bool:
     """途中推定値を COMPLETE にした場合に最良値を更新するか判定する"""
     try:
@@ -411,9 +435,10 @@ def run_optimizer_dashboard(tailscale: bool = False) -> None:
 
 
 class Optimizer:
-    def __init__(self, settings: AHCSettings, cpu_affinity: bool = False) -> None:
+    def __init__(self, settings: AHCSettings, cpu_affinity: bool = False, use_cache: bool = True) -> None:
         self.settings: AHCSettings = settings
         self.cpu_affinity = cpu_affinity
+        self.use_cache = use_cache
         self.study_name = settings.study_name
         self.path = _optimizer_results_path()
 
@@ -442,8 +467,19 @@ class Optimizer:
         pruner: Optional[str] = None,
         tailscale: bool = False,
     ) -> None:
-        affinity_cpu_ids = get_cpu_affinity_ids(self.settings.njobs) if self.cpu_affinity else ()
-        cpu_locks: Optional[dict[int, Any]] = None
+        affinity_cpu_ids = (
+            get_cpu_affinity_ids(
+                self.settings.njobs,
+                getattr(self.settings, "cpu_placement", ()),
+                max(1, getattr(self.settings, "cpus_per_case", 1)),
+            )
+            if self.cpu_affinity
+            else ()
+        )
+        cpu_locks: Optional[dict[CpuTarget, Any]] = None
+        # fork 後の各 session が自分のソルバーを起動し、trial をまたいで使い回す
+        solver_servers = build_solver_servers(self.settings)
+        solver_zygote = build_solver_zygote(self.settings)
         logger.info("==============================================")
         logger.info(to_bold(to_blue("Optimizer settings:")))
         logger.info(f"- study_name    : {to_bold(self.settings.study_name)}")
@@ -452,7 +488,7 @@ class Optimizer:
         optuna_timeout_min = self.settings.optuna_timeout
         optuna_timeout = optuna_timeout_min * 60 if optuna_timeout_min is not None else None
         logger.info(f"- timeout [min] : {to_bold(optuna_timeout_min)}")
-        cpu_affinity_text = ", ".join(map(str, affinity_cpu_ids)) if affinity_cpu_ids else "disabled"
+        cpu_affinity_text = ", ".join(map(format_cpu_target, affinity_cpu_ids)) if affinity_cpu_ids else "disabled"
         logger.info(f"- CPU affinity  : {to_bold(cpu_affinity_text)}")
 
         started_at = datetime.datetime.now().astimezone()
@@ -467,6 +503,10 @@ class Optimizer:
                 cpu_affinity=self.cpu_affinity,
                 affinity_cpu_ids=affinity_cpu_ids,
                 cpu_locks=cpu_locks,
+                use_cache=self.use_cache,
+                lease_role="opt",
+                solver_servers=solver_servers,
+                solver_zygote=solver_zygote,
             )
             execute_args = self._as_execute_args(self.settings.objective(trial))
             trial.set_user_attr(
@@ -477,6 +517,10 @@ class Optimizer:
             scores = tester.run()
             trial.set_user_attr("ahclib_evaluated_cases", len(scores))
             trial.set_user_attr("ahclib_wilcoxon_stopped", False)
+            trial.set_user_attr("ahclib_stderr_discarded_bytes", sum(tester.stderr_discarded_bytes.values()))
+            _set_cache_hits_attr(trial, tester)
+            _set_makespan_attr(trial, tester)
+            _set_admission_attr(trial, tester)
             return tester.get_score(scores)
 
         def _objective_wilcoxon_pruner(trial: optuna.trial.Trial) -> float:
@@ -488,6 +532,10 @@ class Optimizer:
                 cpu_affinity=self.cpu_affinity,
                 affinity_cpu_ids=affinity_cpu_ids,
                 cpu_locks=cpu_locks,
+                use_cache=self.use_cache,
+                lease_role="opt",
+                solver_servers=solver_servers,
+                solver_zygote=solver_zygote,
             )
             execute_args = self._as_execute_args(self.settings.objective(trial))
             trial.set_user_attr(
@@ -505,6 +553,12 @@ class Optimizer:
                 "ahclib_wilcoxon_stopped",
                 pruning_result.pruned,
             )
+            trial.set_user_attr(
+                "ahclib_stderr_discarded_bytes",
+                sum(tester.stderr_discarded_bytes.values()),
+            )
+            _set_cache_hits_attr(trial, tester)
+            _set_admission_attr(trial, tester)
 
             # 完了済みケースから推定値を返して途中評価の情報を sampler へ残す
             # 推定値が最良値を更新する場合だけ、未評価ケースを含む trial が
@@ -628,6 +682,11 @@ class Optimizer:
                 logger.info("Optuna session %s interrupted.", session_label)
                 if not is_child_process:
                     raise
+            finally:
+                if solver_servers is not None:
+                    solver_servers.close()
+                if solver_zygote is not None:
+                    solver_zygote.close()
 
         dashboard_process: Optional[subprocess.Popen[str]] = None
         tailscale_serve: Optional[TailscaleServe] = None
@@ -642,6 +701,7 @@ class Optimizer:
                 verbose=False,
                 cpu_affinity=self.cpu_affinity,
                 affinity_cpu_ids=affinity_cpu_ids,
+                keep_solvers=False,
             )
             tester.compile()
 
@@ -855,9 +915,10 @@ def run_optimizer(
     pruner: Optional[str] = None,
     tailscale: bool = False,
     cpu_affinity: bool = False,
+    use_cache: bool = True,
 ) -> None:
     _configure_logging()
-    optimizer = Optimizer(settings, cpu_affinity=cpu_affinity)
+    optimizer = Optimizer(settings, cpu_affinity=cpu_affinity, use_cache=use_cache)
     try:
         optimizer.optimize(sampler, pruner, tailscale=tailscale)
     except KeyboardInterrupt:
@@ -4,6 +4,7 @@ import concurrent.futures
 import contextlib
 import csv
 import datetime
+import itertools
 import math
 import multiprocessing
 import os
@@ -12,9 +13,10 @@ import shutil
 import signal
 import subprocess
 import sys
+import tempfile
 import threading
 import time
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from logging import getLogger
 from random import Random
 from typing import (
@@ -27,6 +29,8 @@ from typing import (
     Literal,
     Mapping,
     Optional,
+    Sequence,
+    TypeVar,
     Union,
 )
 
@@ -34,8 +38,59 @@ import optuna
 import pandas as pd
 
 from .ahc_settings import AHCSettings
+from .admission import AdmissionController, AdmissionThresholds
 from .ahc_util import to_blue, to_bold, to_green, to_red
+from .case_schedule import (
+    CASE_SCHEDULES,
+    CASE_MEMORY_FILE,
+    CASE_TIMES_FILE,
+    CaseMemoryHistory,
+    CaseTimeHistory,
+    MemoryBudget,
+    WorkStealingQueue,
+    latest_result_csv,
+    plan_longest_first,
+    predicted_makespan,
+)
+from .compile_cache import CompileCache, compile_output_path
+from .cpu_lease import CpuLeaseRegistry, cpu_lease_supported
+from .cpu_topology import log_cpu_placement, normalize_placement, read_cpu_topology, select_cpus
 from .logging_util import configure_elapsed_logging
+from .publish import publish_directory
+from .record_compression import (
+    RecordCompressor,
+    compact_records,
+    default_compression,
+    resolve_compression,
+)
+from .result_cache import ResultCache
+from .run_journal import (
+    JOURNAL_FILE,
+    RUN_MANIFEST_FILE,
+    CaseJournal,
+    read_journal,
+    read_run_manifest,
+    snapshot_command,
+    write_run_manifest,
+)
+from .solver_engine import (
+    NO_LIMITS,
+    CpuTarget,
+    EventSolverEngine,
+    SolverJob,
+    SolverLimits,
+    SolverOutcome,
+    SolverUsage,
+    cpu_limit_supported,
+    cpu_set,
+    format_cpu_target,
+    solver_launcher,
+    solver_usage,
+    spawn_solver,
+)
+from .solver_server import SolverServerPool
+from .staging import RunStaging, stage_root
+from .zygote import PythonZygoteLauncher, zygote_supported
 
 logger = getLogger(__name__)
 
@@ -43,10 +98,21 @@ MS_PER_SEC = 1000
 
 # ``score = X`` を大文字小文字や空白の違いを無視して取得する
 SCORE_PATTERN = re.compile(r"score\s*=\s*(-?\d+(?:\.\d+)?)", re.IGNORECASE)
+SCORE_PATTERN_BYTES = re.compile(SCORE_PATTERN.pattern.encode("ascii"), re.IGNORECASE)
+SCORE_KEYWORD_BYTES = re.compile(rb"score", re.IGNORECASE)
+# 記録した stderr の末尾から score を探すときに 1 回で読むバイト数
+SCORE_TAIL_BLOCK_SIZE = 1 << 16
+# 記録しない実行で stderr を読み進めるときに保持する、改行前の行の最大バイト数
+SCORE_TAIL_WINDOW_SIZE = 1 << 16
 
 RESULTS_DIR = "ahclib_results"
 ALL_TESTS_SUBDIR = "all_tests"
 RESULT_CSV = "result.csv"
+CACHE_SUBDIR = "cache"
+RESULT_CACHE_SUBDIR = "results"
+COMPILE_CACHE_SUBDIR = "compile"
+BYTES_PER_MB = 1024 * 1024
+BYTES_PER_KB = 1024
 ERR_SUBDIR = "err"
 OUT_SUBDIR = "out"
 LOCAL_OUT_DIR = "./out/"
@@ -55,8 +121,15 @@ RESULT_DIR_DATETIME_FORMAT = "%Y_%m_%d_%H_%M_%S"
 
 CSV_HEADERS_REL = ["filename", "score", "rel_score", "state", "time"]
 CSV_HEADERS_NOREL = ["filename", "score", "state", "time"]
-
-SolverState = Literal["AC", "TLE", "ERROR", "INNER_ERROR"]
+# wait4 で取得したケースごとの資源使用量で、取得できなかったケースは空欄にする
+CSV_USAGE_HEADERS = ["user_time", "sys_time", "max_rss_kb", "voluntary_ctx_switches", "involuntary_ctx_switches"]
+# TLE と MLE のケースがどの制限で打ち切られたかで、wall / cpu / memory のいずれか
+CSV_LIMIT_HEADER = "limit"
+KB_PER_MB = 1024
+
+SolverState = Literal["AC", "TLE", "MLE", "ERROR", "INNER_ERROR"]
+SolverEngineName = Literal["thread", "event"]
+TimeoutMode = Literal["wall", "cpu"]
 Direction = Literal["minimize", "maximize"]
 Score = Union[int, float]
 CaseResult = tuple[str, Score, float, SolverState, str]
@@ -66,31 +139,77 @@ CpuLock = ContextManager[Any]
 PRUNER_CANCEL_POLL_SEC = 0.05
 PROCESS_TERMINATE_GRACE_SEC = 0.5
 
+# ジャッジと採点プログラムのコマンドで、入力ファイルと出力ファイルのパスに置き換える
+INPUT_FIELD = "{input}"
+OUTPUT_FIELD = "{output}"
+# 採点プログラムを動かすスレッド数の既定値で、ソルバーの CPU lane とは別に使う
+DEFAULT_SCORE_WORKERS = 2
+# ソルバーの終了後、ジャッジが判定を終えるまで待つ時間
+JUDGE_EXIT_TIMEOUT_SEC = 10.0
+
 # 主な処理は外部ソルバーの待機なので、GIL の影響が小さい ThreadPoolExecutor を使う
 # ProcessPoolExecutor では集計状態の共有と関数の直列化が必要になる
+# 実行中ケースごとのスレッドを避けたい場合は solver_engine の event engine を使う
+SOLVER_ENGINES: tuple[SolverEngineName, ...] = ("thread", "event")
+
+# cpu は他のプロセスで混んでいても TLE にならないよう消費した CPU 時間で判定する
+# 経過時間は止まったソルバーを打ち切るためだけに ``CPU_TIMEOUT_WALL_RATIO`` 倍まで待つ
+TIMEOUT_MODES: tuple[TimeoutMode, ...] = ("wall", "cpu")
+CPU_TIMEOUT_WALL_RATIO = 4
+
 
+def get_cpu_affinity_ids(
+    njobs: int,
+    placement: Union[str, Sequence[str], None] = (),
+    cpus_per_case: int = 1,
+) -> tuple[CpuTarget, ...]:
+    """solver に割り当てる logical CPU の一覧を返す
+
+    ``placement`` を指定すると ``/sys/devices/system/cpu`` の構成から CPU を選び、選んだ理由をログに出す
+    ``cpus_per_case`` が 2 以上なら、その個数ずつの CPU グループの一覧を返す
+    """
+    if cpus_per_case > 1:
+        return group_cpu_ids(get_cpu_affinity_ids(njobs * cpus_per_case, placement), cpus_per_case)
 
-def get_cpu_affinity_ids(njobs: int) -> tuple[int, ...]:
-    """solver に割り当てる logical CPU の一覧を返す"""
     get_affinity = getattr(os, "sched_getaffinity", None)
-    if os.name != "posix" or get_affinity is None:
+    if os.name != "posix" or get_affinity is None or not hasattr(os, "sched_setaffinity"):
         raise RuntimeError("--cpu-affinity は Linux 環境でのみ利用できます")
-    if shutil.which("taskset") is None:
-        raise RuntimeError("--cpu-affinity には taskset が必要です (Ubuntu では util-linux に含まれます)")
 
     available_cpu_ids = tuple(sorted(get_affinity(0)))
     if not available_cpu_ids:
         raise RuntimeError("利用可能な logical CPU が見つかりません")
 
+    policies = normalize_placement(placement)
+    if policies:
+        topology = read_cpu_topology(available_cpu_ids)
+        selection = select_cpus(available_cpu_ids, njobs, policies, topology)
+        log_cpu_placement(selection, topology)
+        return selection.cpu_ids
+
     # 複数 CPU がある場合は最小 ID を solver 用から外す
     solver_cpu_ids = available_cpu_ids[1:] if len(available_cpu_ids) > 1 else available_cpu_ids
     return solver_cpu_ids[: max(1, njobs)]
 
 
-def _command_with_cpu_affinity(command: list[str], cpu_id: Optional[int]) -> list[str]:
+def group_cpu_ids(cpu_ids: Sequence[CpuTarget], cpus_per_case: int) -> tuple[CpuTarget, ...]:
+    """並び順に ``cpus_per_case`` 個ずつ CPU グループにし、足りない端数の CPU は使わない
+
+    1 グループ分に満たない場合は全 CPU を 1 グループにする
+    """
+    if cpus_per_case <= 1:
+        return tuple(cpu_ids)
+    if len(cpu_ids) < cpus_per_case:
+        return (tuple(cpu_ids),) if cpu_ids else ()
+    group_count = len(cpu_ids) // cpus_per_case
+    return tuple(tuple(cpu_ids[index * cpus_per_case : (index + 1) * cpus_per_case]) for index in range(group_count))
+
+
+def _command_with_cpu_affinity(command: list[str], cpu_id: Optional[CpuTarget]) -> list[str]:
+    """taskset で CPU を固定するコマンドを返す (起動コストの比較用)"""
     if cpu_id is None:
         return command
-    return ["taskset", "--cpu-list", str(cpu_id), *command]
+    cpu_list = ",".join(map(str, cpu_id)) if isinstance(cpu_id, tuple) else str(cpu_id)
+    return ["taskset", "--cpu-list", cpu_list, *command]
 
 
 def _cpu_lock_context(cpu_lock: Optional[CpuLock]) -> ContextManager[Any]:
@@ -110,6 +229,8 @@ class WorkerState:
     rel_good_cnt: int = 0
     rel_same_cnt: int = 0
     rel_bad_cnt: int = 0
+    # ファイル名ごとの資源使用量
+    usages: dict[str, SolverUsage] = field(default_factory=dict)
 
 
 @dataclass(frozen=True)
@@ -142,44 +263,310 @@ def _extract_last_score(stderr: str, is_int: bool) -> Score:
     raise ValueError("`score = X` が標準エラー出力に見つかりません")
 
 
+def _extract_last_score_from_file(path: str, is_int: bool) -> Score:
+    """記録した stderr を末尾からブロック単位で読み、最後に現れる `score = X` の X を返す"""
+    with open(path, "rb") as error_file:
+        position = error_file.seek(0, os.SEEK_END)
+        partial_line = b""
+        while position > 0:
+            read_size = min(SCORE_TAIL_BLOCK_SIZE, position)
+            position -= read_size
+            error_file.seek(position)
+            lines = (error_file.read(read_size) + partial_line).splitlines()
+            # 先頭の行はブロック境界で途切れている可能性があるため、次のブロックと連結して調べる
+            partial_line = lines.pop(0) if position > 0 and lines else b""
+            for line in reversed(lines):
+                matches = SCORE_PATTERN.findall(line.decode("utf-8", errors="ignore"))
+                if matches:
+                    score_str = matches[-1]
+                    return int(score_str) if is_int else float(score_str)
+    raise ValueError("`score = X` が標準エラー出力に見つかりません")
+
+
+@dataclass
+class _ScoreTail:
+    """stderr をチャンクごとに受け取り、改行前の行と最後に現れた score だけを保持する"""
+
+    is_int: bool
+    window_size: int = SCORE_TAIL_WINDOW_SIZE
+    score: Optional[Score] = None
+    received_bytes: int = 0
+    partial_line: bytes = b""
+
+    @property
+    def discarded_bytes(self) -> int:
+        """読み取った後に保持しなかったバイト数"""
+        return self.received_bytes - len(self.partial_line)
+
+    def _convert(self, score_bytes: bytes) -> Score:
+        return int(score_bytes) if self.is_int else float(score_bytes)
+
+    def _match_line(self, line: bytes) -> bool:
+        matches = SCORE_PATTERN_BYTES.findall(line)
+        if not matches:
+            return False
+        self.score = self._convert(matches[-1])
+        return True
+
+    def feed(self, chunk: bytes) -> None:
+        self.received_bytes += len(chunk)
+        data = self.partial_line + chunk
+        line_end = data.rfind(b"\n") + 1
+        complete_lines, self.partial_line = data[:line_end], data[line_end:]
+        # score を含まないチャンクは行へ分割せずに読み捨てる
+        if SCORE_KEYWORD_BYTES.search(complete_lines):
+            for line in reversed(complete_lines.split(b"\n")):
+                if self._match_line(line):
+                    break
+        self._trim_partial_line()
+
+    def _trim_partial_line(self) -> None:
+        """改行のない長い行は、末尾 ``window_size`` バイトと途中の score だけを残す"""
+        excess = len(self.partial_line) - self.window_size
+        if excess <= 0:
+            return
+        keep_from = excess
+        for match in SCORE_PATTERN_BYTES.finditer(self.partial_line):
+            if match.end() <= excess:
+                self.score = self._convert(match.group(1))
+            elif match.start() < excess:
+                # 切り捨て位置をまたぐ score は残して、続きの数字とまとめて読む
+                keep_from = match.start()
+                break
+        self.partial_line = self.partial_line[keep_from:]
+
+    def finish(self) -> Score:
+        """末尾の改行がない行を読み、最後に現れた score を返す"""
+        if self.partial_line:
+            self._match_line(self.partial_line)
+        if self.score is None:
+            raise ValueError("`score = X` が標準エラー出力に見つかりません")
+        return self.score
+
+
+def _start_score_tail_threads(
+    process: subprocess.Popen[bytes],
+    input_data: bytes,
+    score_tail: _ScoreTail,
+) -> list[threading.Thread]:
+    """入力の書き込みと stderr の読み取りを行うスレッドを起動する"""
+
+    def write_input() -> None:
+        assert process.stdin is not None
+        try:
+            process.stdin.write(input_data)
+        except OSError:
+            # 入力を読み切らずに終了したソルバーは通常の終了として扱う
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+
+    def read_stderr() -> None:
+        assert process.stderr is not None
+        while chunk := process.stderr.read1(SCORE_TAIL_BLOCK_SIZE):
+            score_tail.feed(chunk)
+
+    threads = [threading.Thread(target=write_input, daemon=True), threading.Thread(target=read_stderr, daemon=True)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def _signal_solver(process: subprocess.Popen, force: bool) -> None:
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+        elif force:
+            process.kill()
+        else:
+            process.terminate()
+    except OSError:
+        pass
+
+
+def _stop_solver(process: subprocess.Popen) -> None:
+    """ソルバーとその子プロセスを終了し、終了を待つ"""
+    if process.poll() is not None:
+        return
+    _signal_solver(process, force=False)
+    try:
+        process.wait(timeout=PROCESS_TERMINATE_GRACE_SEC)
+    except subprocess.TimeoutExpired:
+        _signal_solver(process, force=True)
+        process.wait()
+
+
+def _exceeds_cpu_limit(usage: Optional[SolverUsage], limits: SolverLimits) -> bool:
+    return limits.cpu_seconds is not None and usage is not None and usage.cpu_seconds > limits.cpu_seconds
+
+
+def _apply_limits(
+    result: tuple[SolverState, Score, str, str, float],
+    usage: Optional[SolverUsage],
+    limits: SolverLimits,
+) -> tuple[SolverState, Score, str, str, float]:
+    """回収したソルバーの資源使用量から、CPU 時間を超えたケースを TLE、
+    ピークメモリが制限以上のケースを MLE にする
+
+    RLIMIT_CPU で止めたソルバーは ERROR として返るため、ここで TLE に直す
+    メモリはジャッジと同じく最大 RSS で判定し、TLE はそのまま残す
+    """
+    state, _, stdout, stderr, _ = result
+    if state not in ("AC", "ERROR"):
+        return result
+    if _exceeds_cpu_limit(usage, limits):
+        assert limits.cpu_seconds is not None
+        return "TLE", math.nan, stdout, stderr, limits.cpu_seconds
+    if limits.memory_bytes is None or usage is None or usage.max_rss_kb * BYTES_PER_KB < limits.memory_bytes:
+        return result
+    return "MLE", math.nan, stdout, stderr, -1.0
+
+
+def _execute_solver_score_tail(
+    input_file: str,
+    command: list[str],
+    timeout: Optional[float],
+    score_tail: _ScoreTail,
+    cancel_event: Optional[threading.Event] = None,
+    cpu_id: Optional[CpuTarget] = None,
+    cpu_lock: Optional[CpuLock] = None,
+    limits: SolverLimits = NO_LIMITS,
+) -> Optional[tuple[SolverState, Score, str, str, float]]:
+    """stderr を ``score_tail`` へ逐次渡してソルバーを実行し、中止した場合は ``None`` を返す
+
+    出力は保持しないため、戻り値の stdout と stderr は空文字列になる
+    """
+    with open(input_file, "r", encoding="utf-8") as input_stream:
+        input_data = input_stream.read().encode("utf-8")
+
+    try:
+        with _cpu_lock_context(cpu_lock):
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+            start = time.perf_counter()
+            process = spawn_solver(
+                command,
+                cpu_id,
+                limits=limits,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                start_new_session=(os.name == "posix"),
+            )
+            threads: list[threading.Thread] = []
+            try:
+                threads = _start_score_tail_threads(process, input_data, score_tail)
+                while True:
+                    if cancel_event is not None and cancel_event.is_set():
+                        return None
+                    remaining = None if timeout is None else timeout - (time.perf_counter() - start)
+                    if remaining is not None and remaining <= 0:
+                        return "TLE", math.nan, "", "", timeout
+                    wait_sec = remaining
+                    if cancel_event is not None:
+                        wait_sec = (
+                            PRUNER_CANCEL_POLL_SEC if remaining is None else min(PRUNER_CANCEL_POLL_SEC, remaining)
+                        )
+                    try:
+                        process.wait(timeout=wait_sec)
+                    except subprocess.TimeoutExpired:
+                        continue
+                    elapsed = time.perf_counter() - start
+                    break
+            finally:
+                # CPU lock を手放す前にソルバーを止め、stderr を最後まで読み終える
+                _stop_solver(process)
+                for thread in threads:
+                    thread.join()
+                if process.stderr is not None:
+                    process.stderr.close()
+        if process.returncode != 0:
+            result: tuple[SolverState, Score, str, str, float] = ("ERROR", math.nan, "", "", -1.0)
+        else:
+            result = ("AC", score_tail.finish(), "", "", elapsed)
+        return _apply_limits(result, solver_usage(process), limits)
+    except Exception as e:
+        logger.exception(e)
+        return "INNER_ERROR", math.nan, "", "", -1.0
+
+
+def _store_usage(usages: dict[str, SolverUsage], input_file: str, process: subprocess.Popen) -> None:
+    usage = solver_usage(process)
+    if usage is not None:
+        usages[input_file] = usage
+
+
 def _execute_solver(
     input_file: str,
     command: list[str],
     timeout: Optional[float],
     is_int: bool,
-    cpu_id: Optional[int] = None,
+    cpu_id: Optional[CpuTarget] = None,
     cpu_lock: Optional[CpuLock] = None,
     capture_stdout: bool = True,
+    record_paths: Optional[tuple[str, str]] = None,
+    score_tail: Optional[_ScoreTail] = None,
+    usages: Optional[dict[str, SolverUsage]] = None,
+    limits: SolverLimits = NO_LIMITS,
 ) -> tuple[SolverState, Score, str, str, float]:
-    """入力ファイルをソルバーへ渡し、状態・スコア・出力・実行時間を返す"""
+    """入力ファイルをソルバーへ渡し、状態・スコア・出力・実行時間を返す
+
+    ``record_paths`` に (stdout, stderr) の保存先を渡すと、ソルバーが直接書き込み、
+    戻り値の出力は空文字列になる
+    ``score_tail`` を渡すと出力を保持せず、stderr を逐次読んで score だけを取り出す
+    ``usages`` を渡すと、回収したソルバーの資源使用量を ``input_file`` をキーに保存する
+    ``limits`` の CPU 時間を超えたケースは TLE、メモリを超えたケースは MLE になる
+    """
+    if score_tail is not None:
+        result = _execute_solver_score_tail(input_file, command, timeout, score_tail, None, cpu_id, cpu_lock, limits)
+        assert result is not None
+        return result
     with open(input_file, "r", encoding="utf-8") as input_stream:
         input_text = input_stream.read()
     try:
-        with _cpu_lock_context(cpu_lock):
+        with contextlib.ExitStack() as exit_stack, _cpu_lock_context(cpu_lock):
+            stdout_target: Any = subprocess.PIPE if capture_stdout else subprocess.DEVNULL
+            stderr_target: Any = subprocess.PIPE
+            if record_paths is not None:
+                stdout_target = exit_stack.enter_context(open(record_paths[0], "wb"))
+                stderr_target = exit_stack.enter_context(open(record_paths[1], "wb"))
             start = time.perf_counter()
-            result = subprocess.run(
-                _command_with_cpu_affinity(command, cpu_id),
-                input=input_text,
-                timeout=timeout,
-                stdout=subprocess.PIPE if capture_stdout else subprocess.DEVNULL,
-                stderr=subprocess.PIPE,
+            # communicate の読み取りスレッドが solver の CPU を使わないよう、固定は起動時だけ行う
+            with spawn_solver(
+                command,
+                cpu_id,
+                limits=limits,
+                stdin=subprocess.PIPE,
+                stdout=stdout_target,
+                stderr=stderr_target,
                 text=True,
-                check=True,
-            )
+            ) as process:
+                if usages is not None:
+                    # Popen の with を抜けて回収した後に呼ばれる
+                    exit_stack.callback(_store_usage, usages, input_file, process)
+                try:
+                    stdout, stderr = process.communicate(input=input_text, timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    stdout, stderr = process.communicate()
+                    elapsed = timeout if timeout is not None else -1.0
+                    return "TLE", math.nan, stdout or "", stderr or "", elapsed
+                except BaseException:
+                    process.kill()
+                    raise
             elapsed = time.perf_counter() - start
-        score = _extract_last_score(result.stderr, is_int)
-        return "AC", score, result.stdout or "", result.stderr, elapsed
-    except subprocess.TimeoutExpired as e:
-        elapsed = timeout if timeout is not None else -1.0
-        return (
-            "TLE",
-            math.nan,
-            _decode_process_output(e.stdout),
-            _decode_process_output(e.stderr),
-            elapsed,
-        )
-    except subprocess.CalledProcessError as e:
-        return "ERROR", math.nan, e.stdout or "", e.stderr or "", -1.0
+        if process.returncode != 0:
+            result = ("ERROR", math.nan, stdout or "", stderr or "", -1.0)
+        else:
+            if record_paths is not None:
+                score = _extract_last_score_from_file(record_paths[1], is_int)
+            else:
+                score = _extract_last_score(stderr or "", is_int)
+            result = ("AC", score, stdout or "", stderr or "", elapsed)
+        return _apply_limits(result, solver_usage(process), limits)
     except Exception as e:
         logger.exception(e)
         return "INNER_ERROR", math.nan, "", "", -1.0
@@ -218,13 +605,19 @@ def _execute_solver_cancellable(
     timeout: Optional[float],
     is_int: bool,
     cancel_event: threading.Event,
-    cpu_id: Optional[int] = None,
+    cpu_id: Optional[CpuTarget] = None,
     cpu_lock: Optional[CpuLock] = None,
     capture_stdout: bool = True,
+    score_tail: Optional[_ScoreTail] = None,
+    limits: SolverLimits = NO_LIMITS,
 ) -> Optional[tuple[SolverState, Score, str, str, float]]:
     """ソルバーを実行し、中止通知を受けた場合は終了して ``None`` を返す"""
     if cancel_event.is_set():
         return None
+    if score_tail is not None:
+        return _execute_solver_score_tail(
+            input_file, command, timeout, score_tail, cancel_event, cpu_id, cpu_lock, limits
+        )
 
     with open(input_file, "r", encoding="utf-8") as input_stream:
         input_text = input_stream.read()
@@ -235,8 +628,10 @@ def _execute_solver_cancellable(
             if cancel_event.is_set():
                 return None
             start = time.perf_counter()
-            process = subprocess.Popen(
-                _command_with_cpu_affinity(command, cpu_id),
+            process = spawn_solver(
+                command,
+                cpu_id,
+                limits=limits,
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE if capture_stdout else subprocess.DEVNULL,
                 stderr=subprocess.PIPE,
@@ -272,9 +667,16 @@ def _execute_solver_cancellable(
 
                 elapsed = time.perf_counter() - start
                 if process.returncode != 0:
-                    return "ERROR", math.nan, stdout or "", stderr or "", -1.0
-                score = _extract_last_score(stderr or "", is_int)
-                return "AC", score, stdout or "", stderr or "", elapsed
+                    result: tuple[SolverState, Score, str, str, float] = (
+                        "ERROR",
+                        math.nan,
+                        stdout or "",
+                        stderr or "",
+                        -1.0,
+                    )
+                else:
+                    result = ("AC", _extract_last_score(stderr or "", is_int), stdout or "", stderr or "", elapsed)
+                return _apply_limits(result, solver_usage(process), limits)
     except Exception as e:
         if process is not None and process.poll() is None:
             _terminate_process(process)
@@ -282,6 +684,303 @@ def _execute_solver_cancellable(
         return "INNER_ERROR", math.nan, "", "", -1.0
 
 
+def _file_arguments(command: list[str], input_file: str, output_path: str, append_output: bool) -> list[str]:
+    """コマンドの ``{input}`` と ``{output}`` を置き換え、``{input}`` がなければ末尾に入力ファイルを渡す
+
+    ``append_output`` が ``True`` なら、``{output}`` がない場合に出力ファイルも末尾に渡す
+    """
+    arguments = [argument.replace(INPUT_FIELD, input_file).replace(OUTPUT_FIELD, output_path) for argument in command]
+    if not any(INPUT_FIELD in argument for argument in command):
+        arguments.append(input_file)
+    if append_output and not any(OUTPUT_FIELD in argument for argument in command):
+        arguments.append(output_path)
+    return arguments
+
+
+def _score_output(
+    score_command: list[str],
+    input_file: str,
+    output_path: str,
+    is_int: bool,
+) -> tuple[SolverState, Score]:
+    """採点プログラムを実行し、stdout と stderr の最後の ``score = X`` を返す
+
+    採点プログラムが 0 以外で終了した場合は ERROR とする
+    """
+    completed = subprocess.run(
+        _file_arguments(score_command, input_file, output_path, append_output=True),
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        errors="replace",
+    )
+    if completed.returncode != 0:
+        logger.error(to_red(f"Scorer failed in {input_file}: {completed.stderr.strip()}"))
+        return "ERROR", math.nan
+    return "AC", _extract_last_score(completed.stdout + completed.stderr, is_int)
+
+
+_T = TypeVar("_T")
+
+
+class _ScoreStage:
+    """ソルバーの出力の採点を、CPU lane とは別の小さなスレッドプールで行う
+
+    採点は計測時間と CPU lock の外で行うため、次のソルバーの実行と重なる
+    """
+
+    def __init__(self, score_command: list[str], is_int: bool, max_workers: int) -> None:
+        self.score_command = score_command
+        self.is_int = is_int
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="ahclib-score"
+        )
+        # 出力を記録しない実行で、採点プログラムへ渡す出力を置く
+        self._output_dir = tempfile.TemporaryDirectory(prefix="ahclib-score-")
+
+    def _score(
+        self,
+        input_file: str,
+        result: tuple[SolverState, Score, str, str, float],
+        output_path: Optional[str],
+    ) -> tuple[SolverState, Score, str, str, float]:
+        state, _, stdout, stderr, elapsed = result
+        try:
+            if output_path is not None:
+                score_state, score = _score_output(self.score_command, input_file, output_path, self.is_int)
+            else:
+                fd, temporary_path = tempfile.mkstemp(dir=self._output_dir.name, suffix=".txt")
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as output_file:
+                        output_file.write(stdout)
+                    score_state, score = _score_output(self.score_command, input_file, temporary_path, self.is_int)
+                finally:
+                    os.remove(temporary_path)
+        except Exception as e:
+            logger.exception(e)
+            return "INNER_ERROR", math.nan, "", "", -1.0
+        if score_state != "AC":
+            return score_state, math.nan, stdout, stderr, -1.0
+        return state, score, stdout, stderr, elapsed
+
+    def submit(
+        self,
+        input_file: str,
+        result: tuple[SolverState, Score, str, str, float],
+        output_path: Optional[str],
+        then: Callable[[tuple[SolverState, Score, str, str, float]], _T],
+    ) -> "concurrent.futures.Future[_T]":
+        """AC の結果の score を採点プログラムの score へ置き換え、``then`` を適用した値の Future を返す
+
+        ``output_path`` が ``None`` なら、結果の stdout を一時ファイルへ書いて渡す
+        AC 以外の結果は採点せず、呼び出したスレッドで ``then`` を適用する
+        """
+        if result[0] != "AC":
+            future: concurrent.futures.Future[_T] = concurrent.futures.Future()
+            future.set_result(then(result))
+            return future
+        return self._executor.submit(lambda: then(self._score(input_file, result, output_path)))
+
+    def close(self) -> None:
+        """実行中の採点を待ち、一時ディレクトリを削除する"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._output_dir.cleanup()
+
+
+def _resolve_scored(values: list[Any]) -> list[Any]:
+    """``_ScoreStage.submit`` の Future を採点済みの値へ置き換える"""
+    return [value.result() if isinstance(value, concurrent.futures.Future) else value for value in values]
+
+
+def _auxiliary_commands(
+    interactive_command: Optional[list[str]],
+    score_command: Optional[list[str]],
+) -> tuple[list[str], ...]:
+    """結果に影響するジャッジと採点プログラムのコマンド"""
+    return tuple(command for command in (interactive_command, score_command) if command is not None)
+
+
+def _execute_interactive(
+    input_file: str,
+    command: list[str],
+    interactive_command: list[str],
+    timeout: Optional[float],
+    is_int: bool,
+    cancel_event: Optional[threading.Event] = None,
+    cpu_id: Optional[CpuTarget] = None,
+    cpu_lock: Optional[CpuLock] = None,
+    record_paths: Optional[tuple[str, str]] = None,
+    usages: Optional[dict[str, SolverUsage]] = None,
+    limits: SolverLimits = NO_LIMITS,
+) -> Optional[tuple[SolverState, Score, str, str, float]]:
+    """ジャッジとソルバーの標準入出力を互いにつないで実行し、ジャッジの stderr から score を読む
+
+    実行時間と資源使用量はソルバーだけを計り、ジャッジは CPU へ固定しない
+    ``record_paths`` を渡すと、ジャッジの ``{output}`` を out/ へ、ソルバーとジャッジの stderr を err/ へ保存する
+    中止通知を受けた場合は両方を終了して ``None`` を返す
+    """
+    output_path = os.devnull if record_paths is None else record_paths[0]
+    judge_arguments = _file_arguments(interactive_command, input_file, output_path, append_output=False)
+    judge: Optional[subprocess.Popen] = None
+    solver: Optional[subprocess.Popen] = None
+    reader: Optional[threading.Thread] = None
+    judge_stderr: list[bytes] = []
+    elapsed: Optional[float] = None
+    try:
+        with contextlib.ExitStack() as exit_stack, _cpu_lock_context(cpu_lock):
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+            solver_stderr: Any = subprocess.DEVNULL
+            if record_paths is not None:
+                solver_stderr = exit_stack.enter_context(open(record_paths[1], "wb"))
+            solver_input, judge_output = os.pipe()
+            judge_input, solver_output = os.pipe()
+            try:
+                try:
+                    judge = subprocess.Popen(
+                        judge_arguments,
+                        stdin=judge_input,
+                        stdout=judge_output,
+                        stderr=subprocess.PIPE,
+                        start_new_session=(os.name == "posix"),
+                    )
+                    start = time.perf_counter()
+                    solver = spawn_solver(
+                        command,
+                        cpu_id,
+                        limits=limits,
+                        stdin=solver_input,
+                        stdout=solver_output,
+                        stderr=solver_stderr,
+                        start_new_session=(os.name == "posix"),
+                    )
+                finally:
+                    # 親プロセスがパイプの端を持ち続けると、片方が終了してももう片方へ EOF が届かない
+                    for fd in (solver_input, judge_output, judge_input, solver_output):
+                        os.close(fd)
+                judge_stream = judge.stderr
+                assert judge_stream is not None
+                reader = threading.Thread(target=lambda: judge_stderr.append(judge_stream.read()), daemon=True)
+                reader.start()
+
+                while elapsed is None:
+                    if cancel_event is not None and cancel_event.is_set():
+                        return None
+                    remaining = None if timeout is None else timeout - (time.perf_counter() - start)
+                    if remaining is not None and remaining <= 0:
+                        break
+                    wait_sec = PRUNER_CANCEL_POLL_SEC if remaining is None else min(PRUNER_CANCEL_POLL_SEC, remaining)
+                    try:
+                        solver.wait(timeout=wait_sec)
+                    except subprocess.TimeoutExpired:
+                        continue
+                    elapsed = time.perf_counter() - start
+                if elapsed is not None:
+                    try:
+                        judge.wait(timeout=JUDGE_EXIT_TIMEOUT_SEC)
+                    except subprocess.TimeoutExpired:
+                        logger.error(f"Judge did not exit in {input_file}")
+            finally:
+                # CPU lock を手放す前に両方を止め、ジャッジの stderr を最後まで読み終える
+                for process in (solver, judge):
+                    if process is not None:
+                        _stop_solver(process)
+                if reader is not None:
+                    reader.join()
+                if judge is not None and judge.stderr is not None:
+                    judge.stderr.close()
+        assert solver is not None and judge is not None
+        judge_error_text = b"".join(judge_stderr).decode("utf-8", errors="replace")
+        if record_paths is not None:
+            with open(record_paths[1], "a", encoding="utf-8") as error_file:
+                error_file.write(judge_error_text)
+        if usages is not None:
+            _store_usage(usages, input_file, solver)
+        if elapsed is None:
+            return "TLE", math.nan, "", "", timeout if timeout is not None else -1.0
+        if solver.returncode != 0 or judge.returncode != 0:
+            result: tuple[SolverState, Score, str, str, float] = ("ERROR", math.nan, "", "", -1.0)
+        else:
+            result = ("AC", _extract_last_score(judge_error_text, is_int), "", "", elapsed)
+        return _apply_limits(result, solver_usage(solver), limits)
+    except Exception as e:
+        logger.exception(e)
+        return "INNER_ERROR", math.nan, "", "", -1.0
+
+
+def _execute_solver_server(
+    solver_servers: SolverServerPool,
+    input_file: str,
+    command: list[str],
+    timeout: Optional[float],
+    is_int: bool,
+    cancel_event: Optional[threading.Event] = None,
+    cpu_id: Optional[CpuTarget] = None,
+    cpu_lock: Optional[CpuLock] = None,
+    record_paths: Optional[tuple[str, str]] = None,
+    usages: Optional[dict[str, SolverUsage]] = None,
+    limits: SolverLimits = NO_LIMITS,
+) -> Optional[tuple[SolverState, Score, str, str, float]]:
+    """起動したままのソルバーへ 1 ケースを渡し、``_execute_solver`` と同じ形の結果を返す
+
+    ``record_paths`` を渡すと、受け取った出力をそのファイルへ保存する
+    中止通知を受けた場合はソルバーを終了して ``None`` を返す
+    """
+    try:
+        with open(input_file, "rb") as input_stream:
+            input_bytes = input_stream.read()
+        with _cpu_lock_context(cpu_lock):
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+            outcome = solver_servers.run(command, input_bytes, timeout, cpu_id, limits, cancel_event)
+        if outcome is None:
+            return None
+        if record_paths is not None:
+            for path, output in zip(record_paths, (outcome.stdout, outcome.stderr)):
+                with open(path, "wb") as record_file:
+                    record_file.write(output)
+        if usages is not None and outcome.usage is not None:
+            usages[input_file] = outcome.usage
+        return _solver_result_from_outcome(outcome, is_int, limits=limits)
+    except Exception as e:
+        logger.exception(e)
+        return "INNER_ERROR", math.nan, "", "", -1.0
+
+
+def _solver_result_from_outcome(
+    outcome: SolverOutcome,
+    is_int: bool,
+    stderr_path: Optional[str] = None,
+    score_tail: Optional[_ScoreTail] = None,
+    limits: SolverLimits = NO_LIMITS,
+) -> tuple[SolverState, Score, str, str, float]:
+    """event engine の実行結果を ``_execute_solver`` と同じ形へ変換する
+
+    ``stderr_path`` を渡した場合は、ソルバーが書き込んだファイルから score を読む
+    ``score_tail`` を渡した場合は、逐次読み取った stderr から score を取り出す
+    """
+    if outcome.error is not None:
+        logger.exception(outcome.error)
+        return "INNER_ERROR", math.nan, "", "", -1.0
+    stdout = _decode_process_output(outcome.stdout)
+    stderr = _decode_process_output(outcome.stderr)
+    if outcome.timed_out:
+        return "TLE", math.nan, stdout, stderr, outcome.elapsed
+    if outcome.returncode != 0:
+        return _apply_limits(("ERROR", math.nan, stdout, stderr, -1.0), outcome.usage, limits)
+    try:
+        if score_tail is not None:
+            score = score_tail.finish()
+        elif stderr_path is not None:
+            score = _extract_last_score_from_file(stderr_path, is_int)
+        else:
+            score = _extract_last_score(stderr, is_int)
+    except Exception as e:
+        logger.exception(e)
+        return "INNER_ERROR", math.nan, "", "", -1.0
+    return _apply_limits(("AC", score, stdout, stderr, outcome.elapsed), outcome.usage, limits)
+
+
 def _calculate_relative_score(
     score: Score,
     input_file: str,
@@ -310,6 +1009,33 @@ def _format_relative_score(
     return to_green(formatted_score) if is_improved else to_red(formatted_score)
 
 
+def _fired_limit(state: SolverState, usage: Optional[SolverUsage], limits: SolverLimits) -> str:
+    """TLE と MLE のケースを打ち切った制限を返し、分からない場合は空文字列"""
+    if state == "MLE":
+        return "memory"
+    if state != "TLE":
+        return ""
+    if limits.cpu_seconds is None:
+        return "wall"
+    if usage is None:
+        # キャッシュから復元したケースは資源使用量が残っていない
+        return ""
+    return "cpu" if _exceeds_cpu_limit(usage, limits) else "wall"
+
+
+def _usage_csv_values(usage: Optional[SolverUsage]) -> list[Union[int, float, str]]:
+    """``CSV_USAGE_HEADERS`` の順に資源使用量を返し、取得できなかった場合は空欄にする"""
+    if usage is None:
+        return [""] * len(CSV_USAGE_HEADERS)
+    return [
+        usage.user_seconds,
+        usage.system_seconds,
+        usage.max_rss_kb,
+        usage.voluntary_switches,
+        usage.involuntary_switches,
+    ]
+
+
 def _format_count(count: int, is_good: bool) -> str:
     """改善件数を緑、悪化件数を赤で表示する"""
     return to_green(count) if is_good else to_red(count)
@@ -319,6 +1045,8 @@ def _log_solver_error(input_file: str, state: SolverState) -> None:
     """AC 以外の終了状態をログへ出力する"""
     if state == "TLE":
         logger.error(to_red(f"TLE occured in {input_file}"))
+    elif state == "MLE":
+        logger.error(to_red(f"MLE occured in {input_file}"))
     elif state == "ERROR":
         logger.error(to_red(f"Error occured in {input_file}"))
     elif state == "INNER_ERROR":
@@ -435,6 +1163,74 @@ class _RunConfig:
     record: bool
     is_int: bool
     formatter: _LogFormatter
+    # True なら記録ファイルをソルバーへ直接渡し、出力を Python 側に保持しない
+    stream_record: bool = False
+    result_cache: Optional[ResultCache] = None
+    limits: SolverLimits = NO_LIMITS
+    # インタラクティブ問題のジャッジのコマンドで、None なら入力ファイルをソルバーへ渡す
+    interactive_command: Optional[list[str]] = None
+    # 指定した場合はソルバーの出力を採点プログラムで採点する
+    score_stage: Optional[_ScoreStage] = None
+    # 指定した場合は終わったケースの結果を 1 件ずつ追記する
+    journal: Optional[CaseJournal] = None
+    # 指定した場合はケースごとに起動せず、起動したままのソルバーへ入力を渡す
+    solver_servers: Optional[SolverServerPool] = None
+    # 指定した場合は記録を tmpfs に書き、バックグラウンドで ``output_dir`` へ移す
+    staging: Optional[RunStaging] = None
+    # ``command`` の実行ファイルを tmpfs へ複製した場合の元のコマンドで、キャッシュのキーに使う
+    cache_command: Optional[list[str]] = None
+    # 指定した場合は記録し終えたケースの err/ を圧縮する
+    record_compressor: Optional[RecordCompressor] = None
+
+    @property
+    def auxiliary_commands(self) -> tuple[list[str], ...]:
+        score_command = None if self.score_stage is None else self.score_stage.score_command
+        return _auxiliary_commands(self.interactive_command, score_command)
+
+    @property
+    def buffers_record(self) -> bool:
+        """出力を受け取ってから ``_write_record`` で保存するか"""
+        return self.record and not self.stream_record
+
+
+def _record_dir(config: _RunConfig) -> str:
+    """ソルバーの出力を書き込む out/ err/ の親ディレクトリ"""
+    return config.staging.directory if config.staging is not None else config.output_dir
+
+
+def _record_file_paths(config: _RunConfig, input_file: str) -> Optional[tuple[str, str]]:
+    """記録する (stdout, stderr) の保存先を返し、記録しない場合は ``None``"""
+    if not config.record:
+        return None
+    filename = os.path.basename(input_file)
+    return (
+        os.path.join(_record_dir(config), OUT_SUBDIR, filename),
+        os.path.join(_record_dir(config), ERR_SUBDIR, filename),
+    )
+
+
+def _record_paths(config: _RunConfig, input_file: str) -> Optional[tuple[str, str]]:
+    """ソルバーが直接書き込む (stdout, stderr) の保存先を返し、使わない場合は ``None``"""
+    if not config.stream_record:
+        return None
+    return _record_file_paths(config, input_file)
+
+
+def _lookup_cached_result(
+    result_cache: Optional[ResultCache],
+    command: list[str],
+    input_file: str,
+    timeout: Optional[float],
+    is_int: bool,
+    record_paths: Optional[tuple[str, str]] = None,
+    limits: SolverLimits = NO_LIMITS,
+    auxiliary_commands: tuple[list[str], ...] = (),
+) -> tuple[Optional[str], Optional[tuple[SolverState, Score, str, str, float]]]:
+    """キャッシュのキーと保存済みの実行結果を返し、キャッシュを使わない場合は両方 ``None``"""
+    if result_cache is None:
+        return None, None
+    cache_key = result_cache.key(command, input_file, timeout, is_int, limits, auxiliary_commands)
+    return cache_key, result_cache.load(cache_key, record_paths)
 
 
 def _run_case_for_opt(
@@ -445,11 +1241,62 @@ def _run_case_for_opt(
     use_relative_score: bool,
     baseline_scores: dict[str, float],
     cancel_event: Optional[threading.Event] = None,
-    cpu_id: Optional[int] = None,
+    cpu_id: Optional[CpuTarget] = None,
     cpu_lock: Optional[CpuLock] = None,
-) -> Optional[float]:
-    """Optuna 用に 1 ケースを実行し、失敗時は nan を返す"""
-    if cancel_event is None:
+    score_tail: Optional[_ScoreTail] = None,
+    result_cache: Optional[ResultCache] = None,
+    limits: SolverLimits = NO_LIMITS,
+    interactive_command: Optional[list[str]] = None,
+    score_stage: Optional[_ScoreStage] = None,
+    solver_servers: Optional[SolverServerPool] = None,
+) -> Union[None, float, "concurrent.futures.Future[float]"]:
+    """Optuna 用に 1 ケースを実行し、失敗時は nan を返す
+
+    ``score_stage`` を渡すと、出力の採点を待たずに採点後のスコアの Future を返す
+    ``solver_servers`` を渡すと、起動したままのソルバーで実行する
+    """
+    score_command = None if score_stage is None else score_stage.score_command
+    cache_key, cached_result = _lookup_cached_result(
+        result_cache,
+        command,
+        input_file,
+        timeout,
+        is_int,
+        limits=limits,
+        auxiliary_commands=_auxiliary_commands(interactive_command, score_command),
+    )
+    if cached_result is not None:
+        return _score_for_opt(input_file, cached_result, use_relative_score, baseline_scores)
+    if solver_servers is not None:
+        server_result = _execute_solver_server(
+            solver_servers,
+            input_file,
+            command,
+            timeout,
+            is_int,
+            cancel_event,
+            cpu_id,
+            cpu_lock,
+            limits=limits,
+        )
+        if server_result is None:
+            return None
+        result = server_result
+    elif interactive_command is not None:
+        result = _execute_interactive(
+            input_file,
+            command,
+            interactive_command,
+            timeout,
+            is_int,
+            cancel_event,
+            cpu_id,
+            cpu_lock,
+            limits=limits,
+        )
+        if result is None:
+            return None
+    elif cancel_event is None:
         result = _execute_solver(
             input_file,
             command,
@@ -457,7 +1304,9 @@ def _run_case_for_opt(
             is_int,
             cpu_id,
             cpu_lock,
-            capture_stdout=False,
+            capture_stdout=score_stage is not None,
+            score_tail=score_tail if score_stage is None else None,
+            limits=limits,
         )
     else:
         result = _execute_solver_cancellable(
@@ -468,11 +1317,30 @@ def _run_case_for_opt(
             cancel_event,
             cpu_id,
             cpu_lock,
-            capture_stdout=False,
+            capture_stdout=score_stage is not None,
+            score_tail=score_tail if score_stage is None else None,
+            limits=limits,
         )
         if result is None:
             return None
 
+    def finish(scored_result: tuple[SolverState, Score, str, str, float]) -> float:
+        if result_cache is not None and cache_key is not None:
+            result_cache.store(cache_key, scored_result)
+        return _score_for_opt(input_file, scored_result, use_relative_score, baseline_scores)
+
+    if score_stage is not None:
+        return score_stage.submit(input_file, result, None, finish)
+    return finish(result)
+
+
+def _score_for_opt(
+    input_file: str,
+    result: tuple[SolverState, Score, str, str, float],
+    use_relative_score: bool,
+    baseline_scores: dict[str, float],
+) -> float:
+    """実行結果から Optuna 用のスコアを返し、失敗時は nan を返す"""
     state, score, _, _, _ = result
     if state != "AC":
         _log_solver_error(input_file, state)
@@ -482,7 +1350,8 @@ def _run_case_for_opt(
     return score
 
 
-def _worker_process_file_opt_pruner(args) -> tuple[int, Optional[float]]:
+def _worker_process_file_opt_pruner(args) -> tuple[int, Union[None, float, "concurrent.futures.Future[float]"]]:
+    """1 ケースを実行し、採点を別に行う場合は採点を待たずに採点後のスコアの Future を返す"""
     (
         input_file,
         case_index,
@@ -492,9 +1361,16 @@ def _worker_process_file_opt_pruner(args) -> tuple[int, Optional[float]]:
         use_relative_score,
         baseline_scores,
         cancel_event,
+        discarded_bytes,
+        result_cache,
+        limits,
+        interactive_command,
+        score_stage,
+        solver_servers,
         cpu_id,
         cpu_lock,
     ) = args
+    score_tail = _ScoreTail(is_int)
     score = _run_case_for_opt(
         input_file,
         command,
@@ -505,12 +1381,19 @@ def _worker_process_file_opt_pruner(args) -> tuple[int, Optional[float]]:
         cancel_event,
         cpu_id,
         cpu_lock,
+        score_tail,
+        result_cache,
+        limits,
+        interactive_command,
+        score_stage,
+        solver_servers,
     )
+    discarded_bytes[input_file] = score_tail.discarded_bytes
     return case_index, score
 
 
-def _worker_process_file_light(args) -> float:
-    """記録を残さずに 1 ケースを実行する"""
+def _worker_process_file_light(args) -> Union[float, "concurrent.futures.Future[float]"]:
+    """記録を残さずに 1 ケースを実行し、採点を別に行う場合は採点後のスコアの Future を返す"""
     (
         input_file,
         command,
@@ -519,9 +1402,16 @@ def _worker_process_file_light(args) -> float:
         use_relative_score,
         baseline_scores,
         cancel_event,
+        discarded_bytes,
+        result_cache,
+        limits,
+        interactive_command,
+        score_stage,
+        solver_servers,
         cpu_id,
         cpu_lock,
     ) = args
+    score_tail = _ScoreTail(is_int)
     score = _run_case_for_opt(
         input_file,
         command,
@@ -532,7 +1422,14 @@ def _worker_process_file_light(args) -> float:
         cancel_event,
         cpu_id,
         cpu_lock,
+        score_tail,
+        result_cache,
+        limits,
+        interactive_command,
+        score_stage,
+        solver_servers,
     )
+    discarded_bytes[input_file] = score_tail.discarded_bytes
     return math.nan if score is None else score
 
 
@@ -618,9 +1515,9 @@ def _handle_ac_case(
                 relative_count_text,
             )
         )
-    if config.record:
+    if config.buffers_record:
         _write_record(
-            config.output_dir,
+            _record_dir(config),
             os.path.basename(input_file),
             stdout,
             stderr,
@@ -632,20 +1529,24 @@ def _handle_tle_case(
     input_file: str,
     stdout: str,
     stderr: str,
+    elapsed: float,
     config: _RunConfig,
     state: WorkerState,
 ) -> CaseResult:
+    # cpu モードで RLIMIT_CPU に止められたケースは、経過時間の上限ではなく CPU 時間の制限を返す
+    if elapsed < 0 and config.timeout is not None:
+        elapsed = config.timeout
     count = _increment_counter(state)
     if config.verbose:
-        logger.info(config.formatter.build_tle_line(count, input_file, config.timeout))
-    if config.record:
+        logger.info(config.formatter.build_tle_line(count, input_file, elapsed))
+    if config.buffers_record:
         _write_record(
-            config.output_dir,
+            _record_dir(config),
             os.path.basename(input_file),
             stdout,
             stderr,
         )
-    return input_file, math.nan, math.nan, "TLE", f"{config.timeout:.3f}"
+    return input_file, math.nan, math.nan, "TLE", f"{elapsed:.3f}"
 
 
 def _handle_error_case(
@@ -657,9 +1558,9 @@ def _handle_error_case(
     state: WorkerState,
 ) -> CaseResult:
     _increment_counter(state)
-    if solver_state == "ERROR" and config.record:
+    if solver_state in ("MLE", "ERROR") and config.buffers_record:
         _write_record(
-            config.output_dir,
+            _record_dir(config),
             os.path.basename(input_file),
             stdout,
             stderr,
@@ -668,20 +1569,16 @@ def _handle_error_case(
     return input_file, math.nan, math.nan, solver_state, "-1"
 
 
-def _worker_process_file(args) -> CaseResult:
-    """1 ケースを実行し、ログとファイル出力を処理する"""
-    input_file, config, state, cpu_id, cpu_lock = args
-    solver_state, score, stdout, stderr, elapsed = _execute_solver(
-        input_file,
-        config.command,
-        config.timeout,
-        config.is_int,
-        cpu_id,
-        cpu_lock,
-        capture_stdout=config.record,
-    )
+def _handle_solver_result(
+    input_file: str,
+    result: tuple[SolverState, Score, str, str, float],
+    config: _RunConfig,
+    state: WorkerState,
+) -> CaseResult:
+    """実行結果を終了状態ごとに記録し、``CaseResult`` を返す"""
+    solver_state, score, stdout, stderr, elapsed = result
     if solver_state == "AC":
-        return _handle_ac_case(
+        case_result = _handle_ac_case(
             input_file,
             score,
             stdout,
@@ -690,18 +1587,162 @@ def _worker_process_file(args) -> CaseResult:
             config,
             state,
         )
-    if solver_state == "TLE":
-        return _handle_tle_case(input_file, stdout, stderr, config, state)
-    return _handle_error_case(
+    elif solver_state == "TLE":
+        case_result = _handle_tle_case(input_file, stdout, stderr, elapsed, config, state)
+    else:
+        case_result = _handle_error_case(
+            input_file,
+            solver_state,
+            stdout,
+            stderr,
+            config,
+            state,
+        )
+    return case_result
+
+
+def _settle_record(config: _RunConfig, input_file: str, case_result: CaseResult, state: WorkerState) -> None:
+    """記録を読み終えたケースを journal へ追記し、tmpfs の記録は結果ディレクトリへ移す
+
+    採点とキャッシュへの保存の後に呼び、移した記録は tmpfs から消す
+    出力ファイルを書き終えてから追記し、journal にあるケースは記録もそろっているようにする
+    """
+    journal = config.journal
+    usage = state.usages.get(input_file)
+    if config.staging is not None and config.record:
+        filename = os.path.basename(input_file)
+        config.staging.flush(
+            [os.path.join(OUT_SUBDIR, filename), os.path.join(ERR_SUBDIR, filename)],
+            lambda: None if journal is None else journal.append(case_result, usage),
+        )
+        return
+    if journal is not None:
+        journal.append(case_result, usage)
+    _compress_record(config, input_file)
+
+
+def _compress_record(config: _RunConfig, input_file: str) -> None:
+    """記録し終えたケースの err/ を圧縮に回す (tmpfs を使う場合は結果ディレクトリへ移すときに圧縮する)"""
+    if config.record_compressor is None or not config.record:
+        return
+    config.record_compressor.submit(os.path.join(config.output_dir, ERR_SUBDIR, os.path.basename(input_file)))
+
+
+def _lookup_cached_config_result(
+    config: _RunConfig,
+    input_file: str,
+) -> tuple[Optional[str], Optional[tuple[SolverState, Score, str, str, float]]]:
+    """記録付き実行のキャッシュを引き、見つかれば保存済みの出力を記録先へコピーする"""
+    return _lookup_cached_result(
+        config.result_cache,
+        config.cache_command or config.command,
         input_file,
-        solver_state,
-        stdout,
-        stderr,
-        config,
-        state,
+        config.timeout,
+        config.is_int,
+        _record_file_paths(config, input_file),
+        config.limits,
+        config.auxiliary_commands,
     )
 
 
+def _handle_cached_result(
+    input_file: str,
+    result: tuple[SolverState, Score, str, str, float],
+    config: _RunConfig,
+    state: WorkerState,
+) -> CaseResult:
+    # 出力はキャッシュから記録先へコピー済みなので、空の出力で上書きしない
+    case_result = _handle_solver_result(input_file, result, replace(config, stream_record=True), state)
+    _settle_record(config, input_file, case_result, state)
+    return case_result
+
+
+def _store_config_result(
+    config: _RunConfig,
+    cache_key: Optional[str],
+    input_file: str,
+    result: tuple[SolverState, Score, str, str, float],
+) -> None:
+    if config.result_cache is None or cache_key is None:
+        return
+    config.result_cache.store(cache_key, result, _record_file_paths(config, input_file))
+
+
+def _worker_process_file(args) -> Union[CaseResult, "concurrent.futures.Future[CaseResult]"]:
+    """1 ケースを実行し、ログとファイル出力を処理する"""
+    input_file, config, state, cpu_id, cpu_lock = args
+    cache_key, cached_result = _lookup_cached_config_result(config, input_file)
+    if cached_result is not None:
+        return _handle_cached_result(input_file, cached_result, config, state)
+    if config.solver_servers is not None:
+        server_result = _execute_solver_server(
+            config.solver_servers,
+            input_file,
+            config.command,
+            config.timeout,
+            config.is_int,
+            cpu_id=cpu_id,
+            cpu_lock=cpu_lock,
+            record_paths=_record_paths(config, input_file),
+            usages=state.usages,
+            limits=config.limits,
+        )
+        assert server_result is not None
+        result = server_result
+    elif config.interactive_command is not None:
+        interactive_result = _execute_interactive(
+            input_file,
+            config.command,
+            config.interactive_command,
+            config.timeout,
+            config.is_int,
+            cpu_id=cpu_id,
+            cpu_lock=cpu_lock,
+            record_paths=_record_paths(config, input_file),
+            usages=state.usages,
+            limits=config.limits,
+        )
+        assert interactive_result is not None
+        result = interactive_result
+    else:
+        result = _execute_solver(
+            input_file,
+            config.command,
+            config.timeout,
+            config.is_int,
+            cpu_id,
+            cpu_lock,
+            capture_stdout=config.record or config.score_stage is not None,
+            record_paths=_record_paths(config, input_file),
+            usages=state.usages,
+            limits=config.limits,
+        )
+    return _finish_config_result(input_file, result, config, state, cache_key)
+
+
+def _finish_config_result(
+    input_file: str,
+    result: tuple[SolverState, Score, str, str, float],
+    config: _RunConfig,
+    state: WorkerState,
+    cache_key: Optional[str],
+) -> Union[CaseResult, "concurrent.futures.Future[CaseResult]"]:
+    """実行結果を記録してキャッシュへ保存し、採点を別に行う場合は採点後の ``CaseResult`` の Future を返す"""
+
+    def finish(scored_result: tuple[SolverState, Score, str, str, float]) -> CaseResult:
+        case_result = _handle_solver_result(input_file, scored_result, config, state)
+        _store_config_result(config, cache_key, input_file, scored_result)
+        # キャッシュへ保存した後で移して圧縮し、保存時に元の記録を読めるようにする
+        _settle_record(config, input_file, case_result, state)
+        return case_result
+
+    if config.score_stage is None:
+        return finish(result)
+    record_paths = _record_paths(config, input_file)
+    output_path = None if record_paths is None else record_paths[0]
+    return config.score_stage.submit(input_file, result, output_path, finish)
+
+
 def _submit_next(
     executor: concurrent.futures.Executor,
     argument_iterator: Iterator,
@@ -733,8 +1774,27 @@ class ParallelTester:
         pre_dir_name: str,
         is_int: bool = True,
         optuna_seed: Optional[int] = None,
-        cpu_ids: tuple[int, ...] = (),
-        cpu_locks: Optional[Mapping[int, CpuLock]] = None,
+        cpu_ids: tuple[CpuTarget, ...] = (),
+        cpu_locks: Optional[Mapping[CpuTarget, CpuLock]] = None,
+        engine: SolverEngineName = "thread",
+        stream_record: bool = True,
+        result_cache: Optional[ResultCache] = None,
+        compile_cache: Optional[CompileCache] = None,
+        case_time_history: Optional[CaseTimeHistory] = None,
+        memory_limit: Optional[int] = None,
+        timeout_mode: TimeoutMode = "wall",
+        interactive_command: Optional[str] = None,
+        score_command: Optional[str] = None,
+        score_workers: int = DEFAULT_SCORE_WORKERS,
+        cpus_per_case: int = 1,
+        admission: Optional[AdmissionController] = None,
+        memory_budget_mb: Optional[float] = None,
+        case_memory_history: Optional[CaseMemoryHistory] = None,
+        cpu_lease: Optional[CpuLeaseRegistry] = None,
+        solver_servers: Optional[SolverServerPool] = None,
+        solver_zygote: Optional[PythonZygoteLauncher] = None,
+        stage_dir: Optional[str] = None,
+        record_compression: Optional[str] = None,
     ) -> None:
         """ParallelTester を初期化する
 
@@ -749,12 +1809,54 @@ class ParallelTester:
             timeout: 1 ケースの制限時間で単位は ms、``None`` なら無制限
             is_int: 整数スコアなら ``True``、小数スコアなら ``False``
             optuna_seed: ``run_opt_pruner`` の入力順を決める乱数初期値
-            cpu_ids: solver を固定する logical CPU の一覧で、空なら固定しない
+            cpu_ids: solver を固定する logical CPU (tuple なら CPU グループ) の一覧で、空なら固定しない
             cpu_locks: Optuna session 間で共有する CPU ごとの lock
+            engine: ``thread`` ならケースごとのスレッド、``event`` なら
+                1 スレッドの selectors ループでソルバーを監視する
+            stream_record: 記録時にソルバーの出力を out/ err/ へ直接書き込ませるか
+            result_cache: 同じ実行ファイル・引数・入力のケースを再実行しないためのキャッシュ
+            compile_cache: ソースや依存ヘッダが変わっていなければコンパイルを省くキャッシュ
+            case_time_history: 指定した場合は過去の実行時間が長いケースから起動し、
+                空いた CPU が他の lane の残りのケースを引き取る
+            memory_limit: 1 ケースのメモリ制限で単位は MB、``None`` なら無制限
+            timeout_mode: ``wall`` なら経過時間、``cpu`` なら消費した CPU 時間で
+                ``timeout`` を判定し、経過時間は ``CPU_TIMEOUT_WALL_RATIO`` 倍まで待つ
+            interactive_command: インタラクティブ問題のジャッジのコマンドで、指定した場合は
+                ジャッジとソルバーの標準入出力をつなぎ、ジャッジの stderr から score を読む
+            score_command: 出力を採点するコマンドで、指定した場合はソルバーの終了後に
+                ``score_workers`` 個のスレッドで採点し、その出力の score を使う
+            cpus_per_case: 1 ケースのソルバーが使うスレッド数で、``OMP_NUM_THREADS`` などに設定する
+            admission: 指定した場合は CPU やメモリの圧力が高い間、新しいケースの起動を止める
+            memory_budget_mb: 同時に実行するケースの予想最大 RSS の合計の上限で単位は MB、
+                ``None`` なら制限しない
+            case_memory_history: ケースごとの最大 RSS の履歴で、``memory_budget_mb`` の予想に使い、
+                ``run_record`` の実測値で更新する
+            cpu_lease: 指定した場合は固定する CPU を他の ahclib のプロセスと共有する登録簿から借りる
+            solver_servers: 指定した場合はケースごとにソルバーを起動せず、lane ごとに起動したままの
+                ソルバーへ入力と ``append_execute_command`` の引数を渡す
+            solver_zygote: 指定した場合は Python のソルバーを import 済みの zygote から fork して起動し、
+                ``run`` などの実行中だけ ``spawn_solver`` の起動方法に加える
+            stage_dir: 指定した場合は ``run_record`` で実行ファイルをこの tmpfs へ複製し、記録もここへ書かせて
+                バックグラウンドのスレッドで結果ディレクトリへ移す
+            record_compression: ``gzip`` または ``zstd`` を指定した場合は ``run_record`` で記録した err/ を
+                バックグラウンドのスレッドで圧縮する
         """
         if direction != "minimize" and direction != "maximize":
             logger.critical(f"direction must be `minimize` or `maximize` but got {direction}.")
             raise ValueError(f"Invalid direction: {direction}")
+        if engine not in SOLVER_ENGINES:
+            logger.critical(f"engine must be `thread` or `event` but got {engine}.")
+            raise ValueError(f"Invalid engine: {engine}")
+        if timeout_mode not in TIMEOUT_MODES:
+            logger.critical(f"timeout_mode must be `wall` or `cpu` but got {timeout_mode}.")
+            raise ValueError(f"Invalid timeout_mode: {timeout_mode}")
+        if timeout_mode == "cpu" and not cpu_limit_supported():
+            logger.warning("timeout_mode `cpu` needs wait4 and RLIMIT_CPU; falling back to `wall`.")
+            timeout_mode = "wall"
+        if timeout_mode == "cpu" and cpus_per_case > 1:
+            # RLIMIT_CPU はプロセス全体の CPU 時間のため、N スレッドのソルバーは経過時間 timeout/N で止まる
+            logger.warning("timeout_mode `cpu` counts all threads of a solver; using `wall` with cpus_per_case > 1.")
+            timeout_mode = "wall"
 
         self.direction = direction
         self.filename = filename
@@ -765,9 +1867,55 @@ class ParallelTester:
         self.cpu_count = cpu_count
         self.cpu_ids = cpu_ids
         self.cpu_locks = dict(cpu_locks or {})
+        self.cpu_lease = cpu_lease
+        self.admission = admission
+        self.interactive_command = interactive_command.split() if interactive_command else None
+        self.score_command = score_command.split() if score_command else None
+        self.score_workers = score_workers
+        if self.interactive_command is not None and self.score_command is not None:
+            logger.critical("interactive_command and score_command cannot be used together.")
+            raise ValueError("interactive_command and score_command are exclusive")
+        if self.interactive_command is not None and solver_servers is not None:
+            logger.critical("interactive_command and solver_server cannot be used together.")
+            raise ValueError("interactive_command and solver_server are exclusive")
+        if self.interactive_command is not None and engine == "event":
+            logger.warning("Interactive mode runs on the thread engine; ignoring solver_engine `event`.")
+            engine = "thread"
+        self.case_memory_history = case_memory_history
+        self.memory_budget_kb = memory_budget_mb * KB_PER_MB if memory_budget_mb is not None else None
+        if self.memory_budget_kb is not None and self.case_memory_history is None:
+            self.case_memory_history = CaseMemoryHistory(os.path.join(RESULTS_DIR, CACHE_SUBDIR, CASE_MEMORY_FILE))
+        if self.memory_budget_kb is not None and engine == "event":
+            logger.warning("memory_budget_mb runs on the thread engine; ignoring solver_engine `event`.")
+            engine = "thread"
+        self.solver_servers = solver_servers
+        if self.solver_servers is not None and engine == "event":
+            logger.warning("solver_server runs on the thread engine; ignoring solver_engine `event`.")
+            engine = "thread"
+        self.engine = engine
+        self.solver_zygote = solver_zygote
+        self.stage_dir = stage_dir
+        self.record_compression = record_compression
+        # ジャッジの出力ファイルと stderr は記録先へ直接書き込み、採点プログラムには out/ のファイルを渡す
+        self.stream_record = stream_record or self.interactive_command is not None or self.score_command is not None
+        self.result_cache = result_cache
+        self.compile_cache = compile_cache
+        self.case_time_history = case_time_history
         self.verbose = verbose
         self.get_score = get_score
-        self.timeout = timeout / MS_PER_SEC if (timeout is not None) and (timeout >= 0) else None
+        timeout_sec = timeout / MS_PER_SEC if (timeout is not None) and (timeout >= 0) else None
+        self.timeout_mode = timeout_mode
+        # cpu モードの ``timeout`` は止まったソルバーを打ち切るための経過時間の上限
+        self.timeout = timeout_sec
+        cpu_seconds = None
+        if timeout_mode == "cpu" and timeout_sec is not None:
+            self.timeout = timeout_sec * CPU_TIMEOUT_WALL_RATIO
+            cpu_seconds = timeout_sec
+        self.limits = SolverLimits(
+            memory_bytes=memory_limit * BYTES_PER_MB if memory_limit is not None else None,
+            cpu_seconds=cpu_seconds,
+            threads=max(1, cpus_per_case),
+        )
         self.use_relative_score = use_relative_score
         self.is_int = is_int
         pre_csv = os.path.join(RESULTS_DIR, ALL_TESTS_SUBDIR, pre_dir_name, RESULT_CSV)
@@ -779,17 +1927,70 @@ class ParallelTester:
         # trial ごとに異なる再現可能な入力順を作るための乱数初期値
         self.optuna_seed = optuna_seed
         self.last_output_dir: Optional[str] = None
+        # 直前の run / run_opt_pruner で保持せずに読み捨てた stderr のバイト数
+        self.stderr_discarded_bytes: dict[str, int] = {}
+        # 直前の run / run_record の (予想 makespan, 実際の makespan) で、履歴がなければ予想は ``None``
+        self.last_makespan: Optional[tuple[Optional[float], float]] = None
+        # 直前の run_record で取得したファイル名ごとの資源使用量
+        self.last_usages: dict[str, SolverUsage] = {}
+        # 直前の run / run_record / run_opt_pruner で起動を止めた回数と秒数
+        self.last_admission: Optional[dict[str, Any]] = None
+
+    def _gated_lock(self, cpu_lock: Optional[CpuLock]) -> Optional[CpuLock]:
+        """admission control が有効なら、圧力が下がるまで取得を待たせる lock で包む"""
+        if self.admission is None:
+            return cpu_lock
+        return self.admission.gate(cpu_lock)
+
+    def _start_admission(self) -> None:
+        if self.admission is not None:
+            self.admission.reset()
+
+    def _cancel_admission(self) -> None:
+        if self.admission is not None:
+            self.admission.cancel()
+
+    def _finish_admission(self) -> None:
+        self.last_admission = None if self.admission is None else self.admission.summary()
+
+    def _memory_budget(self, input_files: list[str], order: Optional[list[int]] = None) -> Optional[MemoryBudget]:
+        """``memory_budget_mb`` が有効なら、履歴から予想した最大 RSS で ``MemoryBudget`` を作る"""
+        if self.memory_budget_kb is None or self.case_memory_history is None:
+            return None
+        predicted_kb, known_count = self.case_memory_history.predict(input_files)
+        if known_count == 0:
+            logger.warning("No peak RSS history; memory_budget_mb takes effect after the first `test` run.")
+        return MemoryBudget(self.memory_budget_kb, predicted_kb, order)
+
+    def _log_memory_budget(self, budget: MemoryBudget) -> None:
+        assert self.memory_budget_kb is not None
+        logger.info(
+            f"Memory budget: peak predicted {budget.peak_reserved_kb / KB_PER_MB:.0f} MB"
+            f" / {self.memory_budget_kb / KB_PER_MB:.0f} MB, {budget.deferred_count} cases started out of order."
+        )
+
+    def _cpu_lock(self, cpu_id: CpuTarget) -> Optional[CpuLock]:
+        """プロセス内の lock を他のプロセスとの lease で包み、さらに admission control で包む"""
+        cpu_lock = self.cpu_locks.get(cpu_id)
+        if self.cpu_lease is not None:
+            cpu_lock = self.cpu_lease.lease(cpu_set(cpu_id), cpu_lock)
+        return self._gated_lock(cpu_lock)
 
-    def _cpu_target(self, case_index: int) -> tuple[Optional[int], Optional[CpuLock]]:
+    def _cpu_target(self, case_index: int) -> tuple[Optional[CpuTarget], Optional[CpuLock]]:
         if not self.cpu_ids:
-            return None, None
+            return None, self._gated_lock(None)
         cpu_id = self.cpu_ids[case_index % len(self.cpu_ids)]
-        return cpu_id, self.cpu_locks.get(cpu_id)
+        return cpu_id, self._cpu_lock(cpu_id)
 
     def _prepare_worker_arguments(self, case_index: int, worker_arguments: tuple[Any, ...]) -> tuple[Any, ...]:
         cpu_id, cpu_lock = self._cpu_target(case_index)
         return (*worker_arguments, cpu_id, cpu_lock)
 
+    def _prepare_solver_zygote(self, command: list[str]) -> None:
+        """計測時間にソルバーの import を含めないよう、ケースの実行前に zygote を起動しておく"""
+        if self.solver_zygote is not None:
+            self.solver_zygote.prepare(command, self.limits)
+
     def show_score(self, scores: list[float]) -> float:
         """ケース別スコアを集約してログへ出力する"""
         score = self.get_score(scores)
@@ -809,6 +2010,17 @@ class ParallelTester:
         """設定されたコマンドでコンパイルし、失敗時は終了する"""
         if self.compile_command is None:
             return
+        output_path = compile_output_path(self.compile_command)
+        cache_key = None
+        if self.compile_cache is not None:
+            cache_key = self.compile_cache.key(self.compile_command)
+        if cache_key is not None and output_path is not None:
+            saved_seconds = self.compile_cache.restore(cache_key, output_path)
+            if saved_seconds is not None:
+                logger.info(to_green(f"Compile cache hit: reused {output_path} (saved {saved_seconds:.2f} sec)."))
+                return
+
+        start = time.perf_counter()
         try:
             subprocess.run(
                 self.compile_command,
@@ -821,6 +2033,11 @@ class ParallelTester:
             if error.stderr:
                 logger.error(error.stderr.rstrip())
             sys.exit(1)
+        compile_seconds = time.perf_counter() - start
+
+        if cache_key is not None and output_path is not None:
+            self.compile_cache.store(cache_key, output_path, compile_seconds)
+            logger.info(f"Compile cache miss: compiled in {compile_seconds:.2f} sec.")
 
     def _map_in_parallel(
         self,
@@ -829,6 +2046,10 @@ class ParallelTester:
         cancel_event: Optional[threading.Event] = None,
     ) -> list[Any]:
         """ThreadPoolExecutor で全ケースを並列実行する"""
+        if self.memory_budget_kb is not None:
+            return self._map_memory_budget(worker, worker_arguments, cancel_event)
+        if self.case_time_history is not None:
+            return self._map_longest_first(worker, worker_arguments, cancel_event)
         max_workers = max(1, self.cpu_count)
         executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
         try:
@@ -856,24 +2077,334 @@ class ParallelTester:
             # KeyboardInterrupt 時は executor の終了待ちより先にソルバーへ通知する
             if cancel_event is not None:
                 cancel_event.set()
+            self._cancel_admission()
             executor.shutdown(wait=True, cancel_futures=True)
 
+    def _solver_job(
+        self,
+        case_index: int,
+        input_file: str,
+        command: list[str],
+        capture_stdout: bool,
+        record_paths: Optional[tuple[str, str]] = None,
+        score_tail: Optional[_ScoreTail] = None,
+    ) -> SolverJob:
+        cpu_id, cpu_lock = self._cpu_target(case_index)
+        stdout_path, stderr_path = record_paths if record_paths is not None else (None, None)
+        return SolverJob(
+            key=case_index,
+            command=command,
+            input_file=input_file,
+            timeout=self.timeout,
+            cpu_id=cpu_id,
+            cpu_lock=cpu_lock,
+            capture_stdout=capture_stdout,
+            stdout_path=stdout_path,
+            stderr_path=stderr_path,
+            stderr_sink=None if score_tail is None else score_tail.feed,
+            limits=self.limits,
+        )
+
+    def _schedule_lane_count(self) -> int:
+        return len(self.cpu_ids) if self.cpu_ids else max(1, self.cpu_count)
+
+    def _lane_cpu_target(self, lane_index: int) -> tuple[Optional[CpuTarget], Optional[CpuLock]]:
+        if not self.cpu_ids:
+            return None, self._gated_lock(None)
+        cpu_id = self.cpu_ids[lane_index]
+        return cpu_id, self._cpu_lock(cpu_id)
+
+    def _finish_schedule(
+        self,
+        predicted_seconds: Optional[float],
+        actual_seconds: float,
+        case_seconds: dict[str, float],
+    ) -> None:
+        """実行時間を履歴へ反映し、予想と実際の makespan を残す"""
+        assert self.case_time_history is not None
+        self.case_time_history.record(case_seconds)
+        self.last_makespan = (predicted_seconds, actual_seconds)
+
+    def _map_longest_first(
+        self,
+        worker: Callable[[Any], Any],
+        worker_arguments: list[tuple[Any, ...]],
+        cancel_event: Optional[threading.Event] = None,
+    ) -> list[Any]:
+        """過去の実行時間が長いケースから、空いた lane が他の lane のケースを引き取りながら実行する"""
+        assert self.case_time_history is not None
+        input_files = [arguments[0] for arguments in worker_arguments]
+        predicted, known_count = self.case_time_history.predict(input_files)
+        lanes = plan_longest_first(predicted, self._schedule_lane_count())
+        predicted_seconds = predicted_makespan(predicted, lanes) if known_count else None
+        queue = WorkStealingQueue(lanes, predicted)
+        results: list[Any] = [None] * len(worker_arguments)
+        case_seconds: dict[str, float] = {}
+
+        def run_lane(lane_index: int) -> None:
+            cpu_id, cpu_lock = self._lane_cpu_target(lane_index)
+            while (case_index := queue.next_case(lane_index)) is not None:
+                start = time.perf_counter()
+                results[case_index] = worker((*worker_arguments[case_index], cpu_id, cpu_lock))
+                case_seconds[input_files[case_index]] = time.perf_counter() - start
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(lanes))
+        start = time.perf_counter()
+        try:
+            list(executor.map(run_lane, range(len(lanes))))
+        finally:
+            if cancel_event is not None:
+                cancel_event.set()
+            self._cancel_admission()
+            executor.shutdown(wait=True, cancel_futures=True)
+        self._finish_schedule(predicted_seconds, time.perf_counter() - start, case_seconds)
+        return results
+
+    def _map_memory_budget(
+        self,
+        worker: Callable[[Any], Any],
+        worker_arguments: list[tuple[Any, ...]],
+        cancel_event: Optional[threading.Event] = None,
+    ) -> list[Any]:
+        """予想最大 RSS の合計が budget に収まるケースを、空いた lane から順に実行する
+
+        ``case_time_history`` があれば実行時間が長いケースを優先し、収まらないケースは後回しにする
+        """
+        input_files = [arguments[0] for arguments in worker_arguments]
+        order = list(range(len(worker_arguments)))
+        predicted_seconds: Optional[float] = None
+        if self.case_time_history is not None:
+            predicted, known_count = self.case_time_history.predict(input_files)
+            order.sort(key=lambda case_index: -predicted[case_index])
+            lanes = plan_longest_first(predicted, self._schedule_lane_count())
+            predicted_seconds = predicted_makespan(predicted, lanes) if known_count else None
+        budget = self._memory_budget(input_files, order)
+        assert budget is not None
+        results: list[Any] = [None] * len(worker_arguments)
+        case_seconds: dict[str, float] = {}
+
+        def run_lane(lane_index: int) -> None:
+            cpu_id, cpu_lock = self._lane_cpu_target(lane_index)
+            while (case_index := budget.next_case()) is not None:
+                start = time.perf_counter()
+                try:
+                    results[case_index] = worker((*worker_arguments[case_index], cpu_id, cpu_lock))
+                finally:
+                    budget.release(case_index)
+                case_seconds[input_files[case_index]] = time.perf_counter() - start
+
+        lane_count = self._schedule_lane_count()
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=lane_count)
+        start = time.perf_counter()
+        try:
+            list(executor.map(run_lane, range(lane_count)))
+        finally:
+            if cancel_event is not None:
+                cancel_event.set()
+            budget.cancel()
+            self._cancel_admission()
+            executor.shutdown(wait=True, cancel_futures=True)
+        self._log_memory_budget(budget)
+        if self.case_time_history is not None:
+            self._finish_schedule(predicted_seconds, time.perf_counter() - start, case_seconds)
+        return results
+
+    def _schedule_jobs(self, jobs: list[SolverJob]) -> tuple[list[SolverJob], Optional[float]]:
+        """予想実行時間の長い順に並べ、各ジョブを予想負荷の小さい CPU へ割り当てる"""
+        assert self.case_time_history is not None
+        predicted, known_count = self.case_time_history.predict([job.input_file for job in jobs])
+        lanes = plan_longest_first(predicted, self._schedule_lane_count())
+        scheduled_jobs: list[SolverJob] = []
+        for lane_index, lane in enumerate(lanes):
+            cpu_id, cpu_lock = self._lane_cpu_target(lane_index)
+            for job_index in lane:
+                scheduled_jobs.append(
+                    replace(jobs[job_index], cpu_id=cpu_id, cpu_lock=cpu_lock, expected_seconds=predicted[job_index])
+                )
+        # CPU 固定なしでは 1 つの lane から順に起動するため、全体を長い順に並べる
+        scheduled_jobs.sort(key=lambda job: -(job.expected_seconds or 0.0))
+        return scheduled_jobs, predicted_makespan(predicted, lanes) if known_count else None
+
+    def _run_event_engine(
+        self,
+        jobs: list[SolverJob],
+        on_finish: Callable[[SolverJob, SolverOutcome], None],
+        cancel_event: Optional[threading.Event] = None,
+        schedule: bool = False,
+    ) -> bool:
+        """event engine で全ジョブを実行し、中止した場合は ``False`` を返す
+
+        ``schedule`` なら ``case_time_history`` に従って長いケースから起動する
+        """
+        with contextlib.closing(EventSolverEngine(max(1, self.cpu_count))) as engine:
+            if not schedule or self.case_time_history is None:
+                return engine.run(jobs, on_finish, cancel_event)
+
+            jobs, predicted_seconds = self._schedule_jobs(jobs)
+            case_seconds: dict[str, float] = {}
+
+            def on_scheduled_finish(job: SolverJob, outcome: SolverOutcome) -> None:
+                if outcome.error is None:
+                    case_seconds[job.input_file] = outcome.elapsed
+                on_finish(job, outcome)
+
+            start = time.perf_counter()
+            completed = engine.run(jobs, on_scheduled_finish, cancel_event, work_stealing=True)
+            self._finish_schedule(predicted_seconds, time.perf_counter() - start, case_seconds)
+            return completed
+
+    def _lookup_cached_result(
+        self,
+        input_file: str,
+        command: list[str],
+    ) -> tuple[Optional[str], Optional[tuple[SolverState, Score, str, str, float]]]:
+        return _lookup_cached_result(
+            self.result_cache,
+            command,
+            input_file,
+            self.timeout,
+            self.is_int,
+            limits=self.limits,
+            auxiliary_commands=_auxiliary_commands(self.interactive_command, self.score_command),
+        )
+
+    def _store_cached_result(
+        self,
+        cache_key: Optional[str],
+        result: tuple[SolverState, Score, str, str, float],
+    ) -> None:
+        if self.result_cache is not None and cache_key is not None:
+            self.result_cache.store(cache_key, result)
+
+    def _create_score_stage(self) -> Optional[_ScoreStage]:
+        if self.score_command is None:
+            return None
+        return _ScoreStage(self.score_command, self.is_int, self.score_workers)
+
+    def _finish_result_cache(self) -> None:
+        """キャッシュの容量を上限内に収める"""
+        if self.result_cache is not None:
+            self.result_cache.evict()
+
+    def _run_opt_pruner_event(
+        self,
+        trial: optuna.trial.Trial,
+        indexed_input_files: list[tuple[int, str]],
+        command: list[str],
+        score_stage: Optional[_ScoreStage] = None,
+    ) -> PrunerRunResult:
+        """``run_opt_pruner`` を event engine で実行する
+
+        採点する場合はループで採点を待たず、採点が終わったスレッドから pruner へ渡す
+        """
+        scores: list[Optional[float]] = [None] * len(self.input_file_names)
+        cancel_event = threading.Event()
+        pruned = False
+        # 採点のスレッドとループのスレッドから報告するため、trial の操作をまとめて排他する
+        report_lock = threading.Lock()
+        scoring_futures: list[concurrent.futures.Future] = []
+
+        score_tails = {case_index: _ScoreTail(self.is_int) for case_index, _ in indexed_input_files}
+        cache_keys: dict[int, Optional[str]] = {}
+
+        def report(case_index: int, score: float) -> None:
+            nonlocal pruned
+            with report_lock:
+                if pruned:
+                    return
+                trial.report(score, case_index)
+                scores[case_index] = score
+                if trial.should_prune():
+                    pruned = True
+                    # ループ内で通知するため、実行中のソルバーはすぐに終了する
+                    cancel_event.set()
+                    for pending in scoring_futures:
+                        pending.cancel()
+
+        def on_finish(job: SolverJob, outcome: SolverOutcome) -> None:
+            score_tail = score_tails[job.key]
+            result = _solver_result_from_outcome(
+                outcome,
+                self.is_int,
+                score_tail=None if score_stage is not None else score_tail,
+                limits=self.limits,
+            )
+            self.stderr_discarded_bytes[job.input_file] = score_tail.discarded_bytes
+
+            def finish(scored_result: tuple[SolverState, Score, str, str, float]) -> float:
+                self._store_cached_result(cache_keys[job.key], scored_result)
+                return _score_for_opt(job.input_file, scored_result, self.use_relative_score, self.pre_data)
+
+            if score_stage is None:
+                report(job.key, finish(result))
+                return
+            future = score_stage.submit(job.input_file, result, None, finish)
+            with report_lock:
+                scoring_futures.append(future)
+            future.add_done_callback(lambda done: None if done.cancelled() else report(job.key, done.result()))
+
+        jobs = []
+        for case_index, input_file in indexed_input_files:
+            cache_keys[case_index], cached_result = self._lookup_cached_result(input_file, command)
+            if cached_result is None:
+                jobs.append(
+                    self._solver_job(
+                        case_index,
+                        input_file,
+                        command,
+                        capture_stdout=score_stage is not None,
+                        score_tail=score_tails[case_index] if score_stage is None else None,
+                    )
+                )
+                continue
+            report(case_index, _score_for_opt(input_file, cached_result, self.use_relative_score, self.pre_data))
+            if pruned:
+                return PrunerRunResult(scores=scores, pruned=pruned)
+        self._run_event_engine(jobs, on_finish, cancel_event)
+        for future in scoring_futures:
+            if not future.cancelled():
+                future.result()
+        return PrunerRunResult(scores=scores, pruned=pruned)
+
     def run_opt_pruner(self, trial: optuna.trial.Trial) -> PrunerRunResult:
         """Optuna trial を並列評価し、pruner の判定に従って打ち切る
 
         Returns:
             ケース別スコアと打ち切りの有無で、未完了ケースは ``None``
         """
-        scores: list[Optional[float]] = [None] * len(self.input_file_names)
         indexed_input_files = list(enumerate(self.input_file_names))
         shuffle_seed = None if self.optuna_seed is None else self.optuna_seed + trial.number
         Random(shuffle_seed).shuffle(indexed_input_files)
-        cancel_event = threading.Event()
-
         command = self.execute_command + self.added_command
-        scheduled_arguments = []
+        self.stderr_discarded_bytes = {}
+        self._prepare_solver_zygote(command)
+        self._start_admission()
+        score_stage = self._create_score_stage()
+        try:
+            with solver_launcher(self.solver_zygote):
+                if self.engine == "event":
+                    result = self._run_opt_pruner_event(trial, indexed_input_files, command, score_stage)
+                else:
+                    result = self._run_opt_pruner_threads(trial, indexed_input_files, command, score_stage)
+        finally:
+            if score_stage is not None:
+                score_stage.close()
+        self._finish_result_cache()
+        self._finish_admission()
+        return result
+
+    def _run_opt_pruner_threads(
+        self,
+        trial: optuna.trial.Trial,
+        indexed_input_files: list[tuple[int, str]],
+        command: list[str],
+        score_stage: Optional[_ScoreStage],
+    ) -> PrunerRunResult:
+        scores: list[Optional[float]] = [None] * len(self.input_file_names)
+        cancel_event = threading.Event()
+        case_arguments: dict[int, tuple[Any, ...]] = {}
         for case_index, input_file in indexed_input_files:
-            arguments = (
+            case_arguments[case_index] = (
                 input_file,
                 case_index,
                 command,
@@ -882,30 +2413,67 @@ class ParallelTester:
                 self.use_relative_score,
                 self.pre_data,
                 cancel_event,
+                self.stderr_discarded_bytes,
+                self.result_cache,
+                self.limits,
+                self.interactive_command,
+                score_stage,
+                self.solver_servers,
             )
-            cpu_id, _ = self._cpu_target(case_index)
-            scheduled_arguments.append((cpu_id, self._prepare_worker_arguments(case_index, arguments)))
 
+        worker: Callable[[Any], Any] = _worker_process_file_opt_pruner
         max_workers = max(1, self.cpu_count)
-        argument_iterator = iter(arguments for _, arguments in scheduled_arguments)
-        lane_iterators: dict[int, Iterator] = {}
-        if self.cpu_ids:
-            lane_arguments: dict[int, list[tuple[Any, ...]]] = {cpu_id: [] for cpu_id in self.cpu_ids}
-            for cpu_id, arguments in scheduled_arguments:
-                if cpu_id is not None:
-                    lane_arguments[cpu_id].append(arguments)
+        argument_iterator: Iterator = iter(())
+        lane_iterators: dict[Any, Iterator] = {}
+        budget = self._memory_budget(self.input_file_names, list(case_arguments))
+        if budget is not None:
+            # 空いた lane が、予想最大 RSS が budget に収まるケースをその場で選ぶ
+            lane_targets = [self._lane_cpu_target(lane_index) for lane_index in range(self._schedule_lane_count())]
+
+            def run_budget_case(lane_index: int) -> tuple[Optional[int], Any]:
+                case_index = budget.next_case()
+                if case_index is None:
+                    return None, None
+                try:
+                    return _worker_process_file_opt_pruner((*case_arguments[case_index], *lane_targets[lane_index]))
+                finally:
+                    budget.release(case_index)
+
+            worker = run_budget_case
+            lane_iterators = {lane_index: itertools.repeat(lane_index) for lane_index in range(len(lane_targets))}
+        elif self.cpu_ids:
+            lane_arguments: dict[CpuTarget, list[tuple[Any, ...]]] = {cpu_id: [] for cpu_id in self.cpu_ids}
+            for case_index, arguments in case_arguments.items():
+                cpu_id, _ = self._cpu_target(case_index)
+                assert cpu_id is not None
+                lane_arguments[cpu_id].append(self._prepare_worker_arguments(case_index, arguments))
             lane_iterators = {cpu_id: iter(arguments) for cpu_id, arguments in lane_arguments.items()}
+        else:
+            argument_iterator = iter(
+                self._prepare_worker_arguments(case_index, arguments)
+                for case_index, arguments in case_arguments.items()
+            )
+        max_workers = max(max_workers, len(lane_iterators))
         pruned = False
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
             pending_futures: dict[concurrent.futures.Future, Optional[int]] = {}
+            # 採点中のケースで、採点が終わった順に pruner へ渡す
+            scoring_futures: dict[concurrent.futures.Future, int] = {}
+
+            def submit_next(lane_id: Optional[int]) -> None:
+                if lane_id is None:
+                    _submit_next(executor, argument_iterator, pending_futures, worker)
+                else:
+                    _submit_next(executor, lane_iterators[lane_id], pending_futures, worker, lane_id)
+
             try:
-                if self.cpu_ids:
+                if lane_iterators:
                     for cpu_id, lane_iterator in lane_iterators.items():
                         _submit_next(
                             executor,
                             lane_iterator,
                             pending_futures,
-                            _worker_process_file_opt_pruner,
+                            worker,
                             cpu_id,
                         )
                 else:
@@ -914,17 +2482,29 @@ class ParallelTester:
                             executor,
                             argument_iterator,
                             pending_futures,
-                            _worker_process_file_opt_pruner,
+                            worker,
                         )
 
-                while pending_futures:
+                while pending_futures or scoring_futures:
                     done, _ = concurrent.futures.wait(
-                        pending_futures,
+                        [*pending_futures, *scoring_futures],
                         return_when=concurrent.futures.FIRST_COMPLETED,
                     )
                     for future in done:
-                        lane_id = pending_futures.pop(future)
-                        case_index, score = future.result()
+                        lane_id: Optional[int] = None
+                        if future in scoring_futures:
+                            case_index = scoring_futures.pop(future)
+                            score = future.result()
+                            scored_later = True
+                        else:
+                            lane_id = pending_futures.pop(future)
+                            case_index, score = future.result()
+                            scored_later = isinstance(score, concurrent.futures.Future)
+                            if scored_later:
+                                # 採点を待たずに、空いた lane で次のケースを実行する
+                                scoring_futures[score] = case_index
+                                submit_next(lane_id)
+                                continue
                         if score is None:
                             continue
                         trial.report(score, case_index)
@@ -934,54 +2514,112 @@ class ParallelTester:
                             # Future.cancel() では実行中のソルバーを停止できないため
                             # 終了通知を介して各ワーカーから子プロセスを終了する
                             cancel_event.set()
-                            for pending in pending_futures:
+                            if budget is not None:
+                                budget.cancel()
+                            self._cancel_admission()
+                            for pending in [*pending_futures, *scoring_futures]:
                                 pending.cancel()
                             break
-                        if lane_id is None:
-                            _submit_next(
-                                executor,
-                                argument_iterator,
-                                pending_futures,
-                                _worker_process_file_opt_pruner,
-                            )
-                        else:
-                            _submit_next(
-                                executor,
-                                lane_iterators[lane_id],
-                                pending_futures,
-                                _worker_process_file_opt_pruner,
-                                lane_id,
-                            )
+                        if not scored_later:
+                            submit_next(lane_id)
                     if pruned:
                         break
             finally:
                 # Ctrl-C でも with 節の終了待ちに入る前にソルバーを終了する
                 cancel_event.set()
-                for pending in pending_futures:
+                if budget is not None:
+                    budget.cancel()
+                self._cancel_admission()
+                for pending in [*pending_futures, *scoring_futures]:
                     pending.cancel()
         return PrunerRunResult(scores=scores, pruned=pruned)
 
     def run(self) -> list[float]:
         """全ケースを並列実行し、スコアだけを返す"""
-        cancel_event = threading.Event()
         command = self.execute_command + self.added_command
-        worker_arguments = [
-            (
-                input_file,
-                command,
-                self.timeout,
+        self.stderr_discarded_bytes = {}
+        self._prepare_solver_zygote(command)
+        self._start_admission()
+        score_stage = self._create_score_stage()
+        try:
+            with solver_launcher(self.solver_zygote):
+                if self.engine == "event":
+                    scores = self._run_light_event(command, score_stage)
+                else:
+                    cancel_event = threading.Event()
+                    worker_arguments = [
+                        (
+                            input_file,
+                            command,
+                            self.timeout,
+                            self.is_int,
+                            self.use_relative_score,
+                            self.pre_data,
+                            cancel_event,
+                            self.stderr_discarded_bytes,
+                            self.result_cache,
+                            self.limits,
+                            self.interactive_command,
+                            score_stage,
+                            self.solver_servers,
+                        )
+                        for input_file in self.input_file_names
+                    ]
+                    scores = self._map_in_parallel(
+                        _worker_process_file_light,
+                        worker_arguments,
+                        cancel_event=cancel_event,
+                    )
+            scores = _resolve_scored(scores)
+        finally:
+            if score_stage is not None:
+                score_stage.close()
+        self._finish_result_cache()
+        self._finish_admission()
+        return scores
+
+    def _run_light_event(self, command: list[str], score_stage: Optional[_ScoreStage]) -> list[Any]:
+        """``run`` の全ケースを event engine で実行し、採点を別に行う場合は Future を含むリストを返す"""
+        scores: list[Any] = [math.nan] * len(self.input_file_names)
+        score_tails = [_ScoreTail(self.is_int) for _ in self.input_file_names]
+        cache_keys: dict[int, Optional[str]] = {}
+
+        def on_finish(job: SolverJob, outcome: SolverOutcome) -> None:
+            score_tail = score_tails[job.key]
+            result = _solver_result_from_outcome(
+                outcome,
                 self.is_int,
-                self.use_relative_score,
-                self.pre_data,
-                cancel_event,
+                score_tail=None if score_stage is not None else score_tail,
+                limits=self.limits,
             )
-            for input_file in self.input_file_names
-        ]
-        return self._map_in_parallel(
-            _worker_process_file_light,
-            worker_arguments,
-            cancel_event=cancel_event,
-        )
+            self.stderr_discarded_bytes[job.input_file] = score_tail.discarded_bytes
+
+            def finish(scored_result: tuple[SolverState, Score, str, str, float]) -> float:
+                self._store_cached_result(cache_keys[job.key], scored_result)
+                return _score_for_opt(job.input_file, scored_result, self.use_relative_score, self.pre_data)
+
+            if score_stage is None:
+                scores[job.key] = finish(result)
+            else:
+                scores[job.key] = score_stage.submit(job.input_file, result, None, finish)
+
+        jobs = []
+        for case_index, input_file in enumerate(self.input_file_names):
+            cache_keys[case_index], cached_result = self._lookup_cached_result(input_file, command)
+            if cached_result is not None:
+                scores[case_index] = _score_for_opt(input_file, cached_result, self.use_relative_score, self.pre_data)
+                continue
+            jobs.append(
+                self._solver_job(
+                    case_index,
+                    input_file,
+                    command,
+                    capture_stdout=score_stage is not None,
+                    score_tail=score_tails[case_index] if score_stage is None else None,
+                )
+            )
+        self._run_event_engine(jobs, on_finish, schedule=True)
+        return scores
 
     def _create_output_dir(self) -> str:
         """実行日時を名前に含む出力ディレクトリを作る"""
@@ -1026,40 +2664,141 @@ class ParallelTester:
         self,
         output_dir: str,
         results: list[CaseResult],
+        usages: Optional[Mapping[str, SolverUsage]] = None,
     ) -> None:
         """`{output_dir}/result.csv` へ書き出す"""
+        usages = usages or {}
         csv_path = os.path.join(output_dir, RESULT_CSV)
         with open(csv_path, "w", encoding="utf-8", newline="") as csv_file:
             writer = csv.writer(csv_file)
             if self.use_relative_score:
-                writer.writerow(CSV_HEADERS_REL)
+                writer.writerow(CSV_HEADERS_REL + CSV_USAGE_HEADERS + [CSV_LIMIT_HEADER])
                 for filename, score, relative_score, state, elapsed in results:
-                    writer.writerow([filename, score, relative_score, state, elapsed])
+                    writer.writerow(
+                        [
+                            filename,
+                            score,
+                            relative_score,
+                            state,
+                            elapsed,
+                            *self._resource_csv_values(filename, state, usages),
+                        ]
+                    )
             else:
-                writer.writerow(CSV_HEADERS_NOREL)
+                writer.writerow(CSV_HEADERS_NOREL + CSV_USAGE_HEADERS + [CSV_LIMIT_HEADER])
                 for filename, score, _, state, elapsed in results:
-                    writer.writerow([filename, score, state, elapsed])
-
-    def _copy_outputs_to_local(self, output_dir: str) -> None:
-        """`{output_dir}/out/` の中身を `./out/` にコピーする"""
-        if not os.path.exists(LOCAL_OUT_DIR):
-            os.makedirs(LOCAL_OUT_DIR)
-        source_directory = os.path.join(output_dir, OUT_SUBDIR)
-        for item in os.listdir(source_directory):
-            source_path = os.path.join(source_directory, item)
-            destination_path = os.path.join(LOCAL_OUT_DIR, item)
-            if os.path.isfile(source_path):
-                shutil.copy2(source_path, destination_path)
-            elif os.path.isdir(source_path):
-                shutil.copytree(source_path, destination_path)
-
-    def run_record(self, record: bool, memo: Optional[str] = None) -> list[CaseResult]:
-        """全ケースを並列実行し CSV と (record=True なら) 入出力ファイルも保存する"""
-        output_dir = self._setup_output_dir(record)
+                    writer.writerow(
+                        [filename, score, state, elapsed, *self._resource_csv_values(filename, state, usages)]
+                    )
+
+    def _resource_csv_values(
+        self,
+        filename: str,
+        state: SolverState,
+        usages: Mapping[str, SolverUsage],
+    ) -> list[Union[int, float, str]]:
+        usage = usages.get(filename)
+        return [*_usage_csv_values(usage), _fired_limit(state, usage, self.limits)]
+
+    def _publish_outputs(self, output_dir: str) -> None:
+        """`./out/` を `{output_dir}/out/` を指す symlink に置き換え、前の実行の出力を残さない"""
+        try:
+            method = publish_directory(os.path.join(output_dir, OUT_SUBDIR), LOCAL_OUT_DIR)
+        except OSError as error:
+            logger.warning(f"Failed to publish outputs to {LOCAL_OUT_DIR}: {error}")
+            return
+        if method != "symlink":
+            logger.info(f"Published outputs to {LOCAL_OUT_DIR} by {method} because symlinks are unavailable.")
+
+    def _run_record_event(self, config: _RunConfig, state: WorkerState, input_files: list[str]) -> list[Any]:
+        """``input_files`` を event engine で実行し、採点を別に行う場合は Future を含むリストを返す"""
+        results: list[Any] = [None] * len(input_files)
+
+        cache_keys: dict[int, Optional[str]] = {}
+
+        def on_finish(job: SolverJob, outcome: SolverOutcome) -> None:
+            result = _solver_result_from_outcome(outcome, config.is_int, job.stderr_path, limits=config.limits)
+            if outcome.usage is not None:
+                state.usages[job.input_file] = outcome.usage
+            results[job.key] = _finish_config_result(job.input_file, result, config, state, cache_keys[job.key])
+
+        jobs = []
+        for case_index, input_file in enumerate(input_files):
+            cache_keys[case_index], cached_result = _lookup_cached_config_result(config, input_file)
+            if cached_result is not None:
+                results[case_index] = _handle_cached_result(input_file, cached_result, config, state)
+                continue
+            jobs.append(
+                self._solver_job(
+                    case_index,
+                    input_file,
+                    config.command,
+                    capture_stdout=config.record or config.score_stage is not None,
+                    record_paths=_record_paths(config, input_file),
+                )
+            )
+        self._run_event_engine(jobs, on_finish, schedule=True)
+        return [result for result in results if result is not None]
+
+    def _log_staging(self, staging: RunStaging) -> None:
+        """ソルバーの待ちから外した記録の書き込み時間を表示する"""
+        logger.info(
+            f"Staging: {staging.flushed_files} files ({staging.flushed_bytes / BYTES_PER_MB:.1f} MB) flushed in the"
+            f" background in {staging.flush_seconds:.2f} s; staging the binary took {staging.stage_seconds:.3f} s."
+        )
+
+    def _prepare_resume(self, resume_dir: str) -> dict[str, Any]:
+        """中断した実行の manifest を読み、入力一覧をその実行にそろえる"""
+        manifest = read_run_manifest(resume_dir)
+        self.input_file_names = manifest["input_file_names"]
+        return manifest
+
+    def run_record(
+        self,
+        record: bool,
+        memo: Optional[str] = None,
+        resume_dir: Optional[str] = None,
+    ) -> list[CaseResult]:
+        """全ケースを並列実行し CSV と (record=True なら) 入出力ファイルも保存する
+
+        終わったケースは結果ディレクトリの ``journal.jsonl`` に追記し、``result.csv`` はそこから作る
+        ``resume_dir`` を指定した場合は、その実行の journal にないケースだけを同じ実行ファイルで実行する
+        """
+        if resume_dir is None:
+            output_dir = self._setup_output_dir(record)
+            command = self.execute_command + self.added_command
+            manifest = {
+                "command": command,
+                "snapshot_command": snapshot_command(command, output_dir),
+                "record": record,
+                "input_file_names": self.input_file_names,
+            }
+        else:
+            output_dir = resume_dir
+            manifest = self._prepare_resume(resume_dir)
+            command, record = manifest["snapshot_command"], manifest["record"]
+            if record:
+                self._ensure_record_subdirs(output_dir)
         self.last_output_dir = output_dir
         if memo:
             with open(os.path.join(output_dir, "memo.txt"), "w", encoding="utf-8") as memo_file:
                 memo_file.write(memo)
+        journal_path = os.path.join(output_dir, JOURNAL_FILE)
+        finished = read_journal(journal_path)
+        input_files = [input_file for input_file in self.input_file_names if input_file not in finished]
+        # vis は実行中の進み具合と残り時間をこの開始時刻と開始時点の完了数から求める
+        manifest.update(
+            started_at=time.time(),
+            pid=os.getpid(),
+            finished_at_start=len(self.input_file_names) - len(input_files),
+        )
+        write_run_manifest(output_dir, manifest)
+        self._prepare_solver_zygote(command)
+        if resume_dir is not None:
+            logger.info(
+                f"Resuming {output_dir}: {len(self.input_file_names) - len(input_files)} finished,"
+                f" {len(input_files)} remaining."
+            )
 
         formatter = _LogFormatter(
             direction=self.direction,
@@ -1067,8 +2806,22 @@ class ParallelTester:
             total_files=len(self.input_file_names),
             is_int=self.is_int,
         )
+        staging = None
+        record_compressor = None
+        run_command = command
+        if self.stage_dir is not None:
+            staging = RunStaging(
+                self.stage_dir,
+                output_dir,
+                (OUT_SUBDIR, ERR_SUBDIR) if record else (),
+                self.record_compression,
+                (ERR_SUBDIR,),
+            )
+            run_command = staging.stage_command(command)
+        elif record and self.record_compression is not None:
+            record_compressor = RecordCompressor(self.record_compression)
         run_config = _RunConfig(
-            command=self.execute_command + self.added_command,
+            command=run_command,
             timeout=self.timeout,
             use_relative_score=self.use_relative_score,
             baseline_scores=self.pre_data,
@@ -1078,16 +2831,53 @@ class ParallelTester:
             record=record,
             is_int=self.is_int,
             formatter=formatter,
+            stream_record=self.stream_record,
+            result_cache=self.result_cache,
+            limits=self.limits,
+            interactive_command=self.interactive_command,
+            score_stage=self._create_score_stage(),
+            journal=CaseJournal(journal_path),
+            solver_servers=self.solver_servers,
+            staging=staging,
+            cache_command=command,
+            record_compressor=record_compressor,
         )
-        worker_state = WorkerState()
-        worker_arguments = [(input_file, run_config, worker_state) for input_file in self.input_file_names]
-
-        results = self._map_in_parallel(_worker_process_file, worker_arguments)
-
+        worker_state = WorkerState(counter=len(self.input_file_names) - len(input_files))
+        self._start_admission()
+        try:
+            with solver_launcher(self.solver_zygote):
+                if self.engine == "event":
+                    results = self._run_record_event(run_config, worker_state, input_files)
+                else:
+                    worker_arguments = [(input_file, run_config, worker_state) for input_file in input_files]
+                    results = self._map_in_parallel(_worker_process_file, worker_arguments)
+            # 全ソルバーの終了後に残りの採点を待ち、journal がそろってから result.csv を書く
+            _resolve_scored(results)
+        finally:
+            if run_config.score_stage is not None:
+                run_config.score_stage.close()
+            # journal への追記は記録を移した後に行われるため、移し終えてから閉じる
+            if staging is not None:
+                staging.close()
+            if record_compressor is not None:
+                record_compressor.close()
+            run_config.journal.close()
+        if staging is not None:
+            self._log_staging(staging)
+
+        self._finish_result_cache()
+        self._finish_admission()
+        if self.admission is not None:
+            self.admission.write_summary(output_dir)
+        if self.case_memory_history is not None:
+            self.case_memory_history.record({name: usage.max_rss_kb for name, usage in worker_state.usages.items()})
+        finished = read_journal(journal_path)
+        results = [finished[input_file][0] for input_file in self.input_file_names if input_file in finished]
+        self.last_usages = {name: usage for name, (_, usage) in finished.items() if usage is not None}
         results.sort(key=lambda result: result[0])
-        self._write_result_csv(output_dir, results)
+        self._write_result_csv(output_dir, results, self.last_usages)
         if record:
-            self._copy_outputs_to_local(output_dir)
+            self._publish_outputs(output_dir)
         return results
 
     @staticmethod
@@ -1119,18 +2909,125 @@ class ParallelTester:
         return parser.parse_args()
 
 
+def build_result_cache(settings: AHCSettings) -> Optional[ResultCache]:
+    """settings でキャッシュが有効なら ``ResultCache`` を返す"""
+    if not getattr(settings, "result_cache", False):
+        return None
+    max_mb = getattr(settings, "result_cache_max_mb", 1024)
+    return ResultCache(
+        os.path.join(RESULTS_DIR, CACHE_SUBDIR, RESULT_CACHE_SUBDIR),
+        int(max_mb * BYTES_PER_MB),
+    )
+
+
+def build_compile_cache(settings: AHCSettings) -> Optional[CompileCache]:
+    """settings でコンパイルキャッシュが有効なら ``CompileCache`` を返す"""
+    if not getattr(settings, "compile_cache", True):
+        return None
+    return CompileCache(os.path.join(RESULTS_DIR, CACHE_SUBDIR, COMPILE_CACHE_SUBDIR))
+
+
+def build_case_time_history(settings: AHCSettings) -> Optional[CaseTimeHistory]:
+    """settings の ``case_schedule`` が ``longest_first`` なら実行時間の履歴を返す"""
+    case_schedule = getattr(settings, "case_schedule", "input")
+    if case_schedule not in CASE_SCHEDULES:
+        logger.critical(f"case_schedule must be `input` or `longest_first` but got {case_schedule}.")
+        raise ValueError(f"Invalid case_schedule: {case_schedule}")
+    if case_schedule == "input":
+        return None
+    return CaseTimeHistory(
+        os.path.join(RESULTS_DIR, CACHE_SUBDIR, CASE_TIMES_FILE),
+        latest_result_csv(os.path.join(RESULTS_DIR, ALL_TESTS_SUBDIR), RESULT_CSV),
+    )
+
+
+def build_case_memory_history(settings: AHCSettings) -> Optional[CaseMemoryHistory]:
+    """``memory_budget_mb`` を使う場合に、ケースごとの最大 RSS の履歴を返す
+
+    使わない間は履歴を書かず、有効にした最初の実行では直近の ``result.csv`` の実測値から予想する
+    """
+    if getattr(settings, "memory_budget_mb", None) is None:
+        return None
+    return CaseMemoryHistory(
+        os.path.join(RESULTS_DIR, CACHE_SUBDIR, CASE_MEMORY_FILE),
+        latest_result_csv(os.path.join(RESULTS_DIR, ALL_TESTS_SUBDIR), RESULT_CSV),
+        getattr(settings, "parse_input_params", None),
+    )
+
+
+def build_cpu_lease(settings: AHCSettings, role: str) -> Optional[CpuLeaseRegistry]:
+    """settings の ``cpu_lease`` が有効で ``flock`` を使えるなら、``role`` で CPU を借りる登録簿を返す"""
+    if not getattr(settings, "cpu_lease", True) or not cpu_lease_supported():
+        return None
+    return CpuLeaseRegistry(role)
+
+
+def build_solver_servers(settings: AHCSettings) -> Optional[SolverServerPool]:
+    """settings の ``solver_server`` が有効なら、起動したままのソルバーを lane ごとに貸し出す pool を返す"""
+    if not getattr(settings, "solver_server", False):
+        return None
+    return SolverServerPool(settings.execute_command.split())
+
+
+def build_solver_zygote(settings: AHCSettings) -> Optional[PythonZygoteLauncher]:
+    """settings の ``solver_zygote`` が有効なら、Python のソルバーを zygote から起動する launcher を返す"""
+    if not getattr(settings, "solver_zygote", False):
+        return None
+    if not zygote_supported():
+        logger.warning("solver_zygote needs fork and fd passing on Linux; spawning solvers normally.")
+        return None
+    return PythonZygoteLauncher()
+
+
+def build_admission_controller(settings: AHCSettings, cpus_per_case: int = 1) -> Optional[AdmissionController]:
+    """settings の ``admission_control`` が有効なら、閾値を読んで ``AdmissionController`` を返す"""
+    if not getattr(settings, "admission_control", False):
+        return None
+    defaults = AdmissionThresholds()
+    thresholds = AdmissionThresholds(
+        cpu_pressure=getattr(settings, "admission_cpu_pressure", defaults.cpu_pressure),
+        memory_pressure=getattr(settings, "admission_memory_pressure", defaults.memory_pressure),
+        load_ratio=getattr(settings, "admission_load_ratio", defaults.load_ratio),
+        min_available_mb=getattr(settings, "admission_min_available_mb", defaults.min_available_mb),
+    )
+    return AdmissionController(thresholds, threads_per_case=cpus_per_case)
+
+
 def build_tester(
     settings: AHCSettings,
     njobs: int,
     verbose: bool = False,
     cpu_affinity: bool = False,
-    affinity_cpu_ids: Optional[tuple[int, ...]] = None,
-    cpu_locks: Optional[Mapping[int, CpuLock]] = None,
+    affinity_cpu_ids: Optional[tuple[CpuTarget, ...]] = None,
+    cpu_locks: Optional[Mapping[CpuTarget, CpuLock]] = None,
+    use_cache: bool = True,
+    lease_role: str = "test",
+    solver_servers: Optional[SolverServerPool] = None,
+    solver_zygote: Optional[PythonZygoteLauncher] = None,
+    keep_solvers: bool = True,
 ) -> ParallelTester:
-    """`AHCSettings` から `ParallelTester` を組み立てて返す"""
+    """`AHCSettings` から `ParallelTester` を組み立てて返す
+
+    ``use_cache`` が ``False`` なら settings の ``result_cache`` に関わらずキャッシュを使わない
+    ``lease_role`` は CPU を他のプロセスと取り合うときの優先度で、``test`` が ``opt`` より優先される
+    ``solver_servers`` を渡すと trial をまたいで同じソルバーを使い、省略時は settings から作る
+    ``solver_zygote`` も同様に trial をまたいで同じ zygote を使う
+    ``keep_solvers`` が ``False`` なら settings に関わらず、起動したままのソルバーも zygote も作らない
+    """
+    cpus_per_case = max(1, getattr(settings, "cpus_per_case", 1))
     if affinity_cpu_ids is None:
-        affinity_cpu_ids = get_cpu_affinity_ids(njobs) if cpu_affinity else ()
-    cpu_count = len(affinity_cpu_ids) if affinity_cpu_ids else min(njobs, multiprocessing.cpu_count() - 1)
+        affinity_cpu_ids = (
+            get_cpu_affinity_ids(njobs, getattr(settings, "cpu_placement", ()), cpus_per_case) if cpu_affinity else ()
+        )
+    # 固定しない場合も同時に動くソルバーのスレッド数の合計が CPU 数を超えないようにする
+    cpu_count = (
+        len(affinity_cpu_ids)
+        if affinity_cpu_ids
+        else max(1, min(njobs, (multiprocessing.cpu_count() - 1) // cpus_per_case))
+    )
+    if keep_solvers:
+        solver_servers = solver_servers if solver_servers is not None else build_solver_servers(settings)
+        solver_zygote = solver_zygote if solver_zygote is not None else build_solver_zygote(settings)
     tester = ParallelTester(
         direction=settings.direction,
         filename=settings.filename,
@@ -1147,6 +3044,25 @@ def build_tester(
         optuna_seed=settings.optuna_seed,
         cpu_ids=affinity_cpu_ids,
         cpu_locks=cpu_locks,
+        engine=getattr(settings, "solver_engine", "thread"),
+        stream_record=getattr(settings, "stream_record", True),
+        result_cache=build_result_cache(settings) if use_cache else None,
+        compile_cache=build_compile_cache(settings),
+        case_time_history=build_case_time_history(settings),
+        memory_limit=getattr(settings, "memory_limit", None),
+        timeout_mode=getattr(settings, "timeout_mode", "wall"),
+        interactive_command=getattr(settings, "interactive_command", None),
+        score_command=getattr(settings, "score_command", None),
+        score_workers=getattr(settings, "score_workers", DEFAULT_SCORE_WORKERS),
+        cpus_per_case=cpus_per_case,
+        admission=build_admission_controller(settings, cpus_per_case),
+        memory_budget_mb=getattr(settings, "memory_budget_mb", None),
+        case_memory_history=build_case_memory_history(settings),
+        cpu_lease=build_cpu_lease(settings, lease_role) if affinity_cpu_ids else None,
+        solver_servers=solver_servers,
+        solver_zygote=solver_zygote,
+        stage_dir=stage_root(getattr(settings, "stage_dir", None)),
+        record_compression=resolve_compression(getattr(settings, "record_compression", None)),
     )
     return tester
 
@@ -1196,7 +3112,7 @@ def _log_relative_score_summary(scores: list[CaseResult], direction: Direction)
     logger.info(f"RelativeScore: " f"{_format_relative_score(average_relative_score, direction)}.")
 
 
-ERROR_TABLE_STATES: tuple[SolverState, ...] = ("TLE", "ERROR", "INNER_ERROR")
+ERROR_TABLE_STATES: tuple[SolverState, ...] = ("TLE", "MLE", "ERROR", "INNER_ERROR")
 
 
 def _log_error_table(failed_cases: list[tuple[str, SolverState]]) -> None:
@@ -1222,11 +3138,30 @@ def _log_error_table(failed_cases: list[tuple[str, SolverState]]) -> None:
     logger.error(section_separator)
     logger.error(separator)
     logger.error(to_red(f" TLE   : {state_counts['TLE']} "))
+    logger.error(to_red(f" MLE   : {state_counts['MLE']} "))
     logger.error(to_red(f" Other : {state_counts['ERROR']} "))
     logger.error(to_red(f" Inner : {state_counts['INNER_ERROR']} "))
 
 
-def _log_settings(settings: AHCSettings, njobs: int, cpu_ids: tuple[int, ...]) -> None:
+def _log_usage_summary(usages: Mapping[str, SolverUsage]) -> None:
+    """全ケースの CPU 時間、最大メモリ、コンテキストスイッチを集計して表示する"""
+    if not usages:
+        return
+    slowest_file, slowest = max(usages.items(), key=lambda item: item[1].cpu_seconds)
+    largest_file, largest = max(usages.items(), key=lambda item: item[1].max_rss_kb)
+    user_seconds = sum(usage.user_seconds for usage in usages.values())
+    system_seconds = sum(usage.system_seconds for usage in usages.values())
+    voluntary = sum(usage.voluntary_switches for usage in usages.values())
+    involuntary = sum(usage.involuntary_switches for usage in usages.values())
+    logger.info(f"--- {to_bold('[Resources]')} ---")
+    logger.info(f"cpu time        : user {user_seconds:.3f} sec / sys {system_seconds:.3f} sec")
+    logger.info(f"max cpu time    : {slowest.cpu_seconds:.3f} sec ({slowest_file})")
+    logger.info(f"max rss         : {largest.max_rss_kb / KB_PER_MB:.1f} MB ({largest_file})")
+    logger.info(f"ctx switches    : voluntary {voluntary} / involuntary {involuntary}")
+    logger.info("-----------------")
+
+
+def _log_settings(settings: AHCSettings, njobs: int, cpu_ids: tuple[CpuTarget, ...]) -> None:
     logger.info(f"--- {to_bold('[Settings]')} ---")
     logger.info(f"direction       : {settings.direction}")
     logger.info(f"timeout         : {settings.timeout}")
@@ -1235,11 +3170,20 @@ def _log_settings(settings: AHCSettings, njobs: int, cpu_ids: tuple[int, ...]) -
         logger.info(f"pre_dir_name    : {settings.pre_dir_name}")
     logger.info(f"execute_command : {settings.execute_command}")
     logger.info(f"njobs           : {njobs}")
-    cpu_affinity = ", ".join(map(str, cpu_ids)) if cpu_ids else "disabled"
+    cpu_affinity = ", ".join(map(format_cpu_target, cpu_ids)) if cpu_ids else "disabled"
     logger.info(f"cpu affinity    : {cpu_affinity}")
+    logger.info(f"cpus per case   : {getattr(settings, 'cpus_per_case', 1)}")
+    logger.info(f"solver engine   : {getattr(settings, 'solver_engine', 'thread')}")
     logger.info("----------------")
 
 
+def resolve_run_dir(run_id: str) -> str:
+    """``all_tests`` 以下の実行名か結果ディレクトリのパスを、結果ディレクトリのパスにする"""
+    if os.path.isdir(run_id):
+        return run_id
+    return os.path.join(RESULTS_DIR, ALL_TESTS_SUBDIR, run_id)
+
+
 def run_test(
     settings: AHCSettings,
     njobs: int,
@@ -1248,13 +3192,25 @@ def run_test(
     record: bool = True,
     memo: Optional[str] = None,
     cpu_affinity: bool = False,
+    use_cache: bool = True,
+    resume: Optional[str] = None,
 ) -> float:
+    """``resume`` に実行名を指定した場合は、その実行の残りのケースを同じ実行ファイルで実行する"""
     configure_elapsed_logging()
 
+    resume_dir = None
+    if resume is not None:
+        resume_dir = resolve_run_dir(resume)
+        if not os.path.exists(os.path.join(resume_dir, RUN_MANIFEST_FILE)):
+            logger.critical(f"Cannot resume {resume_dir}: {RUN_MANIFEST_FILE} not found.")
+            raise FileNotFoundError(os.path.join(resume_dir, RUN_MANIFEST_FILE))
+        # 実行ファイルは結果ディレクトリに複製したものを使う
+        compile = False
+
     if not cpu_affinity:
         njobs = max(1, min(njobs, multiprocessing.cpu_count() - 1))
 
-    tester = build_tester(settings, njobs, verbose, cpu_affinity=cpu_affinity)
+    tester = build_tester(settings, njobs, verbose, cpu_affinity=cpu_affinity, use_cache=use_cache)
 
     if verbose:
         _log_settings(settings, max(1, tester.cpu_count), tester.cpu_ids)
@@ -1269,7 +3225,20 @@ def run_test(
 
     start = time.time()
 
-    scores = tester.run_record(record, memo)
+    try:
+        scores = tester.run_record(record, memo, resume_dir)
+    finally:
+        if tester.solver_servers is not None:
+            tester.solver_servers.close()
+        if tester.solver_zygote is not None:
+            tester.solver_zygote.close()
+    if tester.solver_zygote is not None:
+        logger.info(f"Solver zygote: {tester.solver_zygote.fork_count} cases forked from preloaded solvers.")
+    if tester.solver_servers is not None:
+        logger.info(
+            f"Solver server: {tester.solver_servers.spawn_count} started /"
+            f" {tester.solver_servers.restart_count} restarted after timeout or crash."
+        )
 
     if settings.use_relative_score:
         _log_relative_score_summary(scores, settings.direction)
@@ -1277,14 +3246,92 @@ def run_test(
     failed_cases = [(filename, state) for filename, score, _, state, _ in scores if math.isnan(score)]
     if failed_cases:
         _log_error_table(failed_cases)
+    _log_usage_summary(tester.last_usages)
 
     score = tester.show_score([case_score for _, case_score, _, _, _ in scores])
+    if tester.result_cache is not None:
+        logger.info(f"Result cache: {tester.result_cache.hits} hits / {tester.result_cache.misses} misses.")
+    if tester.last_admission is not None:
+        logger.info(
+            f"Admission: paused {tester.last_admission['throttle_count']} times / "
+            f"{tester.last_admission['throttled_seconds']:.1f} sec."
+        )
+    if tester.last_makespan is not None:
+        predicted_seconds, actual_seconds = tester.last_makespan
+        predicted = "n/a" if predicted_seconds is None else f"{predicted_seconds:.3f} sec"
+        logger.info(f"Makespan: predicted {predicted} / actual {actual_seconds:.3f} sec.")
     logger.info(to_green(f"Finished in {time.time() - start:.4f} sec."))
     if tester.last_output_dir is not None:
         logger.info(f"Result directory: {to_bold(to_blue(tester.last_output_dir))}")
     return score
 
 
+def _measure_launch(launch: Callable[[], subprocess.Popen], repeat: int) -> float:
+    """起動から終了までの 1 回あたりの平均時間を秒で返す"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        launch().wait()
+    return (time.perf_counter() - start) / repeat
+
+
+def benchmark_launch_overhead(repeat: int, cpu_id: int) -> dict[str, float]:
+    """CPU の固定方法ごとに、何もしないソルバー 1 回あたりの起動時間を返す"""
+    command = [shutil.which("true") or "true"]
+    launchers: dict[str, Callable[[], subprocess.Popen]] = {
+        "no affinity": lambda: spawn_solver(command),
+        "native": lambda: spawn_solver(command, cpu_id),
+    }
+    if shutil.which("taskset") is not None:
+        launchers["taskset"] = lambda: subprocess.Popen(_command_with_cpu_affinity(command, cpu_id))
+    return {name: _measure_launch(launch, max(1, repeat)) for name, launch in launchers.items()}
+
+
+def run_launch_benchmark(repeat: int = 200) -> None:
+    """taskset と直接固定の起動コストを比較して表示する"""
+    configure_elapsed_logging()
+    cpu_id = get_cpu_affinity_ids(1)[0]
+    logger.info(f"--- {to_bold('[Launch benchmark]')} ---")
+    logger.info(f"solver          : true ({repeat} launches, cpu {cpu_id})")
+    results = benchmark_launch_overhead(repeat, cpu_id)
+    for name, seconds in results.items():
+        logger.info(f"{name:<16}: {seconds * MS_PER_SEC:.3f} ms / case")
+    if "taskset" in results:
+        saved = results["taskset"] - results["native"]
+        logger.info(f"saved           : {to_green(f'{saved * MS_PER_SEC:.3f} ms / case')}")
+    logger.info("----------------")
+
+
+def run_compact(compression: Optional[str] = None, jobs: Optional[int] = None) -> None:
+    """記録済みの実行の out/ err/ を圧縮する
+
+    実行中や中断した実行 (``result.csv`` がない) と、``./out`` が指す実行の out/ は圧縮しない
+    """
+    configure_elapsed_logging()
+    compression = resolve_compression(compression or default_compression())
+    assert compression is not None
+    all_tests_dir = os.path.join(RESULTS_DIR, ALL_TESTS_SUBDIR)
+    published_dir = os.path.realpath(LOCAL_OUT_DIR) if os.path.islink(os.path.normpath(LOCAL_OUT_DIR)) else None
+    directories = []
+    run_names = sorted(os.listdir(all_tests_dir)) if os.path.isdir(all_tests_dir) else []
+    for run_name in run_names:
+        run_dir = os.path.join(all_tests_dir, run_name)
+        if not os.path.exists(os.path.join(run_dir, RESULT_CSV)):
+            continue
+        directories.append(os.path.join(run_dir, ERR_SUBDIR))
+        out_dir = os.path.join(run_dir, OUT_SUBDIR)
+        if os.path.realpath(out_dir) != published_dir:
+            directories.append(out_dir)
+    summary = compact_records(directories, compression, jobs or multiprocessing.cpu_count())
+    saved_mb = (summary.original_bytes - summary.compressed_bytes) / BYTES_PER_MB
+    logger.info(
+        f"Compacted {summary.files} files in {len(run_names)} runs with {compression}:"
+        f" {summary.original_bytes / BYTES_PER_MB:.1f} MB -> {summary.compressed_bytes / BYTES_PER_MB:.1f} MB"
+        f" ({to_green(f'{saved_mb:.1f} MB saved')})."
+    )
+    if summary.failed:
+        logger.warning(f"Failed to compress {summary.failed} files.")
+
+
 def main() -> None:
     """コマンドライン引数を読み、並列テストを実行する"""
     args = ParallelTester.get_args()
@@ -0,0 +1,69 @@
+import os
+import shutil
+
+# symlink を作れない環境では hardlink で、hardlink もできないファイルだけをコピーして公開する
+PUBLISH_METHODS = ("symlink", "hardlink", "copy")
+
+
+def _remove(path: str) -> None:
+    if os.path.islink(path) or os.path.isfile(path):
+        os.remove(path)
+    elif os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _link_tree(source: str, target: str) -> str:
+    """``source`` の各ファイルを ``target`` へ hardlink し、できなかったファイルはコピーする"""
+    method = "hardlink"
+    for directory, _, filenames in os.walk(source):
+        target_directory = os.path.join(target, os.path.relpath(directory, source))
+        os.makedirs(target_directory, exist_ok=True)
+        for filename in filenames:
+            source_path = os.path.join(directory, filename)
+            target_path = os.path.join(target_directory, filename)
+            try:
+                os.link(source_path, target_path)
+            except OSError:
+                shutil.copy2(source_path, target_path)
+                method = "copy"
+    return method
+
+
+def _swap(new_path: str, destination: str) -> None:
+    """``new_path`` を ``destination`` へ移し、元の ``destination`` を消す"""
+    if not os.path.lexists(destination):
+        os.rename(new_path, destination)
+        return
+    if os.path.islink(new_path) and (os.path.islink(destination) or not os.path.isdir(destination)):
+        # symlink 同士は rename 1 回で置き換わるため、途中の状態が見えない
+        os.replace(new_path, destination)
+        return
+    # 実ディレクトリは rename で上書きできないため、退避してから入れ替えて消す
+    retired = f"{destination}.ahclib-old-{os.getpid()}"
+    _remove(retired)
+    os.rename(destination, retired)
+    os.rename(new_path, destination)
+    _remove(retired)
+
+
+def publish_directory(source: str, destination: str) -> str:
+    """``destination`` を ``source`` を指す symlink に置き換え、使った方法 (``PUBLISH_METHODS``) を返す
+
+    symlink は相対パスで作り、作業ディレクトリごと移しても指す先が変わらない
+    前の実行のファイルは残さず、``destination`` が実ディレクトリの場合も置き換える
+    """
+    destination = os.path.normpath(destination)
+    parent = os.path.dirname(os.path.abspath(destination))
+    new_path = os.path.join(parent, f".{os.path.basename(destination)}.ahclib-{os.getpid()}")
+    _remove(new_path)
+    try:
+        os.symlink(os.path.relpath(os.path.abspath(source), parent), new_path, target_is_directory=True)
+        method = "symlink"
+    except (OSError, NotImplementedError):
+        method = _link_tree(source, new_path)
+    try:
+        _swap(new_path, destination)
+    except OSError:
+        _remove(new_path)
+        raise
+    return method
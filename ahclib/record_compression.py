@@ -0,0 +1,163 @@
+import concurrent.futures
+import gzip
+import io
+import os
+import shutil
+import threading
+import zlib
+from dataclasses import dataclass
+from logging import getLogger
+from typing import IO, Iterable, Optional
+
+try:
+    import zstandard
+except ImportError:  # zstd を使わない場合は不要
+    zstandard = None  # type: ignore[assignment]
+
+logger = getLogger(__name__)
+
+# 圧縮方式と、圧縮した記録のファイル名に付ける拡張子
+RECORD_COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+COPY_CHUNK_SIZE = 1 << 20
+# 書きかけや壊れた記録を読んだときに ``read_record_text`` が送出する例外
+RECORD_READ_ERRORS: tuple[type[Exception], ...] = (OSError, EOFError, ValueError, zlib.error) + (
+    (zstandard.ZstdError,) if zstandard is not None else ()
+)
+
+
+def resolve_compression(configured: Optional[str]) -> Optional[str]:
+    """settings の ``record_compression`` を確かめ、zstandard がなければ gzip にする"""
+    if configured is None:
+        return None
+    if configured not in RECORD_COMPRESSIONS:
+        logger.warning(f"record_compression must be `gzip` or `zstd` but got {configured}; keeping records raw.")
+        return None
+    if configured == "zstd" and zstandard is None:
+        logger.warning("zstandard is not installed; compressing records with gzip.")
+        return "gzip"
+    return configured
+
+
+def default_compression() -> str:
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def _compressed_writer(path: str, compression: str) -> IO[bytes]:
+    if compression == "zstd":
+        return zstandard.ZstdCompressor().stream_writer(open(path, "wb"))
+    return gzip.open(path, "wb")
+
+
+def compress_file(source: str, destination: str, compression: str) -> str:
+    """``source`` を圧縮して ``destination`` に拡張子を付けたファイルへ書き、そのパスを返す
+
+    一時ファイルへ書いてから rename するため、途中で止まっても壊れた記録は残らない
+    """
+    target = destination + RECORD_COMPRESSIONS[compression]
+    temporary_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(source, "rb") as source_file, _compressed_writer(temporary_path, compression) as target_file:
+            shutil.copyfileobj(source_file, target_file, COPY_CHUNK_SIZE)
+        os.replace(temporary_path, target)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+    return target
+
+
+def compress_in_place(path: str, compression: str) -> int:
+    """``path`` を圧縮したファイルに置き換え、減ったバイト数を返す"""
+    original_size = os.path.getsize(path)
+    target = compress_file(path, path, compression)
+    os.remove(path)
+    return original_size - os.path.getsize(target)
+
+
+def find_record(path: str) -> Optional[str]:
+    """``path`` か、それを圧縮したファイルのうち存在するものを返す"""
+    for candidate in (path, *(path + suffix for suffix in RECORD_COMPRESSIONS.values())):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def open_record(path: str) -> IO[bytes]:
+    """拡張子に合わせて展開しながら読むファイルを開く"""
+    if path.endswith(RECORD_COMPRESSIONS["gzip"]):
+        return gzip.open(path, "rb")
+    if path.endswith(RECORD_COMPRESSIONS["zstd"]):
+        if zstandard is None:
+            raise OSError(f"zstandard is required to read {path}")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+    return open(path, "rb")
+
+
+def read_record_text(path: str) -> str:
+    """記録をテキストとして読み、``open(path, "r", errors="ignore")`` と同じ文字列を返す"""
+    with io.TextIOWrapper(open_record(path), encoding="utf-8", errors="ignore") as text_file:
+        return text_file.read()
+
+
+class RecordCompressor:
+    """記録し終えたケースの err/ をバックグラウンドのスレッドで圧縮する"""
+
+    def __init__(self, compression: str) -> None:
+        self.compression = compression
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="ahclib-compress")
+
+    def submit(self, path: str) -> None:
+        self._executor.submit(self._compress, path)
+
+    def _compress(self, path: str) -> None:
+        if not os.path.isfile(path):
+            return
+        try:
+            compress_in_place(path, self.compression)
+        except OSError as error:
+            logger.warning(f"Failed to compress {path}: {error}")
+
+    def close(self) -> None:
+        """残りの圧縮を待つ"""
+        self._executor.shutdown(wait=True)
+
+
+@dataclass
+class CompactSummary:
+    """``compact_records`` で圧縮したファイル数と、圧縮前後のバイト数"""
+
+    files: int = 0
+    original_bytes: int = 0
+    compressed_bytes: int = 0
+    failed: int = 0
+
+
+def compact_records(directories: Iterable[str], compression: str, jobs: int) -> CompactSummary:
+    """``directories`` 直下の未圧縮のファイルを ``jobs`` 並列で圧縮する"""
+    paths = [
+        os.path.join(directory, filename)
+        for directory in directories
+        if os.path.isdir(directory)
+        for filename in sorted(os.listdir(directory))
+        if not filename.endswith((*RECORD_COMPRESSIONS.values(), ".tmp"))
+        and os.path.isfile(os.path.join(directory, filename))
+    ]
+    summary = CompactSummary()
+
+    def compress(path: str) -> tuple[int, int]:
+        original_size = os.path.getsize(path)
+        return original_size, original_size - compress_in_place(path, compression)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = {executor.submit(compress, path): path for path in paths}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                original_size, compressed_size = future.result()
+            except OSError as error:
+                logger.warning(f"Failed to compress {futures[future]}: {error}")
+                summary.failed += 1
+                continue
+            summary.files += 1
+            summary.original_bytes += original_size
+            summary.compressed_bytes += compressed_size
+    return summary
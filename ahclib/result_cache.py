@@ -0,0 +1,224 @@
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from logging import getLogger
+from typing import Any, Optional, Sequence, Union
+
+from .solver_engine import NO_LIMITS, SolverLimits
+
+logger = getLogger(__name__)
+
+# キーの作り方や保存形式を変えたら上げて、古いエントリを使わないようにする
+CACHE_FORMAT_VERSION = 1
+HASH_CHUNK_SIZE = 1 << 20
+
+META_SUFFIX = ".json"
+OUT_SUFFIX = ".out"
+ERR_SUFFIX = ".err"
+
+# INNER_ERROR は ahclib 側の失敗なので保存しない
+CACHEABLE_STATES = ("AC", "TLE", "MLE", "ERROR")
+
+CachedSolverResult = tuple[str, Union[int, float], str, str, float]
+
+
+def _atomic_write(path: str, write: Any) -> None:
+    """一時ファイルへ書き込んでから置き換え、読み手に書きかけのファイルを見せない"""
+    directory = os.path.dirname(path)
+    fd, temporary_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as temporary_file:
+            write(temporary_file)
+        os.replace(temporary_path, path)
+    except BaseException:
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
+        raise
+
+
+class ResultCache:
+    """実行ファイル・引数・入力・制限時間が同じケースの結果を再利用するキャッシュ
+
+    エントリは ``<directory>/<key の先頭 2 文字>/<key>.json`` に保存し、
+    記録付きで実行した場合は ``.out`` ``.err`` に出力も残す
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._digests: dict[tuple[str, int, int], str] = {}
+
+    def _file_digest(self, path: str) -> str:
+        """ファイル内容の sha256 を返し、更新時刻とサイズが同じ間は再計算しない"""
+        stat = os.stat(path)
+        memo_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            digest = self._digests.get(memo_key)
+        if digest is not None:
+            return digest
+        hasher = hashlib.sha256()
+        with open(path, "rb") as source:
+            while chunk := source.read(HASH_CHUNK_SIZE):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+        with self._lock:
+            self._digests[memo_key] = digest
+        return digest
+
+    def _command_digests(self, command: list[str]) -> list[Optional[str]]:
+        """実行ファイルやスクリプトなど、コマンド中のファイルの内容を hash する"""
+        digests: list[Optional[str]] = []
+        for index, argument in enumerate(command):
+            path = shutil.which(argument) if index == 0 else None
+            if path is None and os.path.isfile(argument):
+                path = argument
+            digests.append(None if path is None else self._file_digest(path))
+        return digests
+
+    def key(
+        self,
+        command: list[str],
+        input_file: str,
+        timeout: Optional[float],
+        is_int: bool,
+        limits: SolverLimits = NO_LIMITS,
+        auxiliary_commands: Sequence[list[str]] = (),
+    ) -> str:
+        """ケースを識別するキーを返す
+
+        ``auxiliary_commands`` にはジャッジや採点プログラムなど、結果に影響するコマンドを渡す
+        """
+        material = {
+            "version": CACHE_FORMAT_VERSION,
+            "command": command,
+            "command_files": self._command_digests(command),
+            "input": self._file_digest(input_file),
+            "timeout": timeout,
+            "is_int": is_int,
+            "limits": dataclasses.asdict(limits),
+        }
+        if auxiliary_commands:
+            material["auxiliary_commands"] = list(auxiliary_commands)
+            material["auxiliary_command_files"] = [self._command_digests(command) for command in auxiliary_commands]
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key[:2], key + suffix)
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def load(
+        self,
+        key: str,
+        record_paths: Optional[tuple[str, str]] = None,
+    ) -> Optional[CachedSolverResult]:
+        """保存済みの結果を返し、なければ ``None`` を返す
+
+        ``record_paths`` を渡した場合は保存済みの出力をそこへコピーし、
+        出力を保存していないエントリは見つからなかったものとして扱う
+        """
+        meta_path = self._entry_path(key, META_SUFFIX)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as meta_file:
+                entry = json.load(meta_file)
+            if record_paths is not None:
+                if not entry["has_outputs"]:
+                    self._count(False)
+                    return None
+                shutil.copyfile(self._entry_path(key, OUT_SUFFIX), record_paths[0])
+                shutil.copyfile(self._entry_path(key, ERR_SUFFIX), record_paths[1])
+            # 更新時刻を最終利用時刻として容量超過時の削除順に使う
+            os.utime(meta_path)
+            result = (entry["state"], entry["score"], "", "", entry["elapsed"])
+        except (OSError, ValueError, KeyError):
+            self._count(False)
+            return None
+        self._count(True)
+        return result
+
+    def store(
+        self,
+        key: str,
+        result: CachedSolverResult,
+        record_paths: Optional[tuple[str, str]] = None,
+    ) -> None:
+        """実行結果を保存し、``record_paths`` を渡した場合は出力も保存する"""
+        state, score, _, _, elapsed = result
+        if state not in CACHEABLE_STATES:
+            return
+        os.makedirs(os.path.dirname(self._entry_path(key, META_SUFFIX)), exist_ok=True)
+        try:
+            if record_paths is not None:
+                for source_path, suffix in ((record_paths[0], OUT_SUFFIX), (record_paths[1], ERR_SUFFIX)):
+                    with open(source_path, "rb") as source:
+                        _atomic_write(self._entry_path(key, suffix), lambda target: shutil.copyfileobj(source, target))
+            entry = {
+                "state": state,
+                "score": score,
+                "elapsed": elapsed,
+                "has_outputs": record_paths is not None,
+            }
+            # 出力を先に置き、メタデータを最後に置き換えて不完全なエントリを読ませない
+            data = json.dumps(entry).encode("utf-8")
+            _atomic_write(self._entry_path(key, META_SUFFIX), lambda target: target.write(data))
+        except OSError as error:
+            logger.warning(f"Failed to store result cache entry {key}: {error}")
+
+    def evict(self) -> int:
+        """合計サイズが上限を超えていれば最終利用の古いエントリから削除し、削除件数を返す"""
+        entries: dict[str, list[Any]] = {}
+        total_bytes = 0
+        try:
+            shard_names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return 0
+        for shard_name in shard_names:
+            shard_path = os.path.join(self.directory, shard_name)
+            if not os.path.isdir(shard_path):
+                continue
+            with os.scandir(shard_path) as scanner:
+                for dir_entry in scanner:
+                    if dir_entry.name.startswith(".tmp-"):
+                        continue
+                    key, suffix = os.path.splitext(dir_entry.name)
+                    try:
+                        stat = dir_entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    total_bytes += stat.st_size
+                    # [最終利用時刻, 合計サイズ, パス一覧]
+                    entry = entries.setdefault(key, [0.0, 0, []])
+                    if suffix == META_SUFFIX:
+                        entry[0] = stat.st_mtime
+                    entry[1] += stat.st_size
+                    entry[2].append(dir_entry.path)
+        if total_bytes <= self.max_bytes:
+            return 0
+
+        removed_count = 0
+        for _, size, paths in sorted(entries.values(), key=lambda entry: entry[0]):
+            if total_bytes <= self.max_bytes:
+                break
+            for path in paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total_bytes -= size
+            removed_count += 1
+        logger.info(f"Evicted {removed_count} result cache entries (limit: {self.max_bytes} bytes).")
+        return removed_count
@@ -0,0 +1,168 @@
+import json
+import os
+import shutil
+import threading
+from dataclasses import asdict
+from logging import getLogger
+from typing import Any, Optional
+
+from .solver_engine import SolverUsage
+
+logger = getLogger(__name__)
+
+JOURNAL_FILE = "journal.jsonl"
+RUN_MANIFEST_FILE = "run.json"
+# 再開時に同じ実行ファイルで動かすため、コマンド中のファイルを複製する場所
+SNAPSHOT_SUBDIR = "bin"
+# journal を fsync する間隔で、この秒数が経つかこの行数が溜まったらまとめて fsync する
+JOURNAL_SYNC_INTERVAL_SEC = 1.0
+JOURNAL_SYNC_LINES = 64
+
+# (filename, score, relative_score, state, time) で、parallel_tester の ``CaseResult`` と同じ
+JournalResult = tuple[str, Any, float, str, str]
+
+
+class CaseJournal:
+    """終わったケースの結果を 1 行ずつ追記し、中断しても終わったケースを失わない
+
+    1 行を 1 回の ``write`` で ``O_APPEND`` のファイルへ書くため、ahclib が落ちても書いた行は残る
+    OS ごと落ちた場合に備えた ``fsync`` はバックグラウンドのスレッドが ``sync_interval`` 秒ごとか
+    ``sync_lines`` 行ごとにまとめて行い、ケースの実行はディスクを待たない
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sync_interval: float = JOURNAL_SYNC_INTERVAL_SEC,
+        sync_lines: int = JOURNAL_SYNC_LINES,
+    ) -> None:
+        self.path = path
+        self.sync_interval = sync_interval
+        self.sync_lines = sync_lines
+        self.sync_count = 0
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._unsynced_lines = 0
+        self._closing = False
+        self._fd: Optional[int] = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        # 中断で書きかけになった最後の行を閉じ、次の結果がその行に続かないようにする
+        if os.path.getsize(path) > 0:
+            with open(path, "rb") as journal_file:
+                journal_file.seek(-1, os.SEEK_END)
+                if journal_file.read(1) != b"\n":
+                    os.write(self._fd, b"\n")
+        self._thread = threading.Thread(target=self._sync_loop, daemon=True)
+        self._thread.start()
+
+    def append(self, case_result: JournalResult, usage: Optional[SolverUsage] = None) -> None:
+        filename, score, relative_score, state, elapsed = case_result
+        entry = {
+            "filename": filename,
+            "score": score,
+            "relative_score": relative_score,
+            "state": state,
+            "time": elapsed,
+            "usage": None if usage is None else asdict(usage),
+        }
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+        with self._lock:
+            if self._fd is None:
+                return
+            os.write(self._fd, line)
+            self._unsynced_lines += 1
+            if self._unsynced_lines >= self.sync_lines:
+                self._changed.notify()
+
+    def _sync_loop(self) -> None:
+        while True:
+            with self._lock:
+                self._changed.wait_for(
+                    lambda: self._closing or self._unsynced_lines >= self.sync_lines, self.sync_interval
+                )
+                if self._closing:
+                    return
+                if self._unsynced_lines == 0:
+                    continue
+                self._unsynced_lines = 0
+                fd = self._fd
+            # close はこのスレッドを待ってから fd を閉じるため、lock の外で追記と並べて fsync できる
+            assert fd is not None
+            try:
+                os.fsync(fd)
+            except OSError as error:
+                logger.warning(f"Failed to fsync {self.path}: {error}")
+                continue
+            self.sync_count += 1
+
+    def close(self) -> None:
+        """バックグラウンドの ``fsync`` を止め、残りの行を ``fsync`` してから閉じる"""
+        with self._lock:
+            self._closing = True
+            self._changed.notify()
+        self._thread.join()
+        with self._lock:
+            if self._fd is not None:
+                if self._unsynced_lines > 0:
+                    os.fsync(self._fd)
+                    self.sync_count += 1
+                    self._unsynced_lines = 0
+                os.close(self._fd)
+                self._fd = None
+
+
+def read_journal(path: str) -> dict[str, tuple[JournalResult, Optional[SolverUsage]]]:
+    """ファイル名ごとの最後の結果を返し、書きかけの行は読み飛ばす"""
+    entries: dict[str, tuple[JournalResult, Optional[SolverUsage]]] = {}
+    if not os.path.exists(path):
+        return entries
+    with open(path, "r", encoding="utf-8") as journal_file:
+        for line in journal_file:
+            try:
+                entry = json.loads(line)
+                case_result = (
+                    entry["filename"],
+                    entry["score"],
+                    entry["relative_score"],
+                    entry["state"],
+                    entry["time"],
+                )
+                usage = None if entry.get("usage") is None else SolverUsage(**entry["usage"])
+            except (ValueError, KeyError, TypeError):
+                logger.warning(f"Skipped a broken journal line in {path}.")
+                continue
+            entries[case_result[0]] = (case_result, usage)
+    return entries
+
+
+def snapshot_command(command: list[str], output_dir: str) -> list[str]:
+    """コマンド中のファイルを ``output_dir/bin/`` へ複製し、複製を指すコマンドを返す
+
+    ``PATH`` から探すコマンド (``python3`` など) は複製しない
+    """
+    snapshot_dir = os.path.join(output_dir, SNAPSHOT_SUBDIR)
+    snapshot: list[str] = []
+    for argument in command:
+        if not os.path.isfile(argument):
+            snapshot.append(argument)
+            continue
+        os.makedirs(snapshot_dir, exist_ok=True)
+        destination = os.path.join(snapshot_dir, os.path.basename(argument))
+        try:
+            shutil.copy2(argument, destination)
+        except OSError as error:
+            logger.warning(f"Failed to snapshot {argument}: {error}")
+            snapshot.append(argument)
+            continue
+        snapshot.append(destination)
+    return snapshot
+
+
+def write_run_manifest(output_dir: str, manifest: dict[str, Any]) -> None:
+    with open(os.path.join(output_dir, RUN_MANIFEST_FILE), "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+
+
+def read_run_manifest(output_dir: str) -> dict[str, Any]:
+    """再開に必要な実行時の情報を読み、この機能より前の実行なら ``FileNotFoundError``"""
+    with open(os.path.join(output_dir, RUN_MANIFEST_FILE), "r", encoding="utf-8") as manifest_file:
+        return json.load(manifest_file)
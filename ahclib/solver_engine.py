@@ -0,0 +1,730 @@
+import collections
+import contextlib
+import errno
+import inspect
+import math
+import os
+import selectors
+import signal
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import IO, Any, Callable, ContextManager, Iterable, Iterator, Optional, Union
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+# 1 回の read / write で扱う最大バイト数
+IO_CHUNK_SIZE = 1 << 16
+# pidfd が使えない環境で、出力の終了後に子プロセスの終了を確認する間隔
+EXIT_POLL_SEC = 0.01
+# 別の Optuna session が CPU lock を保持している間に再取得を試みる間隔
+LOCK_RETRY_SEC = 0.01
+# 制限時間を超えたソルバーへ SIGTERM を送ってから SIGKILL を送るまでの猶予時間
+TERMINATE_GRACE_SEC = 0.5
+# メモリ制限の何倍で子プロセスのアドレス空間を打ち切るか
+# 制限を少し超えたケースは最後まで動かしてピークメモリを測り、暴走したケースだけを止める
+MEMORY_GUARD_RATIO = 2
+# CPU 時間の制限を超えたソルバーへ SIGXCPU を送ってから SIGKILL を送るまでの猶予 CPU 秒数
+CPU_LIMIT_GRACE_SEC = 1
+# マルチスレッドのソルバーが使うスレッド数を伝える環境変数
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+# ソルバーを固定する logical CPU で、tuple の場合はそのすべてを使える CPU グループ
+CpuTarget = Union[int, tuple[int, ...]]
+
+# 主な処理は外部ソルバーの待機なので、ケースごとのスレッドを持たずに
+# 1 スレッドの selectors ループで全ソルバーのパイプと終了を監視する
+
+
+@dataclass(frozen=True)
+class SolverLimits:
+    """子プロセスに課す資源の制限で、``None`` の項目は制限しない"""
+
+    # バイト単位のメモリ制限
+    memory_bytes: Optional[int] = None
+    # 秒単位の CPU 時間の制限
+    cpu_seconds: Optional[float] = None
+    # ソルバーが使うスレッド数で、指定すると ``THREAD_ENV_VARS`` に設定する
+    threads: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        """``preexec_fn`` で設定する制限があるか"""
+        return self.memory_bytes is not None or self.cpu_seconds is not None
+
+
+NO_LIMITS = SolverLimits()
+
+
+@dataclass
+class SolverJob:
+    """1 ケース分の実行内容で、``key`` は呼び出し側がケースを識別する値"""
+
+    key: Any
+    command: list[str]
+    input_file: str
+    timeout: Optional[float]
+    cpu_id: Optional[CpuTarget] = None
+    cpu_lock: Optional[ContextManager[Any]] = None
+    capture_stdout: bool = True
+    # 指定した場合は出力をパイプで受け取らず、ソルバーが直接このファイルへ書き込む
+    stdout_path: Optional[str] = None
+    stderr_path: Optional[str] = None
+    # 指定した場合は stderr を保持せず、読み取ったチャンクを順に渡す
+    stderr_sink: Optional[Callable[[bytes], None]] = None
+    # work stealing で移すジョブを選ぶための予想実行時間
+    expected_seconds: Optional[float] = None
+    limits: SolverLimits = NO_LIMITS
+
+
+@dataclass(frozen=True)
+class SolverUsage:
+    """``wait4`` で回収したソルバー 1 回分の資源使用量"""
+
+    user_seconds: float
+    system_seconds: float
+    # Linux の ru_maxrss は KiB 単位
+    max_rss_kb: int
+    voluntary_switches: int
+    involuntary_switches: int
+
+    @property
+    def cpu_seconds(self) -> float:
+        return self.user_seconds + self.system_seconds
+
+    @classmethod
+    def from_rusage(cls, rusage: Any) -> "SolverUsage":
+        return cls(
+            user_seconds=rusage.ru_utime,
+            system_seconds=rusage.ru_stime,
+            max_rss_kb=rusage.ru_maxrss,
+            voluntary_switches=rusage.ru_nvcsw,
+            involuntary_switches=rusage.ru_nivcsw,
+        )
+
+
+@dataclass(frozen=True)
+class SolverOutcome:
+    """ソルバー 1 回分の終了コード、出力、経過時間
+
+    ``error`` は入力の読み込みや起動に失敗した場合だけ設定する
+    """
+
+    returncode: Optional[int]
+    timed_out: bool
+    stdout: bytes
+    stderr: bytes
+    elapsed: float
+    error: Optional[BaseException] = None
+    usage: Optional[SolverUsage] = None
+
+
+@dataclass
+class _RunningSolver:
+    job: SolverJob
+    process: subprocess.Popen
+    started_at: float
+    deadline: Optional[float]
+    pending_input: memoryview
+    lock_acquired: bool
+    pidfd: Optional[int] = None
+    exited_at: Optional[float] = None
+    kill_at: Optional[float] = None
+    timed_out: bool = False
+    open_streams: int = 0
+    stdout_chunks: list[bytes] = field(default_factory=list)
+    stderr_chunks: list[bytes] = field(default_factory=list)
+
+    @property
+    def finished(self) -> bool:
+        return self.exited_at is not None and self.open_streams == 0
+
+
+def cpu_set(cpu_id: CpuTarget) -> set[int]:
+    return set(cpu_id) if isinstance(cpu_id, tuple) else {cpu_id}
+
+
+def format_cpu_target(cpu_id: CpuTarget) -> str:
+    """ログ用の表記で、CPU グループは ``+`` でつなぐ"""
+    return "+".join(map(str, cpu_id)) if isinstance(cpu_id, tuple) else str(cpu_id)
+
+
+def thread_environment(threads: int, env: Optional[dict[str, str]] = None) -> dict[str, str]:
+    """``env`` (省略時は現在の環境変数) のスレッド数の変数を ``threads`` にした環境を返す"""
+    environment = dict(os.environ if env is None else env)
+    environment.update({name: str(threads) for name in THREAD_ENV_VARS})
+    return environment
+
+
+@contextlib.contextmanager
+def _pinned_calling_thread(cpu_id: Optional[CpuTarget]) -> Iterator[None]:
+    """呼び出しスレッドだけを一時的に ``cpu_id`` (グループならその全 CPU) へ固定する
+
+    Linux の affinity はスレッド単位で、fork / vfork した子プロセスへ継承される
+    """
+    if cpu_id is None:
+        yield
+        return
+    original_cpu_ids = os.sched_getaffinity(0)
+    os.sched_setaffinity(0, cpu_set(cpu_id))
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, original_cpu_ids)
+
+
+# Popen を継承して置き換える CPython の非公開メソッドと、その引数名
+# Python の更新で引数が変わった場合は置き換えず、wait4 での回収と zygote を使わない
+_POPEN_HOOK_PARAMETERS = {
+    "_try_wait": ("self", "wait_flags"),
+    "_internal_poll": ("self", "_deadstate", "_waitpid", "_WNOHANG", "_ECHILD"),
+    "_close_pipe_fds": ("self", "p2cread", "p2cwrite", "c2pread", "c2pwrite", "errread", "errwrite"),
+    # restore_signals 以降は版ごとに増えるため、fd までを比べる
+    "_execute_child": (
+        "self",
+        "args",
+        "executable",
+        "preexec_fn",
+        "close_fds",
+        "pass_fds",
+        "cwd",
+        "env",
+        "startupinfo",
+        "creationflags",
+        "shell",
+        "p2cread",
+        "p2cwrite",
+        "c2pread",
+        "c2pwrite",
+        "errread",
+        "errwrite",
+    ),
+}
+
+
+def popen_hooks_supported(*names: str) -> bool:
+    """``subprocess.Popen`` の非公開メソッド ``names`` が、置き換えを前提とした引数のままか"""
+    for name in names:
+        method = getattr(subprocess.Popen, name, None)
+        if method is None:
+            return False
+        try:
+            parameters = tuple(inspect.signature(method).parameters)
+        except (TypeError, ValueError):
+            return False
+        expected = _POPEN_HOOK_PARAMETERS[name]
+        if name == "_execute_child":
+            parameters = parameters[: len(expected)]
+        if parameters != expected:
+            return False
+    return True
+
+
+class _AccountedPopen(subprocess.Popen):
+    """終了したソルバーを ``wait4`` で回収し、資源使用量を ``usage`` に残す Popen
+
+    Popen の回収は ``_try_wait`` と ``_internal_poll`` の waitpid だけで行われるため、
+    その 2 か所を wait4 に置き換え、Python の更新で引数が変わった場合は使わない (``popen_hooks_supported``)
+    """
+
+    usage: Optional[SolverUsage] = None
+
+    def _wait4(self, pid: int, options: int) -> tuple[int, int]:
+        reaped_pid, status, rusage = os.wait4(pid, options)
+        if reaped_pid == pid:
+            self.usage = SolverUsage.from_rusage(rusage)
+        return reaped_pid, status
+
+    def _try_wait(self, wait_flags: int) -> tuple[int, int]:
+        try:
+            return self._wait4(self.pid, wait_flags)
+        except ChildProcessError:
+            # SIGCHLD を無視している場合などは、終了状態も資源使用量も取得できない
+            return self.pid, 0
+
+    def _internal_poll(
+        self,
+        _deadstate: Optional[int] = None,
+        _waitpid: Any = None,
+        _WNOHANG: int = getattr(os, "WNOHANG", 1),
+        _ECHILD: int = errno.ECHILD,
+    ) -> Optional[int]:
+        return super()._internal_poll(_deadstate, self._wait4, _WNOHANG, _ECHILD)
+
+
+# wait4 で回収して資源使用量を取れるか
+ACCOUNTED_POPEN_SUPPORTED = hasattr(os, "wait4") and popen_hooks_supported("_try_wait", "_internal_poll")
+
+
+def solver_rlimits(limits: SolverLimits) -> dict[str, tuple[int, int]]:
+    """``limits`` を子プロセスに設定する rlimit の名前と (soft, hard) にする
+
+    RLIMIT_CPU は秒単位なので切り上げ、超過の判定は回収後の CPU 時間で行う
+    """
+    rlimits: dict[str, tuple[int, int]] = {}
+    if limits.memory_bytes is not None:
+        address_space = limits.memory_bytes * MEMORY_GUARD_RATIO
+        rlimits["RLIMIT_AS"] = (address_space, address_space)
+    if limits.cpu_seconds is not None:
+        cpu_seconds = max(1, math.ceil(limits.cpu_seconds))
+        rlimits["RLIMIT_CPU"] = (cpu_seconds, cpu_seconds + CPU_LIMIT_GRACE_SEC)
+    return rlimits
+
+
+def _resource_limiter(limits: SolverLimits) -> Callable[[], None]:
+    """子プロセスで ``limits`` を rlimit として設定する preexec_fn を返す"""
+    rlimits = [(getattr(resource, name), values) for name, values in solver_rlimits(limits).items()]
+
+    def set_resource_limits() -> None:
+        for limit, values in rlimits:
+            resource.setrlimit(limit, values)
+
+    return set_resource_limits
+
+
+# ``spawn_solver`` が通常の起動の前に試す起動方法で、``None`` を返したコマンドは通常どおり起動する
+SolverLauncher = Callable[[list[str], Optional[CpuTarget], SolverLimits, dict[str, Any]], Optional[subprocess.Popen]]
+_solver_launchers: list[SolverLauncher] = []
+_solver_launchers_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def solver_launcher(launcher: Optional[SolverLauncher]) -> Iterator[None]:
+    """with の間だけ ``launcher`` を ``spawn_solver`` が試す起動方法に加える
+
+    同じ launcher を複数の実行が同時に使う場合は、全ての with を抜けるまで外さない
+    """
+    if launcher is None:
+        yield
+        return
+    with _solver_launchers_lock:
+        _solver_launchers.append(launcher)
+    try:
+        yield
+    finally:
+        with _solver_launchers_lock:
+            _solver_launchers.remove(launcher)
+
+
+def spawn_solver(
+    command: list[str],
+    cpu_id: Optional[CpuTarget] = None,
+    limits: SolverLimits = NO_LIMITS,
+    **popen_kwargs: Any,
+) -> subprocess.Popen:
+    """ソルバーを起動し、``cpu_id`` が指定されていればその CPU (グループ) へ固定する
+
+    taskset を挟むと exec が 1 回増え、計測時間に taskset の起動も含まれる
+    preexec_fn は subprocess の vfork 経路を無効にするため、起動する間だけ
+    呼び出しスレッドの affinity を変えて子プロセスへ継承させる
+    ``limits`` を指定した場合だけ、子プロセスで RLIMIT_AS と RLIMIT_CPU を設定する
+    RLIMIT_AS はメモリ制限の ``MEMORY_GUARD_RATIO`` 倍にする
+    ``limits.threads`` を指定した場合は ``THREAD_ENV_VARS`` をそのスレッド数にする
+    wait4 がある環境では、終了後に ``solver_usage`` で資源使用量を取得できる
+    ``solver_launcher`` の with の中であれば、その起動方法を先に試す
+    """
+    popen_class = _AccountedPopen if ACCOUNTED_POPEN_SUPPORTED else subprocess.Popen
+    if limits.threads is not None:
+        popen_kwargs["env"] = thread_environment(limits.threads, popen_kwargs.get("env"))
+    with _pinned_calling_thread(cpu_id):
+        with _solver_launchers_lock:
+            launchers = list(dict.fromkeys(_solver_launchers))
+        for launcher in launchers:
+            process = launcher(command, cpu_id, limits, dict(popen_kwargs))
+            if process is not None:
+                return process
+        if limits.enabled and resource is not None:
+            popen_kwargs["preexec_fn"] = _resource_limiter(limits)
+        return popen_class(command, **popen_kwargs)
+
+
+def cpu_limit_supported() -> bool:
+    """RLIMIT_CPU の設定と、回収時の CPU 時間の取得ができるか"""
+    return resource is not None and ACCOUNTED_POPEN_SUPPORTED
+
+
+def solver_usage(process: subprocess.Popen) -> Optional[SolverUsage]:
+    """``spawn_solver`` で起動して回収済みのソルバーの資源使用量を返し、取得できなければ ``None``"""
+    return getattr(process, "usage", None)
+
+
+def _signal_process_group(process: subprocess.Popen, signal_number: int) -> None:
+    try:
+        os.killpg(process.pid, signal_number)
+    except OSError:
+        pass
+
+
+def _release_lock(lock: Optional[ContextManager[Any]]) -> None:
+    if lock is None:
+        return
+    try:
+        lock.release()
+    except (RuntimeError, ValueError):
+        pass
+
+
+class EventSolverEngine:
+    """1 つの selectors ループで複数ソルバーの入出力、制限時間、中止を扱う
+
+    ``cpu_id`` が同じジョブは投入順に 1 つずつ、``cpu_id`` が ``None`` の
+    ジョブは ``max_running`` 件まで同時に実行する
+    """
+
+    def __init__(self, max_running: int) -> None:
+        if os.name != "posix":
+            raise RuntimeError("event engine は Linux 環境でのみ利用できます")
+        self.max_running = max(1, max_running)
+        self._cancelled = threading.Event()
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_read, False)
+        os.set_blocking(self._wakeup_write, False)
+
+    def close(self) -> None:
+        for fd in (self._wakeup_read, self._wakeup_write):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def cancel(self) -> None:
+        """別スレッドから待機中のループを起こし、全ソルバーを終了させる"""
+        self._cancelled.set()
+        try:
+            os.write(self._wakeup_write, b"\0")
+        except OSError:
+            pass
+
+    def run(
+        self,
+        jobs: Iterable[SolverJob],
+        on_finish: Callable[[SolverJob, SolverOutcome], None],
+        cancel_event: Optional[threading.Event] = None,
+        work_stealing: bool = False,
+    ) -> bool:
+        """全ジョブを実行し、途中で中止した場合は ``False`` を返す
+
+        ``on_finish`` はループのスレッドで呼ばれる
+        その中で ``cancel_event`` を設定すると、次のジョブを起動せずに
+        実行中のソルバーをすぐに終了する
+        ``work_stealing`` なら、空いた CPU の lane が予想残り時間の最も長い lane の末尾からジョブを移す
+        """
+        lanes: dict[Optional[CpuTarget], collections.deque[SolverJob]] = {}
+        lane_locks: dict[CpuTarget, Optional[ContextManager[Any]]] = {}
+        for job in jobs:
+            lanes.setdefault(job.cpu_id, collections.deque()).append(job)
+            if job.cpu_id is not None:
+                lane_locks[job.cpu_id] = job.cpu_lock
+
+        selector = selectors.DefaultSelector()
+        selector.register(self._wakeup_read, selectors.EVENT_READ, None)
+        running: dict[int, _RunningSolver] = {}
+        busy_lanes: collections.Counter[Optional[CpuTarget]] = collections.Counter()
+
+        def is_cancelled() -> bool:
+            return self._cancelled.is_set() or (cancel_event is not None and cancel_event.is_set())
+
+        try:
+            while not is_cancelled():
+                if work_stealing:
+                    self._steal(lanes, busy_lanes, lane_locks)
+                waiting_for_lock = self._dispatch(lanes, running, busy_lanes, selector, on_finish)
+                if is_cancelled():
+                    break
+                if not running and not waiting_for_lock:
+                    return True
+
+                for key, _events in selector.select(self._select_timeout(running, waiting_for_lock)):
+                    if key.data is None:
+                        self._drain_wakeup()
+                        continue
+                    solver, stream_name = key.data
+                    if stream_name == "exit":
+                        self._reap(solver, selector)
+                    elif stream_name == "stdin":
+                        self._write_input(solver, selector)
+                    else:
+                        self._read_output(solver, selector, key.fileobj, stream_name)
+
+                now = time.perf_counter()
+                for solver in list(running.values()):
+                    if solver.exited_at is None and solver.pidfd is None and solver.open_streams == 0:
+                        if solver.process.poll() is not None:
+                            solver.exited_at = now
+                    self._enforce_deadline(solver, now)
+                    if solver.finished:
+                        self._finish(solver, running, busy_lanes, selector, on_finish)
+                        if is_cancelled():
+                            break
+            return False
+        finally:
+            for solver in running.values():
+                self._kill(solver, selector)
+            selector.close()
+
+    def _drain_wakeup(self) -> None:
+        try:
+            while os.read(self._wakeup_read, IO_CHUNK_SIZE):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _select_timeout(self, running: dict[int, _RunningSolver], waiting_for_lock: bool) -> Optional[float]:
+        """次に制限時間や終了確認が必要になるまでの秒数を返す"""
+        now = time.perf_counter()
+        wake_times = []
+        for solver in running.values():
+            if solver.deadline is not None:
+                wake_times.append(solver.deadline - now)
+            if solver.kill_at is not None:
+                wake_times.append(solver.kill_at - now)
+            if solver.exited_at is None and solver.pidfd is None and solver.open_streams == 0:
+                wake_times.append(EXIT_POLL_SEC)
+        if waiting_for_lock:
+            wake_times.append(LOCK_RETRY_SEC)
+        if not wake_times:
+            return None
+        return max(0.0, min(wake_times))
+
+    @staticmethod
+    def _steal(
+        lanes: dict[Optional[CpuTarget], collections.deque[SolverJob]],
+        busy_lanes: collections.Counter[Optional[CpuTarget]],
+        lane_locks: dict[CpuTarget, Optional[ContextManager[Any]]],
+    ) -> None:
+        """空いている CPU の lane へ、予想残り時間の最も長い lane の末尾のジョブを移す"""
+
+        def remaining_seconds(queue: collections.deque[SolverJob]) -> float:
+            return sum(1.0 if job.expected_seconds is None else job.expected_seconds for job in queue)
+
+        for lane_id, queue in lanes.items():
+            if lane_id is None or queue or busy_lanes[lane_id] > 0:
+                continue
+            # 自分で次のジョブを起動できる lane からは、残り 1 件を奪わない
+            victim_queues = [
+                other
+                for other_id, other in lanes.items()
+                if other_id is not None and len(other) > (0 if busy_lanes[other_id] > 0 else 1)
+            ]
+            if not victim_queues:
+                return
+            victim = max(victim_queues, key=remaining_seconds)
+            # 先頭は元の lane が次に起動するため、末尾の短いジョブを移す
+            queue.append(replace(victim.pop(), cpu_id=lane_id, cpu_lock=lane_locks[lane_id]))
+
+    def _dispatch(
+        self,
+        lanes: dict[Optional[CpuTarget], collections.deque[SolverJob]],
+        running: dict[int, _RunningSolver],
+        busy_lanes: collections.Counter[Optional[CpuTarget]],
+        selector: selectors.BaseSelector,
+        on_finish: Callable[[SolverJob, SolverOutcome], None],
+    ) -> bool:
+        """空いている lane へジョブを起動し、CPU lock 待ちが残れば ``True`` を返す"""
+        waiting_for_lock = False
+        for lane_id, queue in lanes.items():
+            while queue and len(running) < self.max_running:
+                if lane_id is not None and busy_lanes[lane_id] > 0:
+                    break
+                job = queue[0]
+                lock_acquired = False
+                if job.cpu_lock is not None:
+                    # ループを止めないよう、取得できなければ次の周回で再試行する
+                    lock_acquired = bool(job.cpu_lock.acquire(False))
+                    if not lock_acquired:
+                        waiting_for_lock = True
+                        break
+                queue.popleft()
+                try:
+                    solver = self._start(job, lock_acquired, selector)
+                except Exception as error:
+                    if lock_acquired:
+                        _release_lock(job.cpu_lock)
+                    on_finish(job, SolverOutcome(None, False, b"", b"", -1.0, error=error))
+                    continue
+                running[solver.process.pid] = solver
+                busy_lanes[lane_id] += 1
+        return waiting_for_lock
+
+    def _start(
+        self,
+        job: SolverJob,
+        lock_acquired: bool,
+        selector: selectors.BaseSelector,
+    ) -> _RunningSolver:
+        # thread engine と同じく text として読み、改行の扱いを揃える
+        with open(job.input_file, "r", encoding="utf-8") as input_stream:
+            input_data = input_stream.read().encode("utf-8")
+        with contextlib.ExitStack() as stack:
+            # 子プロセスが fd を複製するため、親側のファイルは起動後すぐに閉じる
+            stdout_target: Any = subprocess.PIPE if job.capture_stdout else subprocess.DEVNULL
+            if job.stdout_path is not None:
+                stdout_target = stack.enter_context(open(job.stdout_path, "wb"))
+            stderr_target: Any = subprocess.PIPE
+            if job.stderr_path is not None:
+                stderr_target = stack.enter_context(open(job.stderr_path, "wb"))
+            started_at = time.perf_counter()
+            process = spawn_solver(
+                job.command,
+                job.cpu_id,
+                job.limits,
+                stdin=subprocess.PIPE,
+                stdout=stdout_target,
+                stderr=stderr_target,
+                start_new_session=True,
+            )
+        solver = _RunningSolver(
+            job=job,
+            process=process,
+            started_at=started_at,
+            deadline=None if job.timeout is None else started_at + job.timeout,
+            pending_input=memoryview(input_data),
+            lock_acquired=lock_acquired,
+        )
+        for stream, stream_name in ((process.stdout, "stdout"), (process.stderr, "stderr")):
+            if stream is not None:
+                os.set_blocking(stream.fileno(), False)
+                selector.register(stream, selectors.EVENT_READ, (solver, stream_name))
+                solver.open_streams += 1
+        assert process.stdin is not None
+        os.set_blocking(process.stdin.fileno(), False)
+        selector.register(process.stdin, selectors.EVENT_WRITE, (solver, "stdin"))
+
+        pidfd_open = getattr(os, "pidfd_open", None)
+        if pidfd_open is not None:
+            try:
+                solver.pidfd = pidfd_open(process.pid)
+            except OSError:
+                solver.pidfd = None
+            else:
+                selector.register(solver.pidfd, selectors.EVENT_READ, (solver, "exit"))
+        return solver
+
+    @staticmethod
+    def _unregister(selector: selectors.BaseSelector, fileobj: Any) -> None:
+        try:
+            selector.unregister(fileobj)
+        except (KeyError, ValueError):
+            pass
+
+    def _close_stdin(self, solver: _RunningSolver, selector: selectors.BaseSelector) -> None:
+        stdin: Optional[IO[bytes]] = solver.process.stdin
+        if stdin is None or stdin.closed:
+            return
+        self._unregister(selector, stdin)
+        try:
+            stdin.close()
+        except OSError:
+            pass
+
+    def _write_input(self, solver: _RunningSolver, selector: selectors.BaseSelector) -> None:
+        stdin = solver.process.stdin
+        assert stdin is not None
+        try:
+            written = os.write(stdin.fileno(), solver.pending_input[:IO_CHUNK_SIZE])
+        except BlockingIOError:
+            return
+        except OSError:
+            # 入力を読み切らずに終了したソルバーは通常の終了として扱う
+            self._close_stdin(solver, selector)
+            return
+        solver.pending_input = solver.pending_input[written:]
+        if not solver.pending_input:
+            self._close_stdin(solver, selector)
+
+    def _read_output(
+        self,
+        solver: _RunningSolver,
+        selector: selectors.BaseSelector,
+        stream: Any,
+        stream_name: str,
+    ) -> None:
+        try:
+            data = os.read(stream.fileno(), IO_CHUNK_SIZE)
+        except BlockingIOError:
+            return
+        if data:
+            if stream_name == "stderr" and solver.job.stderr_sink is not None:
+                solver.job.stderr_sink(data)
+                return
+            chunks = solver.stdout_chunks if stream_name == "stdout" else solver.stderr_chunks
+            chunks.append(data)
+            return
+        self._unregister(selector, stream)
+        stream.close()
+        solver.open_streams -= 1
+
+    def _reap(self, solver: _RunningSolver, selector: selectors.BaseSelector) -> None:
+        solver.process.wait()
+        solver.exited_at = time.perf_counter()
+        if solver.pidfd is not None:
+            self._unregister(selector, solver.pidfd)
+            os.close(solver.pidfd)
+            solver.pidfd = None
+
+    def _enforce_deadline(self, solver: _RunningSolver, now: float) -> None:
+        if solver.finished:
+            return
+        if solver.deadline is not None and now >= solver.deadline:
+            # 終了後も孫プロセスがパイプを保持する場合に備え、プロセスグループごと止める
+            solver.timed_out = solver.exited_at is None
+            solver.deadline = None
+            solver.kill_at = now + TERMINATE_GRACE_SEC
+            _signal_process_group(solver.process, signal.SIGTERM)
+        elif solver.kill_at is not None and now >= solver.kill_at:
+            solver.kill_at = None
+            _signal_process_group(solver.process, signal.SIGKILL)
+
+    def _close_all(self, solver: _RunningSolver, selector: selectors.BaseSelector) -> None:
+        self._close_stdin(solver, selector)
+        for stream in (solver.process.stdout, solver.process.stderr):
+            if stream is not None and not stream.closed:
+                self._unregister(selector, stream)
+                stream.close()
+        if solver.pidfd is not None:
+            self._unregister(selector, solver.pidfd)
+            os.close(solver.pidfd)
+            solver.pidfd = None
+        if solver.lock_acquired:
+            solver.lock_acquired = False
+            _release_lock(solver.job.cpu_lock)
+
+    def _finish(
+        self,
+        solver: _RunningSolver,
+        running: dict[int, _RunningSolver],
+        busy_lanes: collections.Counter[Optional[CpuTarget]],
+        selector: selectors.BaseSelector,
+        on_finish: Callable[[SolverJob, SolverOutcome], None],
+    ) -> None:
+        self._close_all(solver, selector)
+        running.pop(solver.process.pid, None)
+        busy_lanes[solver.job.cpu_id] -= 1
+        assert solver.exited_at is not None
+        if solver.timed_out:
+            elapsed = solver.job.timeout if solver.job.timeout is not None else -1.0
+        else:
+            elapsed = solver.exited_at - solver.started_at
+        on_finish(
+            solver.job,
+            SolverOutcome(
+                returncode=solver.process.returncode,
+                timed_out=solver.timed_out,
+                stdout=b"".join(solver.stdout_chunks),
+                stderr=b"".join(solver.stderr_chunks),
+                elapsed=elapsed,
+                usage=solver_usage(solver.process),
+            ),
+        )
+
+    def _kill(self, solver: _RunningSolver, selector: selectors.BaseSelector) -> None:
+        _signal_process_group(solver.process, signal.SIGKILL)
+        self._close_all(solver, selector)
+        try:
+            solver.process.wait()
+        except OSError:
+            pass
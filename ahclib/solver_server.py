@@ -0,0 +1,321 @@
+import collections
+import os
+import signal
+import subprocess
+import threading
+import time
+from dataclasses import replace
+from logging import getLogger
+from typing import Optional
+
+from .solver_engine import (
+    IO_CHUNK_SIZE,
+    NO_LIMITS,
+    TERMINATE_GRACE_SEC,
+    CpuTarget,
+    SolverLimits,
+    SolverOutcome,
+    SolverUsage,
+    spawn_solver,
+)
+
+logger = getLogger(__name__)
+
+# ソルバーがケースの終わりに stderr へ書く行の先頭で、続けてそのケースの stdout のバイト数を書く
+SERVER_DONE_PREFIX = b"ahclib:done "
+# 制限時間と中止の確認の間隔
+SERVER_POLL_SEC = 0.05
+
+# 起動したままのソルバーとの間のやり取り
+#   ahclib -> ソルバー (stdin): "<引数の数> <入力のバイト数>\n"、引数を 1 行ずつ、入力そのもの
+#   ソルバー -> ahclib: stdout へ出力を書いて flush し、stderr へ "ahclib:done <stdout のバイト数>\n"
+# ソルバーは stdin の EOF で終了する
+
+
+def format_request(arguments: list[str], input_bytes: bytes) -> bytes:
+    header = f"{len(arguments)} {len(input_bytes)}\n".encode("ascii")
+    return header + b"".join(argument.encode("utf-8") + b"\n" for argument in arguments) + input_bytes
+
+
+def _read_process_usage(pid: int) -> Optional[SolverUsage]:
+    """``/proc`` から起動後の累計の資源使用量を読み、読めなければ ``None``
+
+    ``max_rss_kb`` は ``_reset_peak_rss`` で最後に戻してからの最大値
+    """
+    try:
+        with open(f"/proc/{pid}/stat", "r", encoding="ascii") as stat_file:
+            # comm に空白を含む場合があるため、最後の ")" より後ろを分割する
+            fields = stat_file.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/status", "r", encoding="ascii") as status_file:
+            status = dict(line.split(":", 1) for line in status_file if ":" in line)
+        ticks = os.sysconf("SC_CLK_TCK")
+        return SolverUsage(
+            user_seconds=int(fields[11]) / ticks,
+            system_seconds=int(fields[12]) / ticks,
+            max_rss_kb=int(status["VmHWM"].split()[0]),
+            voluntary_switches=int(status["voluntary_ctxt_switches"]),
+            involuntary_switches=int(status["nonvoluntary_ctxt_switches"]),
+        )
+    except (OSError, ValueError, KeyError, IndexError):
+        return None
+
+
+def _reset_peak_rss(pid: int) -> None:
+    """最大 RSS (VmHWM) を今の RSS に戻し、ケースごとのピークを測れるようにする"""
+    try:
+        with open(f"/proc/{pid}/clear_refs", "w", encoding="ascii") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+
+def _usage_between(before: Optional[SolverUsage], after: Optional[SolverUsage]) -> Optional[SolverUsage]:
+    if before is None or after is None:
+        return None
+    return SolverUsage(
+        user_seconds=after.user_seconds - before.user_seconds,
+        system_seconds=after.system_seconds - before.system_seconds,
+        max_rss_kb=after.max_rss_kb,
+        voluntary_switches=after.voluntary_switches - before.voluntary_switches,
+        involuntary_switches=after.involuntary_switches - before.involuntary_switches,
+    )
+
+
+class SolverServer:
+    """1 つの lane で起動したままにするソルバーで、ケースごとに入力と引数を送り、出力と stderr を受け取る
+
+    制限時間を超えたか、ケースの途中で終了したソルバーは ``alive`` が ``False`` になり、作り直す
+    CPU 時間の制限は累計に効く RLIMIT_CPU ではなく、ケースごとの CPU 時間で判定する
+    """
+
+    def __init__(self, command: list[str], cpu_id: Optional[CpuTarget] = None, limits: SolverLimits = NO_LIMITS):
+        self.command = command
+        self.process = spawn_solver(
+            command,
+            cpu_id,
+            limits=replace(limits, cpu_seconds=None),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=(os.name == "posix"),
+        )
+        self.alive = True
+        self._condition = threading.Condition()
+        self._stdout = bytearray()
+        self._stderr = bytearray()
+        self._line_start = 0
+        # 終わったケースの (stderr の終わり, 終了行の次, stdout のバイト数, 終了時刻)
+        self._finished: collections.deque[tuple[int, int, int, float]] = collections.deque()
+        self._closed_streams = 0
+        self._readers = [
+            threading.Thread(target=self._read_stdout, daemon=True),
+            threading.Thread(target=self._read_stderr, daemon=True),
+        ]
+        for reader in self._readers:
+            reader.start()
+
+    def _read_stdout(self) -> None:
+        assert self.process.stdout is not None
+        file_descriptor = self.process.stdout.fileno()
+        while chunk := os.read(file_descriptor, IO_CHUNK_SIZE):
+            with self._condition:
+                self._stdout += chunk
+                self._condition.notify_all()
+        self._close_stream()
+
+    def _read_stderr(self) -> None:
+        assert self.process.stderr is not None
+        file_descriptor = self.process.stderr.fileno()
+        while chunk := os.read(file_descriptor, IO_CHUNK_SIZE):
+            now = time.perf_counter()
+            with self._condition:
+                self._stderr += chunk
+                while (newline := self._stderr.find(b"\n", self._line_start)) >= 0:
+                    line = bytes(self._stderr[self._line_start : newline]).rstrip(b"\r")
+                    if line.startswith(SERVER_DONE_PREFIX):
+                        try:
+                            stdout_size = int(line[len(SERVER_DONE_PREFIX) :])
+                        except ValueError:
+                            stdout_size = 0
+                        self._finished.append((self._line_start, newline + 1, stdout_size, now))
+                    self._line_start = newline + 1
+                self._condition.notify_all()
+        self._close_stream()
+
+    def _close_stream(self) -> None:
+        with self._condition:
+            self._closed_streams += 1
+            self._condition.notify_all()
+
+    def _write_request(self, request: bytes) -> None:
+        assert self.process.stdin is not None
+        try:
+            self.process.stdin.write(request)
+            self.process.stdin.flush()
+        except (OSError, ValueError):
+            # 終了したソルバーは stderr の EOF で検知する
+            pass
+
+    def _take_case(self) -> tuple[bytes, bytes, float]:
+        """最初に終わったケースの stdout と stderr を取り出す"""
+        stderr_end, line_end, stdout_size, finished_at = self._finished.popleft()
+        stdout = bytes(self._stdout[:stdout_size])
+        stderr = bytes(self._stderr[:stderr_end])
+        del self._stdout[:stdout_size]
+        del self._stderr[:line_end]
+        self._line_start -= line_end
+        self._finished = collections.deque(
+            (end - line_end, after - line_end, size, at) for end, after, size, at in self._finished
+        )
+        return stdout, stderr, finished_at
+
+    def _wait_for_case(self, deadline: Optional[float], cancel_event: Optional[threading.Event]) -> str:
+        """ケースの終了、ソルバーの終了、中止、制限時間のどれが先に起きたかを返す (``_condition`` を保持して呼ぶ)"""
+        while True:
+            if self._finished and len(self._stdout) >= self._finished[0][2]:
+                return "done"
+            if self._closed_streams == len(self._readers):
+                # 申告したバイト数より出力が短いまま終了した場合も、終わったケースとして扱う
+                return "done" if self._finished else "exited"
+            if cancel_event is not None and cancel_event.is_set():
+                return "cancelled"
+            now = time.perf_counter()
+            if deadline is not None and now >= deadline:
+                return "timeout"
+            self._condition.wait(SERVER_POLL_SEC if deadline is None else min(SERVER_POLL_SEC, deadline - now))
+
+    def run_case(
+        self,
+        arguments: list[str],
+        input_bytes: bytes,
+        timeout: Optional[float],
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Optional[SolverOutcome]:
+        """1 ケースを実行し、中止通知を受けた場合はソルバーを終了して ``None`` を返す"""
+        before = _read_process_usage(self.process.pid)
+        _reset_peak_rss(self.process.pid)
+        start = time.perf_counter()
+        deadline = None if timeout is None else start + timeout
+        writer = threading.Thread(
+            target=self._write_request, args=(format_request(arguments, input_bytes),), daemon=True
+        )
+        writer.start()
+        with self._condition:
+            status = self._wait_for_case(deadline, cancel_event)
+            if status == "done":
+                stdout, stderr, finished_at = self._take_case()
+            else:
+                stdout, stderr = bytes(self._stdout), bytes(self._stderr)
+        if status == "done":
+            usage = _usage_between(before, _read_process_usage(self.process.pid))
+            return SolverOutcome(0, False, stdout, stderr, finished_at - start, usage=usage)
+        returncode = self._stop()
+        if status == "cancelled":
+            return None
+        if status == "timeout":
+            assert timeout is not None
+            return SolverOutcome(None, True, stdout, stderr, timeout)
+        logger.warning(f"Solver server exited during a case with code {returncode}.")
+        return SolverOutcome(returncode or -1, False, stdout, stderr, time.perf_counter() - start)
+
+    def _stop(self) -> Optional[int]:
+        """ソルバーとその子プロセスを終了し、終了コードを返す"""
+        self.alive = False
+        if self.process.poll() is None:
+            try:
+                if os.name == "posix":
+                    os.killpg(self.process.pid, signal.SIGKILL)
+                else:
+                    self.process.kill()
+            except OSError:
+                pass
+        returncode = self.process.wait()
+        for reader in self._readers:
+            reader.join()
+        return returncode
+
+    def close(self) -> None:
+        """stdin を閉じてソルバーに終了を伝え、猶予時間内に終わらなければ止める"""
+        self.alive = False
+        try:
+            assert self.process.stdin is not None
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=TERMINATE_GRACE_SEC)
+        except subprocess.TimeoutExpired:
+            pass
+        self._stop()
+        for stream in (self.process.stdout, self.process.stderr):
+            if stream is not None:
+                stream.close()
+
+
+class SolverServerPool:
+    """コマンドと CPU ごとに起動したままのソルバーを貸し出し、trial をまたいで使い回す
+
+    ``base_command`` に続く引数はソルバーの起動時ではなくケースごとに渡す
+    """
+
+    def __init__(self, base_command: list[str]) -> None:
+        self.base_command = list(base_command)
+        self.spawn_count = 0
+        self.restart_count = 0
+        self._idle: dict[tuple[tuple[str, ...], Optional[CpuTarget]], list[SolverServer]] = {}
+        self._lock = threading.Lock()
+        self._owner_pid = os.getpid()
+
+    def _split_command(self, command: list[str]) -> tuple[list[str], list[str]]:
+        """起動するコマンドとケースごとに渡す引数に分ける"""
+        if command[: len(self.base_command)] == self.base_command:
+            return self.base_command, command[len(self.base_command) :]
+        return command, []
+
+    def _checkout(self, command: list[str], cpu_id: Optional[CpuTarget], limits: SolverLimits) -> SolverServer:
+        key = (tuple(command), cpu_id)
+        with self._lock:
+            if os.getpid() != self._owner_pid:
+                # fork 前のソルバーは親プロセスのものなので使わない
+                self._idle = {}
+                self._owner_pid = os.getpid()
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop()
+            self.spawn_count += 1
+        return SolverServer(command, cpu_id, limits)
+
+    def _checkin(self, server: SolverServer, cpu_id: Optional[CpuTarget]) -> None:
+        if not server.alive:
+            with self._lock:
+                self.restart_count += 1
+            return
+        with self._lock:
+            self._idle.setdefault((tuple(server.command), cpu_id), []).append(server)
+
+    def run(
+        self,
+        command: list[str],
+        input_bytes: bytes,
+        timeout: Optional[float],
+        cpu_id: Optional[CpuTarget] = None,
+        limits: SolverLimits = NO_LIMITS,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Optional[SolverOutcome]:
+        """空いているソルバーで 1 ケースを実行し、なければ起動する"""
+        server_command, arguments = self._split_command(command)
+        server = self._checkout(server_command, cpu_id, limits)
+        try:
+            return server.run_case(arguments, input_bytes, timeout, cancel_event)
+        except BaseException:
+            server.close()
+            raise
+        finally:
+            self._checkin(server, cpu_id)
+
+    def close(self) -> None:
+        with self._lock:
+            servers = [server for idle in self._idle.values() for server in idle]
+            self._idle = {}
+        for server in servers:
+            server.close()
@@ -0,0 +1,129 @@
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from logging import getLogger
+from typing import Callable, Optional
+
+from .record_compression import compress_file
+
+logger = getLogger(__name__)
+
+
+def _is_local_file(path: str) -> bool:
+    if not os.path.isfile(path) or os.path.islink(path):
+        return False
+    return os.path.abspath(path).startswith(os.path.join(os.getcwd(), ""))
+
+
+class RunStaging:
+    """実行中の記録を tmpfs に書かせ、バックグラウンドのスレッドで結果ディレクトリへまとめて移す
+
+    ``flush`` に渡した記録は、結果ディレクトリへ書き終えて tmpfs から消してからコールバックを呼ぶ
+    採点やキャッシュへの保存で記録を読み終えてから ``flush`` し、実行中の記録だけを RAM に置く
+    """
+
+    def __init__(
+        self,
+        root: str,
+        output_dir: str,
+        subdirs: tuple[str, ...] = (),
+        compression: Optional[str] = None,
+        compressed_subdirs: tuple[str, ...] = (),
+    ) -> None:
+        self.directory = tempfile.mkdtemp(prefix="ahclib-stage-", dir=root)
+        self.output_dir = output_dir
+        # ``compressed_subdirs`` の記録は、結果ディレクトリへ移すときに ``compression`` で圧縮する
+        self.compression = compression
+        self.compressed_subdirs = compressed_subdirs
+        for subdir in subdirs:
+            os.makedirs(os.path.join(self.directory, subdir), exist_ok=True)
+        # 実行ファイルの複製と、結果ディレクトリへの書き込みにかかった時間
+        self.stage_seconds = 0.0
+        self.flush_seconds = 0.0
+        self.flushed_files = 0
+        self.flushed_bytes = 0
+        self._queue: "queue.Queue[Optional[tuple[list[str], Callable[[], None]]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    def stage_command(self, command: list[str]) -> list[str]:
+        """作業ディレクトリ以下の実行ファイル (``./a.out`` など) を tmpfs へ複製し、複製を指すコマンドを返す
+
+        ``python3`` などのインストール済みのコマンドや、venv の interpreter のような symlink は複製しない
+        """
+        if not command or not _is_local_file(command[0]):
+            return command
+        start = time.perf_counter()
+        staged_path = os.path.join(self.directory, os.path.basename(command[0]))
+        try:
+            shutil.copy2(command[0], staged_path)
+        except OSError as error:
+            logger.warning(f"Failed to stage {command[0]}; running it in place: {error}")
+            return command
+        self.stage_seconds += time.perf_counter() - start
+        return [staged_path, *command[1:]]
+
+    def flush(self, relative_paths: list[str], on_flushed: Callable[[], None]) -> None:
+        """``relative_paths`` の記録を結果ディレクトリへ移し、その後に ``on_flushed`` を呼ぶ"""
+        self._queue.put((relative_paths, on_flushed))
+
+    def _flush_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            # 溜まっている分をまとめて書き、ケースごとの書き込みの待ちを減らす
+            batch = [item]
+            while item is not None:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+            for entry in batch:
+                if entry is None:
+                    return
+                relative_paths, on_flushed = entry
+                start = time.perf_counter()
+                for relative_path in relative_paths:
+                    self._copy(relative_path)
+                self.flush_seconds += time.perf_counter() - start
+                try:
+                    on_flushed()
+                except Exception:
+                    logger.exception("Failed after flushing staged records.")
+
+    def _copy(self, relative_path: str) -> None:
+        source_path = os.path.join(self.directory, relative_path)
+        if not os.path.isfile(source_path):
+            return
+        destination_path = os.path.join(self.output_dir, relative_path)
+        size = os.path.getsize(source_path)
+        try:
+            if self.compression is not None and relative_path.split(os.sep)[0] in self.compressed_subdirs:
+                compress_file(source_path, destination_path, self.compression)
+            else:
+                shutil.copyfile(source_path, destination_path)
+            os.remove(source_path)
+        except OSError as error:
+            logger.warning(f"Failed to flush staged {relative_path}: {error}")
+            return
+        self.flushed_files += 1
+        self.flushed_bytes += size
+
+    def close(self) -> None:
+        """残りの記録を書き終えるまで待ち、tmpfs 上の複製を消す"""
+        self._queue.put(None)
+        self._thread.join()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def stage_root(configured: Optional[str]) -> Optional[str]:
+    """settings の ``stage_dir`` を確かめ、書き込めなければ警告して ``None`` を返す"""
+    if configured is None:
+        return None
+    if not os.path.isdir(configured) or not os.access(configured, os.W_OK):
+        logger.warning(f"stage_dir {configured} is not a writable directory; writing records in place.")
+        return None
+    return configured
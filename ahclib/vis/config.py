@@ -17,8 +17,7 @@ def in_dir() -> str:
     return "./in"
 
 
-GRID_THEME = {
-    "function": """themeQuartz.withParams({
+GRID_THEME = {"function": """themeQuartz.withParams({
         backgroundColor: '#1e1e1e',
         foregroundColor: '#e0e0e0',
         headerBackgroundColor: '#2d2d2d',
@@ -32,8 +31,7 @@ GRID_THEME = {
         fontSize: 12,
         rowHeight: 34,
         headerHeight: 34
-    })"""
-}
+    })"""}
 
 NUMBER_FORMATTER = {"function": "params.value == null ? '' : d3.format(',.12~f')(params.value)"}
 DECIMAL_FORMATTER = {"function": "params.value == null ? '' : d3.format(',.3f')(params.value)"}
@@ -54,6 +52,13 @@ RUN_COLUMN_DEFS = [
         "width": 128,
         "filter": "agTextColumnFilter",
     },
+    {
+        "headerName": "Progress",
+        "headerTooltip": "実行中の結果の完了ケース数と残り時間の見込み",
+        "field": "progress",
+        "width": 132,
+        "cellStyle": {"color": "#29b6f6"},
+    },
     {
         "headerName": "Total",
         "headerTooltip": "AHCSettings.get_score",
@@ -118,6 +123,22 @@ RUN_COLUMN_DEFS = [
         "width": 52,
         "cellStyle": {"color": "#e57373", "fontWeight": "bold"},
     },
+    {
+        "headerName": "CPU",
+        "headerTooltip": "1 ケースあたりの user + sys の CPU 時間の平均 (秒)",
+        "field": "cpu_time_mean",
+        "type": "numericColumn",
+        "width": 72,
+        "valueFormatter": DECIMAL_FORMATTER,
+    },
+    {
+        "headerName": "RSS MB",
+        "headerTooltip": "全ケースの最大メモリ使用量の最大値",
+        "field": "max_rss_mb",
+        "type": "numericColumn",
+        "width": 80,
+        "valueFormatter": DECIMAL_FORMATTER,
+    },
     {
         "headerName": "Tag",
         "field": "tag",
@@ -204,7 +225,7 @@ def case_column_defs(
     read_only: bool = False,
 ) -> list[dict]:
     """最適化方向に合わせた詳細結果の列定義を返す"""
-    default_groups = ["score", "rank", "time", "best", "params"]
+    default_groups = ["score", "rank", "time", "usage", "best", "params"]
     visible = set(default_groups if visible_groups is None else visible_groups)
     parameter_columns = []
     for name, field, is_numeric in parameter_specs or []:
@@ -379,6 +400,66 @@ def case_column_defs(
             "cellStyle": _delta_style("minimize"),
             "hide": "time" not in visible,
         },
+        {
+            "headerName": "CPU",
+            "headerTooltip": "user + sys の CPU 時間 (秒)",
+            "field": "cpu_time",
+            "type": "numericColumn",
+            "valueFormatter": DECIMAL_FORMATTER,
+            "hide": "usage" not in visible,
+        },
+        {
+            "headerName": "Base CPU",
+            "field": "base_cpu_time",
+            "type": "numericColumn",
+            "valueFormatter": DECIMAL_FORMATTER,
+            "hide": "usage" not in visible,
+        },
+        {
+            "headerName": "Δ CPU",
+            "field": "cpu_time_delta",
+            "type": "numericColumn",
+            "valueFormatter": DECIMAL_FORMATTER,
+            "cellStyle": _delta_style("minimize"),
+            "hide": "usage" not in visible,
+        },
+        {
+            "headerName": "RSS MB",
+            "headerTooltip": "最大メモリ使用量",
+            "field": "max_rss_mb",
+            "type": "numericColumn",
+            "valueFormatter": DECIMAL_FORMATTER,
+            "hide": "usage" not in visible,
+        },
+        {
+            "headerName": "Base RSS MB",
+            "field": "base_max_rss_mb",
+            "type": "numericColumn",
+            "valueFormatter": DECIMAL_FORMATTER,
+            "hide": "usage" not in visible,
+        },
+        {
+            "headerName": "Δ RSS MB",
+            "field": "max_rss_delta_mb",
+            "type": "numericColumn",
+            "valueFormatter": DECIMAL_FORMATTER,
+            "cellStyle": _delta_style("minimize"),
+            "hide": "usage" not in visible,
+        },
+        {
+            "headerName": "Vol. CS",
+            "headerTooltip": "自発的なコンテキストスイッチの回数",
+            "field": "voluntary_ctx_switches",
+            "type": "numericColumn",
+            "hide": "usage" not in visible,
+        },
+        {
+            "headerName": "Invol. CS",
+            "headerTooltip": "非自発的なコンテキストスイッチの回数 (他プロセスとの CPU 競合の目安)",
+            "field": "involuntary_ctx_switches",
+            "type": "numericColumn",
+            "hide": "usage" not in visible,
+        },
         {
             "headerName": "Best",
             "field": "best",
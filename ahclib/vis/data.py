@@ -8,6 +8,7 @@ import re
 import shutil
 import sys
 import threading
+import time
 from collections import OrderedDict
 from collections.abc import Callable, Iterable, Mapping
 from dataclasses import dataclass
@@ -17,6 +18,9 @@ from typing import Any, Optional
 
 import pandas as pd
 
+from ..input_gen import resolve_input_file_names
+from ..record_compression import RECORD_READ_ERRORS, find_record, read_record_text
+from ..run_journal import JOURNAL_FILE, RUN_MANIFEST_FILE
 from . import config
 
 logger = logging.getLogger(__name__)
@@ -24,6 +28,10 @@ logger = logging.getLogger(__name__)
 TEXT_CACHE_MAX_FILES = 32
 TEXT_CACHE_MAX_CHARS = 8_000_000
 
+# result.csv の資源使用量の列で、これらの列がない古い結果では欠損として扱う
+USAGE_COLUMNS = ("user_time", "sys_time", "max_rss_kb", "voluntary_ctx_switches", "involuntary_ctx_switches")
+KB_PER_MB = 1024
+
 
 @dataclass(frozen=True)
 class ResultSnapshot:
@@ -81,6 +89,17 @@ def calculate_relative_scores(
     return numeric_scores.div(numeric_baseline.where(numeric_baseline != 0))
 
 
+def add_usage_columns(frame: pd.DataFrame) -> None:
+    """資源使用量の列を数値にそろえ、CPU 時間 (user + sys) と MB 単位の最大メモリを加える"""
+    for column in USAGE_COLUMNS:
+        if column in frame.columns:
+            frame[column] = pd.to_numeric(frame[column], errors="coerce")
+        else:
+            frame[column] = float("nan")
+    frame["cpu_time"] = frame["user_time"] + frame["sys_time"]
+    frame["max_rss_mb"] = frame["max_rss_kb"] / KB_PER_MB
+
+
 def get_ahc_setting(key: str, default: Any) -> Any:
     """カレントの ahc_settings.py から AHCSettings の属性を読む"""
     try:
@@ -103,6 +122,83 @@ def format_timestamp(timestamp: str) -> str:
     return timestamp
 
 
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}" if hours else f"{minutes}:{seconds:02}"
+
+
+class _LiveRun:
+    """実行中の journal.jsonl を前回読んだ位置から読み、ケースごとの最後の結果を持つ"""
+
+    def __init__(self, folder_path: str) -> None:
+        self.journal_path = os.path.join(folder_path, JOURNAL_FILE)
+        self.manifest_path = os.path.join(folder_path, RUN_MANIFEST_FILE)
+        self.offset = 0
+        self.rows: dict[str, dict[str, Any]] = {}
+        self.manifest: dict[str, Any] = {}
+        self.frame: Optional[pd.DataFrame] = None
+
+    def update(self, timestamp: str) -> pd.DataFrame:
+        """追記された行だけを読み、書きかけの最後の行は次回に回す"""
+        with open(self.journal_path, "rb") as journal_file:
+            journal_file.seek(0, os.SEEK_END)
+            if journal_file.tell() < self.offset:
+                # 作り直された journal は最初から読む
+                self.offset = 0
+                self.rows = {}
+            journal_file.seek(self.offset)
+            appended = journal_file.read()
+        end = appended.rfind(b"\n") + 1
+        for line in appended[:end].splitlines():
+            try:
+                entry = json.loads(line)
+                row = {column: entry[column] for column in ("filename", "score", "state", "time")}
+            except (ValueError, KeyError, TypeError):
+                continue
+            usage = entry.get("usage") or {}
+            for column in USAGE_COLUMNS:
+                row[column] = usage.get(column, float("nan"))
+            self.rows[row["filename"]] = row
+        self.offset += end
+        if end > 0 or self.frame is None:
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as manifest_file:
+                    self.manifest = json.load(manifest_file)
+            except (OSError, ValueError):
+                self.manifest = {}
+            frame = pd.DataFrame(
+                list(self.rows.values()), columns=["filename", "score", "state", "time", *USAGE_COLUMNS]
+            )
+            self.frame = ResultStore._prepare_result_frame(frame, timestamp)
+        return self.frame
+
+    def progress(self, now: float) -> str:
+        """完了数と、開始後の完了ペースから求めた残り時間を返す"""
+        finished = len(self.rows)
+        total = len(self.manifest.get("input_file_names") or []) or finished
+        text = f"{finished}/{total}"
+        pid = self.manifest.get("pid")
+        if isinstance(pid, int) and not _pid_alive(pid):
+            return f"中断 {text}"
+        started_at = self.manifest.get("started_at")
+        finished_since_start = finished - int(self.manifest.get("finished_at_start", 0))
+        if isinstance(started_at, (int, float)) and finished_since_start > 0 and total > finished:
+            remaining = (now - started_at) / finished_since_start * (total - finished)
+            text += f" ETA {format_duration(remaining)}"
+        return text
+
+
 class ResultStore:
     """実行結果の読み込み・キャッシュ・集計を集約する"""
 
@@ -119,7 +215,8 @@ class ResultStore:
             str,
             tuple[tuple[int, int], pd.DataFrame],
         ] = {}
-        self._frame_cache: Optional[tuple[tuple[tuple[str, int, int], ...], pd.DataFrame]] = None
+        self._frame_cache: Optional[tuple[tuple[tuple[str, int, int, bool], ...], pd.DataFrame]] = None
+        self._live_runs: dict[str, _LiveRun] = {}
         self._version = 0
         self._comparison_cache: dict[
             tuple[int, Optional[str], Optional[str]],
@@ -152,16 +249,21 @@ class ResultStore:
     def version(self) -> int:
         return self._version
 
-    def _scan(self) -> list[tuple[str, int, int]]:
-        """結果ディレクトリ名と result.csv の署名を返す"""
+    def _scan(self) -> list[tuple[str, int, int, bool]]:
+        """結果ディレクトリ名と result.csv の署名を返す
+
+        result.csv がまだない実行中の結果は、journal.jsonl の署名と実行中の印を返す
+        """
         if not os.path.exists(self.base_path):
             return []
         entries = []
         for folder in sorted(os.listdir(self.base_path)):
-            csv_path = os.path.join(self.base_path, folder, config.FILE_NAME)
-            if os.path.exists(csv_path):
-                file_status = os.stat(csv_path)
-                entries.append((folder, file_status.st_mtime_ns, file_status.st_size))
+            for file_name, live in ((config.FILE_NAME, False), (JOURNAL_FILE, True)):
+                path = os.path.join(self.base_path, folder, file_name)
+                if os.path.exists(path):
+                    file_status = os.stat(path)
+                    entries.append((folder, file_status.st_mtime_ns, file_status.st_size, live))
+                    break
         return entries
 
     @staticmethod
@@ -172,6 +274,7 @@ class ResultStore:
                 "score",
                 "state",
                 "time",
+                *USAGE_COLUMNS,
                 "timestamp",
                 "name",
                 "case_id",
@@ -192,6 +295,9 @@ class ResultStore:
             prepared["state"] = ""
         else:
             prepared["state"] = prepared["state"].fillna("").astype(str)
+        for column in USAGE_COLUMNS:
+            if column not in prepared.columns:
+                prepared[column] = float("nan")
         prepared["timestamp"] = timestamp
         normalized_ids = prepared["filename"].map(normalize_case_id)
         prepared["case_id"] = unique_case_ids(list(prepared["filename"]))
@@ -211,21 +317,28 @@ class ResultStore:
         if self._frame_cache is not None and self._frame_cache[0] == signature:
             return self._frame_cache[1]
 
-        current_folders = [folder for folder, _, _ in entries]
+        current_folders = [folder for folder, _, _, live in entries if not live]
         self._csv_cache = {
             folder_path: cached_data
             for folder_path, cached_data in self._csv_cache.items()
             if os.path.basename(folder_path) in current_folders
         }
+        live_folders = [folder for folder, _, _, live in entries if live]
+        self._live_runs = {folder: live_run for folder, live_run in self._live_runs.items() if folder in live_folders}
 
         frames = []
         warnings = []
-        for folder, mtime_ns, size in entries:
+        for folder, mtime_ns, size, live in entries:
             folder_path = os.path.join(self.base_path, folder)
-            csv_path = os.path.join(folder_path, config.FILE_NAME)
+            csv_path = os.path.join(folder_path, JOURNAL_FILE if live else config.FILE_NAME)
             file_signature = (mtime_ns, size)
             try:
-                if folder_path in self._csv_cache and self._csv_cache[folder_path][0] == file_signature:
+                if live:
+                    frame = self._live_runs.setdefault(folder, _LiveRun(folder_path)).update(folder)
+                    # まだ 1 ケースも終わっていない実行は一覧に出さない
+                    if frame.empty:
+                        continue
+                elif folder_path in self._csv_cache and self._csv_cache[folder_path][0] == file_signature:
                     frame = self._csv_cache[folder_path][1]
                 else:
                     frame = self._prepare_result_frame(pd.read_csv(csv_path), folder)
@@ -233,7 +346,7 @@ class ResultStore:
                 frames.append(frame)
             except (OSError, ValueError, pd.errors.ParserError) as error:
                 logger.warning("Failed to read %s: %s", csv_path, error)
-                warnings.append(f"result.csv の読み込み失敗: {folder} ({error})")
+                warnings.append(f"{os.path.basename(csv_path)} の読み込み失敗: {folder} ({error})")
 
         frame = pd.concat(frames, ignore_index=True) if frames else empty_frame
         self._frame_cache = (signature, frame)
@@ -264,12 +377,17 @@ class ResultStore:
             "ci95_score",
             "case_count",
             "ng_cnt",
+            "cpu_time_mean",
+            "max_rss_mb",
+            "progress",
         ]
         if results.empty:
             return pd.DataFrame(columns=columns), []
 
         frame = results.copy()
         frame["score"] = pd.to_numeric(frame["score"], errors="coerce")
+        if "cpu_time" not in frame.columns:
+            add_usage_columns(frame)
         grouped = (
             frame.groupby("timestamp", sort=True)
             .agg(
@@ -278,6 +396,8 @@ class ResultStore:
                 std_score=("score", "std"),
                 valid_score_count=("score", "count"),
                 case_count=("case_id", "size"),
+                cpu_time_mean=("cpu_time", "mean"),
+                max_rss_mb=("max_rss_mb", "max"),
             )
             .reset_index()
         )
@@ -315,12 +435,17 @@ class ResultStore:
                 aggregate_scores[str(timestamp)] = None
                 warnings.append(f"AHCSettings.get_score の計算失敗: {timestamp} ({error})")
         grouped["aggregate_score"] = grouped["timestamp"].map(aggregate_scores)
+        now = time.time()
+        grouped["progress"] = grouped["timestamp"].map(
+            lambda timestamp: self._live_runs[timestamp].progress(now) if timestamp in self._live_runs else ""
+        )
         return grouped[columns], warnings
 
     def _prepare_snapshot_results(self, results: pd.DataFrame) -> pd.DataFrame:
         prepared = results.copy()
         prepared["score"] = pd.to_numeric(prepared["score"], errors="coerce")
         prepared["time"] = pd.to_numeric(prepared["time"], errors="coerce")
+        add_usage_columns(prepared)
         prepared["rank"] = prepared.groupby("timestamp")["score"].rank(
             method="min",
             ascending=self.direction == "minimize",
@@ -437,6 +562,11 @@ class ResultStore:
         return result
 
     def _read_text(self, path: str, default: str = "") -> str:
+        """``path`` を読み、圧縮した記録しかない場合は展開して読む"""
+        record_path = find_record(path)
+        if record_path is None:
+            return default
+        path = record_path
         try:
             file_status = os.stat(path)
         except OSError:
@@ -454,9 +584,9 @@ class ResultStore:
                 return cached
 
         try:
-            with open(path, "r", encoding="utf-8", errors="ignore") as text_file:
-                text = text_file.read()
-        except OSError:
+            text = read_record_text(path)
+        except RECORD_READ_ERRORS:
+            # 書きかけや壊れた圧縮ファイルも、ファイルがない場合と同じに扱う
             return default
 
         with self._lock:
@@ -729,6 +859,8 @@ class ResultStore:
                     "input_file_names",
                     None,
                 )
+                if getattr(ahc_settings.AHCSettings, "gen_command", None) is not None:
+                    input_files = resolve_input_file_names(ahc_settings.AHCSettings)
                 score_aggregator = getattr(
                     ahc_settings.AHCSettings,
                     "get_score",
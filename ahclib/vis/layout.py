@@ -382,6 +382,7 @@ def _build_main(direction: str, read_only: bool) -> Component:
                                                 "value": "unavailable",
                                             },
                                             {"label": " 失敗", "value": "failed"},
+                                            {"label": " MLE", "value": "mle"},
                                             {
                                                 "label": " Bookmark",
                                                 "value": "bookmarked",
@@ -426,6 +427,7 @@ def _build_main(direction: str, read_only: bool) -> Component:
                                             {"label": " Score", "value": "score"},
                                             {"label": " Rank", "value": "rank"},
                                             {"label": " Time", "value": "time"},
+                                            {"label": " Resources", "value": "usage"},
                                             {"label": " Best", "value": "best"},
                                             {"label": " Params", "value": "params"},
                                         ],
@@ -433,6 +435,7 @@ def _build_main(direction: str, read_only: bool) -> Component:
                                             "score",
                                             "rank",
                                             "time",
+                                            "usage",
                                             "best",
                                             "params",
                                         ],
@@ -4,7 +4,7 @@ from typing import Any, Optional
 
 import pandas as pd
 
-from .data import calculate_relative_scores, format_timestamp
+from .data import add_usage_columns, calculate_relative_scores, format_timestamp
 
 PARAMETER_FIELD_PREFIX = "__parameter_"
 
@@ -62,6 +62,7 @@ def build_run_rows(
 
     frame = all_results.copy()
     frame["score"] = pd.to_numeric(frame["score"], errors="coerce")
+    add_usage_columns(frame)
     timestamps = sorted(frame["timestamp"].dropna().astype(str).unique())
     if not timestamps:
         return [], None
@@ -82,6 +83,8 @@ def build_run_rows(
                 std_score=("score", "std"),
                 valid_score_count=("score", "count"),
                 case_count=("case_id", "size"),
+                cpu_time_mean=("cpu_time", "mean"),
+                max_rss_mb=("max_rss_mb", "max"),
             )
             .reset_index()
         )
@@ -133,6 +136,8 @@ def build_run_rows(
         grouped["favorite_str"] = grouped["timestamp"].map(
             lambda timestamp: ("★" if favorite_getter is not None and favorite_getter(timestamp) else "☆")
         )
+    if "progress" not in grouped.columns:
+        grouped["progress"] = ""
     grouped["id"] = grouped["timestamp"]
 
     columns = [
@@ -141,6 +146,7 @@ def build_run_rows(
         "favorite_str",
         "is_base_str",
         "formatted",
+        "progress",
         "aggregate_score",
         "average_score",
         "median_score",
@@ -151,6 +157,8 @@ def build_run_rows(
         "std_score",
         "case_count",
         "ng_cnt",
+        "cpu_time_mean",
+        "max_rss_mb",
         "tag",
         "memo",
         "delete_btn",
@@ -187,6 +195,7 @@ def build_case_rows(
     frame = all_results.copy()
     frame["score"] = pd.to_numeric(frame["score"], errors="coerce")
     frame["time"] = pd.to_numeric(frame["time"], errors="coerce")
+    add_usage_columns(frame)
     if "state" not in frame.columns:
         frame["state"] = ""
 
@@ -207,12 +216,14 @@ def build_case_rows(
         baseline = frame[frame["timestamp"] == base_timestamp].copy()
         if "rank" not in baseline.columns:
             _add_rank(baseline, "score", "rank", direction)
-        baseline = baseline[["case_id", "score", "time", "state", "rank"]].rename(
+        baseline = baseline[["case_id", "score", "time", "state", "rank", "cpu_time", "max_rss_mb"]].rename(
             columns={
                 "score": "base_score",
                 "time": "base_time",
                 "state": "base_state",
                 "rank": "base_rank",
+                "cpu_time": "base_cpu_time",
+                "max_rss_mb": "base_max_rss_mb",
             }
         )
         target = pd.merge(target, baseline, on="case_id", how="left")
@@ -221,10 +232,14 @@ def build_case_rows(
         target["base_time"] = pd.NA
         target["base_state"] = None
         target["base_rank"] = pd.NA
+        target["base_cpu_time"] = float("nan")
+        target["base_max_rss_mb"] = float("nan")
 
     target["score_delta"] = target["score"] - target["base_score"]
     target["time_delta"] = target["time"] - target["base_time"]
     target["rank_delta"] = target["rank"] - target["base_rank"]
+    target["cpu_time_delta"] = target["cpu_time"] - target["base_cpu_time"]
+    target["max_rss_delta_mb"] = target["max_rss_mb"] - target["base_max_rss_mb"]
     target["rel"] = calculate_relative_scores(target["score"], target["base_score"])
     target["abs_score_delta"] = target["score_delta"].abs()
     target["relative_gap"] = (target["rel"] - 1.0).abs()
@@ -274,6 +289,7 @@ def build_case_rows(
             "same": target["comparison"] == "同点",
             "unavailable": target["comparison"] == "比較不能",
             "failed": ~target["comparison"].isin(["改善", "悪化", "同点", "比較不能"]),
+            "mle": target["state"] == "MLE",
             "bookmarked": target["bookmark_str"] == "★",
         }
         for filter_name in comparison_filters:
@@ -309,6 +325,14 @@ def build_case_rows(
         "time",
         "base_time",
         "time_delta",
+        "cpu_time",
+        "base_cpu_time",
+        "cpu_time_delta",
+        "max_rss_mb",
+        "base_max_rss_mb",
+        "max_rss_delta_mb",
+        "voluntary_ctx_switches",
+        "involuntary_ctx_switches",
         "best",
         *parameter_fields,
     ]
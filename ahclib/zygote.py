@@ -0,0 +1,271 @@
+import errno
+import json
+import os
+import re
+import socket
+import subprocess
+import threading
+from logging import getLogger
+from typing import Any, Optional
+
+from .solver_engine import (
+    NO_LIMITS,
+    TERMINATE_GRACE_SEC,
+    CpuTarget,
+    SolverLimits,
+    SolverUsage,
+    cpu_set,
+    popen_hooks_supported,
+    solver_rlimits,
+    thread_environment,
+)
+
+logger = getLogger(__name__)
+
+ZYGOTE_RUNNER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "zygote_runner.py")
+# zygote がソルバーの import を終えるまで待つ最大秒数
+ZYGOTE_START_TIMEOUT_SEC = 60
+MAX_MESSAGE_SIZE = 1 << 16
+# zygote から fork してよいコマンドの 1 語目
+PYTHON_INTERPRETER_PATTERN = re.compile(r"^(python|pypy)[\d.]*$")
+
+# 1 つの zygote がソルバーの import を済ませて待機し、ケースごとに fork した子でスクリプトを実行する
+# 子は zygote の子なので ahclib からは回収できず、終了状態と資源使用量はケースごとの socket で受け取る
+
+
+def zygote_supported() -> bool:
+    """fork、fd の受け渡し、affinity の設定ができる環境か"""
+    return (
+        os.name == "posix"
+        and hasattr(os, "fork")
+        and hasattr(socket, "send_fds")
+        and hasattr(socket, "SOCK_SEQPACKET")
+        and hasattr(os, "sched_setaffinity")
+        and popen_hooks_supported("_execute_child", "_try_wait", "_internal_poll", "_close_pipe_fds")
+    )
+
+
+def zygote_script(command: list[str]) -> Optional[str]:
+    """``python3 solver.py ...`` の形のコマンドならスクリプトのパスを返す"""
+    if len(command) < 2 or not PYTHON_INTERPRETER_PATTERN.match(os.path.basename(command[0])):
+        return None
+    if not command[1].endswith(".py") or not os.path.isfile(command[1]):
+        return None
+    return command[1]
+
+
+class ZygotePopen(subprocess.Popen):
+    """zygote が fork した子を表す Popen
+
+    Popen の起動は ``_execute_child``、回収は ``_try_wait`` と ``_internal_poll`` だけで行われるため、
+    その 3 か所を zygote とのやり取りに置き換え、制限時間や中止の処理は通常の Popen と同じにする
+    これらの引数が変わった Python では ``zygote_supported`` が偽になり、使わない
+    """
+
+    usage: Optional[SolverUsage] = None
+
+    def __init__(self, zygote: "PythonZygote", request: dict[str, Any], *args: Any, **kwargs: Any) -> None:
+        self._zygote = zygote
+        self._request = request
+        self._status_socket: Optional[socket.socket] = None
+        super().__init__(*args, **kwargs)
+
+    def _execute_child(
+        self,
+        args: Any,
+        executable: Any,
+        preexec_fn: Any,
+        close_fds: Any,
+        pass_fds: Any,
+        cwd: Any,
+        env: Any,
+        startupinfo: Any,
+        creationflags: Any,
+        shell: Any,
+        p2cread: int,
+        p2cwrite: int,
+        c2pread: int,
+        c2pwrite: int,
+        errread: int,
+        errwrite: int,
+        *_rest: Any,  # restore_signals 以降の、版ごとに異なる引数
+    ) -> None:
+        stream_fds = [p2cread, c2pwrite, errwrite]
+        request = dict(self._request, streams=[fd != -1 for fd in stream_fds])
+        request["cwd"] = cwd if cwd is not None else os.getcwd()
+        request["env"] = dict(env) if env is not None else dict(os.environ)
+        status_socket, child_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        try:
+            with child_end:
+                self._zygote.send(
+                    json.dumps(request).encode("utf-8"), [child_end.fileno()] + [fd for fd in stream_fds if fd != -1]
+                )
+            message = status_socket.recv(MAX_MESSAGE_SIZE)
+            if not message:
+                raise OSError("zygote exited before forking a solver")
+        except BaseException:
+            status_socket.close()
+            raise
+        self._status_socket = status_socket
+        self.pid = json.loads(message)["pid"]
+        self._child_created = True
+        self._close_pipe_fds(p2cread, p2cwrite, c2pread, c2pwrite, errread, errwrite)
+
+    def _exit_status(self, pid: int, options: int) -> tuple[int, int]:
+        """zygote が回収した子の終了状態を受け取り、``waitpid`` と同じ形で返す"""
+        assert self._status_socket is not None
+        try:
+            message = self._status_socket.recv(MAX_MESSAGE_SIZE, socket.MSG_DONTWAIT if options else 0)
+        except BlockingIOError:
+            return 0, 0
+        self._status_socket.close()
+        if not message:
+            # zygote が終了した場合は、強制終了したケースとして扱う
+            return pid, 9
+        exited = json.loads(message)
+        self.usage = SolverUsage(**exited["usage"])
+        return pid, exited["status"]
+
+    def _try_wait(self, wait_flags: int) -> tuple[int, int]:
+        return self._exit_status(self.pid, wait_flags)
+
+    def _internal_poll(
+        self,
+        _deadstate: Optional[int] = None,
+        _waitpid: Any = None,
+        _WNOHANG: int = getattr(os, "WNOHANG", 1),
+        _ECHILD: int = errno.ECHILD,
+    ) -> Optional[int]:
+        return super()._internal_poll(_deadstate, self._exit_status, _WNOHANG, _ECHILD)
+
+
+class PythonZygote:
+    """1 つのスクリプトを import 済みで待機する zygote プロセス"""
+
+    def __init__(self, interpreter: str, script: str, env: Optional[dict[str, str]]) -> None:
+        self._control, zygote_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        self._send_lock = threading.Lock()
+        with zygote_end:
+            self.process = subprocess.Popen(
+                [interpreter, ZYGOTE_RUNNER, str(zygote_end.fileno()), script],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                pass_fds=(zygote_end.fileno(),),
+                env=env,
+                start_new_session=True,
+            )
+        self._control.settimeout(ZYGOTE_START_TIMEOUT_SEC)
+        try:
+            ready = json.loads(self._control.recv(MAX_MESSAGE_SIZE))
+            # zygote が読み込んだ、スクリプトのディレクトリ以下のモジュールと読み込んだ時点の更新時刻
+            self.module_mtimes: dict[str, int] = dict(ready["modules"])
+        except (OSError, ValueError, KeyError, TypeError):
+            self.close()
+            raise OSError(f"zygote for {script} did not start")
+        self._control.settimeout(None)
+
+    def modules_changed(self) -> bool:
+        """読み込んだローカルのモジュールが、zygote の起動後に書き換えられたか"""
+        try:
+            return any(os.stat(path).st_mtime_ns != mtime for path, mtime in self.module_mtimes.items())
+        except OSError:
+            return True
+
+    def send(self, message: bytes, fds: list[int]) -> None:
+        with self._send_lock:
+            socket.send_fds(self._control, [message], fds)
+
+    def close(self) -> None:
+        """control socket を閉じて zygote に終了を伝え、猶予時間内に終わらなければ止める"""
+        self._control.close()
+        try:
+            self.process.wait(timeout=TERMINATE_GRACE_SEC)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class PythonZygoteLauncher:
+    """``prepare`` したスクリプトのソルバーを、import 済みの zygote から fork して起動する
+
+    ``solver_launcher`` で ``spawn_solver`` の前に試す launcher にし、対象外のコマンドや zygote を起動できない場合は
+    ``None`` を返して通常の起動に任せる
+    スクリプトか、zygote が読み込んだスクリプトのディレクトリのモジュールを書き換えた場合は zygote を作り直す
+    """
+
+    def __init__(self) -> None:
+        self.fork_count = 0
+        self._scripts: set[tuple[str, str]] = set()
+        self._zygotes: dict[tuple[str, str, int], PythonZygote] = {}
+        self._failed: set[tuple[str, str, int]] = set()
+        self._lock = threading.Lock()
+        self._owner_pid = os.getpid()
+
+    def prepare(self, command: list[str], limits: SolverLimits = NO_LIMITS) -> None:
+        """``command`` を zygote から起動する対象にし、計測時間に import を含めないよう先に zygote を起動する"""
+        if zygote_script(command) is None:
+            return
+        with self._lock:
+            self._scripts.add((command[0], os.path.abspath(command[1])))
+        env = thread_environment(limits.threads, None) if limits.threads is not None else None
+        self._zygote(command, env)
+
+    def _zygote(self, command: list[str], env: Optional[dict[str, str]]) -> Optional[PythonZygote]:
+        script = zygote_script(command)
+        if script is None:
+            return None
+        key = (command[0], os.path.abspath(script), os.stat(script).st_mtime_ns)
+        with self._lock:
+            if os.getpid() != self._owner_pid:
+                # fork 前の zygote は親プロセスのものなので使わない
+                self._zygotes = {}
+                self._failed = set()
+                self._owner_pid = os.getpid()
+            if key[:2] not in self._scripts or key in self._failed:
+                return None
+            zygote = self._zygotes.get(key)
+            if zygote is not None and not zygote.modules_changed():
+                return zygote
+            for stale_key in [other for other in self._zygotes if other[:2] == key[:2]]:
+                self._zygotes.pop(stale_key).close()
+            try:
+                zygote = PythonZygote(command[0], key[1], env)
+            except OSError as error:
+                logger.warning(f"Failed to start the solver zygote for {script}; spawning normally: {error}")
+                self._failed.add(key)
+                return None
+            self._zygotes[key] = zygote
+            return zygote
+
+    def __call__(
+        self, command: list[str], cpu_id: Optional[CpuTarget], limits: SolverLimits, popen_kwargs: dict[str, Any]
+    ) -> Optional[subprocess.Popen]:
+        zygote = self._zygote(command, popen_kwargs.get("env"))
+        if zygote is None:
+            return None
+        request = {
+            "arguments": command[2:],
+            "cpus": None if cpu_id is None else sorted(cpu_set(cpu_id)),
+            "rlimits": solver_rlimits(limits),
+        }
+        try:
+            process = ZygotePopen(zygote, request, command, **popen_kwargs)
+        except OSError as error:
+            logger.warning(f"Solver zygote failed to fork; spawning normally: {error}")
+            with self._lock:
+                for key, running in list(self._zygotes.items()):
+                    if running is zygote:
+                        self._zygotes.pop(key).close()
+            return None
+        with self._lock:
+            self.fork_count += 1
+        return process
+
+    def close(self) -> None:
+        """zygote を終了する"""
+        with self._lock:
+            zygotes = list(self._zygotes.values()) if os.getpid() == self._owner_pid else []
+            self._zygotes = {}
+        for zygote in zygotes:
+            zygote.close()
@@ -0,0 +1,211 @@
+"""ソルバーの import を済ませて待機し、ケースごとに fork してソルバーを実行する zygote
+
+ソルバーと同じ Python で ``python3 zygote_runner.py <control fd> <script>`` として起動するため、標準ライブラリだけを使う
+control socket からは JSON の依頼と (状態を返す socket, stdin, stdout, stderr) の fd を受け取る
+状態を返す socket へは fork した子の pid を送り、終了後に wait4 の終了状態と資源使用量を送る
+起動を終えると、読み込んだスクリプトのディレクトリのモジュールと更新時刻を control socket へ送る
+"""
+
+import ast
+import importlib
+import io
+import json
+import os
+import resource
+import selectors
+import signal
+import socket
+import sys
+import traceback
+import types
+
+MAX_MESSAGE_SIZE = 1 << 20
+# 1 件の依頼で受け取る fd の最大数 (状態を返す socket と標準入出力)
+MAX_REQUEST_FDS = 4
+
+
+def _preload(script_path: str) -> types.CodeType:
+    """スクリプトを compile し、スクリプト中で import するモジュールを読み込んでおく"""
+    with open(script_path, "rb") as script_file:
+        source = script_file.read()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script_path)))
+    tree = ast.parse(source, script_path)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module is not None:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except BaseException:
+                # 条件付きの import などは、ケースの実行時に通常どおり処理させる
+                pass
+    return compile(tree, script_path, "exec")
+
+
+def _local_module_mtimes(script_path: str) -> dict[str, int]:
+    """読み込んだモジュールのうち、スクリプトのディレクトリ以下のファイル (venv を除く) と更新時刻"""
+    directory = os.path.join(os.path.dirname(os.path.abspath(script_path)), "")
+    mtimes = {}
+    for module in list(sys.modules.values()):
+        path = getattr(module, "__file__", None)
+        if path is None:
+            continue
+        path = os.path.abspath(path)
+        if not path.startswith(directory) or "site-packages" in path or "dist-packages" in path:
+            continue
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+    return mtimes
+
+
+def _reopen_standard_streams() -> None:
+    """fork 前の zygote の標準入出力の object を捨て、新しく起動した Python と同じバッファリングで開き直す"""
+    sys.stdin = io.TextIOWrapper(io.open(0, "rb", closefd=False), encoding=sys.stdin.encoding, errors=sys.stdin.errors)
+    sys.stdout = io.TextIOWrapper(
+        io.open(1, "wb", closefd=False), encoding=sys.stdout.encoding, errors=sys.stdout.errors
+    )
+    sys.stderr = io.TextIOWrapper(
+        io.open(2, "wb", closefd=False), encoding=sys.stderr.encoding, errors="backslashreplace", line_buffering=True
+    )
+
+
+def _run_child(code: types.CodeType, script_path: str, request: dict, stream_fds: list[int]) -> None:
+    """fork した子でケースのソルバーを実行し、戻らずに終了する"""
+    exit_code = 0
+    try:
+        os.setsid()
+        for target_fd, stream_fd in zip((0, 1, 2), stream_fds):
+            if stream_fd >= 0:
+                os.dup2(stream_fd, target_fd)
+        for stream_fd in stream_fds:
+            if stream_fd > 2:
+                os.close(stream_fd)
+        if request.get("cwd") is not None:
+            os.chdir(request["cwd"])
+        if request.get("env") is not None:
+            os.environ.clear()
+            os.environ.update(request["env"])
+        if request.get("cpus"):
+            os.sched_setaffinity(0, request["cpus"])
+        for name, (soft, hard) in request.get("rlimits", {}).items():
+            resource.setrlimit(getattr(resource, name), (soft, hard))
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        _reopen_standard_streams()
+        sys.argv = [script_path, *request["arguments"]]
+        main_module = types.ModuleType("__main__")
+        main_module.__file__ = script_path
+        sys.modules["__main__"] = main_module
+        exec(code, main_module.__dict__)
+    except SystemExit as error:
+        if error.code is None:
+            exit_code = 0
+        elif isinstance(error.code, int):
+            exit_code = error.code
+        else:
+            print(error.code, file=sys.stderr)
+            exit_code = 1
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except BaseException:
+            pass
+    os._exit(exit_code)
+
+
+def _send(status_socket: socket.socket, message: dict) -> None:
+    try:
+        status_socket.send(json.dumps(message).encode("utf-8"))
+    except OSError:
+        pass
+
+
+def main() -> None:
+    control = socket.socket(fileno=int(sys.argv[1]))
+    script_path = sys.argv[2]
+    code = _preload(script_path)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    wakeup_read, wakeup_write = os.pipe()
+    os.set_blocking(wakeup_read, False)
+    os.set_blocking(wakeup_write, False)
+    signal.set_wakeup_fd(wakeup_write)
+    signal.signal(signal.SIGCHLD, lambda _signum, _frame: None)
+    selector = selectors.DefaultSelector()
+    selector.register(control, selectors.EVENT_READ, "control")
+    selector.register(wakeup_read, selectors.EVENT_READ, "child")
+    # 実行中の子の pid と、終了を伝える socket
+    children: dict[int, socket.socket] = {}
+    # 準備ができたことを ahclib へ伝える
+    control.send(json.dumps({"modules": _local_module_mtimes(script_path)}).encode("utf-8"))
+
+    while True:
+        for key, _events in selector.select():
+            if key.data == "child":
+                try:
+                    while os.read(wakeup_read, 4096):
+                        pass
+                except BlockingIOError:
+                    pass
+                continue
+            message, fds, _flags, _address = socket.recv_fds(control, MAX_MESSAGE_SIZE, MAX_REQUEST_FDS)
+            if not message:
+                # ahclib が終了した
+                return
+            request = json.loads(message)
+            status_socket = socket.socket(fileno=fds[0])
+            received = iter(fds[1:])
+            stream_fds = [next(received) if present else -1 for present in request["streams"]]
+            pid = os.fork()
+            if pid == 0:
+                selector.close()
+                signal.set_wakeup_fd(-1)
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                for fd in (wakeup_read, wakeup_write):
+                    os.close(fd)
+                control.close()
+                status_socket.close()
+                for other in children.values():
+                    other.close()
+                _run_child(code, script_path, request, stream_fds)
+            for stream_fd in stream_fds:
+                if stream_fd >= 0:
+                    os.close(stream_fd)
+            children[pid] = status_socket
+            _send(status_socket, {"pid": pid})
+
+        while children:
+            try:
+                pid, status, usage = os.wait4(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            status_socket = children.pop(pid, None)
+            if status_socket is None:
+                continue
+            _send(
+                status_socket,
+                {
+                    "status": status,
+                    "usage": {
+                        "user_seconds": usage.ru_utime,
+                        "system_seconds": usage.ru_stime,
+                        "max_rss_kb": usage.ru_maxrss,
+                        "voluntary_switches": usage.ru_nvcsw,
+                        "involuntary_switches": usage.ru_nivcsw,
+                    },
+                },
+            )
+            status_socket.close()
+
+
+if __name__ == "__main__":
+    main()
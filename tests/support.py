@@ -0,0 +1,25 @@
+from typing import Any
+
+from ahclib.parallel_tester import ParallelTester
+
+
+def minimal_tester(**options: Any) -> ParallelTester:
+    """任意の機能を無効にした ``ParallelTester`` を ``__init__`` を通して作る
+
+    ``options`` は ``ParallelTester`` の引数で、``execute_command`` は空白区切りの文字列、``timeout`` はミリ秒で渡す
+    """
+    arguments: dict[str, Any] = {
+        "direction": "maximize",
+        "filename": "main.cpp",
+        "compile_command": None,
+        "execute_command": "",
+        "input_file_names": [],
+        "cpu_count": 1,
+        "verbose": False,
+        "get_score": sum,
+        "timeout": None,
+        "use_relative_score": False,
+        "pre_dir_name": "",
+        **options,
+    }
+    return ParallelTester(**arguments)
@@ -0,0 +1,146 @@
+import json
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from ahclib import admission
+from ahclib.admission import AdmissionController, AdmissionThresholds, SystemPressure, read_psi_avg10
+from ahclib.parallel_tester import ParallelTester
+
+from .support import minimal_tester
+
+
+class _PressureSequence:
+    """呼ばれるたびに次の値を返し、最後の値を返し続ける sampler"""
+
+    def __init__(self, *pressures: SystemPressure) -> None:
+        self.pressures = list(pressures)
+        self.lock = threading.Lock()
+
+    def __call__(self) -> SystemPressure:
+        with self.lock:
+            return self.pressures.pop(0) if len(self.pressures) > 1 else self.pressures[0]
+
+
+CALM = SystemPressure(cpu_pressure=1.0, memory_pressure=0.0, load_average=0.5, available_mb=4096)
+BUSY = SystemPressure(cpu_pressure=50.0, memory_pressure=0.0, load_average=0.5, available_mb=4096)
+# 再開の閾値 (20% × 0.8) より上なので止めたまま
+EASING = SystemPressure(cpu_pressure=18.0, memory_pressure=0.0, load_average=0.5, available_mb=4096)
+
+
+class AdmissionControllerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        patcher = mock.patch.object(admission, "ADMISSION_SAMPLE_SEC", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_psi_is_parsed(self) -> None:
+        with tempfile.TemporaryDirectory() as temporary_dir:
+            psi_path = Path(temporary_dir) / "cpu"
+            psi_path.write_text(
+                "some avg10=12.50 avg60=5.23 avg300=4.85 total=100\nfull avg10=0.00 avg60=0.00 avg300=0.00 total=0\n",
+                encoding="ascii",
+            )
+            self.assertEqual(read_psi_avg10(str(psi_path)), 12.5)
+            self.assertIsNone(read_psi_avg10(str(Path(temporary_dir) / "missing")))
+
+    def test_pause_and_resume_with_hysteresis(self) -> None:
+        controller = AdmissionController(
+            AdmissionThresholds(), cpu_count=4, sampler=_PressureSequence(BUSY, EASING, CALM)
+        )
+
+        with self.assertLogs("ahclib.admission", level="INFO") as logs:
+            self.assertFalse(controller.admit())
+            self.assertFalse(controller.admit())
+            self.assertTrue(controller.admit())
+
+        self.assertIn("cpu pressure 50.0% > 20.0%", logs.output[0])
+        self.assertIn("resumed", logs.output[-1])
+        summary = controller.summary()
+        self.assertEqual(summary["throttle_count"], 1)
+        self.assertIsNotNone(summary["events"][0]["seconds"])
+
+    def test_own_solvers_are_excluded_from_load(self) -> None:
+        loaded = SystemPressure(load_average=6.0)
+        controller = AdmissionController(AdmissionThresholds(), cpu_count=4, sampler=lambda: loaded)
+        controller.running = 3
+
+        self.assertTrue(controller.admit())
+        controller.running = 0
+        with self.assertLogs("ahclib.admission", level="WARNING"):
+            self.assertFalse(controller.admit())
+
+    def test_memory_shortage_pauses_until_max_pause(self) -> None:
+        low_memory = SystemPressure(available_mb=100)
+        controller = AdmissionController(AdmissionThresholds(), sampler=lambda: low_memory, max_pause_sec=0)
+
+        with self.assertLogs("ahclib.admission", level="WARNING") as logs:
+            self.assertFalse(controller.admit())
+            self.assertTrue(controller.admit())
+            controller.running = 1
+            self.assertFalse(controller.admit())
+        self.assertIn("available memory 100 MB < 512 MB", logs.output[0])
+
+    def test_cancel_releases_waiting_threads(self) -> None:
+        controller = AdmissionController(AdmissionThresholds(), sampler=lambda: BUSY)
+        waiter = threading.Thread(target=controller.gate(None).acquire)
+        with self.assertLogs("ahclib.admission", level="WARNING"):
+            waiter.start()
+            waiter.join(0.3)
+            self.assertTrue(waiter.is_alive())
+            controller.cancel()
+            waiter.join(5)
+        self.assertFalse(waiter.is_alive())
+
+
+class AdmissionTesterTest(unittest.TestCase):
+    def setUp(self) -> None:
+        patcher = mock.patch.object(admission, "ADMISSION_SAMPLE_SEC", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.input_path = Path(self._temporary_dir.name) / "0000.txt"
+        self.input_path.write_text("abc\n", encoding="utf-8")
+        self.solver_path = Path(self._temporary_dir.name) / "solver.py"
+        self.solver_path.write_text("import sys\nprint('score = 7', file=sys.stderr)\n", encoding="utf-8")
+
+    def tearDown(self) -> None:
+        self._temporary_dir.cleanup()
+
+    def _tester(self, engine: str) -> ParallelTester:
+        tester = minimal_tester(
+            input_file_names=[str(self.input_path)] * 3,
+            execute_command=f"{sys.executable} {self.solver_path}",
+            timeout=10_000,
+            cpu_count=2,
+            engine=engine,
+            admission=AdmissionController(AdmissionThresholds(), sampler=_PressureSequence(BUSY, BUSY, CALM)),
+        )
+        return tester
+
+    def test_paused_cases_run_after_pressure_clears(self) -> None:
+        for engine in ("thread", "event"):
+            with self.subTest(engine=engine):
+                tester = self._tester(engine)
+                with self.assertLogs("ahclib.admission", level="INFO"):
+                    scores = tester.run()
+
+                self.assertEqual(scores, [7, 7, 7])
+                self.assertEqual(tester.last_admission["throttle_count"], 1)
+                self.assertEqual(tester.admission.running, 0)
+
+    def test_summary_is_written_to_output_dir(self) -> None:
+        tester = self._tester("thread")
+        tester.admission.events.append(admission.AdmissionEvent("cpu pressure", 0.0, 1.5))
+        tester.admission.write_summary(self._temporary_dir.name)
+
+        with open(Path(self._temporary_dir.name) / admission.ADMISSION_FILE, encoding="utf-8") as summary_file:
+            summary = json.load(summary_file)
+        self.assertEqual((summary["throttle_count"], summary["throttled_seconds"]), (1, 1.5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,220 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from ahclib import parallel_tester
+from ahclib.case_schedule import (
+    CaseMemoryHistory,
+    CaseTimeHistory,
+    MemoryBudget,
+    WorkStealingQueue,
+    latest_result_csv,
+    plan_longest_first,
+    predicted_makespan,
+)
+
+from .support import minimal_tester
+
+
+class LongestFirstPlanTest(unittest.TestCase):
+    def test_longest_cases_are_spread_over_lanes(self) -> None:
+        predicted = [1.0, 3.0, 5.0, 3.0, 4.0]
+        lanes = plan_longest_first(predicted, 2)
+
+        self.assertEqual([list(lane) for lane in lanes], [[2, 3], [4, 1, 0]])
+        self.assertEqual(predicted_makespan(predicted, lanes), 8.0)
+
+    def test_idle_lane_steals_from_end_of_longest_lane(self) -> None:
+        predicted = [5.0, 1.0, 1.0, 2.0, 1.0]
+        queue = WorkStealingQueue(plan_longest_first(predicted, 2), predicted)
+
+        self.assertEqual([queue.next_case(0), queue.next_case(0)], [0, 4])
+        self.assertEqual([queue.next_case(1) for _ in range(3)], [3, 1, 2])
+        self.assertIsNone(queue.next_case(0))
+        self.assertEqual(queue.stolen_count, 1)
+
+
+class CaseTimeHistoryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._temporary_dir.name)
+
+    def tearDown(self) -> None:
+        self._temporary_dir.cleanup()
+
+    def test_latest_result_csv_is_used_until_history_exists(self) -> None:
+        for run_name, seconds in (("2024_01_01_00_00_00", 9.0), ("2024_01_02_00_00_00", 2.0)):
+            run_dir = self.directory / "all_tests" / run_name
+            run_dir.mkdir(parents=True)
+            (run_dir / "result.csv").write_text(
+                f"filename,score,state,time\na.txt,1,AC,{seconds}\nb.txt,0,ERROR,-1\nc.txt,1,AC,4.0\n",
+                encoding="utf-8",
+            )
+        fallback_csv = latest_result_csv(str(self.directory / "all_tests"))
+        history = CaseTimeHistory(str(self.directory / "case_times.json"), fallback_csv)
+
+        self.assertEqual(history.predict(["a.txt", "b.txt", "c.txt"]), ([2.0, 3.0, 4.0], 2))
+
+        history.record({"a.txt": 4.0, "b.txt": 1.0})
+
+        saved = json.loads((self.directory / "case_times.json").read_text(encoding="utf-8"))
+        self.assertEqual(saved, {"a.txt": 3.0, "b.txt": 1.0, "c.txt": 4.0})
+        reloaded = CaseTimeHistory(str(self.directory / "case_times.json"))
+        self.assertEqual(reloaded.predict(["a.txt", "d.txt"]), ([3.0, 3.0], 1))
+
+    def test_tester_starts_longest_cases_first(self) -> None:
+        history = CaseTimeHistory(str(self.directory / "case_times.json"))
+        history.record({"short.txt": 0.01, "long.txt": 0.2, "middle.txt": 0.05})
+        tester = minimal_tester(case_time_history=history)
+
+        started: list[str] = []
+        started_lock = threading.Lock()
+
+        def worker(arguments):
+            input_file, cpu_id, _cpu_lock = arguments
+            with started_lock:
+                started.append(input_file)
+            time.sleep(0.01)
+            return input_file, cpu_id
+
+        input_files = ["short.txt", "long.txt", "middle.txt"]
+        results = tester._map_in_parallel(worker, [(input_file,) for input_file in input_files])
+
+        self.assertEqual(results, [(input_file, None) for input_file in input_files])
+        self.assertEqual(started, ["long.txt", "middle.txt", "short.txt"])
+        predicted, actual = tester.last_makespan
+        self.assertAlmostEqual(predicted, 0.26)
+        self.assertGreater(actual, 0)
+
+
+class MemoryBudgetTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._temporary_dir.name)
+
+    def tearDown(self) -> None:
+        self._temporary_dir.cleanup()
+
+    def test_case_that_fits_is_started_first(self) -> None:
+        budget = MemoryBudget(1000, [600, 600, 100, 2000])
+
+        self.assertEqual([budget.next_case(), budget.next_case()], [0, 2])
+        self.assertEqual(budget.deferred_count, 1)
+        budget.release(0)
+        budget.release(2)
+        self.assertEqual(budget.next_case(), 1)
+        budget.release(1)
+        # 実行中のケースがなければ budget を超えるケースも起動する
+        self.assertEqual(budget.next_case(), 3)
+        self.assertEqual(budget.peak_reserved_kb, 2000)
+
+    def test_waiting_lane_is_released_by_cancel(self) -> None:
+        budget = MemoryBudget(1000, [800, 800])
+        self.assertEqual(budget.next_case(), 0)
+        waiter = threading.Thread(target=budget.next_case)
+        waiter.start()
+        waiter.join(0.2)
+        self.assertTrue(waiter.is_alive())
+        budget.cancel()
+        waiter.join(5)
+        self.assertFalse(waiter.is_alive())
+
+    def test_unknown_case_uses_nearest_input_params(self) -> None:
+        for name, size in (("small.txt", 10), ("large.txt", 1000), ("new.txt", 900)):
+            (self.directory / name).write_text(f"{size}\n", encoding="utf-8")
+
+        def parse_input_params(file_path: str) -> dict[str, int]:
+            return {"N": int(Path(file_path).read_text(encoding="utf-8"))}
+
+        history = CaseMemoryHistory(str(self.directory / "case_memory.json"), input_parser=parse_input_params)
+        small, large, new = (str(self.directory / name) for name in ("small.txt", "large.txt", "new.txt"))
+        history.record({small: 2048, large: 65536})
+
+        self.assertEqual(history.predict([small, new]), ([2048, 65536], 1))
+        self.assertEqual(CaseMemoryHistory(history.path).predict([new]), ([(2048 + 65536) / 2], 0))
+
+    def test_tester_keeps_concurrent_cases_within_budget(self) -> None:
+        history = CaseMemoryHistory(str(self.directory / "case_memory.json"))
+        history.record({"heavy1.txt": 700 * 1024, "heavy2.txt": 700 * 1024, "light.txt": 100 * 1024})
+        tester = minimal_tester(
+            cpu_count=2,
+            case_memory_history=history,
+            memory_budget_mb=1000,
+        )
+
+        running: set[str] = set()
+        overlaps: list[set[str]] = []
+        running_lock = threading.Lock()
+
+        def worker(arguments):
+            input_file, _cpu_id, _cpu_lock = arguments
+            with running_lock:
+                running.add(input_file)
+                overlaps.append(set(running))
+            time.sleep(0.05)
+            with running_lock:
+                running.discard(input_file)
+            return input_file
+
+        input_files = ["heavy1.txt", "heavy2.txt", "light.txt"]
+        with self.assertLogs("ahclib.parallel_tester", level="INFO") as logs:
+            results = tester._map_in_parallel(worker, [(input_file,) for input_file in input_files])
+
+        self.assertEqual(results, input_files)
+        self.assertFalse(any({"heavy1.txt", "heavy2.txt"} <= overlap for overlap in overlaps))
+        self.assertIn("1 cases started out of order", logs.output[-1])
+
+    def test_opt_starts_a_fitting_case_instead_of_waiting(self) -> None:
+        history = CaseMemoryHistory(str(self.directory / "case_memory.json"))
+        history.record({"heavy1.txt": 700 * 1024, "heavy2.txt": 700 * 1024, "light.txt": 100 * 1024})
+        # seed 5 の並べ替えでは入力順のまま heavy1, heavy2, light になる
+        tester = minimal_tester(
+            input_file_names=["heavy1.txt", "heavy2.txt", "light.txt"],
+            optuna_seed=5,
+            cpu_count=2,
+            case_memory_history=history,
+            memory_budget_mb=1000,
+        )
+
+        class Trial:
+            number = 0
+
+            def report(self, _score, _step) -> None:
+                return None
+
+            def should_prune(self) -> bool:
+                return False
+
+        started: list[str] = []
+        started_lock = threading.Lock()
+
+        def worker(arguments):
+            input_file, case_index = arguments[:2]
+            with started_lock:
+                started.append(input_file)
+            time.sleep(0.05)
+            return case_index, 1.0
+
+        with mock.patch.object(parallel_tester, "_worker_process_file_opt_pruner", side_effect=worker):
+            result = tester.run_opt_pruner(Trial())
+
+        self.assertEqual(result.scores, [1.0, 1.0, 1.0])
+        # heavy2 は heavy1 と同時に収まらないため、後ろの light を先に起動する
+        self.assertEqual(set(started[:2]), {"heavy1.txt", "light.txt"})
+        self.assertEqual(started[2], "heavy2.txt")
+
+    def test_memory_history_is_built_only_with_budget(self) -> None:
+        settings = SimpleNamespace(memory_budget_mb=None)
+        self.assertIsNone(parallel_tester.build_case_memory_history(settings))
+
+        settings.memory_budget_mb = 1024
+        self.assertIsNotNone(parallel_tester.build_case_memory_history(settings))
+
+
+if __name__ == "__main__":
+    unittest.main()
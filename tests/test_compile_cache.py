@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from ahclib import parallel_tester
+from ahclib.compile_cache import CompileCache, compile_output_path, parse_dependency_output
+
+from .support import minimal_tester
+
+
+class CompileCacheParsingTest(unittest.TestCase):
+    def test_dependency_output_is_parsed(self) -> None:
+        text = "main.o: main.cpp lib/a.h \\\n  my\\ dir/b.h lib/a.h\n"
+
+        self.assertEqual(parse_dependency_output(text), ["main.cpp", "lib/a.h", "my dir/b.h"])
+
+    def test_output_path_is_found(self) -> None:
+        self.assertEqual(compile_output_path(["g++", "main.cpp", "-o", "a.out", "-O2"]), "a.out")
+        self.assertEqual(compile_output_path(["g++", "main.cpp", "-obin/a.out"]), "bin/a.out")
+        self.assertIsNone(compile_output_path(["g++", "main.cpp"]))
+
+    def test_unknown_compiler_is_not_cached(self) -> None:
+        cache = CompileCache("cache")
+        with self.assertLogs("ahclib.compile_cache", "INFO") as logs:
+            self.assertIsNone(cache.key(["cargo", "build", "--release"]))
+            self.assertIsNone(cache.key(["g++", "main.cpp"]))
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("Compile cache is disabled", logs.output[0])
+
+    def test_concurrent_restores_use_separate_temporary_files(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            binary = Path(directory) / "a.out"
+            binary.write_bytes(b"binary")
+            cache = CompileCache(str(Path(directory) / "cache"))
+            cache.store("key", str(binary), 1.5)
+            binary.unlink()
+
+            with mock.patch("ahclib.compile_cache.shutil.copy2", wraps=shutil.copy2) as copy:
+                self.assertEqual(cache.restore("key", str(binary)), 1.5)
+                binary.unlink()
+                self.assertEqual(cache.restore("key", str(binary)), 1.5)
+
+            temporary_paths = [call.args[1] for call in copy.call_args_list]
+            self.assertNotEqual(temporary_paths[0], temporary_paths[1])
+            self.assertEqual(binary.read_bytes(), b"binary")
+            self.assertEqual(sorted(os.listdir(directory)), ["a.out", "cache"])
+
+
+@unittest.skipIf(shutil.which("g++") is None, "g++ が必要")
+class CompileCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._temporary_dir.name)
+        self.header = self.directory / "value.h"
+        self.header.write_text("constexpr int VALUE = 1;\n", encoding="utf-8")
+        self.source = self.directory / "main.cpp"
+        self.source.write_text('#include "value.h"\nint main() { return VALUE - 1; }\n', encoding="utf-8")
+        self.binary = self.directory / "a.out"
+        self.command = ["g++", str(self.source), "-O0", "-o", str(self.binary)]
+        self.cache = CompileCache(str(self.directory / "cache"))
+
+    def tearDown(self) -> None:
+        self._temporary_dir.cleanup()
+
+    def test_key_follows_included_headers(self) -> None:
+        key = self.cache.key(self.command)
+        self.assertIsNotNone(key)
+        self.assertEqual(self.cache.key(self.command), key)
+
+        self.header.write_text("constexpr int VALUE = 2;\n", encoding="utf-8")
+        self.assertNotEqual(self.cache.key(self.command), key)
+
+    def test_tester_restores_cached_binary(self) -> None:
+        tester = minimal_tester(
+            compile_command=" ".join(self.command),
+            compile_cache=self.cache,
+        )
+
+        with self.assertLogs(parallel_tester.logger, "INFO") as logs:
+            tester.compile()
+        self.assertIn("Compile cache miss", logs.output[-1])
+        compiled = self.binary.read_bytes()
+
+        self.binary.unlink()
+        with (
+            mock.patch.object(parallel_tester.subprocess, "run", wraps=parallel_tester.subprocess.run) as run,
+            self.assertLogs(parallel_tester.logger, "INFO") as logs,
+        ):
+            tester.compile()
+
+        self.assertIn("Compile cache hit", logs.output[-1])
+        self.assertEqual(self.binary.read_bytes(), compiled)
+        self.assertNotIn(self.command, [call.args[0] for call in run.call_args_list])
+
+
+if __name__ == "__main__":
+    unittest.main()
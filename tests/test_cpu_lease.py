@@ -0,0 +1,103 @@
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from ahclib import cpu_lease
+from ahclib.cpu_lease import CpuLeaseRegistry, cpu_lease_supported, format_lease_status
+
+# 別プロセスで CPU 5 を借りたまま止まる
+HOLDER_SCRIPT = (
+    "import sys, time\n"
+    "from ahclib.cpu_lease import CpuLeaseRegistry\n"
+    "lease = CpuLeaseRegistry('opt', sys.argv[1]).lease([5])\n"
+    "lease.acquire()\n"
+    "print('held', flush=True)\n"
+    "time.sleep(60)\n"
+)
+
+
+@unittest.skipUnless(cpu_lease_supported(), "flock is not available")
+class CpuLeaseTest(unittest.TestCase):
+    def setUp(self) -> None:
+        patcher = mock.patch.object(cpu_lease, "LEASE_REPORT_SEC", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.lease_dir = self._temporary_dir.name
+        self.test_registry = CpuLeaseRegistry("test", self.lease_dir)
+        self.opt_registry = CpuLeaseRegistry("opt", self.lease_dir)
+
+    def tearDown(self) -> None:
+        self._temporary_dir.cleanup()
+
+    def test_leased_cpu_is_not_shared(self) -> None:
+        opt_lease = self.opt_registry.lease([3])
+        test_lease = self.test_registry.lease([3])
+
+        self.assertTrue(opt_lease.acquire(False))
+        with self.assertLogs("ahclib.cpu_lease", level="INFO") as logs:
+            self.assertFalse(test_lease.acquire(False))
+        self.assertIn("cpu 3 by opt", logs.output[0])
+        self.assertEqual([(holder.cpu_id, holder.role) for holder in self.test_registry.holders()], [(3, "opt")])
+
+        opt_lease.release()
+        self.assertTrue(test_lease.acquire(False))
+        test_lease.release()
+        self.assertEqual(self.test_registry.holders(), [])
+
+    def test_waiting_test_takes_cpu_before_opt(self) -> None:
+        opt_lease = self.opt_registry.lease([1])
+        test_lease = self.test_registry.lease([1])
+        self.assertTrue(opt_lease.acquire(False))
+        with self.assertLogs("ahclib.cpu_lease", level="INFO"):
+            self.assertFalse(test_lease.acquire(False))
+        self.assertIn("test:", format_lease_status(self.test_registry)[1])
+
+        opt_lease.release()
+        self.assertFalse(opt_lease.acquire(False))
+        self.assertTrue(test_lease.acquire(False))
+        self.assertEqual(self.test_registry.waiters(1)[0].role, "opt")
+        test_lease.release()
+        self.assertTrue(opt_lease.acquire(False))
+        opt_lease.release()
+
+    def test_cpu_group_is_leased_all_or_nothing(self) -> None:
+        single = self.opt_registry.lease([2])
+        group = self.opt_registry.lease([1, 2])
+        self.assertTrue(single.acquire(False))
+        with self.assertLogs("ahclib.cpu_lease", level="INFO"):
+            self.assertFalse(group.acquire(False))
+        self.assertEqual([holder.cpu_id for holder in self.opt_registry.holders()], [2])
+
+        single.release()
+        self.assertTrue(group.acquire(False))
+        self.assertEqual([holder.cpu_id for holder in self.opt_registry.holders()], [1, 2])
+        group.release()
+
+    def test_lease_of_killed_process_is_released(self) -> None:
+        holder = subprocess.Popen(
+            [sys.executable, "-c", HOLDER_SCRIPT, self.lease_dir], stdout=subprocess.PIPE, text=True
+        )
+        try:
+            self.assertEqual(holder.stdout.readline().strip(), "held")
+            self.assertEqual(self.test_registry.holders()[0].pid, holder.pid)
+            lease = self.test_registry.lease([5])
+            with self.assertLogs("ahclib.cpu_lease", level="INFO"):
+                self.assertFalse(lease.acquire(False))
+        finally:
+            holder.kill()
+            holder.wait()
+            holder.stdout.close()
+
+        deadline = time.monotonic() + 5
+        while not lease.acquire(False):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.05)
+        lease.release()
+
+
+if __name__ == "__main__":
+    unittest.main()
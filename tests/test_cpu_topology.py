@@ -0,0 +1,85 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from ahclib import parallel_tester
+from ahclib.cpu_topology import normalize_placement, parse_cpu_list, read_cpu_topology, select_cpus
+
+
+def _write_cpu(sys_dir: Path, cpu_id: int, core_id: int, siblings: str, node_id: int, capacity: int) -> None:
+    cpu_dir = sys_dir / f"cpu{cpu_id}"
+    (cpu_dir / "topology").mkdir(parents=True)
+    (cpu_dir / f"node{node_id}").mkdir()
+    (cpu_dir / "topology" / "core_id").write_text(f"{core_id}\n", encoding="utf-8")
+    (cpu_dir / "topology" / "physical_package_id").write_text(f"{node_id}\n", encoding="utf-8")
+    (cpu_dir / "topology" / "thread_siblings_list").write_text(f"{siblings}\n", encoding="utf-8")
+    (cpu_dir / "cpu_capacity").write_text(f"{capacity}\n", encoding="utf-8")
+
+
+class CpuTopologyTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.sys_dir = Path(self._temporary_dir.name)
+        # node 0 は SMT ありの P コア 2 つ (0,4 と 1,5) と E コア 2 つ (2, 3)、node 1 は P コア 6,7
+        for cpu_id, core_id, siblings, node_id, capacity in (
+            (0, 0, "0,4", 0, 1024),
+            (1, 1, "1,5", 0, 1024),
+            (2, 8, "2", 0, 512),
+            (3, 9, "3", 0, 512),
+            (4, 0, "0,4", 0, 1024),
+            (5, 1, "1,5", 0, 1024),
+            (6, 0, "6-7", 1, 1024),
+            (7, 0, "6-7", 1, 1024),
+        ):
+            _write_cpu(self.sys_dir, cpu_id, core_id, siblings, node_id, capacity)
+        self.topology = read_cpu_topology(range(8), str(self.sys_dir))
+
+    def tearDown(self) -> None:
+        self._temporary_dir.cleanup()
+
+    def test_cpu_list_is_expanded(self) -> None:
+        self.assertEqual(parse_cpu_list("0-2,8,10-11\n"), (0, 1, 2, 8, 10, 11))
+
+    def test_topology_is_read_from_sys(self) -> None:
+        info = self.topology[5]
+        self.assertEqual((info.core_id, info.node_id, info.thread_siblings, info.capacity), (1, 0, (1, 5), 1024))
+        self.assertEqual(self.topology[4].core_key, self.topology[0].core_key)
+        self.assertIsNone(read_cpu_topology([9], str(self.sys_dir))[9].core_id)
+
+    def test_without_placement_lowest_cpu_is_reserved(self) -> None:
+        selection = select_cpus(range(8), 100, (), self.topology)
+        self.assertEqual(selection.cpu_ids, (1, 2, 3, 4, 5, 6, 7))
+
+    def test_physical_core_skips_siblings_of_reserved_cpu(self) -> None:
+        selection = select_cpus(range(8), 100, ("physical_core",), self.topology)
+        self.assertEqual(selection.cpu_ids, (1, 2, 3, 6))
+        self.assertTrue(any("SMT" in reason for reason in selection.reasons))
+
+    def test_policies_are_applied_in_order(self) -> None:
+        selection = select_cpus(range(8), 100, ("physical_core", "fastest"), self.topology)
+        self.assertEqual(selection.cpu_ids, (1, 6))
+        selection = select_cpus(range(8), 100, ("physical_core", "same_node"), self.topology)
+        self.assertEqual(selection.cpu_ids, (1, 2, 3))
+        selection = select_cpus(range(8), 2, ("fastest",), self.topology)
+        self.assertEqual(selection.cpu_ids, (1, 4))
+
+    def test_unknown_policy_is_rejected(self) -> None:
+        self.assertEqual(normalize_placement("fastest"), ("fastest",))
+        with self.assertRaisesRegex(ValueError, "cpu_placement"):
+            normalize_placement(["physical_core", "smt"])
+
+    def test_affinity_ids_use_placement(self) -> None:
+        topology = self.topology
+        with (
+            mock.patch.object(parallel_tester.os, "name", "posix"),
+            mock.patch.object(parallel_tester.os, "sched_getaffinity", return_value=set(range(8)), create=True),
+            mock.patch.object(parallel_tester, "read_cpu_topology", return_value=topology),
+            self.assertLogs("ahclib.cpu_topology", level="INFO") as logs,
+        ):
+            self.assertEqual(parallel_tester.get_cpu_affinity_ids(3, ["physical_core"]), (1, 2, 3))
+        self.assertIn("CPU placement: 1 (node 0, core 0:1, capacity 1024)", logs.output[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from ahclib.input_gen import InputGenerator, resolve_input_file_names
+
+# 呼び出し回数を calls.txt に残し、シードから決まる入力を標準出力へ書く
+STDOUT_GENERATOR = (
+    "import os, sys\n"
+    "with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'calls.txt'), 'a') as calls:\n"
+    "    calls.write(sys.argv[1] + '\\n')\n"
+    "seed = int(sys.argv[1])\n"
+    "if seed < 0:\n"
+    "    sys.exit(1)\n"
+    "print(seed * 2)\n"
+)
+
+# 公式の gen と同じく seeds.txt を読んで ./in/0000.txt へ書く
+OFFICIAL_GENERATOR = (
+    "import os, sys\n"
+    "seeds = open(sys.argv[1]).read().split()\n"
+    "os.makedirs('in', exist_ok=True)\n"
+    "for index, seed in enumerate(seeds):\n"
+    "    with open(os.path.join('in', f'{index:04}.txt'), 'w') as input_file:\n"
+    "        print(f'seed {seed}', file=input_file)\n"
+)
+
+
+class InputGeneratorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._temporary_dir.name)
+        self.generator_path = self.directory / "gen.py"
+        self.generator_path.write_text(STDOUT_GENERATOR, encoding="utf-8")
+        self.gen_dir = self.directory / "in"
+
+    def tearDown(self) -> None:
+        self._temporary_dir.cleanup()
+
+    def _generator(self, seeds, source=None) -> InputGenerator:
+        command = f"{sys.executable} {self.generator_path} {{seed}}" if source is None else source
+        return InputGenerator(command, seeds, gen_dir=str(self.gen_dir), njobs=2)
+
+    def _calls(self) -> list[str]:
+        calls_path = self.directory / "calls.txt"
+        return calls_path.read_text(encoding="utf-8").split() if calls_path.exists() else []
+
+    def test_inputs_are_generated_from_stdout(self) -> None:
+        summary = self._generator([3, 5, 7]).run()
+
+        self.assertEqual(len(summary.generated), 3)
+        self.assertEqual(
+            [(self.gen_dir / f"000{index}.txt").read_text(encoding="utf-8") for index in range(3)],
+            ["6\n", "10\n", "14\n"],
+        )
+
+    def test_matching_inputs_are_skipped(self) -> None:
+        self._generator([3, 5]).run()
+        summary = self._generator([3, 5, 7]).run()
+
+        self.assertEqual(summary.skipped, [str(self.gen_dir / "0000.txt"), str(self.gen_dir / "0001.txt")])
+        self.assertEqual(summary.generated, [str(self.gen_dir / "0002.txt")])
+        self.assertEqual(sorted(self._calls()), ["3", "5", "7"])
+
+    def test_changed_seed_or_generator_is_regenerated(self) -> None:
+        self._generator([3, 5]).run()
+        summary = self._generator([3, 6]).run()
+        self.assertEqual(summary.generated, [str(self.gen_dir / "0001.txt")])
+
+        self.generator_path.write_text(STDOUT_GENERATOR + "# updated\n", encoding="utf-8")
+        summary = self._generator([3, 6]).run()
+        self.assertEqual(len(summary.generated), 2)
+        self.assertEqual((self.gen_dir / "0001.txt").read_text(encoding="utf-8"), "12\n")
+
+    def test_failed_seed_is_reported_and_retried(self) -> None:
+        summary = self._generator([1, -1]).run()
+
+        self.assertEqual(summary.failed, [str(self.gen_dir / "0001.txt")])
+        self.assertFalse((self.gen_dir / "0001.txt").exists())
+        self.assertEqual(self._generator([1, -1]).run().failed, summary.failed)
+
+    def test_official_generator_reads_seeds_file(self) -> None:
+        official_path = self.directory / "official_gen.py"
+        official_path.write_text(OFFICIAL_GENERATOR, encoding="utf-8")
+        summary = self._generator([10, 20], f"{sys.executable} {official_path} {{seeds}}").run()
+
+        self.assertEqual(len(summary.generated), 2)
+        self.assertEqual((self.gen_dir / "0001.txt").read_text(encoding="utf-8"), "seed 20\n")
+        self.assertFalse((self.directory / "in" / "in").exists())
+
+    def test_generated_files_replace_input_file_names(self) -> None:
+        class Settings:
+            input_file_names = ["./other/0000.txt"]
+            gen_command = "gen {seed}"
+            gen_seeds = [5, 6]
+            gen_dir = "./generated"
+
+        self.assertEqual(
+            resolve_input_file_names(Settings),
+            [os.path.join("./generated", "0000.txt"), os.path.join("./generated", "0001.txt")],
+        )
+        Settings.gen_command = None
+        self.assertEqual(resolve_input_file_names(Settings), ["./other/0000.txt"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,9 @@
 import collections
+import csv
+import math
+import os
 import subprocess
+import sys
 import tempfile
 import threading
 import time
@@ -7,9 +11,31 @@ import unittest
 from pathlib import Path
 from unittest import mock
 
-from ahclib import parallel_tester
+from ahclib import parallel_tester, solver_engine
 from ahclib.main import get_args, resolve_cpu_affinity
 from ahclib.parallel_tester import ParallelTester
+from ahclib.solver_engine import NO_LIMITS, SolverLimits, SolverUsage, spawn_solver
+
+from .support import minimal_tester
+
+
+class _FakeProcess:
+    def __init__(self, stdout, stderr, returncode: int = 0) -> None:
+        self.stdout = stdout
+        self.stderr = stderr
+        self.returncode = returncode
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        return None
+
+    def communicate(self, input=None, timeout=None):
+        return self.stdout, self.stderr
+
+    def kill(self) -> None:
+        return None
 
 
 class CpuAffinityTest(unittest.TestCase):
@@ -65,7 +91,7 @@ class CpuAffinityTest(unittest.TestCase):
             with self.assertRaisesRegex(RuntimeError, "Linux"):
                 parallel_tester.get_cpu_affinity_ids(1)
 
-    def test_missing_taskset_reports_an_error(self) -> None:
+    def test_taskset_is_not_required(self) -> None:
         with (
             mock.patch.object(parallel_tester.os, "name", "posix"),
             mock.patch.object(
@@ -76,8 +102,42 @@ class CpuAffinityTest(unittest.TestCase):
             ),
             mock.patch.object(parallel_tester.shutil, "which", return_value=None),
         ):
-            with self.assertRaisesRegex(RuntimeError, "taskset"):
-                parallel_tester.get_cpu_affinity_ids(1)
+            self.assertEqual(parallel_tester.get_cpu_affinity_ids(1), (1,))
+
+    def test_cpu_groups_are_formed_for_multithreaded_solvers(self) -> None:
+        self.assertEqual(parallel_tester.group_cpu_ids((1, 2, 3, 4, 5), 2), ((1, 2), (3, 4)))
+        self.assertEqual(parallel_tester.group_cpu_ids((1, 2), 4), ((1, 2),))
+        self.assertEqual(parallel_tester.group_cpu_ids((1, 2), 1), (1, 2))
+        with (
+            mock.patch.object(parallel_tester.os, "name", "posix"),
+            mock.patch.object(
+                parallel_tester.os,
+                "sched_getaffinity",
+                return_value=set(range(10)),
+                create=True,
+            ),
+        ):
+            self.assertEqual(parallel_tester.get_cpu_affinity_ids(2, cpus_per_case=3), ((1, 2, 3), (4, 5, 6)))
+            self.assertEqual(parallel_tester.get_cpu_affinity_ids(100, cpus_per_case=4), ((1, 2, 3, 4), (5, 6, 7, 8)))
+        self.assertEqual(
+            parallel_tester._command_with_cpu_affinity(["./a.out"], (2, 3)),
+            ["taskset", "--cpu-list", "2,3", "./a.out"],
+        )
+
+    @unittest.skipUnless(hasattr(os, "sched_getaffinity"), "CPU グループは Linux 専用")
+    def test_thread_count_is_exported_to_solver(self) -> None:
+        source = "import os; print(os.environ['OMP_NUM_THREADS'], len(os.sched_getaffinity(0)))"
+        cpu_group = tuple(sorted(os.sched_getaffinity(0)))
+        process = spawn_solver(
+            [sys.executable, "-c", source],
+            cpu_group,
+            SolverLimits(threads=3),
+            stdout=subprocess.PIPE,
+            env={**os.environ, "OMP_NUM_THREADS": "64"},
+        )
+        stdout, _ = process.communicate()
+
+        self.assertEqual(stdout.split(), [b"3", str(len(cpu_group)).encode()])
 
     def test_solver_command_is_wrapped_with_taskset(self) -> None:
         self.assertEqual(
@@ -87,29 +147,26 @@ class CpuAffinityTest(unittest.TestCase):
         command = ["./a.out"]
         self.assertIs(parallel_tester._command_with_cpu_affinity(command, None), command)
 
-    def test_execute_solver_uses_wrapped_command(self) -> None:
-        completed = subprocess.CompletedProcess(args=[], returncode=0, stdout="output", stderr="Score = 10\n")
+    def test_execute_solver_pins_solver_without_taskset(self) -> None:
+        process = _FakeProcess("output", "Score = 10\n")
         with tempfile.TemporaryDirectory() as temporary_dir:
             input_path = Path(temporary_dir) / "0000.txt"
             input_path.write_text("input", encoding="utf-8")
-            with mock.patch.object(parallel_tester.subprocess, "run", return_value=completed) as run:
+            with mock.patch.object(parallel_tester, "spawn_solver", return_value=process) as spawn:
                 result = parallel_tester._execute_solver(str(input_path), ["./a.out"], None, True, cpu_id=7)
 
         self.assertEqual(result[0], "AC")
         self.assertEqual(result[1], 10)
-        self.assertEqual(
-            run.call_args.args[0],
-            ["taskset", "--cpu-list", "7", "./a.out"],
-        )
-        self.assertEqual(run.call_args.kwargs["stdout"], subprocess.PIPE)
-        self.assertEqual(run.call_args.kwargs["stderr"], subprocess.PIPE)
+        self.assertEqual(spawn.call_args.args, (["./a.out"], 7))
+        self.assertEqual(spawn.call_args.kwargs["stdout"], subprocess.PIPE)
+        self.assertEqual(spawn.call_args.kwargs["stderr"], subprocess.PIPE)
 
     def test_execute_solver_discards_stdout_when_not_recording(self) -> None:
-        completed = subprocess.CompletedProcess(args=[], returncode=0, stdout=None, stderr="Score = 10\n")
+        process = _FakeProcess(None, "Score = 10\n")
         with tempfile.TemporaryDirectory() as temporary_dir:
             input_path = Path(temporary_dir) / "0000.txt"
             input_path.write_text("input", encoding="utf-8")
-            with mock.patch.object(parallel_tester.subprocess, "run", return_value=completed) as run:
+            with mock.patch.object(parallel_tester, "spawn_solver", return_value=process) as spawn:
                 result = parallel_tester._execute_solver(
                     str(input_path),
                     ["./a.out"],
@@ -120,8 +177,23 @@ class CpuAffinityTest(unittest.TestCase):
 
         self.assertEqual(result[0], "AC")
         self.assertEqual(result[2], "")
-        self.assertEqual(run.call_args.kwargs["stdout"], subprocess.DEVNULL)
-        self.assertEqual(run.call_args.kwargs["stderr"], subprocess.PIPE)
+        self.assertEqual(spawn.call_args.kwargs["stdout"], subprocess.DEVNULL)
+        self.assertEqual(spawn.call_args.kwargs["stderr"], subprocess.PIPE)
+
+    @unittest.skipUnless(hasattr(os, "sched_setaffinity"), "CPU affinity は Linux 専用")
+    def test_spawned_solver_inherits_cpu_and_caller_is_restored(self) -> None:
+        caller_cpu_ids = os.sched_getaffinity(0)
+        cpu_id = max(caller_cpu_ids)
+        process = spawn_solver(
+            [sys.executable, "-c", "import os; print(sorted(os.sched_getaffinity(0)))"],
+            cpu_id,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        stdout, _ = process.communicate()
+
+        self.assertEqual(stdout.strip(), str([cpu_id]))
+        self.assertEqual(os.sched_getaffinity(0), caller_cpu_ids)
 
     def test_optuna_discards_stdout(self) -> None:
         solver_result = ("AC", 10, "", "Score = 10\n", 0.1)
@@ -158,22 +230,34 @@ class CpuAffinityTest(unittest.TestCase):
 
     def test_worker_discards_stdout_when_not_recording(self) -> None:
         solver_result = ("AC", 10, "", "Score = 10\n", 0.1)
-        config = mock.Mock(command=["./a.out"], timeout=None, is_int=True, record=False)
+        config = mock.Mock(
+            command=["./a.out"],
+            timeout=None,
+            is_int=True,
+            record=False,
+            result_cache=None,
+            limits=NO_LIMITS,
+            interactive_command=None,
+            score_stage=None,
+            solver_servers=None,
+        )
         expected = ("0000.txt", 10, 1.0, "AC", "0.100")
         with (
             mock.patch.object(parallel_tester, "_execute_solver", return_value=solver_result) as execute_solver,
             mock.patch.object(parallel_tester, "_handle_ac_case", return_value=expected),
         ):
-            result = parallel_tester._worker_process_file(("0000.txt", config, mock.sentinel.state, None, None))
+            result = parallel_tester._worker_process_file(
+                ("0000.txt", config, parallel_tester.WorkerState(), None, None)
+            )
 
         self.assertEqual(result, expected)
         self.assertFalse(execute_solver.call_args.kwargs["capture_stdout"])
 
     def test_parallel_map_keeps_one_case_per_cpu(self) -> None:
-        tester = object.__new__(ParallelTester)
-        tester.cpu_count = 2
-        tester.cpu_ids = (2, 4)
-        tester.cpu_locks = {}
+        tester = minimal_tester(
+            cpu_count=2,
+            cpu_ids=(2, 4),
+        )
 
         state_lock = threading.Lock()
         active = collections.Counter()
@@ -207,9 +291,7 @@ class CpuAffinityTest(unittest.TestCase):
         self.assertEqual(maximum_active, {2: 1, 4: 1})
 
     def test_case_to_cpu_mapping_does_not_depend_on_execution_order(self) -> None:
-        tester = object.__new__(ParallelTester)
-        tester.cpu_ids = (1, 3, 5)
-        tester.cpu_locks = {}
+        tester = minimal_tester(cpu_ids=(1, 3, 5))
 
         first = {i: tester._cpu_target(i)[0] for i in range(9)}
         second = {i: tester._cpu_target(i)[0] for i in (8, 2, 5, 1, 7, 0, 6, 4, 3)}
@@ -217,18 +299,13 @@ class CpuAffinityTest(unittest.TestCase):
         self.assertEqual(first, second)
 
     def test_optuna_shuffle_keeps_original_case_to_cpu_mapping(self) -> None:
-        tester = object.__new__(ParallelTester)
-        tester.input_file_names = [f"./in/{i:04d}.txt" for i in range(8)]
-        tester.optuna_seed = 10
-        tester.execute_command = ["./a.out"]
-        tester.added_command = []
-        tester.timeout = None
-        tester.is_int = True
-        tester.use_relative_score = False
-        tester.pre_data = {}
-        tester.cpu_count = 2
-        tester.cpu_ids = (2, 4)
-        tester.cpu_locks = {}
+        tester = minimal_tester(
+            input_file_names=[f"./in/{i:04d}.txt" for i in range(8)],
+            optuna_seed=10,
+            execute_command="./a.out",
+            cpu_count=2,
+            cpu_ids=(2, 4),
+        )
 
         class Trial:
             number = 3
@@ -255,5 +332,527 @@ class CpuAffinityTest(unittest.TestCase):
         self.assertEqual(result.scores, [2.0, 4.0, 2.0, 4.0, 2.0, 4.0, 2.0, 4.0])
 
 
+class StreamRecordTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._temporary_dir.name)
+
+    def tearDown(self) -> None:
+        self._temporary_dir.cleanup()
+
+    def test_score_is_found_across_block_boundaries(self) -> None:
+        error_path = self.directory / "0000.txt"
+        error_path.write_bytes(b"score = 1\n" + b"debug " * 100 + b"\nScore = 12345\n" + b"x" * 37 + b"\n")
+
+        with mock.patch.object(parallel_tester, "SCORE_TAIL_BLOCK_SIZE", 7):
+            score = parallel_tester._extract_last_score_from_file(str(error_path), True)
+
+        self.assertEqual(score, 12345)
+
+    def test_missing_score_in_file_is_an_error(self) -> None:
+        error_path = self.directory / "0000.txt"
+        error_path.write_bytes(b"no score here\n")
+
+        with self.assertRaises(ValueError):
+            parallel_tester._extract_last_score_from_file(str(error_path), True)
+
+    def test_solver_writes_record_files_directly(self) -> None:
+        input_path = self.directory / "in.txt"
+        input_path.write_text("abc\n", encoding="utf-8")
+        out_path = self.directory / "out.txt"
+        err_path = self.directory / "err.txt"
+        source = "import sys\nprint(sys.stdin.read().upper(), end='')\nprint('score = 7', file=sys.stderr)\n"
+
+        result = parallel_tester._execute_solver(
+            str(input_path),
+            [sys.executable, "-c", source],
+            10,
+            True,
+            record_paths=(str(out_path), str(err_path)),
+        )
+
+        self.assertEqual(result[:4], ("AC", 7, "", ""))
+        self.assertEqual(out_path.read_text(encoding="utf-8"), "ABC\n")
+        self.assertEqual(err_path.read_text(encoding="utf-8").strip(), "score = 7")
+
+    def test_streamed_record_is_not_written_again(self) -> None:
+        config = mock.Mock(record=True, stream_record=True, buffers_record=False, verbose=False, baseline_scores={})
+        with mock.patch.object(parallel_tester, "_write_record") as write_record:
+            parallel_tester._handle_ac_case("0000.txt", 1, "", "", 0.1, config, parallel_tester.WorkerState())
+
+        write_record.assert_not_called()
+
+
+class ResourceUsageTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._temporary_dir.name)
+
+    def tearDown(self) -> None:
+        self._temporary_dir.cleanup()
+
+    @unittest.skipUnless(hasattr(os, "wait4"), "wait4 が必要")
+    def test_solver_usage_is_recorded_per_case(self) -> None:
+        input_path = self.directory / "0000.txt"
+        input_path.write_text("abc\n", encoding="utf-8")
+        source = "import sys\nmemory = bytearray(64 << 20)\nprint('score = 1', file=sys.stderr)\n"
+        usages: dict[str, SolverUsage] = {}
+
+        result = parallel_tester._execute_solver(
+            str(input_path), [sys.executable, "-c", source], 10, True, usages=usages
+        )
+
+        self.assertEqual(result[:2], ("AC", 1))
+        usage = usages[str(input_path)]
+        self.assertGreaterEqual(usage.max_rss_kb, 64 << 10)
+        self.assertGreater(usage.cpu_seconds, 0)
+
+    def test_result_csv_has_usage_columns(self) -> None:
+        tester = minimal_tester()
+        usage = SolverUsage(0.5, 0.25, 2048, 3, 4)
+
+        tester._write_result_csv(
+            str(self.directory),
+            [("./in/0000.txt", 10, -1.0, "AC", 0.9), ("./in/0001.txt", 20, -1.0, "AC", 0.8)],
+            {"./in/0000.txt": usage},
+        )
+
+        with open(self.directory / "result.csv", encoding="utf-8", newline="") as csv_file:
+            rows = list(csv.DictReader(csv_file))
+        self.assertEqual(
+            [rows[0][column] for column in parallel_tester.CSV_USAGE_HEADERS], ["0.5", "0.25", "2048", "3", "4"]
+        )
+        self.assertEqual([rows[1][column] for column in parallel_tester.CSV_USAGE_HEADERS], [""] * 5)
+
+    def test_usage_summary_reports_largest_cases(self) -> None:
+        usages = {
+            "./in/0000.txt": SolverUsage(1.0, 0.5, 1024, 1, 2),
+            "./in/0001.txt": SolverUsage(0.5, 0.0, 4096, 3, 4),
+        }
+        with self.assertLogs(parallel_tester.logger, "INFO") as logs:
+            parallel_tester._log_usage_summary(usages)
+
+        output = "\n".join(logs.output)
+        self.assertIn("user 1.500 sec / sys 0.500 sec", output)
+        self.assertIn("1.500 sec (./in/0000.txt)", output)
+        self.assertIn("4.0 MB (./in/0001.txt)", output)
+        self.assertIn("voluntary 4 / involuntary 6", output)
+
+
+@unittest.skipUnless(hasattr(os, "wait4"), "wait4 が必要")
+class MemoryLimitTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.input_path = Path(self._temporary_dir.name) / "0000.txt"
+        self.input_path.write_text("abc\n", encoding="utf-8")
+
+    def tearDown(self) -> None:
+        self._temporary_dir.cleanup()
+
+    def _run(self, megabytes: int, memory_limit: int):
+        source = f"import sys\nmemory = bytearray({megabytes} << 20)\nprint('score = 1', file=sys.stderr)\n"
+        return parallel_tester._execute_solver(
+            str(self.input_path),
+            [sys.executable, "-c", source],
+            10,
+            True,
+            limits=SolverLimits(memory_bytes=memory_limit * parallel_tester.BYTES_PER_MB),
+        )
+
+    def test_case_over_memory_limit_is_mle(self) -> None:
+        result = self._run(192, 128)
+
+        self.assertEqual(result[0], "MLE")
+        self.assertTrue(math.isnan(result[1]))
+
+    def test_case_under_memory_limit_is_accepted(self) -> None:
+        self.assertEqual(self._run(16, 256)[:2], ("AC", 1))
+
+    def test_error_table_counts_mle(self) -> None:
+        with self.assertLogs(parallel_tester.logger, "ERROR") as logs:
+            parallel_tester._log_error_table([("./in/0000.txt", "MLE"), ("./in/0001.txt", "TLE")])
+
+        output = "\n".join(logs.output)
+        self.assertIn(" MLE ", output)
+        self.assertIn(" MLE   : 1 ", output)
+
+
+@unittest.skipUnless(solver_engine.cpu_limit_supported(), "wait4 と RLIMIT_CPU が必要")
+class CpuTimeoutTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.input_path = Path(self._temporary_dir.name) / "0000.txt"
+        self.input_path.write_text("abc\n", encoding="utf-8")
+
+    def tearDown(self) -> None:
+        self._temporary_dir.cleanup()
+
+    def _run(self, source: str):
+        usages: dict[str, SolverUsage] = {}
+        result = parallel_tester._execute_solver(
+            str(self.input_path),
+            [sys.executable, "-c", source + "print('score = 1', file=sys.stderr)\n"],
+            10,
+            True,
+            usages=usages,
+            limits=SolverLimits(cpu_seconds=0.3),
+        )
+        return result, usages[str(self.input_path)]
+
+    def test_busy_solver_is_tle_by_cpu_time(self) -> None:
+        result, usage = self._run("import sys\nwhile True:\n    pass\n")
+
+        self.assertEqual(result[0], "TLE")
+        self.assertEqual(result[-1], 0.3)
+        self.assertEqual(parallel_tester._fired_limit("TLE", usage, SolverLimits(cpu_seconds=0.3)), "cpu")
+
+    def test_waiting_solver_is_not_tle(self) -> None:
+        result, _ = self._run("import sys, time\ntime.sleep(0.6)\n")
+
+        self.assertEqual(result[:2], ("AC", 1))
+
+    def test_fired_limit_distinguishes_wall_clock_safety_net(self) -> None:
+        idle = SolverUsage(0.01, 0.0, 1024, 0, 0)
+        self.assertEqual(parallel_tester._fired_limit("TLE", idle, SolverLimits(cpu_seconds=0.3)), "wall")
+        self.assertEqual(parallel_tester._fired_limit("TLE", idle, NO_LIMITS), "wall")
+        self.assertEqual(parallel_tester._fired_limit("MLE", idle, NO_LIMITS), "memory")
+        self.assertEqual(parallel_tester._fired_limit("AC", idle, NO_LIMITS), "")
+
+    def test_cpu_mode_reports_cpu_limit_as_tle_time(self) -> None:
+        directory = Path(self._temporary_dir.name)
+        (directory / "solver.py").write_text("while True:\n    pass\n", encoding="utf-8")
+        previous_cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            tester = ParallelTester(
+                "maximize",
+                "main.cpp",
+                None,
+                f"{sys.executable} solver.py",
+                [str(self.input_path)],
+                1,
+                True,
+                sum,
+                300,
+                False,
+                "",
+                timeout_mode="cpu",
+            )
+            with self.assertLogs(parallel_tester.logger, "INFO") as logs:
+                results = tester.run_record(record=True)
+        finally:
+            os.chdir(previous_cwd)
+
+        self.assertEqual([(state, time) for _, _, _, state, time in results], [("TLE", "0.300")])
+        self.assertTrue(any(">0.300 sec" in line for line in logs.output))
+
+    def test_cpu_mode_falls_back_to_wall_with_multiple_threads(self) -> None:
+        with self.assertLogs(parallel_tester.logger, "WARNING"):
+            tester = ParallelTester(
+                "maximize",
+                "main.cpp",
+                None,
+                "./a.out",
+                [],
+                1,
+                False,
+                sum,
+                2000,
+                False,
+                "",
+                timeout_mode="cpu",
+                cpus_per_case=2,
+            )
+
+        self.assertEqual(tester.timeout_mode, "wall")
+        self.assertIsNone(tester.limits.cpu_seconds)
+        self.assertEqual(tester.timeout, 2.0)
+
+    def test_cpu_mode_keeps_wall_clock_as_safety_net(self) -> None:
+        tester = ParallelTester(
+            "maximize", "main.cpp", None, "./a.out", [], 1, False, sum, 2000, False, "", timeout_mode="cpu"
+        )
+
+        self.assertEqual(tester.limits.cpu_seconds, 2.0)
+        self.assertEqual(tester.timeout, 2.0 * parallel_tester.CPU_TIMEOUT_WALL_RATIO)
+
+
+INTERACTIVE_JUDGE = (
+    "import sys, time\n"
+    "n = int(open(sys.argv[1]).read())\n"
+    "print(n, flush=True)\n"
+    "answer = int(input())\n"
+    "open(sys.argv[2], 'w').write(f'{answer}\\n')\n"
+    "if answer != 2 * n:\n"
+    "    sys.exit(1)\n"
+    "time.sleep(float(sys.argv[3]))\n"
+    "print(f'Score = {answer}', file=sys.stderr)\n"
+)
+INTERACTIVE_SOLVER = "import sys\nn = int(input())\nprint(2 * n, flush=True)\nprint('solver log', file=sys.stderr)\n"
+
+
+@unittest.skipUnless(os.name == "posix", "プロセスグループの終了に POSIX が必要")
+class InteractiveTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._temporary_dir.name)
+        self.input_path = self.directory / "0000.txt"
+        self.input_path.write_text("21\n", encoding="utf-8")
+        self.record_paths = (str(self.directory / "out.txt"), str(self.directory / "err.txt"))
+
+    def tearDown(self) -> None:
+        self._temporary_dir.cleanup()
+
+    def _judge(self, judge_sleep: float = 0.0) -> list[str]:
+        return [sys.executable, "-c", INTERACTIVE_JUDGE, "{input}", "{output}", str(judge_sleep)]
+
+    def _run(self, solver_source: str, judge_sleep: float = 0.0, timeout: float = 10, **kwargs):
+        return parallel_tester._execute_interactive(
+            str(self.input_path),
+            [sys.executable, "-c", solver_source],
+            self._judge(judge_sleep),
+            timeout,
+            True,
+            record_paths=self.record_paths,
+            **kwargs,
+        )
+
+    def test_judge_score_and_outputs_are_recorded(self) -> None:
+        result = self._run(INTERACTIVE_SOLVER)
+
+        self.assertEqual(result[:2], ("AC", 42))
+        self.assertEqual(Path(self.record_paths[0]).read_text(encoding="utf-8"), "42\n")
+        self.assertEqual(Path(self.record_paths[1]).read_text(encoding="utf-8"), "solver log\nScore = 42\n")
+
+    def test_time_is_attributed_to_solver_only(self) -> None:
+        result = self._run(INTERACTIVE_SOLVER, judge_sleep=1.0)
+
+        self.assertEqual(result[0], "AC")
+        self.assertLess(result[-1], 1.0)
+
+    def test_rejected_answer_is_error(self) -> None:
+        result = self._run("print(0, flush=True)\n")
+
+        self.assertEqual(result[0], "ERROR")
+
+    def test_slow_solver_is_tle(self) -> None:
+        started = time.perf_counter()
+        result = self._run("import time\ntime.sleep(30)\n", timeout=0.3)
+
+        self.assertEqual(result[0], "TLE")
+        self.assertLess(time.perf_counter() - started, 5)
+
+    def test_cancel_stops_judge_and_solver(self) -> None:
+        cancel_event = threading.Event()
+        threading.Timer(0.2, cancel_event.set).start()
+        started = time.perf_counter()
+
+        result = self._run("import time\ntime.sleep(30)\n", cancel_event=cancel_event)
+
+        self.assertIsNone(result)
+        self.assertLess(time.perf_counter() - started, 5)
+
+    def test_optuna_case_uses_judge_score(self) -> None:
+        score = parallel_tester._run_case_for_opt(
+            str(self.input_path),
+            [sys.executable, "-c", INTERACTIVE_SOLVER],
+            10,
+            True,
+            False,
+            {},
+            interactive_command=self._judge(),
+        )
+
+        self.assertEqual(score, 42)
+
+    def test_input_path_is_appended_without_placeholder(self) -> None:
+        self.assertEqual(
+            parallel_tester._file_arguments(["./judge", "{output}"], "in/0000.txt", "out/0000.txt", False),
+            ["./judge", "out/0000.txt", "in/0000.txt"],
+        )
+
+
+SCORER = (
+    "import sys, time\n"
+    "time.sleep(float(sys.argv[3]))\n"
+    "answer = int(open(sys.argv[2]).read())\n"
+    "if answer < 0:\n"
+    "    sys.exit(1)\n"
+    "print(f'Score = {answer * 10}')\n"
+)
+
+
+class ScoreStageTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._temporary_dir.name)
+        self.input_paths = []
+        for case_index, answer in enumerate((1, 2, -1)):
+            input_path = self.directory / f"{case_index:04}.txt"
+            input_path.write_text(f"{answer}\n", encoding="utf-8")
+            self.input_paths.append(str(input_path))
+        (self.directory / "solver.py").write_text(
+            "import sys\nprint(sys.stdin.read().strip())\nprint('score = 1', file=sys.stderr)\n", encoding="utf-8"
+        )
+        (self.directory / "scorer.py").write_text(SCORER, encoding="utf-8")
+        self.previous_cwd = os.getcwd()
+        os.chdir(self.directory)
+
+    def tearDown(self) -> None:
+        os.chdir(self.previous_cwd)
+        self._temporary_dir.cleanup()
+
+    def _tester(self, engine: str = "thread", scorer_sleep: float = 0.0, cpu_count: int = 3) -> ParallelTester:
+        return ParallelTester(
+            "maximize",
+            "main.cpp",
+            None,
+            f"{sys.executable} solver.py",
+            self.input_paths,
+            cpu_count,
+            False,
+            sum,
+            10_000,
+            False,
+            "",
+            engine=engine,
+            score_command=f"{sys.executable} scorer.py {{input}} {{output}} {scorer_sleep}",
+        )
+
+    def test_scores_come_from_scorer_on_both_engines(self) -> None:
+        for engine in parallel_tester.SOLVER_ENGINES:
+            if engine == "event" and os.name != "posix":
+                continue
+            with self.subTest(engine=engine):
+                scores = self._tester(engine).run()
+
+                self.assertEqual(scores[:2], [10, 20])
+                self.assertTrue(math.isnan(scores[2]))
+
+    def test_scoring_is_outside_solver_time(self) -> None:
+        tester = self._tester(scorer_sleep=1.0)
+        with self.assertLogs(parallel_tester.logger, "ERROR"):
+            results = tester.run_record(record=True)
+
+        by_file = {filename: (score, state, elapsed) for filename, score, _, state, elapsed in results}
+        self.assertEqual(by_file[self.input_paths[1]][:2], (20, "AC"))
+        self.assertLess(float(by_file[self.input_paths[1]][2]), 1.0)
+        self.assertEqual(by_file[self.input_paths[2]][1], "ERROR")
+        assert tester.last_output_dir is not None
+        with open(Path(tester.last_output_dir) / "result.csv", encoding="utf-8", newline="") as csv_file:
+            rows = {row["filename"]: row for row in csv.DictReader(csv_file)}
+        self.assertEqual(rows[self.input_paths[0]]["score"], "10")
+
+    def test_opt_runs_next_case_on_lane_while_scoring(self) -> None:
+        (self.directory / "solver.py").write_text(
+            "import sys, time\n"
+            "with open('started.log', 'a') as log:\n"
+            "    print(time.time(), file=log)\n"
+            "print(sys.stdin.read().strip())\n"
+            "print('score = 1', file=sys.stderr)\n",
+            encoding="utf-8",
+        )
+
+        class Trial:
+            number = 0
+
+            def __init__(self) -> None:
+                self.reported: dict[int, float] = {}
+
+            def report(self, score, step) -> None:
+                self.reported[step] = score
+
+            def should_prune(self) -> bool:
+                return False
+
+        for engine in parallel_tester.SOLVER_ENGINES:
+            if engine == "event" and os.name != "posix":
+                continue
+            with self.subTest(engine=engine):
+                Path("started.log").unlink(missing_ok=True)
+                trial = Trial()
+                with self.assertLogs(parallel_tester.logger, "ERROR"):
+                    result = self._tester(engine, scorer_sleep=1.0, cpu_count=1).run_opt_pruner(trial)
+
+                self.assertEqual(result.scores[:2], [10, 20])
+                self.assertEqual(sorted(trial.reported), [0, 1, 2])
+                started = [float(line) for line in Path("started.log").read_text(encoding="utf-8").split()]
+                # 1 つの lane でも、前のケースの採点 (1 秒) を待たずに次のケースを実行する
+                self.assertEqual(len(started), 3)
+                self.assertLess(max(started) - min(started), 1.0)
+
+    def test_interactive_and_score_command_are_exclusive(self) -> None:
+        with self.assertRaisesRegex(ValueError, "exclusive"):
+            ParallelTester(
+                "maximize",
+                "main.cpp",
+                None,
+                "./a.out",
+                [],
+                1,
+                False,
+                sum,
+                None,
+                False,
+                "",
+                interactive_command="./judge",
+                score_command="./score",
+            )
+
+
+class ScoreTailTest(unittest.TestCase):
+    def _feed(self, data: bytes, chunk_size: int, window_size: int = 16) -> parallel_tester._ScoreTail:
+        score_tail = parallel_tester._ScoreTail(True, window_size=window_size)
+        for start in range(0, len(data), chunk_size):
+            score_tail.feed(data[start : start + chunk_size])
+        return score_tail
+
+    def test_last_score_is_kept_for_any_chunk_size(self) -> None:
+        data = b"score = 1\nSCORE=22 score = 333\ndebug\n" + b"x" * 100 + b"\nscore = 4444"
+        for chunk_size in (1, 3, 7, len(data)):
+            with self.subTest(chunk_size=chunk_size):
+                score_tail = self._feed(data, chunk_size)
+                self.assertEqual(score_tail.finish(), 4444)
+                self.assertLessEqual(len(score_tail.partial_line), 16)
+
+    def test_long_line_is_trimmed_without_losing_score(self) -> None:
+        data = b"a" * 40 + b"score = 56789" + b"b" * 40 + b"\n" + b"c" * 100
+        for chunk_size in (1, 5, len(data)):
+            with self.subTest(chunk_size=chunk_size):
+                score_tail = self._feed(data, chunk_size)
+                self.assertEqual(score_tail.finish(), 56789)
+                self.assertEqual(score_tail.discarded_bytes, len(data) - len(score_tail.partial_line))
+
+    def test_missing_score_is_an_error(self) -> None:
+        score_tail = self._feed(b"no score\n" * 10, 4)
+
+        with self.assertRaises(ValueError):
+            score_tail.finish()
+
+    def test_cancellable_solver_reads_large_input_and_stderr(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = Path(directory) / "0000.txt"
+            input_path.write_text("abc\n" * 50_000, encoding="utf-8")
+            source = (
+                "import sys\n"
+                "data = sys.stdin.read()\n"
+                "sys.stderr.write('debug\\n' * 100_000)\n"
+                "print(f'score = {len(data)}', file=sys.stderr)\n"
+            )
+            score_tail = parallel_tester._ScoreTail(True)
+
+            result = parallel_tester._execute_solver_cancellable(
+                str(input_path),
+                [sys.executable, "-c", source],
+                10,
+                True,
+                threading.Event(),
+                score_tail=score_tail,
+            )
+
+        self.assertEqual(result[:4], ("AC", 200_000, "", ""))
+        self.assertGreater(score_tail.discarded_bytes, 600_000)
+
+
 if __name__ == "__main__":
     unittest.main()
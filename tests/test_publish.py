@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from ahclib.publish import publish_directory
+
+
+class PublishDirectoryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._temporary_dir.name)
+        self.destination = str(self.directory / "out")
+
+    def tearDown(self) -> None:
+        self._temporary_dir.cleanup()
+
+    def _run_outputs(self, name: str, files: dict[str, str]) -> str:
+        source = self.directory / "results" / name / "out"
+        source.mkdir(parents=True)
+        for filename, content in files.items():
+            (source / filename).write_text(content, encoding="utf-8")
+        return str(source)
+
+    def test_symlink_replaces_previous_run_and_real_directory(self) -> None:
+        # 以前の版がコピーした実ディレクトリも置き換える
+        os.makedirs(self.destination)
+        Path(self.destination, "stale.txt").write_text("old", encoding="utf-8")
+
+        self.assertEqual(publish_directory(self._run_outputs("a", {"0000.txt": "a"}), self.destination), "symlink")
+        self.assertEqual(publish_directory(self._run_outputs("b", {"0001.txt": "b"}), self.destination), "symlink")
+
+        self.assertTrue(os.path.islink(self.destination))
+        self.assertFalse(os.path.isabs(os.readlink(self.destination)))
+        self.assertEqual(sorted(os.listdir(self.destination)), ["0001.txt"])
+        self.assertEqual(sorted(os.listdir(self.directory)), ["out", "results"])
+
+    def test_hardlinks_when_symlink_is_unavailable(self) -> None:
+        publish_directory(self._run_outputs("a", {"0000.txt": "a", "stale.txt": "old"}), self.destination)
+        source = self._run_outputs("b", {"0000.txt": "b"})
+
+        with mock.patch("ahclib.publish.os.symlink", side_effect=OSError("not permitted")):
+            method = publish_directory(source, self.destination)
+
+        self.assertEqual(method, "hardlink")
+        self.assertFalse(os.path.islink(self.destination))
+        self.assertEqual(sorted(os.listdir(self.destination)), ["0000.txt"])
+        self.assertTrue(os.path.samefile(Path(self.destination, "0000.txt"), Path(source, "0000.txt")))
+
+
+if __name__ == "__main__":
+    unittest.main()
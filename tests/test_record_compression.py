@@ -0,0 +1,126 @@
+import gzip
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from ahclib.parallel_tester import ParallelTester, run_compact
+from ahclib.record_compression import (
+    compact_records,
+    compress_in_place,
+    find_record,
+    read_record_text,
+    resolve_compression,
+    zstandard,
+)
+from ahclib.vis.data import ResultStore
+
+# 入力をそのまま出力し、stderr に score を書く
+SOLVER = """\
+import sys
+
+value = int(sys.stdin.read())
+print(value)
+print(f"score = {value}", file=sys.stderr)
+"""
+
+
+class RecordCompressionTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._temporary_dir.name)
+        self.previous_cwd = os.getcwd()
+        os.chdir(self.directory)
+
+    def tearDown(self) -> None:
+        os.chdir(self.previous_cwd)
+        self._temporary_dir.cleanup()
+
+    def test_compressed_record_reads_back_the_same_text(self) -> None:
+        compressions = ["gzip"] + (["zstd"] if zstandard is not None else [])
+        for compression in compressions:
+            with self.subTest(compression=compression):
+                path = self.directory / f"{compression}.txt"
+                path.write_text("score = 42\nあいう\n" * 100, encoding="utf-8")
+
+                self.assertGreater(compress_in_place(str(path), compression), 0)
+
+                self.assertFalse(path.exists())
+                record_path = find_record(str(path))
+                assert record_path is not None
+                self.assertEqual(read_record_text(record_path), "score = 42\nあいう\n" * 100)
+
+    def test_invalid_compression_keeps_records_raw(self) -> None:
+        self.assertIsNone(resolve_compression("lz4"))
+        self.assertIsNone(resolve_compression(None))
+        self.assertEqual(resolve_compression("zstd"), "zstd" if zstandard is not None else "gzip")
+
+    def test_compact_skips_compressed_files(self) -> None:
+        (self.directory / "a.txt").write_text("a" * 1000, encoding="utf-8")
+        with gzip.open(self.directory / "b.txt.gz", "wt", encoding="utf-8") as compressed_file:
+            compressed_file.write("b")
+
+        summary = compact_records([str(self.directory)], "gzip", 2)
+
+        self.assertEqual((summary.files, summary.failed), (1, 0))
+        self.assertLess(summary.compressed_bytes, summary.original_bytes)
+        self.assertEqual(sorted(os.listdir(self.directory)), ["a.txt.gz", "b.txt.gz"])
+
+    def test_broken_compressed_record_reads_as_missing(self) -> None:
+        run_dir = self.directory / "results" / "run-1"
+        (run_dir / "err").mkdir(parents=True)
+        (run_dir / "out").mkdir()
+        (run_dir / "err" / "0000.txt.gz").write_bytes(b"not gzip")
+        (run_dir / "out" / "0000.txt.gz").write_bytes(gzip.compress(b"answer\n" * 100)[:20])
+        store = ResultStore(base_path=str(self.directory / "results"), direction="maximize")
+
+        self.assertEqual(store.out_err("run-1", "0000.txt"), ("(err ファイルなし)", "(out ファイルなし)"))
+
+    def test_recorded_err_is_compressed_and_readable_from_vis(self) -> None:
+        (self.directory / "solver.py").write_text(SOLVER, encoding="utf-8")
+        input_paths = []
+        for case_index in range(3):
+            input_path = self.directory / "in" / f"{case_index:04}.txt"
+            input_path.parent.mkdir(exist_ok=True)
+            input_path.write_text(f"{case_index + 1}\n", encoding="utf-8")
+            input_paths.append(str(input_path))
+        tester = ParallelTester(
+            "maximize",
+            "main.cpp",
+            None,
+            f"{sys.executable} solver.py",
+            input_paths,
+            2,
+            False,
+            sum,
+            10_000,
+            False,
+            "",
+            record_compression="gzip",
+        )
+
+        results = tester.run_record(record=True)
+
+        self.assertEqual([score for _, score, _, _, _ in results], [1, 2, 3])
+        assert tester.last_output_dir is not None
+        output_dir = Path(tester.last_output_dir)
+        # ./out は公式ツールから読めるよう、圧縮しない
+        self.assertEqual((output_dir / "out" / "0000.txt").read_text(encoding="utf-8"), "1\n")
+        self.assertFalse((output_dir / "err" / "0000.txt").exists())
+        self.assertTrue((output_dir / "err" / "0000.txt.gz").exists())
+
+        store = ResultStore(base_path=str(output_dir.parent), direction="maximize")
+        err_text, out_text = store.out_err(output_dir.name, "0001.txt")
+        self.assertIn("score = 2", err_text)
+        self.assertEqual(out_text, "2\n")
+
+        run_compact("gzip", 2)
+
+        # ./out が指す実行の out/ は圧縮せず、err/ は圧縮したまま残す
+        self.assertTrue((output_dir / "out" / "0000.txt").exists())
+        self.assertEqual(sorted(os.listdir(output_dir / "err")), ["0000.txt.gz", "0001.txt.gz", "0002.txt.gz"])
+
+
+if __name__ == "__main__":
+    unittest.main()
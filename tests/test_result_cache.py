@@ -0,0 +1,125 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from ahclib.main import get_args
+from ahclib.result_cache import ResultCache
+from ahclib.solver_engine import SolverLimits
+
+from .support import minimal_tester
+
+COUNTING_SOLVER = (
+    "import sys\n"
+    "data = sys.stdin.read()\n"
+    "open(COUNTER_PATH, 'a').write('x')\n"
+    "print(data, end='')\n"
+    "print(f'score = {len(data)}', file=sys.stderr)\n"
+)
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._temporary_dir.name)
+        self.binary = self.directory / "a.out"
+        self.binary.write_bytes(b"binary v1")
+        self.input_path = self.directory / "0000.txt"
+        self.input_path.write_text("abc\n", encoding="utf-8")
+        self.cache = ResultCache(str(self.directory / "cache"), max_bytes=1 << 20)
+
+    def tearDown(self) -> None:
+        self._temporary_dir.cleanup()
+
+    def _key(self, *args: str) -> str:
+        return self.cache.key([str(self.binary), *args], str(self.input_path), 2.0, True)
+
+    def test_key_depends_on_binary_arguments_input_and_timeout(self) -> None:
+        key = self._key("1")
+        self.assertEqual(self._key("1"), key)
+        self.assertNotEqual(self._key("2"), key)
+        self.assertNotEqual(self.cache.key([str(self.binary), "1"], str(self.input_path), 3.0, True), key)
+        self.assertNotEqual(
+            self.cache.key(
+                [str(self.binary), "1"], str(self.input_path), 2.0, True, SolverLimits(memory_bytes=256 << 20)
+            ),
+            key,
+        )
+
+        self.input_path.write_text("abcd\n", encoding="utf-8")
+        input_key = self._key("1")
+        self.assertNotEqual(input_key, key)
+
+        self.binary.write_bytes(b"binary v2")
+        self.assertNotEqual(self._key("1"), input_key)
+
+    def test_stored_result_is_returned(self) -> None:
+        key = self._key()
+        self.assertIsNone(self.cache.load(key))
+
+        self.cache.store(key, ("AC", 123, "ignored", "ignored", 0.5))
+
+        self.assertEqual(self.cache.load(key), ("AC", 123, "", "", 0.5))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_inner_error_is_not_stored(self) -> None:
+        key = self._key()
+        self.cache.store(key, ("INNER_ERROR", float("nan"), "", "", -1.0))
+
+        self.assertIsNone(self.cache.load(key))
+
+    def test_recorded_outputs_are_restored(self) -> None:
+        key = self._key()
+        out_path, err_path = self.directory / "out.txt", self.directory / "err.txt"
+        self.cache.store(key, ("AC", 1, "", "", 0.1))
+        self.assertIsNone(self.cache.load(key, (str(out_path), str(err_path))))
+
+        out_path.write_text("output", encoding="utf-8")
+        err_path.write_text("score = 1\n", encoding="utf-8")
+        self.cache.store(key, ("AC", 1, "", "", 0.1), (str(out_path), str(err_path)))
+        restored = self.directory / "restored.out", self.directory / "restored.err"
+
+        self.assertEqual(self.cache.load(key, (str(restored[0]), str(restored[1]))), ("AC", 1, "", "", 0.1))
+        self.assertEqual(restored[0].read_text(encoding="utf-8"), "output")
+        self.assertEqual(restored[1].read_text(encoding="utf-8"), "score = 1\n")
+
+    def test_least_recently_used_entries_are_evicted(self) -> None:
+        keys = [self._key(str(index)) for index in range(3)]
+        for index, key in enumerate(keys):
+            self.cache.store(key, ("AC", index, "", "", 0.1))
+            meta_path = self.directory / "cache" / key[:2] / f"{key}.json"
+            os.utime(meta_path, (time.time() - 100 + index, time.time() - 100 + index))
+        entry_size = (self.directory / "cache" / keys[0][:2] / f"{keys[0]}.json").stat().st_size
+        self.cache.max_bytes = entry_size * 2
+
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertIsNone(self.cache.load(keys[0]))
+        self.assertIsNotNone(self.cache.load(keys[2]))
+
+    def test_tester_does_not_rerun_cached_cases(self) -> None:
+        counter_path = self.directory / "count.txt"
+        solver_path = self.directory / "solver.py"
+        solver_path.write_text(COUNTING_SOLVER.replace("COUNTER_PATH", repr(str(counter_path))), encoding="utf-8")
+        tester = minimal_tester(
+            input_file_names=[str(self.input_path)],
+            execute_command=f"{sys.executable} {solver_path}",
+            timeout=10_000,
+            result_cache=self.cache,
+        )
+
+        for engine in ("thread", "event"):
+            with self.subTest(engine=engine):
+                tester.engine = engine
+                self.assertEqual(tester.run(), [4])
+                self.assertEqual(counter_path.read_text(encoding="utf-8"), "x")
+
+    def test_cli_can_disable_cache(self) -> None:
+        self.assertTrue(get_args(["test"]).cache)
+        self.assertFalse(get_args(["test", "--no-cache"]).cache)
+        self.assertFalse(get_args(["opt", "--no-cache"]).cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
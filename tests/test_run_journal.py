@@ -0,0 +1,112 @@
+import csv
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from ahclib.parallel_tester import ParallelTester
+from ahclib.run_journal import JOURNAL_FILE, CaseJournal, read_journal
+
+# 入力の数と、実行ファイルの版 (VERSION) から score を決める
+SOLVER = "import sys\nVERSION = 1\nprint('score =', int(sys.stdin.read()) * VERSION, file=sys.stderr)\n"
+
+
+class RunJournalTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._temporary_dir.name)
+        self.input_paths = []
+        for case_index in range(3):
+            input_path = self.directory / f"{case_index:04}.txt"
+            input_path.write_text(f"{case_index + 1}\n", encoding="utf-8")
+            self.input_paths.append(str(input_path))
+        (self.directory / "solver.py").write_text(SOLVER, encoding="utf-8")
+        self.previous_cwd = os.getcwd()
+        os.chdir(self.directory)
+
+    def tearDown(self) -> None:
+        os.chdir(self.previous_cwd)
+        self._temporary_dir.cleanup()
+
+    def _tester(self) -> ParallelTester:
+        return ParallelTester(
+            "maximize",
+            "main.cpp",
+            None,
+            f"{sys.executable} solver.py",
+            self.input_paths,
+            2,
+            False,
+            sum,
+            10_000,
+            False,
+            "",
+        )
+
+    def _csv_scores(self, output_dir: str) -> dict[str, str]:
+        with open(Path(output_dir) / "result.csv", encoding="utf-8", newline="") as csv_file:
+            return {row["filename"]: row["score"] for row in csv.DictReader(csv_file)}
+
+    def test_result_csv_is_built_from_journal(self) -> None:
+        tester = self._tester()
+        results = tester.run_record(record=False)
+
+        assert tester.last_output_dir is not None
+        journal = read_journal(str(Path(tester.last_output_dir) / JOURNAL_FILE))
+        self.assertEqual(sorted(journal), self.input_paths)
+        self.assertEqual([score for _, score, _, _, _ in results], [1, 2, 3])
+        self.assertEqual(list(self._csv_scores(tester.last_output_dir).values()), ["1", "2", "3"])
+
+    def test_resume_runs_only_missing_cases_with_snapshot(self) -> None:
+        tester = self._tester()
+        tester.run_record(record=True)
+        assert tester.last_output_dir is not None
+        output_dir = tester.last_output_dir
+        # 1 ケース目の後で中断し、最後の行が書きかけになった状態にする
+        journal_path = Path(output_dir) / JOURNAL_FILE
+        entry = json.loads(journal_path.read_text(encoding="utf-8").splitlines()[0])
+        entry["score"] = 999
+        journal_path.write_text(json.dumps(entry) + '\n{"filename": ', encoding="utf-8")
+        os.remove(Path(output_dir) / "result.csv")
+        # 再開時は実行開始時に複製した solver を使う
+        (self.directory / "solver.py").write_text(SOLVER.replace("VERSION = 1", "VERSION = 10"), encoding="utf-8")
+
+        with self.assertLogs("ahclib.run_journal", level="WARNING"):
+            results = self._tester().run_record(record=False, resume_dir=output_dir)
+
+        scores = {filename: score for filename, score, _, _, _ in results}
+        expected = {path: case_index + 1 for case_index, path in enumerate(self.input_paths)}
+        expected[entry["filename"]] = 999
+        self.assertEqual(scores, expected)
+        self.assertEqual(self._csv_scores(output_dir), {path: str(score) for path, score in expected.items()})
+
+    def test_broken_line_is_skipped(self) -> None:
+        path = str(self.directory / JOURNAL_FILE)
+        journal = CaseJournal(path)
+        journal.append(("a.txt", 5, float("nan"), "AC", "0.100"))
+        journal.append(("a.txt", 7, float("nan"), "AC", "0.200"))
+        journal.close()
+        with open(path, "a", encoding="utf-8") as journal_file:
+            journal_file.write('{"filename": "b.txt", "sco')
+
+        with self.assertLogs("ahclib.run_journal", level="WARNING"):
+            entries = read_journal(path)
+        self.assertEqual(list(entries), ["a.txt"])
+        self.assertEqual(entries["a.txt"][0][1], 7)
+
+    def test_lines_are_readable_before_the_batched_fsync(self) -> None:
+        path = str(self.directory / JOURNAL_FILE)
+        journal = CaseJournal(path, sync_interval=60.0, sync_lines=64)
+        for case_index in range(3):
+            journal.append((f"{case_index}.txt", case_index, float("nan"), "AC", "0.100"))
+
+        self.assertEqual(list(read_journal(path)), ["0.txt", "1.txt", "2.txt"])
+        self.assertEqual(journal.sync_count, 0)
+        journal.close()
+        self.assertEqual(journal.sync_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import collections
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from ahclib import parallel_tester
+from ahclib.solver_engine import EventSolverEngine, SolverJob
+
+from .support import minimal_tester
+
+
+def _python_solver(source: str) -> list[str]:
+    return [sys.executable, "-c", source]
+
+
+ECHO_SCORE = (
+    "import sys\n"
+    "data = sys.stdin.read()\n"
+    "print(data.upper(), end='')\n"
+    "print(f'score = {len(data)}', file=sys.stderr)\n"
+)
+
+
+@unittest.skipUnless(os.name == "posix", "event engine は POSIX 専用")
+class EventSolverEngineTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.input_path = Path(self._temporary_dir.name) / "0000.txt"
+        self.input_path.write_text("abc\n" * 50_000, encoding="utf-8")
+
+    def tearDown(self) -> None:
+        self._temporary_dir.cleanup()
+
+    def _run(self, jobs, max_running=4, cancel_event=None, on_finish=None):
+        outcomes = {}
+
+        def record(job, outcome):
+            outcomes[job.key] = outcome
+            if on_finish is not None:
+                on_finish(job, outcome)
+
+        engine = EventSolverEngine(max_running)
+        try:
+            completed = engine.run(jobs, record, cancel_event)
+        finally:
+            engine.close()
+        return completed, outcomes
+
+    def test_large_input_and_outputs_are_exchanged(self) -> None:
+        job = SolverJob(0, _python_solver(ECHO_SCORE), str(self.input_path), timeout=10)
+        completed, outcomes = self._run([job])
+
+        self.assertTrue(completed)
+        outcome = outcomes[0]
+        self.assertEqual(outcome.returncode, 0)
+        self.assertFalse(outcome.timed_out)
+        self.assertEqual(outcome.stdout, b"ABC\n" * 50_000)
+        self.assertEqual(outcome.stderr.strip(), b"score = 200000")
+        self.assertGreater(outcome.elapsed, 0)
+        self.assertGreater(outcome.usage.max_rss_kb, 0)
+        self.assertGreater(outcome.usage.cpu_seconds, 0)
+
+    def test_outputs_are_written_to_record_files(self) -> None:
+        out_path = Path(self._temporary_dir.name) / "out.txt"
+        err_path = Path(self._temporary_dir.name) / "err.txt"
+        job = SolverJob(
+            0,
+            _python_solver(ECHO_SCORE),
+            str(self.input_path),
+            timeout=10,
+            stdout_path=str(out_path),
+            stderr_path=str(err_path),
+        )
+        completed, outcomes = self._run([job])
+
+        self.assertTrue(completed)
+        self.assertEqual(outcomes[0].returncode, 0)
+        self.assertEqual((outcomes[0].stdout, outcomes[0].stderr), (b"", b""))
+        self.assertEqual(out_path.read_bytes(), b"ABC\n" * 50_000)
+        self.assertEqual(err_path.read_bytes().strip(), b"score = 200000")
+
+    def test_timeout_stops_solver(self) -> None:
+        job = SolverJob(0, _python_solver("import time; time.sleep(30)"), str(self.input_path), timeout=0.2)
+        started = time.perf_counter()
+        completed, outcomes = self._run([job])
+
+        self.assertTrue(completed)
+        self.assertTrue(outcomes[0].timed_out)
+        self.assertEqual(outcomes[0].elapsed, 0.2)
+        self.assertLess(time.perf_counter() - started, 5)
+
+    def test_cancel_in_callback_stops_running_solvers(self) -> None:
+        cancel_event = threading.Event()
+        jobs = [SolverJob(0, _python_solver("pass"), str(self.input_path), timeout=None)]
+        jobs += [
+            SolverJob(key, _python_solver("import time; time.sleep(30)"), str(self.input_path), timeout=None)
+            for key in range(1, 4)
+        ]
+        started = time.perf_counter()
+        completed, outcomes = self._run(jobs, cancel_event=cancel_event, on_finish=lambda _job, _o: cancel_event.set())
+
+        self.assertFalse(completed)
+        self.assertEqual(list(outcomes), [0])
+        self.assertLess(time.perf_counter() - started, 5)
+
+    def test_jobs_on_same_cpu_run_one_at_a_time(self) -> None:
+        log_path = Path(self._temporary_dir.name) / "log.txt"
+        source = (
+            "import sys, time\n"
+            f"log = open({str(log_path)!r}, 'a')\n"
+            "log.write(f'start {sys.argv[1]}\\n'); log.flush()\n"
+            "time.sleep(0.05)\n"
+            "log.write(f'end {sys.argv[1]}\\n'); log.flush()\n"
+        )
+        cpu_id = max(os.sched_getaffinity(0))
+        jobs = [
+            SolverJob(key, [*_python_solver(source), str(key)], str(self.input_path), timeout=10, cpu_id=cpu_id)
+            for key in range(3)
+        ]
+        completed, _ = self._run(jobs)
+
+        self.assertTrue(completed)
+        self.assertEqual(
+            log_path.read_text(encoding="utf-8").split("\n")[:-1],
+            ["start 0", "end 0", "start 1", "end 1", "start 2", "end 2"],
+        )
+
+    def test_idle_cpu_steals_last_job_of_longest_lane(self) -> None:
+        lock = threading.Lock()
+        lanes = {
+            1: collections.deque(
+                SolverJob(key, ["solver"], "in.txt", timeout=None, cpu_id=1, expected_seconds=seconds)
+                for key, seconds in enumerate((3.0, 2.0, 1.0))
+            ),
+            2: collections.deque(),
+        }
+
+        EventSolverEngine._steal(lanes, collections.Counter({1: 1}), {1: None, 2: lock})
+
+        self.assertEqual([job.key for job in lanes[1]], [0, 1])
+        stolen = lanes[2][0]
+        self.assertEqual((stolen.key, stolen.cpu_id, stolen.cpu_lock), (2, 2, lock))
+
+    def test_start_failure_is_reported(self) -> None:
+        job = SolverJob(0, ["./missing-solver-binary"], str(self.input_path), timeout=None)
+        completed, outcomes = self._run([job])
+
+        self.assertTrue(completed)
+        self.assertIsInstance(outcomes[0].error, OSError)
+
+    def test_tester_returns_same_case_results_as_thread_engine(self) -> None:
+        input_path = Path(self._temporary_dir.name) / "0001.txt"
+        input_path.write_text("abc\n" * 100, encoding="utf-8")
+        solver_path = Path(self._temporary_dir.name) / "solver.py"
+        solver_path.write_text(ECHO_SCORE, encoding="utf-8")
+        tester = minimal_tester(
+            input_file_names=[str(input_path), str(input_path)],
+            execute_command=f"{sys.executable} {solver_path}",
+            timeout=10_000,
+            cpu_count=2,
+        )
+        thread_scores = tester.run()
+        tester.engine = "event"
+        event_scores = tester.run()
+
+        self.assertEqual(thread_scores, [400, 400])
+        self.assertEqual(event_scores, thread_scores)
+
+    def test_invalid_engine_is_rejected(self) -> None:
+        with self.assertRaisesRegex(ValueError, "engine"):
+            parallel_tester.ParallelTester(
+                "maximize",
+                "main.cpp",
+                None,
+                "./a.out",
+                [],
+                1,
+                False,
+                sum,
+                None,
+                False,
+                "",
+                engine="process",
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
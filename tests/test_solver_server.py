@@ -0,0 +1,97 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from ahclib.parallel_tester import ParallelTester
+from ahclib.solver_server import SolverServerPool
+
+# 入力が 0 なら異常終了、負なら止まり、それ以外は入力 × 最初の引数を score にする
+SERVER_SOLVER = """\
+import os
+import sys
+import time
+
+stdin = sys.stdin.buffer
+while header := stdin.readline():
+    argument_count, input_size = map(int, header.split())
+    arguments = [stdin.readline().decode().rstrip("\\n") for _ in range(argument_count)]
+    value = int(stdin.read(input_size))
+    if value == 0:
+        sys.exit(3)
+    if value < 0:
+        time.sleep(10)
+    output = f"{value}\\n".encode()
+    sys.stdout.buffer.write(output)
+    sys.stdout.buffer.flush()
+    factor = int(arguments[0]) if arguments else 1
+    sys.stderr.write(f"pid = {os.getpid()}\\nscore = {value * factor}\\nahclib:done {len(output)}\\n")
+    sys.stderr.flush()
+"""
+
+
+class SolverServerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._temporary_dir.name)
+        (self.directory / "solver.py").write_text(SERVER_SOLVER, encoding="utf-8")
+        self.previous_cwd = os.getcwd()
+        os.chdir(self.directory)
+        self.execute_command = f"{sys.executable} solver.py"
+        self.pool = SolverServerPool(self.execute_command.split())
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        os.chdir(self.previous_cwd)
+        self._temporary_dir.cleanup()
+
+    def _tester(self, values: list[int], timeout: int = 10_000) -> ParallelTester:
+        input_paths = []
+        for case_index, value in enumerate(values):
+            input_path = self.directory / f"{case_index:04}.txt"
+            input_path.write_text(f"{value}\n", encoding="utf-8")
+            input_paths.append(str(input_path))
+        return ParallelTester(
+            "maximize",
+            "main.cpp",
+            None,
+            self.execute_command,
+            input_paths,
+            1,
+            False,
+            sum,
+            timeout,
+            False,
+            "",
+            solver_servers=self.pool,
+        )
+
+    def test_one_process_serves_cases_across_runs(self) -> None:
+        tester = self._tester([1, 2, 3])
+        tester.append_execute_command([10])
+        self.assertEqual(tester.run(), [10, 20, 30])
+
+        # 次の trial の引数もケースごとに渡すので、同じソルバーを使い続ける
+        next_tester = self._tester([1, 2, 3])
+        next_tester.append_execute_command([2])
+        self.assertEqual(next_tester.run(), [2, 4, 6])
+        self.assertEqual((self.pool.spawn_count, self.pool.restart_count), (1, 0))
+
+    def test_timeout_and_crash_restart_the_server(self) -> None:
+        tester = self._tester([1, -1, 0, 2], timeout=500)
+
+        with self.assertLogs("ahclib.solver_server", level="WARNING") as logs:
+            results = tester.run_record(record=True)
+
+        self.assertEqual([state for _, _, _, state, _ in results], ["AC", "TLE", "ERROR", "AC"])
+        self.assertEqual([score for _, score, _, _, _ in results][::3], [1, 2])
+        self.assertIn("code 3", logs.output[0])
+        self.assertEqual((self.pool.spawn_count, self.pool.restart_count), (3, 2))
+        assert tester.last_output_dir is not None
+        self.assertEqual((Path(tester.last_output_dir) / "out" / "0003.txt").read_text(encoding="utf-8"), "2\n")
+        self.assertIn("score = 2", (Path(tester.last_output_dir) / "err" / "0003.txt").read_text(encoding="utf-8"))
+
+
+if __name__ == "__main__":
+    unittest.main()
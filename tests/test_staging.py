@@ -0,0 +1,105 @@
+import json
+import os
+import stat
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from ahclib.parallel_tester import ParallelTester
+from ahclib.result_cache import OUT_SUFFIX, ResultCache
+from ahclib.run_journal import JOURNAL_FILE
+from ahclib.staging import RunStaging
+
+# 入力を出力へ写し、実行ファイルの場所と score を stderr へ書く
+SOLVER = f"""#!{sys.executable}
+import sys
+
+value = int(sys.stdin.read())
+print(value)
+print(f"path = {{sys.argv[0]}}", file=sys.stderr)
+print(f"score = {{value}}", file=sys.stderr)
+"""
+
+
+class RunStagingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._temporary_dir.name)
+        self.stage_dir = self.directory / "shm"
+        self.stage_dir.mkdir()
+        solver_path = self.directory / "solver"
+        solver_path.write_text(SOLVER, encoding="utf-8")
+        solver_path.chmod(solver_path.stat().st_mode | stat.S_IEXEC)
+        self.input_paths = []
+        for case_index in range(3):
+            input_path = self.directory / f"{case_index:04}.txt"
+            input_path.write_text(f"{case_index + 1}\n", encoding="utf-8")
+            self.input_paths.append(str(input_path))
+        self.previous_cwd = os.getcwd()
+        os.chdir(self.directory)
+
+    def tearDown(self) -> None:
+        os.chdir(self.previous_cwd)
+        self._temporary_dir.cleanup()
+
+    def test_flushed_records_leave_tmpfs(self) -> None:
+        staging = RunStaging(str(self.stage_dir), str(self.directory), ("out",))
+        (self.directory / "out").mkdir()
+        Path(staging.directory, "out", "0000.txt").write_text("1\n", encoding="utf-8")
+        flushed = threading.Event()
+        staged_after_flush: list[bool] = []
+
+        def on_flushed() -> None:
+            staged_after_flush.append(Path(staging.directory, "out", "0000.txt").exists())
+            flushed.set()
+
+        try:
+            staging.flush([os.path.join("out", "0000.txt")], on_flushed)
+            self.assertTrue(flushed.wait(10))
+        finally:
+            staging.close()
+
+        self.assertEqual(staged_after_flush, [False])
+        self.assertEqual((self.directory / "out" / "0000.txt").read_text(encoding="utf-8"), "1\n")
+
+    def test_records_are_flushed_from_stage_before_journal(self) -> None:
+        cache = ResultCache(str(self.directory / "cache"), max_bytes=1 << 20)
+        tester = ParallelTester(
+            "maximize",
+            "main.cpp",
+            None,
+            "./solver",
+            self.input_paths,
+            2,
+            False,
+            sum,
+            10_000,
+            False,
+            "",
+            stage_dir=str(self.stage_dir),
+            result_cache=cache,
+        )
+
+        with self.assertLogs("ahclib.parallel_tester", level="INFO") as logs:
+            results = tester.run_record(record=True)
+
+        self.assertEqual([score for _, score, _, _, _ in results], [1, 2, 3])
+        assert tester.last_output_dir is not None
+        output_dir = Path(tester.last_output_dir)
+        self.assertEqual((output_dir / "out" / "0002.txt").read_text(encoding="utf-8"), "3\n")
+        # ソルバーは tmpfs に複製した実行ファイルから起動する
+        stderr = (output_dir / "err" / "0000.txt").read_text(encoding="utf-8")
+        self.assertIn(f"path = {self.stage_dir}", stderr)
+        journal = [json.loads(line) for line in (output_dir / JOURNAL_FILE).read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(len(journal), 3)
+        self.assertTrue(any("6 files" in line for line in logs.output))
+        # キャッシュへの保存は tmpfs から記録を消す前に読み終える
+        self.assertEqual(len(list((self.directory / "cache").rglob(f"*{OUT_SUFFIX}"))), 3)
+        # 終了後は tmpfs に何も残さない
+        self.assertEqual(list(self.stage_dir.iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
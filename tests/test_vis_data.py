@@ -1,7 +1,9 @@
 import csv
+import json
 import os
 import sys
 import tempfile
+import time
 import unittest
 from pathlib import Path
 from types import SimpleNamespace
@@ -17,6 +19,7 @@ from ahclib.vis.config import case_column_defs
 from ahclib.vis.data import ResultStore, normalize_case_id
 from ahclib.vis.layout import build_layout
 from ahclib.main import get_args
+from ahclib.run_journal import JOURNAL_FILE, RUN_MANIFEST_FILE, CaseJournal
 from ahclib.vis.table_data import (
     build_case_rows,
     build_run_rows,
@@ -195,6 +198,8 @@ class ResultStoreTest(unittest.TestCase):
                 self.assertEqual(summary["median_score"], 15)
                 self.assertEqual(summary["ng_cnt"], 1)
                 self.assertAlmostEqual(summary["ci95_score"], 9.8)
+                # 資源使用量の列がない古い result.csv は欠損として読む
+                self.assertTrue(pd.isna(summary["max_rss_mb"]))
 
                 _write_results(
                     result_path,
@@ -210,6 +215,45 @@ class ResultStoreTest(unittest.TestCase):
                 if previous_module is not None:
                     sys.modules["ahc_settings"] = previous_module
 
+    def test_running_result_is_read_incrementally_from_journal(self) -> None:
+        with tempfile.TemporaryDirectory() as temporary_dir:
+            run_path = Path(temporary_dir) / "run-1"
+            run_path.mkdir()
+            (run_path / RUN_MANIFEST_FILE).write_text(
+                json.dumps(
+                    {
+                        "input_file_names": ["./in/a.txt", "./in/b.txt", "./in/c.txt", "./in/d.txt"],
+                        "started_at": time.time() - 10,
+                        "pid": os.getpid(),
+                        "finished_at_start": 0,
+                    }
+                ),
+                encoding="utf-8",
+            )
+            journal = CaseJournal(str(run_path / JOURNAL_FILE))
+            journal.append(("./in/a.txt", 10, float("nan"), "AC", "0.100"))
+            journal.close()
+            with (run_path / JOURNAL_FILE).open("a", encoding="utf-8") as journal_file:
+                journal_file.write('{"filename": "./in/b.txt", ')
+            store = ResultStore(base_path=temporary_dir, direction="minimize")
+
+            first = store.snapshot()
+            self.assertEqual(list(first.results["score"]), [10])
+            self.assertRegex(first.run_summary.iloc[0]["progress"], r"^1/4 ETA 0:[23]\d$")
+            offset = store._live_runs["run-1"].offset
+
+            with (run_path / JOURNAL_FILE).open("a", encoding="utf-8") as journal_file:
+                journal_file.write('"score": 20, "relative_score": null, "state": "AC", "time": "0.200"}\n')
+            second = store.snapshot()
+            self.assertEqual(list(second.results["score"]), [10, 20])
+            self.assertGreater(store._live_runs["run-1"].offset, offset)
+            self.assertTrue(second.run_summary.iloc[0]["progress"].startswith("2/4 ETA"))
+
+            _write_results(run_path / "result.csv", [("./in/a.txt", 10, "AC", 0.1)])
+            finished = store.snapshot()
+            self.assertEqual(finished.run_summary.iloc[0]["progress"], "")
+            self.assertEqual(store._live_runs, {})
+
     def test_meta_reparses_only_changed_inputs_and_exposes_warnings(self) -> None:
         with tempfile.TemporaryDirectory() as temporary_dir:
             project_path = Path(temporary_dir)
@@ -363,6 +407,33 @@ class TableDataTest(unittest.TestCase):
         self.assertEqual(sorted_rows[0]["id"], "in/a.txt")
         self.assertEqual(by_id[sorted_rows[0]["id"]]["name"], "a.txt")
 
+    def test_case_rows_include_resource_usage_differences(self) -> None:
+        results = self.results.copy()
+        results["user_time"] = [0.5, 1.0, 0.75, None]
+        results["sys_time"] = [0.25, 0.0, 0.25, None]
+        results["max_rss_kb"] = [2048, 1024, 4096, None]
+
+        by_id = {
+            row["id"]: row
+            for row in build_case_rows(
+                results,
+                target_timestamp="run-2",
+                base_timestamp="run-1",
+                direction="minimize",
+            )
+        }
+
+        self.assertEqual(by_id["in/a.txt"]["cpu_time"], 1.0)
+        self.assertEqual(by_id["in/a.txt"]["cpu_time_delta"], 0.25)
+        self.assertEqual(by_id["in/a.txt"]["max_rss_mb"], 4.0)
+        self.assertEqual(by_id["in/a.txt"]["max_rss_delta_mb"], 2.0)
+        self.assertIsNone(by_id["in/b.txt"]["cpu_time"])
+
+        run_rows, _ = build_run_rows(results, base_timestamp="run-1", memo_getter=lambda _timestamp: "")
+        run_by_id = {row["id"]: row for row in run_rows}
+        self.assertEqual(run_by_id["run-1"]["cpu_time_mean"], 0.875)
+        self.assertEqual(run_by_id["run-2"]["max_rss_mb"], 4.0)
+
     def test_case_rows_can_filter_non_accepted_cases(self) -> None:
         rows = build_case_rows(
             self.results,
@@ -411,6 +482,19 @@ class TableDataTest(unittest.TestCase):
         self.assertEqual([row["id"] for row in bookmarked], ["in/b.txt"])
         self.assertEqual(bookmarked[0]["case_memo"], "inspect")
 
+    def test_case_rows_can_filter_mle_cases(self) -> None:
+        results = self.results.copy()
+        results.loc[results["state"] == "TLE", "state"] = "MLE"
+
+        rows = build_case_rows(
+            results,
+            target_timestamp="run-2",
+            base_timestamp="run-1",
+            direction="minimize",
+            comparison_filters=["mle"],
+        )
+        self.assertEqual([row["id"] for row in rows], ["in/b.txt"])
+
     def test_case_rows_include_input_parameters(self) -> None:
         metadata = pd.DataFrame(
             [
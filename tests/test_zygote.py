@@ -0,0 +1,132 @@
+import csv
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from ahclib.parallel_tester import ParallelTester
+from ahclib.solver_engine import popen_hooks_supported
+from ahclib.zygote import PythonZygoteLauncher, zygote_supported
+
+# import したプロセスの pid を覚えておき、zygote で import したかを確かめる
+HELPER = "import os\nIMPORTED_BY = os.getpid()\n"
+# 入力が 0 なら異常終了、負なら止まり、それ以外は入力 × 最初の引数を score にする
+SOLVER = """\
+import os
+import sys
+
+import helper
+
+value = int(sys.stdin.read())
+if value == 0:
+    sys.exit(3)
+while value < 0:
+    pass
+print(value)
+factor = int(sys.argv[1]) if len(sys.argv) > 1 else getattr(helper, "FACTOR", 1)
+print(f"score = {value * factor}", file=sys.stderr)
+print(f"preloaded = {helper.IMPORTED_BY != os.getpid()}", file=sys.stderr)
+"""
+
+
+@unittest.skipUnless(zygote_supported(), "zygote は Linux 専用")
+class PythonZygoteTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._temporary_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._temporary_dir.name)
+        (self.directory / "helper.py").write_text(HELPER, encoding="utf-8")
+        (self.directory / "solver.py").write_text(SOLVER, encoding="utf-8")
+        self.previous_cwd = os.getcwd()
+        os.chdir(self.directory)
+        self.launcher = PythonZygoteLauncher()
+
+    def tearDown(self) -> None:
+        self.launcher.close()
+        os.chdir(self.previous_cwd)
+        self._temporary_dir.cleanup()
+
+    def _tester(self, values: list[int], engine: str = "thread", timeout: int = 10_000) -> ParallelTester:
+        input_paths = []
+        for case_index, value in enumerate(values):
+            input_path = self.directory / f"{case_index:04}.txt"
+            input_path.write_text(f"{value}\n", encoding="utf-8")
+            input_paths.append(str(input_path))
+        return ParallelTester(
+            "maximize",
+            "main.cpp",
+            None,
+            f"{sys.executable} solver.py",
+            input_paths,
+            2,
+            False,
+            sum,
+            timeout,
+            False,
+            "",
+            engine=engine,
+            solver_zygote=self.launcher,
+        )
+
+    def test_cases_fork_from_preloaded_solver(self) -> None:
+        for engine in ("thread", "event"):
+            with self.subTest(engine=engine):
+                tester = self._tester([1, 2, 3], engine=engine)
+                tester.append_execute_command([10])
+                self.assertEqual(tester.run(), [10, 20, 30])
+        self.assertEqual(self.launcher.fork_count, 6)
+
+    def test_timeout_crash_and_usage_match_normal_spawn(self) -> None:
+        tester = self._tester([1, -1, 0], timeout=500)
+
+        results = tester.run_record(record=True)
+
+        self.assertEqual([state for _, _, _, state, _ in results], ["AC", "TLE", "ERROR"])
+        assert tester.last_output_dir is not None
+        output_dir = Path(tester.last_output_dir)
+        self.assertEqual((output_dir / "out" / "0000.txt").read_text(encoding="utf-8"), "1\n")
+        self.assertIn("preloaded = True", (output_dir / "err" / "0000.txt").read_text(encoding="utf-8"))
+        with open(output_dir / "result.csv", encoding="utf-8", newline="") as csv_file:
+            rows = list(csv.DictReader(csv_file))
+        self.assertTrue(all(row["max_rss_kb"] for row in rows))
+
+    def test_edited_script_restarts_zygote(self) -> None:
+        self._tester([2]).run()
+        (self.directory / "solver.py").write_text(SOLVER.replace("value * factor", "value * 7"), encoding="utf-8")
+        os.utime(self.directory / "solver.py", ns=(0, 0))
+
+        self.assertEqual(self._tester([2]).run(), [14])
+
+    def test_edited_local_module_restarts_zygote(self) -> None:
+        self.assertEqual(self._tester([2]).run(), [2])
+        (self.directory / "helper.py").write_text(HELPER + "FACTOR = 5\n", encoding="utf-8")
+        os.utime(self.directory / "helper.py", ns=(0, 0))
+
+        self.assertEqual(self._tester([2]).run(), [10])
+
+    def test_zygote_is_used_only_while_its_tester_runs(self) -> None:
+        self.assertEqual(self._tester([2]).run(), [2])
+        other = self._tester([3])
+        other.solver_zygote = None
+
+        self.assertEqual(other.run(), [3])
+        self.assertEqual(self.launcher.fork_count, 1)
+
+
+class PopenHooksTest(unittest.TestCase):
+    def test_overridden_popen_internals_match_this_python(self) -> None:
+        # 失敗した場合は、Python の更新で Popen の非公開メソッドの引数が変わっている
+        self.assertTrue(popen_hooks_supported("_execute_child", "_try_wait", "_internal_poll", "_close_pipe_fds"))
+
+    def test_changed_popen_internals_are_not_used(self) -> None:
+        def changed_try_wait(self, wait_flags, timeout):
+            return 0, 0
+
+        with mock.patch.object(subprocess.Popen, "_try_wait", changed_try_wait):
+            self.assertFalse(popen_hooks_supported("_try_wait"))
+
+
+if __name__ == "__main__":
+    unittest.main()